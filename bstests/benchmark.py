@@ -0,0 +1,264 @@
+#-----------------------------------------------------------------------------
+# Buli Script
+# Copyright (C) 2020 - Grum999
+# -----------------------------------------------------------------------------
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.
+# If not, see https://www.gnu.org/licenses/
+# -----------------------------------------------------------------------------
+# A Krita plugin designed to draw programmatically
+# -----------------------------------------------------------------------------
+
+# Benchmarks for tokenizer, parser and interpreter
+#
+# Script has to be executed from Krita (Tools > Scripts > Scripter) as plugin
+# modules need Krita environment
+#
+# Executed without arguments, all benchmarks are executed, otherwise only
+# benchmarks for given names:
+#   benchmark.py tokenizer
+#
+# Durations are the best of BENCHMARK_RUNS executions
+
+import glob
+import os.path
+import sys
+import time
+import tracemalloc
+
+from buliscript.bs.bslanguagedef import BSLanguageDef
+from buliscript.bs.bsinterpreter import BSInterpreter
+from buliscript.bs.bsrenderer import BSWRendererScene
+from buliscript.pktk.modules.parser import ASTItem
+
+try:
+    BSTESTS_PATH=os.path.dirname(os.path.abspath(__file__))
+except NameError:
+    # executed from Krita's scripter without file name
+    BSTESTS_PATH=os.getcwd()
+
+BENCHMARK_RUNS=3
+
+
+def bsTestsScripts():
+    """Return a list of tuple (file name, content) for all bstests scripts"""
+    returned=[]
+    for fileName in sorted(glob.glob(os.path.join(BSTESTS_PATH, '*.bs'))):
+        with open(fileName, 'r') as fHandle:
+            returned.append((os.path.basename(fileName), fHandle.read()))
+    return returned
+
+
+def generatedScript(nbLines):
+    """Return a script of about `nbLines` lines, built from test-drawing.bs content
+
+    Import instructions are only allowed at the beginning of script, and macro definitions before
+    other instructions: script is built with imports, then repeated macro definitions and then
+    repeated instructions
+    """
+    with open(os.path.join(BSTESTS_PATH, 'test-drawing.bs'), 'r') as fHandle:
+        lines=fHandle.read().split('\n')
+
+    imports=[line for line in lines if line.startswith('import')]
+    lines=[line for line in lines if not line.startswith('import')]
+
+    # instructions start on first line that is not a macro definition
+    index=0
+    for index, line in enumerate(lines):
+        if line!='' and not(line[0] in ' #' or line.startswith('define')):
+            break
+    definitions=lines[:index]
+    instructions=lines[index:]
+
+    nbRepeat=max(1, round((nbLines-len(imports))/len(lines)))
+    return '\n'.join(imports+definitions*nbRepeat+instructions*nbRepeat)
+
+
+def bestTime(function, runs=BENCHMARK_RUNS):
+    """Execute `runs` times given `function` and return best execution time, in seconds"""
+    returned=None
+    for run in range(runs):
+        startTime=time.perf_counter()
+        function()
+        duration=time.perf_counter()-startTime
+        if returned is None or duration<returned:
+            returned=duration
+    return returned
+
+
+def benchmarkTokenizer():
+    """Tokenize bstests scripts and generated 10k/100k lines scripts (cache cleared before each run)"""
+    tokenizer=BSLanguageDef().tokenizer()
+
+    scripts=bsTestsScripts()
+    for nbLines in (10000, 100000):
+        scripts.append((f'generated-{nbLines}', generatedScript(nbLines)))
+
+    def tokenize(text):
+        tokenizer.clearCache(True)
+        return tokenizer.tokenize(text)
+
+    for name, text in scripts:
+        nbTokens=tokenize(text).length()
+        duration=bestTime(lambda: tokenize(text))
+        print(f"{name:<24} {text.count(chr(10))+1:>7} lines {nbTokens:>8} tokens {duration*1000:>10.1f} ms")
+
+
+def benchmarkTokensMemory():
+    """Memory used to tokenize generated 10k/100k lines scripts, and time to access all tokens"""
+    tokenizer=BSLanguageDef().tokenizer()
+
+    for nbLines in (10000, 100000):
+        text=generatedScript(nbLines)
+
+        tokenizer.clearCache(True)
+        tracemalloc.start()
+        tokens=tokenizer.tokenize(text)
+        retained, peak=tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # first access only: Token objects are created on first access
+        duration=bestTime(lambda: [token.value() for token in tokens.list()], 1)
+        print(f"generated-{nbLines:<14} {tokens.length():>8} tokens  peak {peak/1048576:>7.2f} MB  retained {retained/1048576:>7.2f} MB  tokens access {duration*1000:>8.1f} ms")
+
+
+def newParser(languageDef, packratEnabled=False):
+    """Return a new parser initialised like interpreter parser, without incremental parsing
+
+    (a parser doesn't parse again a text already parsed)
+    """
+    parser=BSInterpreter.newParser(languageDef)
+    parser.setIncremental(False)
+    parser.setPackratEnabled(packratEnabled)
+    return parser
+
+
+def benchmarkParserPackrat():
+    """Parse test-grammar.bs and synthetic deep expressions scripts, with and without packrat cache"""
+    with open(os.path.join(BSTESTS_PATH, 'test-grammar.bs'), 'r') as fHandle:
+        scripts=[('test-grammar.bs', fHandle.read())]
+
+    nestedExpression='1'
+    for index in range(50):
+        nestedExpression=f"({nestedExpression} + :v{index}) * 2"
+    scripts.append(('nested-expression', f"set variable :x = {nestedExpression}\n"*20))
+    scripts.append(('long-expression', f"set variable :x = {' + '.join([f'(:v{index} * {index})' for index in range(500)])}\n"*20))
+    scripts.append(('long-list', f"set variable :x = [{', '.join([f'[{index}, :v{index} - 1]' for index in range(500)])}]\n"*20))
+
+    languageDef=BSLanguageDef()
+    for name, text in scripts:
+        # tokenized texts are kept in tokenizer cache, durations are for parsing only
+        parser=newParser(languageDef)
+        parser.parse(text)
+
+        durations=[]
+        for packratEnabled in (False, True):
+            durations.append(bestTime(lambda: newParser(languageDef, packratEnabled).parse(text)))
+        print(f"{name:<24} errors {len(parser.errors()):>3}  no packrat {durations[0]*1000:>8.1f} ms  packrat {durations[1]*1000:>8.1f} ms")
+
+
+def benchmarkParserAst():
+    """AST build time and memory for test-grammar.bs and generated 10k/100k lines scripts"""
+    def countNodes(ast):
+        returned=1
+        for node in ast.nodes():
+            if isinstance(node, ASTItem):
+                returned+=countNodes(node)
+        return returned
+
+    with open(os.path.join(BSTESTS_PATH, 'test-grammar.bs'), 'r') as fHandle:
+        scripts=[('test-grammar.bs', fHandle.read())]
+    for nbLines in (10000, 100000):
+        scripts.append((f'generated-{nbLines}', generatedScript(nbLines)))
+
+    languageDef=BSLanguageDef()
+    for name, text in scripts:
+        # tokenized texts are kept in tokenizer cache, durations and memory are for parsing only
+        parser=newParser(languageDef)
+        parser.parse(text)
+
+        duration=bestTime(lambda: newParser(languageDef).parse(text))
+
+        parser=newParser(languageDef)
+        tracemalloc.start()
+        ast=parser.parse(text)
+        retained, peak=tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"{name:<24} errors {len(parser.errors()):>3}  {countNodes(ast):>8} AST items  parse {duration*1000:>8.1f} ms  peak {peak/1048576:>7.2f} MB  retained {retained/1048576:>7.2f} MB")
+
+
+EXECUTION_MODES=('interpreted', 'compiled', 'transpiled')
+
+
+def newInterpreter(languageDef, script, executionMode):
+    """Return a new interpreter, without verbose mode, for given `script` and execution mode
+
+    Interpreter executes script on current Krita document
+    """
+    interpreter=BSInterpreter(languageDef, BSWRendererScene())
+    interpreter.setOptionVerboseMode(False)
+    interpreter.setOptionCompileMode(executionMode=='compiled')
+    interpreter.setOptionTranspileMode(executionMode=='transpiled')
+    interpreter.setScript(script)
+    return interpreter
+
+
+def benchmarkScripts(scripts):
+    """Execute given scripts (list of tuple (name, script)) for all execution modes and print durations"""
+    languageDef=BSLanguageDef()
+    for name, text in scripts:
+        durations=[]
+        for executionMode in EXECUTION_MODES:
+            interpreter=newInterpreter(languageDef, text, executionMode)
+            durations.append(f"{executionMode} {bestTime(interpreter.execute)*1000:>8.1f} ms")
+        print(f"{name:<24} {'  '.join(durations)}")
+
+
+def benchmarkInterpreterLoops():
+    """Execute tight `repeat 100000 times` loops with arithmetic, functions, conditions and strings"""
+    benchmarkScripts([
+            ('arithmetic', "set variable :a = 0\nset variable :b = 3\nrepeat 100000 times\n    set variable :a = (:a + :b * 2 - 1) % 1000\n"),
+            ('functions', "set variable :a = 0\nrepeat 100000 times\n    set variable :a = math.absolute(:a - 1) + math.ceil(1.5)\n"),
+            ('conditions', "set variable :a = 0\nrepeat 100000 times\n    if :a > 10 then\n        set variable :a = 0\n    else\n        set variable :a = :a + 1\n"),
+            ('strings', "set variable :s = ''\nrepeat 100000 times\n    set variable :s = \"ab\" + \"c\"\n")
+        ])
+
+
+def benchmarkInterpreterEmptyLoops():
+    """Execute loops with a minimal body (empty block is not allowed): 1M iterations `repeat`, 100k iterations `for each` and 100k macro calls"""
+    benchmarkScripts([
+            ('repeat', "repeat 1000000 times\n    set variable :x = 0\n"),
+            ('for each', f"set variable :l = [{', '.join(['0']*100000)}]\nfor each item from :l as :i do\n    set variable :x = 0\n"),
+            ('call macro', "define macro 'm' as\n    set variable :x = 0\nrepeat 100000 times\n    call macro 'm'\n")
+        ])
+
+
+BENCHMARKS={
+        'tokenizer': benchmarkTokenizer,
+        'tokensMemory': benchmarkTokensMemory,
+        'parserPackrat': benchmarkParserPackrat,
+        'parserAst': benchmarkParserAst,
+        'interpreterLoops': benchmarkInterpreterLoops,
+        'interpreterEmptyLoops': benchmarkInterpreterEmptyLoops
+    }
+
+
+if __name__=='__main__':
+    names=[name for name in sys.argv[1:] if name in BENCHMARKS]
+    if len(names)==0:
+        names=list(BENCHMARKS)
+
+    for name in names:
+        print(f"-- {name}: {BENCHMARKS[name].__doc__}")
+        BENCHMARKS[name]()
@@ -0,0 +1,191 @@
+#-----------------------------------------------------------------------------
+# Buli Script
+# Copyright (C) 2020 - Grum999
+# -----------------------------------------------------------------------------
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.
+# If not, see https://www.gnu.org/licenses/
+# -----------------------------------------------------------------------------
+# A Krita plugin designed to draw programmatically
+# -----------------------------------------------------------------------------
+
+# Execution modes equivalence test: bstests scripts and generated scripts
+# (operators, flows, macros, variables scopes) are executed with each
+# execution mode, and outputs, returned values and raised exceptions must be
+# the same than with interpreted mode
+#
+# Script has to be executed from Krita (Tools > Scripts > Scripter) as plugin
+# modules need Krita environment, with an active document
+
+import glob
+import itertools
+import os.path
+
+from buliscript.bs.bslanguagedef import BSLanguageDef
+from buliscript.bs.bsinterpreter import BSInterpreter
+from buliscript.bs.bsrenderer import BSWRendererScene
+
+try:
+    BSTESTS_PATH=os.path.dirname(os.path.abspath(__file__))
+except NameError:
+    # executed from Krita's scripter without file name
+    BSTESTS_PATH=os.getcwd()
+
+# first mode is reference mode
+EXECUTION_MODES=('interpreted', 'compiled', 'transpiled')
+
+# output messages that can't be the same from one execution to another one
+IGNORED_MESSAGES=('Start script execution', 'Parsed in', 'Script executed')
+
+
+def withRandomizeSeed(script):
+    """Return given `script` with a fixed randomize seed
+
+    Import instructions and macro definitions have to be defined first: seed is defined before first
+    other instruction (a macro definition can be written on many lines, 'as' at beginning of line is
+    the end of macro definition)
+    """
+    lines=script.split('\n')
+    index=len(lines)
+    for lineNumber, line in enumerate(lines):
+        if line.strip()!='' and not(line[0] in ' #' or line.startswith(('import', 'define', 'as'))):
+            index=lineNumber
+            break
+    return '\n'.join(lines[:index]+['set script randomize seed 1']+lines[index:])
+
+
+def testScripts():
+    """Return a list of scripts to execute"""
+    returned=[]
+    for fileName in sorted(glob.glob(os.path.join(BSTESTS_PATH, '*.bs'))):
+        with open(fileName, 'r') as fHandle:
+            returned.append(fHandle.read())
+
+    values=['0', '1', '-1', '2', '0.5', '1.5', '0.0', '"abc"', '""', '[1, 2, 3]', '[]', 'ON', 'OFF', '#ff0000', ':a', ':l']
+    operators=['+', '-', '*', '/', '//', '%', '<', '<=', '>', '>=', '=', '<>', 'in', 'and', 'or', 'xor']
+    header="set variable :a = 3\nset variable :l = [1, 2.5, \"x\"]\n"
+
+    for operator in operators:
+        returned.append(header+''.join([f"print {left} {operator} {right}\n" for left, right in itertools.product(values, values)]))
+    for value in values:
+        returned.append(header+f"print not {value}\nprint -{value}\nprint {value}[1]\nprint :l[{value}]\n")
+        returned.append(header+f"if {value} then\n    print 'T'\nelse if :a = 3 then\n    print 'E'\nelse\n    print 'F'\n")
+        returned.append(header+f"repeat {value} times\n    print :repeat.currentIteration\n")
+        returned.append(header+f"for each item from {value} as :x do\n    print :x\n    print :foreach.currentAngle\n")
+
+    # macros: parameters, returned values, recursion, errors
+    returned.append(header+"define macro 'm' with parameters :p1 :p2 as\n    set global variable :g = :p1 + :p2\n    return :p1 * :p2\n    print 'never'\n"
+                           "call macro 'm' 2 3 and store result into variable :r\nprint :r\nprint :g\ncall macro 'm' 2\ncall macro 'zz'\n")
+    returned.append(header+"define macro 'f' with parameters :n as\n    set variable :r = 1\n    if :n > 1 then\n        call macro 'f' :n - 1 and store result into variable :r\n    return :n * :r\n"
+                           "call macro 'f' 10 and store result into variable :x\nprint :x\n")
+    # loops variables, functions and invalid expressions
+    returned.append(header+"repeat 3 times\n    if :repeat.isLastIteration then\n        print 'last'\n    set variable :a = :a + 1\n"
+                           "print :a\nprint math.random(1, 10)\nprint math.sum(1, 2, [3, 4])\nprint string.format('{0} {1}', 1)\nprint math.absolute()\n")
+    returned.append(header+"print [1, 2, [3, :a]]\nprint \"abc\"[2]\nprint (:a + 1) * 2\nprint 1 + :undefined\n")
+    # variables scopes
+    returned.append("set variable :x = 1\nfor each item from [5, 6] as :x do\n    print :x\n    set variable :x = :x + 10\n    print :x\n    set global variable :x = 99\n    print :x\nprint :x\n")
+    returned.append("set variable :v = 'g'\ndefine macro 'm' with parameters :v as\n    print :v\n    set variable :v = 'local'\n    print :v\n    set global variable :v = 'glob'\n    print :v\n"
+                    "    set variable :w = 'mw'\n    repeat 2 times\n        set variable :v = :v + '!'\n        set variable :z = :repeat.currentIteration\n        print :v\n    print :z\n    return :v\n"
+                    "set variable :pp = 'p'\ncall macro 'm' :pp and store result into variable :r\nprint :r\nprint :v\nprint :w\nprint :z\n")
+    returned.append("define macro 'inner' as\n    print :outerLocal\n    set global variable :outerLocal = 'fromInner'\n    print :outerLocal\n    set variable :n = 1\n"
+                    "define macro 'outer' as\n    set variable :outerLocal = 'o'\n    call macro 'inner'\n    print :outerLocal\n    print :n\ncall macro 'outer'\nprint :outerLocal\nprint :n\n")
+    returned.append("set variable :q = 0\nrepeat 2 times\n    repeat 2 times\n        for each item from [1, 2] as :x do\n            for each item from [3] as :x do\n"
+                    "                set global variable :x = 7\n                set variable :x = 8\n                print :x\n            print :x\n        print :x\n"
+                    "        set variable :q = :q + 1\n    print :repeat.currentIteration\nprint :repeat.currentIteration\nprint :q\n")
+    returned.append("define macro 'r' with parameters :d as\n    set variable :k = :d\n    if :d < 4 then\n        call macro 'r' :d + 1\n    set global variable :k = :k * 10\n    print :k\n"
+                    "call macro 'r' 1\nprint :k\n")
+    return [withRandomizeSeed(script) for script in returned]
+
+
+class ExecutionResult(object):
+    """Execute a script with an interpreter and keep output messages and result"""
+
+    def __init__(self, interpreter, script):
+        self.__messages=[]
+        interpreter.output.connect(self.__output)
+        try:
+            interpreter.setScript(script)
+            self.__result=f"returned {interpreter.execute()!r}"
+        except Exception as e:
+            if not e.__cause__ is None:
+                # transpiled mode: python exception converted to internal error with AST
+                e=e.__cause__
+            # execution time is provided after exception message
+            message=str(e).split('\nInformation')[0]
+            ast=e.ast().id() if hasattr(e, 'ast') and not e.ast() is None else None
+            self.__result=f"exception {type(e).__name__}: {message} [{ast}]"
+        interpreter.output.disconnect(self.__output)
+
+    def __output(self, text, type, data, cReturn):
+        """Keep output message"""
+        for ignored in IGNORED_MESSAGES:
+            if ignored in text:
+                return
+        self.__messages.append(text)
+
+    def __eq__(self, other):
+        return self.__result==other.result() and self.__messages==other.messages()
+
+    def result(self):
+        """Return result as string (returned value or exception)"""
+        return self.__result
+
+    def messages(self):
+        """Return list of output messages"""
+        return self.__messages
+
+
+def newInterpreter(languageDef, executionMode):
+    """Return a new interpreter for given execution mode"""
+    interpreter=BSInterpreter(languageDef, BSWRendererScene())
+    interpreter.setOptionCompileMode(executionMode=='compiled')
+    interpreter.setOptionTranspileMode(executionMode=='transpiled')
+    return interpreter
+
+
+def testExecutionModes():
+    """Execute scripts with all execution modes, verbose mode on and off, and compare results
+
+    Return number of differences
+    """
+    # one language definition per mode: tokens (and then values of constants) are cached by tokenizer
+    # and some actions modify colors values, then a mode must not use tokens from another mode
+    interpreters={executionMode: newInterpreter(BSLanguageDef(), executionMode) for executionMode in EXECUTION_MODES}
+
+    scripts=testScripts()
+    returned=0
+    for index, script in enumerate(scripts):
+        for verboseMode in (True, False):
+            results=[]
+            for executionMode in EXECUTION_MODES:
+                interpreters[executionMode].setOptionVerboseMode(verboseMode)
+                results.append(ExecutionResult(interpreters[executionMode], script))
+
+            for executionMode, result in zip(EXECUTION_MODES[1:], results[1:]):
+                if not result==results[0]:
+                    returned+=1
+                    print(f"  script {index} (verbose {verboseMode}): {executionMode} mode is different")
+                    print(f"    {EXECUTION_MODES[0]}: {results[0].result()}")
+                    print(f"    {executionMode}: {result.result()}")
+
+    print(f"{len(scripts)} scripts executed with {', '.join(EXECUTION_MODES)} modes, {returned} difference")
+    return returned
+
+
+if __name__=='__main__':
+    nbDifferences=testExecutionModes()
+
+    if nbDifferences==0:
+        print("OK")
+    else:
+        print(f"FAILED: {nbDifferences} difference")
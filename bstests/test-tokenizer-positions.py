@@ -0,0 +1,101 @@
+#-----------------------------------------------------------------------------
+# Buli Script
+# Copyright (C) 2020 - Grum999
+# -----------------------------------------------------------------------------
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.
+# If not, see https://www.gnu.org/licenses/
+# -----------------------------------------------------------------------------
+# A Krita plugin designed to draw programmatically
+# -----------------------------------------------------------------------------
+
+# Tokens positions test: for each token, column/row returned from position
+# (and position returned from column/row) must match token column/row, line
+# text must contain token text and token must be found from its column/row
+#
+# Tokens positions are UTF-16 code units: scripts are also tested with
+# characters outside unicode BMP (emoji) in comments and strings, before line
+# feeds
+#
+# Script has to be executed from Krita (Tools > Scripts > Scripter) as plugin
+# modules need Krita environment
+
+import glob
+import os.path
+
+from buliscript.bs.bslanguagedef import BSLanguageDef
+
+try:
+    BSTESTS_PATH=os.path.dirname(os.path.abspath(__file__))
+except NameError:
+    # executed from Krita's scripter without file name
+    BSTESTS_PATH=os.getcwd()
+
+NON_BMP_CHAR='\U0001F600'
+
+
+def testScripts():
+    """Return a list of tuple (name, script) to tokenize"""
+    returned=[]
+    for fileName in sorted(glob.glob(os.path.join(BSTESTS_PATH, '*.bs'))):
+        with open(fileName, 'r') as fHandle:
+            text=fHandle.read()
+        returned.append((os.path.basename(fileName), text))
+        # non BMP characters in comments and strings
+        returned.append((f"{os.path.basename(fileName)} (non BMP)", text.replace('# ', f'# {NON_BMP_CHAR}').replace('"', f'"{NON_BMP_CHAR}')))
+
+    returned.append(('non BMP before line feed', f"# {NON_BMP_CHAR}\nprint \"{NON_BMP_CHAR}{NON_BMP_CHAR}\" 1\n\nset variable :v = '{NON_BMP_CHAR}'  # {NON_BMP_CHAR}\nprint :v\n"))
+    return returned
+
+
+def testTokensPositions(name, text, tokenizer):
+    """Check positions for all tokens from given text
+
+    Return number of errors
+    """
+    tokens=tokenizer.tokenize(text)
+
+    returned=0
+    for token in tokens.list():
+        errors=[]
+        if tokens.positionToColRow(token.positionStart())!=(token.column(), token.row()):
+            errors.append(f"positionToColRow() returned {tokens.positionToColRow(token.positionStart())}")
+        if tokens.colRowToPosition(token.column(), token.row())!=token.positionStart():
+            errors.append(f"colRowToPosition() returned {tokens.colRowToPosition(token.column(), token.row())}")
+
+        lineText=tokens.lineText(token.row())
+        if lineText is None or not tokens.textRange(token.positionStart(), token.positionEnd()).split('\n')[0] in lineText:
+            errors.append(f"token text not found in line text {lineText!r}")
+        if token.length()>0 and tokens.tokenAt(token.column(), token.row()) is None:
+            errors.append("tokenAt() returned None")
+
+        if len(errors)>0:
+            returned+=1
+            if returned<=5:
+                print(f"  {name}: token {token.index()} ({token.column()}, {token.row()}): {', '.join(errors)}")
+
+    print(f"{name:<32} {tokens.length():>6} tokens, {returned} error")
+    return returned
+
+
+if __name__=='__main__':
+    tokenizer=BSLanguageDef().tokenizer()
+
+    nbErrors=0
+    for name, text in testScripts():
+        nbErrors+=testTokensPositions(name, text, tokenizer)
+
+    if nbErrors==0:
+        print("OK")
+    else:
+        print(f"FAILED: {nbErrors} error")
@@ -0,0 +1,123 @@
+#-----------------------------------------------------------------------------
+# Buli Script
+# Copyright (C) 2020 - Grum999
+# -----------------------------------------------------------------------------
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.
+# If not, see https://www.gnu.org/licenses/
+# -----------------------------------------------------------------------------
+# A Krita plugin designed to draw programmatically
+# -----------------------------------------------------------------------------
+
+# Tokenizer stress test: the same tokenizer is used to tokenize scripts from
+# many threads, and tokens (type, position, row, column, indent) must be the
+# same than tokens returned by a serial execution
+#
+# Script has to be executed from Krita (Tools > Scripts > Scripter) as plugin
+# modules need Krita environment
+
+import glob
+import os.path
+import sys
+
+from PyQt5.Qt import *
+
+from buliscript.bs.bslanguagedef import BSLanguageDef
+
+try:
+    BSTESTS_PATH=os.path.dirname(os.path.abspath(__file__))
+except NameError:
+    # executed from Krita's scripter without file name
+    BSTESTS_PATH=os.getcwd()
+
+NB_THREADS=8
+NB_ROUNDS=3
+
+
+class TokenizeRunnable(QRunnable):
+    """Tokenize a text and store tokens signature in results"""
+
+    def __init__(self, tokenizer, index, text, results):
+        super(TokenizeRunnable, self).__init__()
+        self.__tokenizer=tokenizer
+        self.__index=index
+        self.__text=text
+        self.__results=results
+
+    def run(self):
+        try:
+            self.__results[self.__index]=tokensSignature(self.__tokenizer.tokenize(self.__text))
+        except Exception as e:
+            self.__results[self.__index]=e
+
+
+def tokensSignature(tokens):
+    """Return a list of tuple (type, position, row, column, indent) for given tokens"""
+    return [(token.type(), token.positionStart(), token.positionEnd(), token.row(), token.column(), token.indent()) for token in tokens.list()]
+
+
+def testTokenizerThreads(cacheMaxEntries):
+    """Tokenize scripts in parallel and compare results with serial results
+
+    Return number of mismatches
+    """
+    texts=[]
+    for fileName in sorted(glob.glob(os.path.join(BSTESTS_PATH, '*.bs'))):
+        with open(fileName, 'r') as fHandle:
+            text=fHandle.read()
+        # same content but different texts: rows of tokens are not the same
+        texts+=[('\n'*index)+text for index in range(10)]
+
+    tokenizer=BSLanguageDef().tokenizer()
+    tokenizer.setCacheLimits(cacheMaxEntries)
+
+    serialResults=[tokensSignature(tokenizer.tokenize(text)) for text in texts]
+    # texts must be tokenized again, not returned from cache
+    tokenizer.clearCache()
+
+    threadPool=QThreadPool()
+    threadPool.setMaxThreadCount(NB_THREADS)
+
+    parallelTexts=texts*NB_ROUNDS
+    parallelResults=[None]*len(parallelTexts)
+
+    # force threads to switch often
+    switchInterval=sys.getswitchinterval()
+    sys.setswitchinterval(0.00001)
+    for index, text in enumerate(parallelTexts):
+        threadPool.start(TokenizeRunnable(tokenizer, index, text, parallelResults))
+    threadPool.waitForDone()
+    sys.setswitchinterval(switchInterval)
+
+    returned=0
+    for index, result in enumerate(parallelResults):
+        if isinstance(result, Exception):
+            print(f"  text {index}: exception {type(result).__name__}: {result}")
+            returned+=1
+        elif result!=serialResults[index%len(texts)]:
+            print(f"  text {index}: tokens are different")
+            returned+=1
+
+    print(f"cache max entries {cacheMaxEntries:>5}: {len(parallelTexts)} texts tokenized from {NB_THREADS} threads, {returned} mismatch")
+    return returned
+
+
+if __name__=='__main__':
+    # small cache: entries are evicted while other threads are tokenizing
+    nbMismatches=testTokenizerThreads(1)
+    nbMismatches+=testTokenizerThreads(1000)
+
+    if nbMismatches==0:
+        print("OK")
+    else:
+        print(f"FAILED: {nbMismatches} mismatch")
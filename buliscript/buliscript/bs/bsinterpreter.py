@@ -22,9 +22,11 @@
 
 import sys
 import re
+import hashlib
 import uuid
 import random
 import math
+import operator
 import time
 import os.path
 
@@ -41,6 +43,7 @@ from .bssettings import (
     )
 from .bslanguagedef import BSLanguageDef
 from .bsrenderer import BSRenderer
+from .bstranspiler import BSTranspiler
 
 
 from buliscript.pktk.modules.ekrita import (
@@ -232,6 +235,31 @@ class BSInterpreter(QObject):
             'BOTTOM': 1
         }
 
+    # loop variables, in order of values provided on each iteration
+    __REPEAT_VARIABLES=(':repeat.totalIteration',
+                        ':repeat.currentIteration',
+                        ':repeat.isFirstIteration',
+                        ':repeat.isLastIteration',
+                        ':repeat.incAngle',
+                        ':repeat.currentAngle')
+
+    __FOREACH_VARIABLES=(':foreach.totalIteration',
+                         ':foreach.currentIteration',
+                         ':foreach.isFirstIteration',
+                         ':foreach.isLastIteration',
+                         ':foreach.incAngle',
+                         ':foreach.currentAngle')
+
+    # maximum number of script blocks in stack
+    # recursive execution (compiled, transpiled) reaches python recursion limit
+    # before; iterative execution is only limited by memory
+    __MAX_STACK_SIZE=1000
+    __MAX_STACK_SIZE_ITERATIVE=100000
+    # iterative execution: number of statements executed between two user interface events processing
+    __PROCESS_EVENTS_STEPS=100
+
+    # built-in functions registry, initialised with first interpreter instance
+    __functions=None
 
     def __init__(self, languageDef, renderedScene):
         super(BSInterpreter, self).__init__(None)
@@ -260,15 +288,24 @@ class BSInterpreter(QObject):
         self.__languageDef=languageDef
 
         # parser is initialised from language definition; once defined, can't be changed
-        self.__parser=Parser(languageDef.tokenizer(), languageDef.grammarRules())
-        # let parser ignore some tokens useless for execution
-        self.__parser.setIgnoredTokens([BSLanguageDef.ITokenType.SPACE,
-                                        BSLanguageDef.ITokenType.NEWLINE,
-                                        BSLanguageDef.ITokenType.COMMENT])
+        self.__parser=BSInterpreter.newParser(languageDef)
 
         # internal value to define if an execution is currently running
         self.__isRunning=False
 
+        # iterative execution: stack of flows and script blocks being executed,
+        # and next statement to execute
+        # (stack is None when execution is not iterative)
+        self.__executionStack=None
+        self.__executionNext=None
+        self.__executionStartTime=0
+
+        # when set, iterative execution is paused before next statement (or
+        # stopped, if stop has been requested)
+        self.__executionInterrupt=False
+        self.__executionStop=False
+        self.__executionPaused=False
+
         # renderer provide a QPainter ready to use
         self.__renderer=BSRenderer()
         self.__painter=None
@@ -289,7 +326,9 @@ class BSInterpreter(QObject):
         # -- default options values
 
         # debug mode by default is False
-        # when True, execution is made step by step
+        # when True, execution is made step by step: execution is iterative
+        # (compile and transpile modes are ignored) and paused before first
+        # instruction
         self.__optionDebugMode=False
 
         # verbose mode by default is False
@@ -300,6 +339,14 @@ class BSInterpreter(QObject):
         # when set, a delay is applied between each instruction
         self.__optionDelay=0
 
+        # compile mode by default is False
+        # when True, AST is compiled to python functions before execution
+        self.__optionCompileMode=False
+
+        # transpile mode by default is False
+        # when True, AST is transpiled to python code before execution
+        self.__optionTranspileMode=False
+
         # default background properties for canvas
         self.__optionDefaulViewBackgroundFrom=BSInterpreter.OPTION_BACKGROUND_FROM_ACTIVE_LAYER
         self.__optionDefaulViewBackgroundFromColor=QColor(Qt.white)
@@ -341,6 +388,15 @@ class BSInterpreter(QObject):
         # define rendered scene, on which grid, origin, ... are drawn
         self.__renderedScene=renderedScene
 
+        # AST are executed by handlers, according to AST id
+        self.__initExecuteAstHandlers()
+        self.__initCompileAstHandlers()
+        self.__initBinaryOperators()
+
+        # built-in functions are executed by handlers from functions registry
+        if BSInterpreter.__functions is None:
+            BSInterpreter.__functions=BSInterpreter.__initFunctions()
+
     # --------------------------------------------------------------------------
     # utils methods
     # --------------------------------------------------------------------------
@@ -458,6 +514,10 @@ class BSInterpreter(QObject):
         if self.__optionDelay>0:
             Timer.sleep(self.__optionDelay)
 
+            if self.__executionStop:
+                # stop requested while waiting
+                raise EInterpreter("Script execution stopped by user", None, EInterpreter.ERROR_LEVEL_STOP)
+
     def __evaluate(self, item):
         """Evaluate item value
 
@@ -467,7 +527,7 @@ class BSInterpreter(QObject):
         if isinstance(item, Token):
             if item.type() in (BSLanguageDef.ITokenType.VARIABLE_USER, BSLanguageDef.ITokenType.VARIABLE_RESERVED):
                 # get variable value
-                return self.__scriptBlockStack.current().variable(item.value())
+                return self.__scriptBlockStack.variable(item.value())
 
             # otherwise return token value
             return item.value()
@@ -563,13 +623,13 @@ class BSInterpreter(QObject):
         """Return given `value` if provided, otherwise return current canvas unit"""
         if value:
             return value
-        return self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+        return self.__scriptBlockStack.variable(':unit.canvas', 'PX')
 
     def __unitRotation(self, value=None):
         """Return given `value` if provided, otherwise return current rotation unit"""
         if value:
             return value
-        return self.__scriptBlockStack.current().variable(':unit.rotation', 'DEGREE')
+        return self.__scriptBlockStack.variable(':unit.rotation', 'DEGREE')
 
     def __updateRenderedScene(self):
         """Update rendered scene"""
@@ -712,349 +772,317 @@ class BSInterpreter(QObject):
 
         self.valid(f"**Start script execution**# #w#[##lw#*{time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())}*##w#]")
         if self.__astRoot.id()==ASTSpecialItemType.ROOT:
-            startTime=time.time()
+            self.__executionStartTime=time.time()
+            self.__executionInterrupt=False
+            self.__executionStop=False
+            self.__executionPaused=False
+
+            if self.__optionDebugMode or not (self.__optionTranspileMode or self.__optionCompileMode):
+                # iterative execution, can be paused
+                self.__scriptBlockStack.setMaxStackSize(BSInterpreter.__MAX_STACK_SIZE_ITERATIVE)
+                self.__executionStack=[self.__iterateRoot(self.__astRoot)]
+                self.__executionNext=None
+                # in debug mode, pause before first instruction
+                self.__executionInterrupt=self.__optionDebugMode
+                return self.__executeIterative()
+
+            self.__scriptBlockStack.setMaxStackSize(BSInterpreter.__MAX_STACK_SIZE)
+            self.__executionStack=None
             try:
-                returned=self.__executeAst(self.__astRoot)
-                totalTime=round(time.time()-startTime,4)
-                self.valid(f"**Script executed**# #w#[Executed in# #lw#*{totalTime}s*##w#]")
-                self.__updateRenderedScene()
-                # need to review this...
-                self.__painter=self.__renderer.finalize()
-                return returned
-            except EInterpreter as e:
-                # need to review this...
-                self.__painter=self.__renderer.finalize()
-                if e.errorLevel()==EInterpreter.ERROR_LEVEL_STOP:
-                    totalTime=round(time.time()-startTime, 4)
-                    raise EInterpreter(f"{str(e)}\nInformation# #lw#>># #lg#**Script executed **# #w#[Executed in# #lw#*{totalTime}s*##w#]", e.ast(), EInterpreter.ERROR_LEVEL_STOP)
-                raise e
+                if self.__optionTranspileMode:
+                    returned=self.__executeTranspiled(self.__astRoot)
+                else:
+                    returned=self.__compile(self.__astRoot)()
             except Exception as e:
-                # need to review this...
-                self.__painter=self.__renderer.finalize()
-                raise e
+                self.__executeFinalize(exception=e)
+            return self.__executeFinalize(returned)
 
         raise EInterpreterInternalError("Invalid ROOT", self.__astRoot)
 
+    def __executeFinalize(self, returned=None, exception=None):
+        """Finalize script execution
+
+        If `exception` is provided, execution has been interrupted and given
+        `exception` is raised, otherwise given `returned` value is returned
+        """
+        self.__executionStack=None
+        self.__executionNext=None
+        self.__executionPaused=False
+
+        if exception is None:
+            totalTime=round(time.time()-self.__executionStartTime, 4)
+            self.valid(f"**Script executed**# #w#[Executed in# #lw#*{totalTime}s*##w#]")
+            self.__updateRenderedScene()
+            # need to review this...
+            self.__painter=self.__renderer.finalize()
+            return returned
+
+        # need to review this...
+        self.__painter=self.__renderer.finalize()
+        if isinstance(exception, EInterpreter) and exception.errorLevel()==EInterpreter.ERROR_LEVEL_STOP:
+            totalTime=round(time.time()-self.__executionStartTime, 4)
+            raise EInterpreter(f"{str(exception)}\nInformation# #lw#>># #lg#**Script executed **# #w#[Executed in# #lw#*{totalTime}s*##w#]", exception.ast(), EInterpreter.ERROR_LEVEL_STOP)
+        raise exception
+
+    def __executeIterative(self, steps=0):
+        """Continue iterative execution
+
+        Execution stack contains generators executing flows with script blocks
+        (root, macro call, conditions, loops); a generator yields statements
+        (<ASTItem>) to execute and receive in return value returned by
+        statement. Value returned by a generator is sent to parent generator.
+
+        Then there's no python recursion, and execution can be paused before
+        any statement.
+
+        User interface events are processed every __PROCESS_EVENTS_STEPS
+        statements, then execution can be paused or stopped while running.
+
+        When interruption is requested, `steps` statements are executed before
+        pause is applied.
+
+        Return value returned by script if execution is finished, None if
+        execution is paused
+        """
+        stack=self.__executionStack
+        executeAstHandlers=self.__executeAstHandlers
+        iterateAstHandlers=self.__iterateAstHandlers
+        item=self.__executionNext
+        value=None
+        processEventsCountdown=BSInterpreter.__PROCESS_EVENTS_STEPS
+
+        try:
+            while True:
+                if not item is None:
+                    # next statement to execute
+                    processEventsCountdown-=1
+                    if processEventsCountdown==0:
+                        processEventsCountdown=BSInterpreter.__PROCESS_EVENTS_STEPS
+                        QApplication.processEvents()
+
+                    if self.__executionInterrupt:
+                        if self.__executionStop:
+                            raise EInterpreter("Script execution stopped by user", item, EInterpreter.ERROR_LEVEL_STOP)
+                        elif steps==0:
+                            self.__executionNext=item
+                            self.__executionPaused=True
+                            return None
+                        steps-=1
+
+                    executeHandler=executeAstHandlers.get(item.id())
+                    if not executeHandler is None:
+                        value=executeHandler(item)
+                    else:
+                        iterateHandler=iterateAstHandlers.get(item.id())
+                        if iterateHandler is None:
+                            value=self.__executeAst(item)
+                        else:
+                            stack.append(iterateHandler(item))
+                            value=None
+
+                while stack:
+                    try:
+                        item=stack[-1].send(value)
+                        break
+                    except StopIteration as e:
+                        # generator is finished, returned value is sent to parent
+                        stack.pop()
+                        value=e.value
+
+                if len(stack)==0:
+                    # root is finished
+                    break
+        except Exception as e:
+            self.__executeFinalize(exception=e)
+
+        return self.__executeFinalize(value)
+
+    def __initExecuteAstHandlers(self):
+        """Initialise handlers used to execute AST, according to AST id
+
+        AST executing script blocks (root, macro call, conditions, loops) are
+        executed iteratively through generators returned by iterate handlers
+        """
+        self.__iterateAstHandlers={
+                ASTSpecialItemType.ROOT: self.__iterateRoot,
+                'Flow_Call_Macro': self.__iterateFlowCallMacro,
+                'Flow_If': lambda currentAst: self.__iterateFlowIfElseIf(currentAst, 'if'),
+                'Flow_ElseIf': lambda currentAst: self.__iterateFlowIfElseIf(currentAst, 'else if'),
+                'Flow_Else': self.__iterateFlowElse,
+                'Flow_Repeat': self.__iterateFlowRepeat,
+                'Flow_ForEach': self.__iterateFlowForEach
+            }
+
+        self.__executeAstHandlers={
+                # ----------------------------------------------------------------------
+                # Flows
+                # -----
+                'Flow_Set_Variable': self.__executeFlowSetVariable,
+                'Flow_Define_Macro': self.__executeFlowDefineMacro,
+                'Flow_Stop_Script': self.__executeFlowStopScript,
+                'Flow_Return': self.__executeFlowReturn,
+                'Flow_Import_Image_From_File': self.__executeFlowImportImageFromFile,
+                'Flow_Import_Image_From_LayerName': self.__executeFlowImportImageFromLayerName,
+                'Flow_Import_Image_From_LayerId': self.__executeFlowImportImageFromLayerId,
+                'Flow_Import_Image_From_LayerCurrent': self.__executeFlowImportImageFromLayerCurrent,
+                'Flow_Import_Image_From_Document': self.__executeFlowImportImageFromDocument,
+                'Flow_Import_Image_From_Canvas': self.__executeFlowImportImageFromCanvas,
+
+                # ----------------------------------------------------------------------
+                # Actions
+                # -------
+                'Action_Set_Unit_Canvas': self.__executeActionSetUnitCanvas,
+                'Action_Set_Unit_Rotation': self.__executeActionSetUnitRotation,
+                'Action_Set_Pen_Color': self.__executeActionSetPenColor,
+                'Action_Set_Pen_Size': self.__executeActionSetPenSize,
+                'Action_Set_Pen_Style': self.__executeActionSetPenStyle,
+                'Action_Set_Pen_Cap': self.__executeActionSetPenCap,
+                'Action_Set_Pen_Join': self.__executeActionSetPenJoin,
+                'Action_Set_Pen_Opacity': self.__executeActionSetPenOpacity,
+                'Action_Set_Fill_Color': self.__executeActionSetFillColor,
+                'Action_Set_Fill_Rule': self.__executeActionSetFillRule,
+                'Action_Set_Fill_Opacity': self.__executeActionSetFillOpacity,
+                'Action_Set_Text_Color': self.__executeActionSetTextColor,
+                'Action_Set_Text_Opacity': self.__executeActionSetTextOpacity,
+                'Action_Set_Text_Font': self.__executeActionSetTextFont,
+                'Action_Set_Text_Size': self.__executeActionSetTextSize,
+                'Action_Set_Text_Bold': self.__executeActionSetTextBold,
+                'Action_Set_Text_Italic': self.__executeActionSetTextItalic,
+                'Action_Set_Text_Letter_Spacing': self.__executeActionSetTextLetterSpacing,
+                'Action_Set_Text_Stretch': self.__executeActionSetTextStretch,
+                'Action_Set_Text_HAlignment': self.__executeActionSetTextHAlignment,
+                'Action_Set_Text_VAlignment': self.__executeActionSetTextVAlignment,
+                'Action_Set_Draw_Antialiasing': self.__executeActionSetDrawAntialiasing,
+                'Action_Set_Draw_Blending': self.__executeActionSetDrawBlending,
+                'Action_Set_Draw_Opacity': self.__executeActionSetDrawOpacity,
+                'Action_Set_Draw_Origin': self.__executeActionSetDrawOrigin,
+                'Action_Set_View_Grid_Color': self.__executeActionSetViewGridColor,
+                'Action_Set_View_Grid_Style': self.__executeActionSetViewGridStyle,
+                'Action_Set_View_Grid_Opacity': self.__executeActionSetViewGridOpacity,
+                'Action_Set_View_Grid_Size': self.__executeActionSetViewGridSize,
+                'Action_Set_View_Rulers_Color': self.__executeActionSetViewRulersColor,
+                'Action_Set_View_Origin_Color': self.__executeActionSetViewOriginColor,
+                'Action_Set_View_Origin_Style': self.__executeActionSetViewOriginStyle,
+                'Action_Set_View_Origin_Opacity': self.__executeActionSetViewOriginOpacity,
+                'Action_Set_View_Origin_Size': self.__executeActionSetViewOriginSize,
+                'Action_Set_View_Position_Color': self.__executeActionSetViewPositionColor,
+                'Action_Set_View_Position_Opacity': self.__executeActionSetViewPositionOpacity,
+                'Action_Set_View_Position_Size': self.__executeActionSetViewPositionSize,
+                'Action_Set_View_Position_Fulfill': self.__executeActionSetViewPositionFulfill,
+                'Action_Set_View_Position_Axis': self.__executeActionSetViewPositionAxis,
+                'Action_Set_View_Position_Model': self.__executeActionSetViewPositionModel,
+                'Action_Set_View_Background_Opacity': self.__executeActionSetViewBackgroundOpacity,
+                'Action_Set_View_Background_From_Color': self.__executeActionSetViewBackgroundFromColor,
+                'Action_Set_View_Background_From_Document': self.__executeActionSetViewBackgroundFromDocument,
+                'Action_Set_View_Background_From_Layer_Id': self.__executeActionSetViewBackgroundFromLayerId,
+                'Action_Set_View_Background_From_Layer_Name': self.__executeActionSetViewBackgroundFromLayerName,
+                'Action_Set_View_Background_From_Layer_Active': self.__executeActionSetViewBackgroundFromLayerActive,
+                'Action_Set_Script_Execution_Verbose': self.__executeActionSetExecutionVerbose,
+                'Action_Set_Script_Randomize_Seed': self.__executeActionSetRandomizeSeed,
+                'Action_Draw_Shape_Line': self.__executeActionDrawShapeLine,
+                'Action_Draw_Shape_Square': self.__executeActionDrawShapeSquare,
+                'Action_Draw_Shape_Round_Square': self.__executeActionDrawShapeRoundSquare,
+                'Action_Draw_Shape_Rect': self.__executeActionDrawShapeRect,
+                'Action_Draw_Shape_Round_Rect': self.__executeActionDrawShapeRoundRect,
+                'Action_Draw_Shape_Circle': self.__executeActionDrawShapeCircle,
+                'Action_Draw_Shape_Ellipse': self.__executeActionDrawShapeEllipse,
+                'Action_Draw_Shape_Dot': self.__executeActionDrawShapeDot,
+                'Action_Draw_Shape_Pixel': self.__executeActionDrawShapePixel,
+                'Action_Draw_Shape_Image': self.__executeActionDrawShapeImage,
+                'Action_Draw_Shape_Scaled_Image': self.__executeActionDrawShapeScaledImage,
+                'Action_Draw_Shape_Text': self.__executeActionDrawShapeText,
+                'Action_Draw_Shape_Star': self.__executeActionDrawShapeStar,
+                'Action_Draw_Shape_Polygon': self.__executeActionDrawShapePolygon,
+                'Action_Draw_Shape_Pie': self.__executeActionDrawShapePie,
+                'Action_Draw_Shape_Arc': self.__executeActionDrawShapeArc,
+                'Action_Draw_Misc_Clear_Canvas': self.__executeActionDrawMiscClearCanvas,
+                'Action_Draw_Misc_Fill_Canvas_From_Color': self.__executeActionDrawMiscFillCanvasFromColor,
+                'Action_Draw_Misc_Fill_Canvas_From_Image': self.__executeActionDrawMiscFillCanvasFromImage,
+                'Action_Draw_Shape_Start': self.__executeActionDrawShapeStart,
+                'Action_Draw_Shape_Stop': self.__executeActionDrawShapeStop,
+                'Action_Draw_Fill_Activate': self.__executeActionDrawFillActivate,
+                'Action_Draw_Fill_Deactivate': self.__executeActionDrawFillDeactivate,
+                'Action_Draw_Pen_Up': self.__executeActionDrawPenUp,
+                'Action_Draw_Pen_Down': self.__executeActionDrawPenDown,
+                'Action_Draw_Move_Home': self.__executeActionDrawMoveHome,
+                'Action_Draw_Move_Forward': self.__executeActionDrawMoveForward,
+                'Action_Draw_Move_Backward': self.__executeActionDrawMoveBackward,
+                'Action_Draw_Move_Left': self.__executeActionDrawMoveLeft,
+                'Action_Draw_Move_Right': self.__executeActionDrawMoveRight,
+                'Action_Draw_Move_To': self.__executeActionDrawMoveTo,
+                'Action_Draw_Turn_Left': self.__executeActionDrawTurnLeft,
+                'Action_Draw_Turn_Right': self.__executeActionDrawTurnRight,
+                'Action_Draw_Turn_To': self.__executeActionDrawTurnTo,
+                'Action_State_Push': self.__executeActionStatePush,
+                'Action_State_Pop': self.__executeActionStatePop,
+                'Action_View_Show_Grid': self.__executeActionViewShowGrid,
+                'Action_View_Show_Origin': self.__executeActionViewShowOrigin,
+                'Action_View_Show_Position': self.__executeActionViewShowPosition,
+                'Action_View_Show_Background': self.__executeActionViewShowBackground,
+                'Action_View_Show_Rulers': self.__executeActionViewShowRulers,
+                'Action_View_Hide_Grid': self.__executeActionViewHideGrid,
+                'Action_View_Hide_Origin': self.__executeActionViewHideOrigin,
+                'Action_View_Hide_Position': self.__executeActionViewHidePosition,
+                'Action_View_Hide_Background': self.__executeActionViewHideBackground,
+                'Action_View_Hide_Rulers': self.__executeActionViewHideRulers,
+                'Action_UIConsole_Print': self.__executeActionUIConsolePrint,
+                'Action_UIConsole_Print_Formatted': lambda currentAst: self.__executeActionUIConsolePrint(currentAst, formatted=True),
+                'Action_UIConsole_Print_Error': lambda currentAst: self.__executeActionUIConsolePrint(currentAst, consoleType=WConsoleType.ERROR),
+                'Action_UIConsole_Print_Warning': lambda currentAst: self.__executeActionUIConsolePrint(currentAst, consoleType=WConsoleType.WARNING),
+                'Action_UIConsole_Print_Verbose': lambda currentAst: self.__executeActionUIConsolePrint(currentAst, consoleType=WConsoleType.INFO),
+                'Action_UIConsole_Print_Valid': lambda currentAst: self.__executeActionUIConsolePrint(currentAst, consoleType=WConsoleType.VALID),
+                'Action_UIConsole_Print_Formatted_Error': lambda currentAst: self.__executeActionUIConsolePrint(currentAst, formatted=True, consoleType=WConsoleType.ERROR),
+                'Action_UIConsole_Print_Formatted_Warning': lambda currentAst: self.__executeActionUIConsolePrint(currentAst, formatted=True, consoleType=WConsoleType.WARNING),
+                'Action_UIConsole_Print_Formatted_Verbose': lambda currentAst: self.__executeActionUIConsolePrint(currentAst, formatted=True, consoleType=WConsoleType.INFO),
+                'Action_UIConsole_Print_Formatted_Valid': lambda currentAst: self.__executeActionUIConsolePrint(currentAst, formatted=True, consoleType=WConsoleType.VALID),
+                'Action_UIDialog_Message': self.__executeActionUIDialogMessage,
+                'Action_UIDialog_Boolean_Input': self.__executeActionUIDialogBooleanInput,
+                'Action_UIDialog_String_Input': self.__executeActionUIDialogStringInput,
+                'Action_UIDialog_Integer_Input': self.__executeActionUIDialogIntegerInput,
+                'Action_UIDialog_Decimal_Input': self.__executeActionUIDialogDecimalInput,
+                'Action_UIDialog_Color_Input': self.__executeActionUIDialogColorInput,
+                'Action_UIDialog_Single_Choice_Input': self.__executeActionUIDialogSingleChoiceInput,
+                'Action_UIDialog_Multiple_Choice_Input': self.__executeActionUIDialogMultipleChoiceInput,
+                'Action_UIDialog_Font_Input': self.__executeActionUIDialogFontInput,
+                'Action_UIDialog_FileName_Input': self.__executeActionUIDialogFileNameInput,
+
+                # ----------------------------------------------------------------------
+                # Function & Evaluation
+                # ---------------------
+                'Function': self.__executeFunction,
+                'Evaluation_Expression_Parenthesis': self.__executeEvaluationExpressionParenthesis,
+                'String_Value': self.__executeStringValue,
+                'List_Value': self.__executeListValue,
+                'List_Index_Expression': self.__executeListIndexExpression,
+
+                # ----------------------------------------------------------------------
+                # Operators
+                # ---------
+                ASTSpecialItemType.UNARY_OPERATOR: self.__executeUnaryOperator,
+                ASTSpecialItemType.BINARY_OPERATOR: self.__executeBinaryOperator,
+                ASTSpecialItemType.INDEX_OPERATOR: self.__executeIndexOperator
+            }
+
     def __executeAst(self, currentAst):
         """Execute current given AST"""
-
-        # ----------------------------------------------------------------------
-        # ROOT
-        # ----
-        if currentAst.id() == ASTSpecialItemType.ROOT:
-            # given AST is the main block of instructions
-            # initialise reserved 'constant' variables
-            predefinedVariables={
-                    ':math.pi':                         math.pi,
-                    ':math.e':                          math.e,
-                    ':math.phi':                        1.618033988749895
-                }
-            return self.__executeScriptBlock(currentAst, True, "Main script", predefinedVariables)
-
-        # ----------------------------------------------------------------------
-        # Flows
-        # -----
-
-        # ----------------------------------------------------------------------
-        # Flows
-        # -----
-        elif currentAst.id() == 'Flow_Set_Variable':
-            return self.__executeFlowSetVariable(currentAst)
-        elif currentAst.id() == 'Flow_Define_Macro':
-            return self.__executeFlowDefineMacro(currentAst)
-        elif currentAst.id() == 'Flow_Stop_Script':
-            return self.__executeFlowStopScript(currentAst)
-        elif currentAst.id() == 'Flow_Call_Macro':
-            return self.__executeFlowCallMacro(currentAst)
-        elif currentAst.id() == 'Flow_Return':
-            return self.__executeFlowReturn(currentAst)
-        elif currentAst.id() == 'Flow_If':
-            return self.__executeFlowIfElseIf(currentAst, 'if')
-        elif currentAst.id() == 'Flow_ElseIf':
-            return self.__executeFlowIfElseIf(currentAst, 'else if')
-        elif currentAst.id() == 'Flow_Else':
-            return self.__executeFlowElse(currentAst)
-        elif currentAst.id() == 'Flow_Repeat':
-            return self.__executeFlowRepeat(currentAst)
-        elif currentAst.id() == 'Flow_ForEach':
-            return self.__executeFlowForEach(currentAst)
-        elif currentAst.id() == 'Flow_Import_Image_From_File':
-            return self.__executeFlowImportImageFromFile(currentAst)
-        elif currentAst.id() == 'Flow_Import_Image_From_LayerName':
-            return self.__executeFlowImportImageFromLayerName(currentAst)
-        elif currentAst.id() == 'Flow_Import_Image_From_LayerId':
-            return self.__executeFlowImportImageFromLayerId(currentAst)
-        elif currentAst.id() == 'Flow_Import_Image_From_LayerCurrent':
-            return self.__executeFlowImportImageFromLayerCurrent(currentAst)
-        elif currentAst.id() == 'Flow_Import_Image_From_Document':
-            return self.__executeFlowImportImageFromDocument(currentAst)
-        elif currentAst.id() == 'Flow_Import_Image_From_Canvas':
-            return self.__executeFlowImportImageFromCanvas(currentAst)
-
-        # ----------------------------------------------------------------------
-        # Actions
-        # -------
-        elif currentAst.id() == 'Action_Set_Unit_Canvas':
-            return self.__executeActionSetUnitCanvas(currentAst)
-        elif currentAst.id() == 'Action_Set_Unit_Rotation':
-            return self.__executeActionSetUnitRotation(currentAst)
-        elif currentAst.id() == 'Action_Set_Pen_Color':
-            return self.__executeActionSetPenColor(currentAst)
-        elif currentAst.id() == 'Action_Set_Pen_Size':
-            return self.__executeActionSetPenSize(currentAst)
-        elif currentAst.id() == 'Action_Set_Pen_Style':
-            return self.__executeActionSetPenStyle(currentAst)
-        elif currentAst.id() == 'Action_Set_Pen_Cap':
-            return self.__executeActionSetPenCap(currentAst)
-        elif currentAst.id() == 'Action_Set_Pen_Join':
-            return self.__executeActionSetPenJoin(currentAst)
-        elif currentAst.id() == 'Action_Set_Pen_Opacity':
-            return self.__executeActionSetPenOpacity(currentAst)
-        elif currentAst.id() == 'Action_Set_Fill_Color':
-            return self.__executeActionSetFillColor(currentAst)
-        elif currentAst.id() == 'Action_Set_Fill_Rule':
-            return self.__executeActionSetFillRule(currentAst)
-        elif currentAst.id() == 'Action_Set_Fill_Opacity':
-            return self.__executeActionSetFillOpacity(currentAst)
-        elif currentAst.id() == 'Action_Set_Text_Color':
-            return self.__executeActionSetTextColor(currentAst)
-        elif currentAst.id() == 'Action_Set_Text_Opacity':
-            return self.__executeActionSetTextOpacity(currentAst)
-        elif currentAst.id() == 'Action_Set_Text_Font':
-            return self.__executeActionSetTextFont(currentAst)
-        elif currentAst.id() == 'Action_Set_Text_Size':
-            return self.__executeActionSetTextSize(currentAst)
-        elif currentAst.id() == 'Action_Set_Text_Bold':
-            return self.__executeActionSetTextBold(currentAst)
-        elif currentAst.id() == 'Action_Set_Text_Italic':
-            return self.__executeActionSetTextItalic(currentAst)
-        elif currentAst.id() == 'Action_Set_Text_Letter_Spacing':
-            return self.__executeActionSetTextLetterSpacing(currentAst)
-        elif currentAst.id() == 'Action_Set_Text_Stretch':
-            return self.__executeActionSetTextStretch(currentAst)
-        elif currentAst.id() == 'Action_Set_Text_HAlignment':
-            return self.__executeActionSetTextHAlignment(currentAst)
-        elif currentAst.id() == 'Action_Set_Text_VAlignment':
-            return self.__executeActionSetTextVAlignment(currentAst)
-        elif currentAst.id() == 'Action_Set_Draw_Antialiasing':
-            return self.__executeActionSetDrawAntialiasing(currentAst)
-        elif currentAst.id() == 'Action_Set_Draw_Blending':
-            return self.__executeActionSetDrawBlending(currentAst)
-        elif currentAst.id() == 'Action_Set_Draw_Opacity':
-            return self.__executeActionSetDrawOpacity(currentAst)
-        elif currentAst.id() == 'Action_Set_Draw_Origin':
-            return self.__executeActionSetDrawOrigin(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Grid_Color':
-            return self.__executeActionSetViewGridColor(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Grid_Style':
-            return self.__executeActionSetViewGridStyle(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Grid_Opacity':
-            return self.__executeActionSetViewGridOpacity(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Grid_Size':
-            return self.__executeActionSetViewGridSize(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Rulers_Color':
-            return self.__executeActionSetViewRulersColor(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Origin_Color':
-            return self.__executeActionSetViewOriginColor(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Origin_Style':
-            return self.__executeActionSetViewOriginStyle(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Origin_Opacity':
-            return self.__executeActionSetViewOriginOpacity(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Origin_Size':
-            return self.__executeActionSetViewOriginSize(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Position_Color':
-            return self.__executeActionSetViewPositionColor(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Position_Opacity':
-            return self.__executeActionSetViewPositionOpacity(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Position_Size':
-            return self.__executeActionSetViewPositionSize(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Position_Fulfill':
-            return self.__executeActionSetViewPositionFulfill(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Position_Axis':
-            return self.__executeActionSetViewPositionAxis(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Position_Model':
-            return self.__executeActionSetViewPositionModel(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Background_Opacity':
-            return self.__executeActionSetViewBackgroundOpacity(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Background_From_Color':
-            return self.__executeActionSetViewBackgroundFromColor(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Background_From_Document':
-            return self.__executeActionSetViewBackgroundFromDocument(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Background_From_Layer_Id':
-            return self.__executeActionSetViewBackgroundFromLayerId(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Background_From_Layer_Name':
-            return self.__executeActionSetViewBackgroundFromLayerName(currentAst)
-        elif currentAst.id() == 'Action_Set_View_Background_From_Layer_Active':
-            return self.__executeActionSetViewBackgroundFromLayerActive(currentAst)
-        elif currentAst.id() == 'Action_Set_Script_Execution_Verbose':
-            return self.__executeActionSetExecutionVerbose(currentAst)
-        elif currentAst.id() == 'Action_Set_Script_Randomize_Seed':
-            return self.__executeActionSetRandomizeSeed(currentAst)
-        elif currentAst.id() == 'Action_Draw_Shape_Line':
-            return self.__executeActionDrawShapeLine(currentAst)
-        elif currentAst.id() == 'Action_Draw_Shape_Square':
-            return self.__executeActionDrawShapeSquare(currentAst)
-        elif currentAst.id() == 'Action_Draw_Shape_Round_Square':
-            return self.__executeActionDrawShapeRoundSquare(currentAst)
-        elif currentAst.id() == 'Action_Draw_Shape_Rect':
-            return self.__executeActionDrawShapeRect(currentAst)
-        elif currentAst.id() == 'Action_Draw_Shape_Round_Rect':
-            return self.__executeActionDrawShapeRoundRect(currentAst)
-        elif currentAst.id() == 'Action_Draw_Shape_Circle':
-            return self.__executeActionDrawShapeCircle(currentAst)
-        elif currentAst.id() == 'Action_Draw_Shape_Ellipse':
-            return self.__executeActionDrawShapeEllipse(currentAst)
-        elif currentAst.id() == 'Action_Draw_Shape_Dot':
-            return self.__executeActionDrawShapeDot(currentAst)
-        elif currentAst.id() == 'Action_Draw_Shape_Pixel':
-            return self.__executeActionDrawShapePixel(currentAst)
-        elif currentAst.id() == 'Action_Draw_Shape_Image':
-            return self.__executeActionDrawShapeImage(currentAst)
-        elif currentAst.id() == 'Action_Draw_Shape_Scaled_Image':
-            return self.__executeActionDrawShapeScaledImage(currentAst)
-        elif currentAst.id() == 'Action_Draw_Shape_Text':
-            return self.__executeActionDrawShapeText(currentAst)
-        elif currentAst.id() == 'Action_Draw_Shape_Star':
-            return self.__executeActionDrawShapeStar(currentAst)
-        elif currentAst.id() == 'Action_Draw_Shape_Polygon':
-            return self.__executeActionDrawShapePolygon(currentAst)
-        elif currentAst.id() == 'Action_Draw_Shape_Pie':
-            return self.__executeActionDrawShapePie(currentAst)
-        elif currentAst.id() == 'Action_Draw_Shape_Arc':
-            return self.__executeActionDrawShapeArc(currentAst)
-        elif currentAst.id() == 'Action_Draw_Misc_Clear_Canvas':
-            return self.__executeActionDrawMiscClearCanvas(currentAst)
-        elif currentAst.id() == 'Action_Draw_Misc_Fill_Canvas_From_Color':
-            return self.__executeActionDrawMiscFillCanvasFromColor(currentAst)
-        elif currentAst.id() == 'Action_Draw_Misc_Fill_Canvas_From_Image':
-            return self.__executeActionDrawMiscFillCanvasFromImage(currentAst)
-        elif currentAst.id() == 'Action_Draw_Shape_Start':
-            return self.__executeActionDrawShapeStart(currentAst)
-        elif currentAst.id() == 'Action_Draw_Shape_Stop':
-            return self.__executeActionDrawShapeStop(currentAst)
-        elif currentAst.id() == 'Action_Draw_Fill_Activate':
-            return self.__executeActionDrawFillActivate(currentAst)
-        elif currentAst.id() == 'Action_Draw_Fill_Deactivate':
-            return self.__executeActionDrawFillDeactivate(currentAst)
-        elif currentAst.id() == 'Action_Draw_Pen_Up':
-            return self.__executeActionDrawPenUp(currentAst)
-        elif currentAst.id() == 'Action_Draw_Pen_Down':
-            return self.__executeActionDrawPenDown(currentAst)
-        elif currentAst.id() == 'Action_Draw_Move_Home':
-            return self.__executeActionDrawMoveHome(currentAst)
-        elif currentAst.id() == 'Action_Draw_Move_Forward':
-            return self.__executeActionDrawMoveForward(currentAst)
-        elif currentAst.id() == 'Action_Draw_Move_Backward':
-            return self.__executeActionDrawMoveBackward(currentAst)
-        elif currentAst.id() == 'Action_Draw_Move_Left':
-            return self.__executeActionDrawMoveLeft(currentAst)
-        elif currentAst.id() == 'Action_Draw_Move_Right':
-            return self.__executeActionDrawMoveRight(currentAst)
-        elif currentAst.id() == 'Action_Draw_Move_To':
-            return self.__executeActionDrawMoveTo(currentAst)
-        elif currentAst.id() == 'Action_Draw_Turn_Left':
-            return self.__executeActionDrawTurnLeft(currentAst)
-        elif currentAst.id() == 'Action_Draw_Turn_Right':
-            return self.__executeActionDrawTurnRight(currentAst)
-        elif currentAst.id() == 'Action_Draw_Turn_To':
-            return self.__executeActionDrawTurnTo(currentAst)
-        elif currentAst.id() == 'Action_State_Push':
-            return self.__executeActionStatePush(currentAst)
-        elif currentAst.id() == 'Action_State_Pop':
-            return self.__executeActionStatePop(currentAst)
-        elif currentAst.id() == 'Action_View_Show_Grid':
-            return self.__executeActionViewShowGrid(currentAst)
-        elif currentAst.id() == 'Action_View_Show_Origin':
-            return self.__executeActionViewShowOrigin(currentAst)
-        elif currentAst.id() == 'Action_View_Show_Position':
-            return self.__executeActionViewShowPosition(currentAst)
-        elif currentAst.id() == 'Action_View_Show_Background':
-            return self.__executeActionViewShowBackground(currentAst)
-        elif currentAst.id() == 'Action_View_Show_Rulers':
-            return self.__executeActionViewShowRulers(currentAst)
-        elif currentAst.id() == 'Action_View_Hide_Grid':
-            return self.__executeActionViewHideGrid(currentAst)
-        elif currentAst.id() == 'Action_View_Hide_Origin':
-            return self.__executeActionViewHideOrigin(currentAst)
-        elif currentAst.id() == 'Action_View_Hide_Position':
-            return self.__executeActionViewHidePosition(currentAst)
-        elif currentAst.id() == 'Action_View_Hide_Background':
-            return self.__executeActionViewHideBackground(currentAst)
-        elif currentAst.id() == 'Action_View_Hide_Rulers':
-            return self.__executeActionViewHideRulers(currentAst)
-        elif currentAst.id() == 'Action_UIConsole_Print':
-            return self.__executeActionUIConsolePrint(currentAst)
-        elif currentAst.id() == 'Action_UIConsole_Print_Formatted':
-            return self.__executeActionUIConsolePrint(currentAst, formatted=True)
-        elif currentAst.id() == 'Action_UIConsole_Print_Error':
-            return self.__executeActionUIConsolePrint(currentAst, consoleType=WConsoleType.ERROR)
-        elif currentAst.id() == 'Action_UIConsole_Print_Warning':
-            return self.__executeActionUIConsolePrint(currentAst, consoleType=WConsoleType.WARNING)
-        elif currentAst.id() == 'Action_UIConsole_Print_Verbose':
-            return self.__executeActionUIConsolePrint(currentAst, consoleType=WConsoleType.INFO)
-        elif currentAst.id() == 'Action_UIConsole_Print_Valid':
-            return self.__executeActionUIConsolePrint(currentAst, consoleType=WConsoleType.VALID)
-        elif currentAst.id() == 'Action_UIConsole_Print_Formatted_Error':
-            return self.__executeActionUIConsolePrint(currentAst, formatted=True, consoleType=WConsoleType.ERROR)
-        elif currentAst.id() == 'Action_UIConsole_Print_Formatted_Warning':
-            return self.__executeActionUIConsolePrint(currentAst, formatted=True, consoleType=WConsoleType.WARNING)
-        elif currentAst.id() == 'Action_UIConsole_Print_Formatted_Verbose':
-            return self.__executeActionUIConsolePrint(currentAst, formatted=True, consoleType=WConsoleType.INFO)
-        elif currentAst.id() == 'Action_UIConsole_Print_Formatted_Valid':
-            return self.__executeActionUIConsolePrint(currentAst, formatted=True, consoleType=WConsoleType.VALID)
-        elif currentAst.id() == 'Action_UIDialog_Message':
-            return self.__executeActionUIDialogMessage(currentAst)
-        elif currentAst.id() == 'Action_UIDialog_Boolean_Input':
-            return self.__executeActionUIDialogBooleanInput(currentAst)
-        elif currentAst.id() == 'Action_UIDialog_String_Input':
-            return self.__executeActionUIDialogStringInput(currentAst)
-        elif currentAst.id() == 'Action_UIDialog_Integer_Input':
-            return self.__executeActionUIDialogIntegerInput(currentAst)
-        elif currentAst.id() == 'Action_UIDialog_Decimal_Input':
-            return self.__executeActionUIDialogDecimalInput(currentAst)
-        elif currentAst.id() == 'Action_UIDialog_Color_Input':
-            return self.__executeActionUIDialogColorInput(currentAst)
-        elif currentAst.id() == 'Action_UIDialog_Single_Choice_Input':
-            return self.__executeActionUIDialogSingleChoiceInput(currentAst)
-        elif currentAst.id() == 'Action_UIDialog_Multiple_Choice_Input':
-            return self.__executeActionUIDialogMultipleChoiceInput(currentAst)
-        elif currentAst.id() == 'Action_UIDialog_Font_Input':
-            return self.__executeActionUIDialogFontInput(currentAst)
-        elif currentAst.id() == 'Action_UIDialog_FileName_Input':
-            return self.__executeActionUIDialogFileNameInput(currentAst)
-
-        # ----------------------------------------------------------------------
-        # Function & Evaluation
-        # ---------------------
-        elif currentAst.id() == 'Function':
-            return self.__executeFunction(currentAst)
-        elif currentAst.id() == 'Evaluation_Expression_Parenthesis':
-            return self.__executeEvaluationExpressionParenthesis(currentAst)
-        elif currentAst.id() == 'String_Value':
-            return self.__executeStringValue(currentAst)
-        elif currentAst.id() == 'List_Value':
-            return self.__executeListValue(currentAst)
-        elif currentAst.id() == 'List_Index_Expression':
-            return self.__executeListIndexExpression(currentAst)
-
-        # ----------------------------------------------------------------------
-        # Operators
-        # ---------
-        elif currentAst.id() == ASTSpecialItemType.UNARY_OPERATOR:
-            return self.__executeUnaryOperator(currentAst)
-        elif currentAst.id() == ASTSpecialItemType.BINARY_OPERATOR:
-            return self.__executeBinaryOperator(currentAst)
-        elif currentAst.id() == ASTSpecialItemType.INDEX_OPERATOR:
-            return self.__executeIndexOperator(currentAst)
-
-        # ----------------------------------------------------------------------
-        # Forgotten to implement something?
-        # ---------------------------------
-        else:
+        executeHandler=self.__executeAstHandlers.get(currentAst.id())
+        if executeHandler is None:
+            # Forgotten to implement something?
             self.error(f'* TODO: implement {currentAst.id()}')
             return None
+        return executeHandler(currentAst)
+
+    def __iterateRoot(self, currentAst):
+        """Execute main block of instructions"""
+        # initialise reserved 'constant' variables
+        predefinedVariables={
+                ':math.pi':                         math.pi,
+                ':math.e':                          math.e,
+                ':math.phi':                        1.618033988749895
+            }
+        return (yield from self.__iterateScriptBlock(currentAst, True, "Main script", predefinedVariables))
 
-    def __executeScriptBlock(self, currentAst, allowLocalVariable, name, createLocalVariables=None):
+    def __iterateScriptBlock(self, currentAst, allowLocalVariable, name, createLocalVariables=None, pushScriptBlock=True):
         """Execute a script block
 
         Each script block:
@@ -1066,15 +1094,22 @@ class BSInterpreter(QObject):
         If `createLocalVariables` is provided, must be a <dict>
         In this case, local variables from dict will be created for current AST
 
+        If `pushScriptBlock` is False, script block has already been pushed in
+        stack (loops reuse the same script block for all iterations)
+
+        Instructions are yielded to be executed by __executeIterative()
         """
         returned=None
 
-        self.verbose(f"Enter scriptblock: '{name}'", currentAst)
-        self.__scriptBlockStack.push(currentAst, allowLocalVariable, name)
+        if self.__optionVerboseMode:
+            self.verbose(f"Enter scriptblock: '{name}'", currentAst)
+
+        if pushScriptBlock:
+            self.__scriptBlockStack.push(currentAst, allowLocalVariable, name)
 
-        if allowLocalVariable:
-            # automatically save painter state
-            self.__renderer.pushState()
+            if allowLocalVariable:
+                # automatically save painter state
+                self.__renderer.pushState()
 
         if isinstance(createLocalVariables, dict):
             # create local variables if any provided before starting block execution
@@ -1086,23 +1121,31 @@ class BSInterpreter(QObject):
             if currentAst.id()==ASTSpecialItemType.ROOT and ast.id()=='ScriptBlock':
                 # we are in a special case, still in main script block
                 for subAst in ast.nodes():
-                    self.__executeAst(subAst)
+                    yield subAst
             else:
-                returned=self.__executeAst(ast)
+                returned=yield ast
 
             if not returned is None:
                 # when a value is returned, that's a RETURN flow
                 break
 
         #Debug.print("Variables: {0}", scriptBlock.variables(True))
-        if allowLocalVariable:
-            self.__renderer.popState()
+        if pushScriptBlock:
+            if allowLocalVariable:
+                self.__renderer.popState()
 
-        self.__scriptBlockStack.pop()
-        self.verbose(f"Exit scriptblock: '{name}'", currentAst)
+            self.__scriptBlockStack.pop()
+
+        if self.__optionVerboseMode:
+            self.verbose(f"Exit scriptblock: '{name}'", currentAst)
 
         return returned
 
+    def __verboseScriptBlock(self, action, name, currentAst):
+        """Print verbose message for script block `action` ('Enter', 'Exit')"""
+        if self.__optionVerboseMode:
+            self.verbose(f"{action} scriptblock: '{name}'", currentAst)
+
 
     # --------------------------------------------------------------------------
     # Flows
@@ -1118,17 +1161,29 @@ class BSInterpreter(QObject):
         variableValue=self.__evaluate(currentAst.node(2))
 
         if not variableLocalScope:
-            globalVar='global '
             scope=BSVariableScope.GLOBAL
         else:
-            globalVar=''
             scope=BSVariableScope.CURRENT
 
+        return self.__flowSetVariable(currentAst, variableName, variableValue, scope)
+
+    def __flowSetVariable(self, currentAst, variableName, variableValue, scope, variableSlot=None):
+        """Set a variable for given (already evaluated) `variableValue`
 
+        If provided, `variableSlot` is the already resolved slot for `variableName`
+        """
+        if scope==BSVariableScope.GLOBAL:
+            globalVar='global '
+        else:
+            globalVar=''
 
-        self.verbose(f"set {globalVar}variable {variableName}={self.__strValue(variableValue)}", currentAst)
+        if self.__optionVerboseMode:
+            self.verbose(f"set {globalVar}variable {variableName}={self.__strValue(variableValue)}", currentAst)
 
-        self.__scriptBlockStack.setVariable(variableName, variableValue, scope)
+        if variableSlot is None:
+            self.__scriptBlockStack.setVariable(variableName, variableValue, scope)
+        else:
+            self.__scriptBlockStack.setVariableSlot(variableSlot, variableValue, scope)
 
         self.__delay()
         return None
@@ -1177,7 +1232,7 @@ class BSInterpreter(QObject):
         """
         raise EInterpreter("Explicit call to stop script", currentAst, EInterpreter.ERROR_LEVEL_STOP)
 
-    def __executeFlowCallMacro(self, currentAst):
+    def __iterateFlowCallMacro(self, currentAst):
         """call macro
 
         Call defined and execute it
@@ -1191,7 +1246,6 @@ class BSInterpreter(QObject):
         macroName=None
         variablesAsParameter=[]
         storeResultName=None
-        storeResultValue=None
         for index, node in enumerate(currentAst.nodes()):
             if index==0:
                 macroName=self.__evaluate(node)
@@ -1202,6 +1256,32 @@ class BSInterpreter(QObject):
             else:
                 variablesAsParameter.append(self.__evaluate(node))
 
+        macroDefinition, name, localVariables=self.__flowCallMacroStart(currentAst, macroName, variablesAsParameter, storeResultName)
+        storeResultValue=yield from self.__iterateScriptBlock(macroDefinition.ast(), True, name, localVariables)
+        return self.__flowCallMacroStoreResult(storeResultName, storeResultValue)
+
+    def __flowCallMacro(self, currentAst, macroName, variablesAsParameter, storeResultName, executeMacro):
+        """Call macro for given (already evaluated) `macroName` and `variablesAsParameter`
+
+        Given `executeMacro` is called with macro definition, script block name
+        and local variables, to execute macro script block
+
+        Compiled and transpiled macros are executed with python recursion: when
+        python recursion limit is reached, an <EInterpreter> exception is raised
+        """
+        macroDefinition, name, localVariables=self.__flowCallMacroStart(currentAst, macroName, variablesAsParameter, storeResultName)
+        try:
+            returned=executeMacro(macroDefinition, name, localVariables)
+        except RecursionError:
+            raise EInterpreter(f"Flow ***call macro***: maximum recursion depth reached for macro '{macroName}' (use interpreted execution mode for deeper recursion)", currentAst)
+        return self.__flowCallMacroStoreResult(storeResultName, returned)
+
+    def __flowCallMacroStart(self, currentAst, macroName, variablesAsParameter, storeResultName):
+        """Check macro call for given (already evaluated) `macroName` and `variablesAsParameter`
+
+        Return a tuple (macro definition, script block name, local variables)
+        """
+        fctLabel='Flow ***call macro***'
 
         self.__checkParamType(currentAst, fctLabel, 'MACRO', macroName, str)
 
@@ -1227,8 +1307,13 @@ class BSInterpreter(QObject):
             verboseText+='and store result into variable '+storeResultName
         self.verbose(verboseText, currentAst)
 
-        storeResultValue=self.__executeScriptBlock(macroDefinition.ast(), True, f"Macro: {macroName}", localVariables)
+        return (macroDefinition, f"Macro: {macroName}", localVariables)
+
+    def __flowCallMacroStoreResult(self, storeResultName, storeResultValue):
+        """Store value returned by macro into variable `storeResultName`, if any
 
+        Return value returned by macro
+        """
         if isinstance(storeResultName, str):
             self.__scriptBlockStack.setVariable(storeResultName, storeResultValue, BSVariableScope.CURRENT)
 
@@ -1247,12 +1332,16 @@ class BSInterpreter(QObject):
         if len(currentAst.nodes())>0:
             returned=self.__evaluate(currentAst.node(0))
 
+        return self.__flowReturn(currentAst, returned)
+
+    def __flowReturn(self, currentAst, returned):
+        """Return given (already evaluated) `returned` value"""
         self.verbose(f"return {self.__strValue(returned)}", currentAst)
 
         #self.__delay()
         return returned
 
-    def __executeFlowIfElseIf(self, currentAst, mode='if'):
+    def __iterateFlowIfElseIf(self, currentAst, mode='if'):
         """if <condition> then
 
         Execute a scriptblock if condition is met
@@ -1266,6 +1355,55 @@ class BSInterpreter(QObject):
 
         condition=self.__evaluate(currentAst.node(0))
 
+        branch=self.__flowIfElseIfBranch(currentAst, mode, condition, len(currentAst.nodes())==3)
+        if branch is True:
+            yield from self.__iterateScriptBlock(currentAst.node(1), False, f'{mode} (ON) then (Execute statement)')
+        elif branch is False:
+            # else or else if
+            yield currentAst.node(2)
+
+        #self.__delay()
+        return None
+
+    def __flowIfElseIf(self, currentAst, mode, condition, executeThen, executeElse):
+        """Execute if/else if flow for given (already evaluated) `condition`
+
+        Given `executeThen` is called with script block name if condition is met
+        Given `executeElse` is called without argument if condition is not met
+        (None if there's no else/else if)
+        """
+        branch=self.__flowIfElseIfBranch(currentAst, mode, condition, not executeElse is None)
+        if branch is True:
+            executeThen(f'{mode} (ON) then (Execute statement)')
+        elif branch is False:
+            executeElse()
+
+        #self.__delay()
+        return None
+
+    def __flowIfElseIfBranch(self, currentAst, mode, condition, hasElse):
+        """Return branch to execute for given (already evaluated) `condition`
+
+        - True: condition is met
+        - False: condition is not met, else/else if has to be executed
+        - None: condition is not met and there's no else/else if
+        """
+        if self.__conditionValue(condition):
+            self.verbose(f'{mode} (condition validated) then ...', currentAst)
+            return True
+        elif hasElse:
+            # else or else if
+            if currentAst.node(2).id()=='Flow_ElseIf':
+                self.verbose(f'{mode} (condition not validated) then ... else if (...)', currentAst)
+            else:
+                self.verbose(f'{mode} (condition not validated) then ... else', currentAst)
+            return False
+        else:
+            self.verbose(f'{mode} (condition not validated) then ...', currentAst)
+            return None
+
+    def __conditionValue(self, condition):
+        """Return given (already evaluated) `condition` as a boolean value"""
         if isinstance(condition, (int, float)):
             # when condition is a number value, consider 0 value as FALSE and other as TRUE
             condition=(condition!=0)
@@ -1282,42 +1420,9 @@ class BSInterpreter(QObject):
             # when condition is not a boolean (can occurs?), condition is False
             condition=False
 
-        astScriptBlock=None
-        execFct=None
-
-        if condition==True:
-            verboseText=f'{mode} (condition validated) then ...'
-            astBlockName=f'{mode} (ON) then (Execute statement)'
-            astScriptBlock=currentAst.node(1)
-            execFct='__executeScriptBlock'
-        elif len(currentAst.nodes())==3:
-            # else or else if
-            astScriptBlock=currentAst.node(2)
-            if astScriptBlock.id()=='Flow_ElseIf':
-                verboseText=f'{mode} (condition not validated) then ... else if (...)'
-                astBlockName=f'{mode} (OFF) then ... elseif (...)'
-                execFct='__executeFlowIfElseIf'
-            else:
-                verboseText=f'{mode} (condition not validated) then ... else'
-                astBlockName=f'{mode} (OFF) then ... else '
-                execFct='__executeFlowElse'
-        else:
-            verboseText=f'{mode} (condition not validated) then ...'
-
-        self.verbose(verboseText, currentAst)
-
-        if execFct=='__executeScriptBlock':
-            self.__executeScriptBlock(astScriptBlock, False, astBlockName)
-        elif execFct=='__executeFlowIfElseIf':
-            self.__executeFlowIfElseIf(astScriptBlock, 'else if')
-        elif execFct=='__executeFlowElse':
-            self.__executeFlowElse(astScriptBlock)
-
-
-        #self.__delay()
-        return None
+        return condition==True
 
-    def __executeFlowElse(self, currentAst):
+    def __iterateFlowElse(self, currentAst):
         """... else ...
 
         Execute a scriptblock
@@ -1328,12 +1433,12 @@ class BSInterpreter(QObject):
         self.__checkParamNumber(currentAst, fctLabel, 1)
 
         self.verbose('else ...', currentAst)
-        self.__executeScriptBlock(currentAst.node(0), False, 'else')
+        yield from self.__iterateScriptBlock(currentAst.node(0), False, 'else')
 
         #self.__delay()
         return None
 
-    def __executeFlowRepeat(self, currentAst):
+    def __iterateFlowRepeat(self, currentAst):
         """repeat <COUNT> times
 
         Execute a repeat loop
@@ -1347,16 +1452,21 @@ class BSInterpreter(QObject):
         repeatTotal=self.__evaluate(currentAst.node(0))
         astScriptBlock=currentAst.node(1)
 
-        if isinstance(repeatTotal, float):
-            asInt=round(repeatTotal)
-            if asInt==repeatTotal:
-                # a float value without decimals (4.0 for exsample => convert to <int>)
-                repeatTotal=asInt
+        for scriptBlockName in self.__flowRepeat(currentAst, repeatTotal):
+            yield from self.__iterateScriptBlock(astScriptBlock, False, scriptBlockName, pushScriptBlock=False)
 
-        self.__checkParamType(currentAst, fctLabel, 'COUNT', repeatTotal, int)
+        return None
 
-        if not self.__checkParamDomain(currentAst, fctLabel, 'COUNT', repeatTotal>=0, f"Can't repeat negative value (count={repeatTotal})", False):
-            return None
+    def __flowRepeat(self, currentAst, repeatTotal):
+        """Iterate repeat loop for given (already evaluated) `repeatTotal`
+
+        Loop script block is pushed once and reused for all iterations
+        For each iteration, loop variables are set and script block name is
+        yielded: caller has to execute loop script block
+        """
+        repeatTotal=self.__flowRepeatCount(currentAst, repeatTotal)
+        if repeatTotal is None:
+            return
 
         scriptBlockName=f'repeat {repeatTotal} times'
 
@@ -1366,24 +1476,46 @@ class BSInterpreter(QObject):
         else:
             repeatIncAngle=0
 
+        loopSlots=[BSScriptBlockStack.slot(variableName) for variableName in BSInterpreter.__REPEAT_VARIABLES]
+
+        self.__scriptBlockStack.push(currentAst.node(1), False, scriptBlockName)
+
         repeatCurrentAngle=0
         for repeatCurrent in range(repeatTotal):
-            loopVariables={
-                    ':repeat.totalIteration': repeatTotal,
-                    ':repeat.currentIteration': repeatCurrent+1,
-                    ':repeat.isFirstIteration': (repeatCurrent==0),
-                    ':repeat.isLastIteration': (repeatCurrent==repeatTotal-1),
-                    ':repeat.incAngle': repeatIncAngle,
-                    ':repeat.currentAngle': repeatCurrentAngle
-                }
+            self.__scriptBlockStack.setLocalVariables(loopSlots, (repeatTotal,
+                                                                  repeatCurrent+1,
+                                                                  (repeatCurrent==0),
+                                                                  (repeatCurrent==repeatTotal-1),
+                                                                  repeatIncAngle,
+                                                                  repeatCurrentAngle))
 
-            self.__executeScriptBlock(astScriptBlock, False, scriptBlockName, loopVariables)
+            yield scriptBlockName
 
             repeatCurrentAngle+=repeatIncAngle
 
-        return None
+        self.__scriptBlockStack.pop()
+
+    def __flowRepeatCount(self, currentAst, repeatTotal):
+        """Return number of iterations for given (already evaluated) `repeatTotal`
+
+        Return None if loop can't be executed
+        """
+        fctLabel='Flow ***repeat *<COUNT>* times***'
+
+        if isinstance(repeatTotal, float):
+            asInt=round(repeatTotal)
+            if asInt==repeatTotal:
+                # a float value without decimals (4.0 for exsample => convert to <int>)
+                repeatTotal=asInt
 
-    def __executeFlowForEach(self, currentAst):
+        self.__checkParamType(currentAst, fctLabel, 'COUNT', repeatTotal, int)
+
+        if not self.__checkParamDomain(currentAst, fctLabel, 'COUNT', repeatTotal>=0, f"Can't repeat negative value (count={repeatTotal})", False):
+            return None
+
+        return repeatTotal
+
+    def __iterateFlowForEach(self, currentAst):
         """for each <variable> in <list>
 
         Do loop over items in list
@@ -1399,16 +1531,19 @@ class BSInterpreter(QObject):
         forVarName=currentAst.node(1).value()
         astScriptBlock=currentAst.node(2)
 
+        for scriptBlockName in self.__flowForEach(currentAst, forEachList, forVarName):
+            yield from self.__iterateScriptBlock(astScriptBlock, False, scriptBlockName, pushScriptBlock=False)
 
-        self.__checkParamType(currentAst, fctLabel, 'LIST', forEachList, list, str)
+        return None
 
-        if isinstance(forEachList, str):
-            forEachList=[c for c in forEachList]
+    def __flowForEach(self, currentAst, forEachList, forVarName):
+        """Iterate for each loop for given (already evaluated) `forEachList`
 
-        if len(forEachList)>5:
-            scriptBlockName=f'for each item from {forEachList[0:5]} as {forVarName} do'.replace(']', ', ...]')
-        else:
-            scriptBlockName=f'for each item from {forEachList} as {forVarName} do'
+        Loop script block is pushed once and reused for all iterations
+        For each iteration, loop variables are set and script block name is
+        yielded: caller has to execute loop script block
+        """
+        forEachList, scriptBlockName=self.__flowForEachList(currentAst, forEachList, forVarName)
 
         # define loop variable
         forEachTotal=len(forEachList)
@@ -1417,23 +1552,41 @@ class BSInterpreter(QObject):
         else:
             forEachIncAngle=0
 
+        loopSlots=[BSScriptBlockStack.slot(variableName) for variableName in BSInterpreter.__FOREACH_VARIABLES+(forVarName,)]
+
+        self.__scriptBlockStack.push(currentAst.node(2), False, scriptBlockName)
+
         forEachCurrentAngle=0
         for index, forEachCurrentValue in enumerate(forEachList):
-            loopVariables={
-                    ':foreach.totalIteration': forEachTotal,
-                    ':foreach.currentIteration': index+1,
-                    ':foreach.isFirstIteration': (index==0),
-                    ':foreach.isLastIteration': (index==forEachTotal-1),
-                    ':foreach.incAngle': forEachIncAngle,
-                    ':foreach.currentAngle': forEachCurrentAngle,
-                    forVarName: forEachCurrentValue
-                }
+            self.__scriptBlockStack.setLocalVariables(loopSlots, (forEachTotal,
+                                                                  index+1,
+                                                                  (index==0),
+                                                                  (index==forEachTotal-1),
+                                                                  forEachIncAngle,
+                                                                  forEachCurrentAngle,
+                                                                  forEachCurrentValue))
 
-            self.__executeScriptBlock(astScriptBlock, False, scriptBlockName, loopVariables)
+            yield scriptBlockName
 
             forEachCurrentAngle+=forEachIncAngle
 
-        return None
+        self.__scriptBlockStack.pop()
+
+    def __flowForEachList(self, currentAst, forEachList, forVarName):
+        """Return a tuple (list, script block name) for given (already evaluated) `forEachList`"""
+        fctLabel='Flow ***for each ... in ...***'
+
+        self.__checkParamType(currentAst, fctLabel, 'LIST', forEachList, list, str)
+
+        if isinstance(forEachList, str):
+            forEachList=[c for c in forEachList]
+
+        if len(forEachList)>5:
+            scriptBlockName=f'for each item from {forEachList[0:5]} as {forVarName} do'.replace(']', ', ...]')
+        else:
+            scriptBlockName=f'for each item from {forEachList} as {forVarName} do'
+
+        return (forEachList, scriptBlockName)
 
     def __executeFlowImportImageFromFile(self, currentAst):
         """import file into image library from
@@ -2004,7 +2157,7 @@ class BSInterpreter(QObject):
         self.__checkParamNumber(currentAst, fctLabel, 1, 2)
 
         value=self.__evaluate(currentAst.node(0))
-        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')))
+        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.variable(':unit.canvas', 'PX')))
 
         self.__checkParamType(currentAst, fctLabel, 'SPACING', value, int, float)
 
@@ -2201,7 +2354,7 @@ class BSInterpreter(QObject):
         secondary=self.__evaluate(currentAst.node(1))
 
         if secondary is None:
-            secondary=self.__scriptBlockStack.current().variable(':view.grid.style.secondary', 'DOT')
+            secondary=self.__scriptBlockStack.variable(':view.grid.style.secondary', 'DOT')
 
         self.__checkParamDomain(currentAst, fctLabel, 'STYLE-MAIN', main in BSInterpreter.CONST_PEN_STYLE, f"style value for main grid can be: {', '.join(BSInterpreter.CONST_PEN_STYLE)}")
         self.__checkParamDomain(currentAst, fctLabel, 'STYLE-SECONDARY', secondary in BSInterpreter.CONST_PEN_STYLE, f"style value for secondary grid can be: {', '.join(BSInterpreter.CONST_PEN_STYLE)}")
@@ -2255,15 +2408,15 @@ class BSInterpreter(QObject):
 
         if p2 is None and p3 is None:
             # no other parameters provided, set default value
-            main=self.__scriptBlockStack.current().variable(':view.grid.size.main', 0)
-            unit=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+            main=self.__scriptBlockStack.variable(':view.grid.size.main', 0)
+            unit=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
         elif p3 is None:
             # p2 has been provided
             if isinstance(p2, (int, float)):
                 main=p2
-                unit=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+                unit=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
             else:
-                main=self.__scriptBlockStack.current().variable(':view.grid.size.main', 0)
+                main=self.__scriptBlockStack.variable(':view.grid.size.main', 0)
                 unit=p2
         else:
             # p2+p3 provided
@@ -2275,11 +2428,11 @@ class BSInterpreter(QObject):
 
         if not self.__checkParamDomain(currentAst, fctLabel, 'WIDTH', width>0, f"a positive number is expected (current={width})", False):
             # let default value being applied in this case
-            width=self.__scriptBlockStack.current().variable(':view.grid.size.width', width, True)
+            width=self.__scriptBlockStack.variable(':view.grid.size.width', width, True)
 
         if not self.__checkParamDomain(currentAst, fctLabel, 'MAIN', main>=0, f"a zero or positive number is expected (current={main})", False):
             # let default value being applied in this case
-            main=self.__scriptBlockStack.current().variable(':view.grid.size.main', main, True)
+            main=self.__scriptBlockStack.variable(':view.grid.size.main', main, True)
 
 
         self.__checkParamDomain(currentAst, fctLabel, 'UNIT', unit in BSInterpreter.CONST_MEASURE_UNIT, f"grid unit value can be: {', '.join(BSInterpreter.CONST_MEASURE_UNIT)}")
@@ -2701,7 +2854,7 @@ class BSInterpreter(QObject):
         self.__checkParamNumber(currentAst, fctLabel, 1, 2)
 
         length=self.__evaluate(currentAst.node(0))
-        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')))
+        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.variable(':unit.canvas', 'PX')))
 
         self.__checkParamType(currentAst, fctLabel, 'LENGTH', length, int, float)
         if not self.__checkParamDomain(currentAst, fctLabel, 'LENGTH', length>0, f"a positive number is expected (current={length})", False):
@@ -2724,7 +2877,7 @@ class BSInterpreter(QObject):
         self.__checkParamNumber(currentAst, fctLabel, 1, 2)
 
         width=self.__evaluate(currentAst.node(0))
-        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')))
+        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.variable(':unit.canvas', 'PX')))
 
         self.__checkParamType(currentAst, fctLabel, 'WIDTH', width, int, float)
         if not self.__checkParamDomain(currentAst, fctLabel, 'WIDTH', width>0, f"a positive number is expected (current={width})", False):
@@ -2754,18 +2907,18 @@ class BSInterpreter(QObject):
         if len(currentAst.nodes())==2:
             # second parameter is radius
             radius=p2
-            unitWidth=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
-            unitRadius=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+            unitWidth=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
+            unitRadius=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
         elif len(currentAst.nodes())==3:
             if isinstance(p2, str):
                 # second parameter is a string, consider it's a width unit
                 radius=p3
                 unitWidth=p2
-                unitRadius=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+                unitRadius=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
             else:
                 # second parameter is not a string, consider it's radius
                 radius=p2
-                unitWidth=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+                unitWidth=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
                 unitRadius=p3
         elif len(currentAst.nodes())==4:
             radius=p3
@@ -2802,7 +2955,7 @@ class BSInterpreter(QObject):
 
         width=self.__evaluate(currentAst.node(0))
         height=self.__evaluate(currentAst.node(1))
-        unit=self.__evaluate(currentAst.node(2, self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')))
+        unit=self.__evaluate(currentAst.node(2, self.__scriptBlockStack.variable(':unit.canvas', 'PX')))
 
         self.__checkParamType(currentAst, fctLabel, 'WIDTH', width, int, float)
         self.__checkParamType(currentAst, fctLabel, 'HEIGHT', height, int, float)
@@ -2841,18 +2994,18 @@ class BSInterpreter(QObject):
         if len(currentAst.nodes())==3:
             # third parameter is radius
             radius=p3
-            unitDimension=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
-            unitRadius=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+            unitDimension=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
+            unitRadius=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
         elif len(currentAst.nodes())==4:
             if isinstance(p3, str):
                 # third parameter is a string, consider it's a dimension unit
                 radius=p4
                 unitDimension=p3
-                unitRadius=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+                unitRadius=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
             else:
                 # third parameter is not a string, consider it's radius
                 radius=p3
-                unitDimension=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+                unitDimension=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
                 unitRadius=p4
         elif len(currentAst.nodes())==5:
             radius=p4
@@ -2896,7 +3049,7 @@ class BSInterpreter(QObject):
         self.__checkParamNumber(currentAst, fctLabel, 1, 2)
 
         radius=self.__evaluate(currentAst.node(0))
-        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')))
+        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.variable(':unit.canvas', 'PX')))
 
         self.__checkParamType(currentAst, fctLabel, 'RADIUS', radius, int, float)
         if not self.__checkParamDomain(currentAst, fctLabel, 'RADIUS', radius>0, f"a positive number is expected (current={radius})", False):
@@ -2920,7 +3073,7 @@ class BSInterpreter(QObject):
 
         hRadius=self.__evaluate(currentAst.node(0))
         vRadius=self.__evaluate(currentAst.node(1))
-        unit=self.__evaluate(currentAst.node(2, self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')))
+        unit=self.__evaluate(currentAst.node(2, self.__scriptBlockStack.variable(':unit.canvas', 'PX')))
 
         self.__checkParamType(currentAst, fctLabel, 'H-RADIUS', hRadius, int, float)
         self.__checkParamType(currentAst, fctLabel, 'V-RADIUS', vRadius, int, float)
@@ -3003,15 +3156,15 @@ class BSInterpreter(QObject):
             #   draw scaled image "image ref" width height [unit]
             # same unit for witdh and height
             height=p2
-            unitW=self.__evaluate(currentAst.node(3, self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')))
+            unitW=self.__evaluate(currentAst.node(3, self.__scriptBlockStack.variable(':unit.canvas', 'PX')))
             unitH=unitW
         elif isinstance(p2, str):
             # p2 is a string value
             # consider we have
             #   draw scaled image "image ref" width unit height [unit]
-            unitW=self.__evaluate(currentAst.node(2, self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')))
+            unitW=self.__evaluate(currentAst.node(2, self.__scriptBlockStack.variable(':unit.canvas', 'PX')))
             height=p3
-            unitH=self.__evaluate(currentAst.node(4, self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')))
+            unitH=self.__evaluate(currentAst.node(4, self.__scriptBlockStack.variable(':unit.canvas', 'PX')))
 
         self.__checkParamType(currentAst, fctLabel, 'IMAGE', imageReference, str)
         self.__checkParamType(currentAst, fctLabel, 'WIDTH', width, int, float)
@@ -3072,18 +3225,18 @@ class BSInterpreter(QObject):
         if len(currentAst.nodes())==3:
             # third parameter is inner radius
             iRadius=p3
-            unitORadius=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
-            unitIRadius=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+            unitORadius=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
+            unitIRadius=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
         elif len(currentAst.nodes())==4:
             if isinstance(p3, str):
                 # third parameter is a string, consider it's a dimension unit
                 iRadius=p4
                 unitORadius=p3
-                unitIRadius=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+                unitIRadius=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
             else:
                 # third parameter is not a string, consider it's radius
                 iRadius=p3
-                unitORadius=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+                unitORadius=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
                 unitIRadius=p4
         elif len(currentAst.nodes())==5:
             iRadius=p4
@@ -3130,7 +3283,7 @@ class BSInterpreter(QObject):
         unitRadius=self.__evaluate(currentAst.node(2))
 
         if unitRadius is None:
-            unitRadius=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+            unitRadius=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
 
         self.__checkParamType(currentAst, fctLabel, 'EDGES', edges, int)
         self.__checkParamType(currentAst, fctLabel, 'RADIUS', radius, int, float)
@@ -3157,18 +3310,18 @@ class BSInterpreter(QObject):
         if len(currentAst.nodes())==2:
             # second parameter is angle
             angle=p2
-            unitRadius=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
-            unitAngle=self.__scriptBlockStack.current().variable(':unit.rotation', 'DEGREE')
+            unitRadius=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
+            unitAngle=self.__scriptBlockStack.variable(':unit.rotation', 'DEGREE')
         elif len(currentAst.nodes())==3:
             if isinstance(p2, str):
                 # second parameter is a string, consider it's a radius unit
                 unitRadius=p2
                 angle=p3
-                unitAngle=self.__scriptBlockStack.current().variable(':unit.rotation', 'DEGREE')
+                unitAngle=self.__scriptBlockStack.variable(':unit.rotation', 'DEGREE')
             else:
                 # second parameter is not a string, consider it's angle
                 angle=p2
-                unitRadius=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+                unitRadius=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
                 unitAngle=p3
         elif len(currentAst.nodes())==4:
             unitRadius=p2
@@ -3203,18 +3356,18 @@ class BSInterpreter(QObject):
         if len(currentAst.nodes())==2:
             # second parameter is angle
             angle=p2
-            unitRadius=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
-            unitAngle=self.__scriptBlockStack.current().variable(':unit.rotation', 'DEGREE')
+            unitRadius=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
+            unitAngle=self.__scriptBlockStack.variable(':unit.rotation', 'DEGREE')
         elif len(currentAst.nodes())==3:
             if isinstance(p2, str):
                 # second parameter is a string, consider it's a radius unit
                 unitRadius=p2
                 angle=p3
-                unitAngle=self.__scriptBlockStack.current().variable(':unit.rotation', 'DEGREE')
+                unitAngle=self.__scriptBlockStack.variable(':unit.rotation', 'DEGREE')
             else:
                 # second parameter is not a string, consider it's angle
                 angle=p2
-                unitRadius=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+                unitRadius=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
                 unitAngle=p3
         elif len(currentAst.nodes())==4:
             unitRadius=p2
@@ -3336,7 +3489,7 @@ class BSInterpreter(QObject):
         if len(currentAst.nodes())==2:
             # second parameter is v scale
             scaleV=p2
-            unitScaleH=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+            unitScaleH=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
             unitScaleV=unitScaleH
         elif len(currentAst.nodes())==3:
             if isinstance(p2, str):
@@ -3344,11 +3497,11 @@ class BSInterpreter(QObject):
                 unitScaleH=p2
                 # third parameter is v scale
                 scaleV=p3
-                unitScaleV=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+                unitScaleV=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
             elif isinstance(p2, (int, float)):
                 # second parameter is v scale
                 scaleV=p2
-                unitScaleH=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+                unitScaleH=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
                 unitScaleV=p3
         elif len(currentAst.nodes())==4:
                 unitScaleH=p2
@@ -3384,7 +3537,7 @@ class BSInterpreter(QObject):
         if len(currentAst.nodes())==2:
             # second parameter is v offset
             offsetV=p2
-            unitOffsetH=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+            unitOffsetH=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
             unitOffsetV=unitOffsetH
         elif len(currentAst.nodes())==3:
             if isinstance(p2, str):
@@ -3392,11 +3545,11 @@ class BSInterpreter(QObject):
                 unitOffsetH=p2
                 # third parameter is v offset
                 offsetV=p3
-                unitOffsetV=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+                unitOffsetV=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
             elif isinstance(p2, (int, float)):
                 # second parameter is v offset
                 offsetV=p2
-                unitOffsetH=self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')
+                unitOffsetH=self.__scriptBlockStack.variable(':unit.canvas', 'PX')
                 unitOffsetV=p3
         elif len(currentAst.nodes())==4:
                 unitOffsetH=p2
@@ -3428,7 +3581,7 @@ class BSInterpreter(QObject):
         angle=self.__evaluate(currentAst.node(1))
 
         if angle is None:
-            angle=self.__scriptBlockStack.current().variable(':unit.rotation', 'PX')
+            angle=self.__scriptBlockStack.variable(':unit.rotation', 'PX')
 
         self.__checkParamType(currentAst, fctLabel, 'ANGLE', rotation, int, float)
         self.__checkParamType(currentAst, fctLabel, 'ANGLE-UNIT', angle, str)
@@ -3552,7 +3705,7 @@ class BSInterpreter(QObject):
         self.__checkParamNumber(currentAst, fctLabel, 1, 2)
 
         value=self.__evaluate(currentAst.node(0))
-        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')))
+        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.variable(':unit.canvas', 'PX')))
 
         self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
 
@@ -3571,7 +3724,7 @@ class BSInterpreter(QObject):
         self.__checkParamNumber(currentAst, fctLabel, 1, 2)
 
         value=self.__evaluate(currentAst.node(0))
-        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')))
+        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.variable(':unit.canvas', 'PX')))
 
         self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
 
@@ -3590,7 +3743,7 @@ class BSInterpreter(QObject):
         self.__checkParamNumber(currentAst, fctLabel, 1, 2)
 
         value=self.__evaluate(currentAst.node(0))
-        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')))
+        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.variable(':unit.canvas', 'PX')))
 
         self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
 
@@ -3609,7 +3762,7 @@ class BSInterpreter(QObject):
         self.__checkParamNumber(currentAst, fctLabel, 1, 2)
 
         value=self.__evaluate(currentAst.node(0))
-        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')))
+        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.variable(':unit.canvas', 'PX')))
 
         self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
 
@@ -3629,7 +3782,7 @@ class BSInterpreter(QObject):
 
         valueX=self.__evaluate(currentAst.node(0))
         valueY=self.__evaluate(currentAst.node(1))
-        unit=self.__evaluate(currentAst.node(2, self.__scriptBlockStack.current().variable(':unit.canvas', 'PX')))
+        unit=self.__evaluate(currentAst.node(2, self.__scriptBlockStack.variable(':unit.canvas', 'PX')))
 
         self.__checkParamType(currentAst, fctLabel, 'X', valueX, int, float)
         self.__checkParamType(currentAst, fctLabel, 'Y', valueY, int, float)
@@ -3649,7 +3802,7 @@ class BSInterpreter(QObject):
         self.__checkParamNumber(currentAst, fctLabel, 1, 2)
 
         value=self.__evaluate(currentAst.node(0))
-        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.current().variable(':unit.rotation', 'DEGREE')))
+        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.variable(':unit.rotation', 'DEGREE')))
 
         self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
 
@@ -3668,7 +3821,7 @@ class BSInterpreter(QObject):
         self.__checkParamNumber(currentAst, fctLabel, 1, 2)
 
         value=self.__evaluate(currentAst.node(0))
-        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.current().variable(':unit.rotation', 'DEGREE')))
+        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.variable(':unit.rotation', 'DEGREE')))
 
         self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
 
@@ -3687,7 +3840,7 @@ class BSInterpreter(QObject):
         self.__checkParamNumber(currentAst, fctLabel, 1, 2)
 
         value=self.__evaluate(currentAst.node(0))
-        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.current().variable(':unit.rotation', 'DEGREE')))
+        unit=self.__evaluate(currentAst.node(1, self.__scriptBlockStack.variable(':unit.rotation', 'DEGREE')))
 
         self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
 
@@ -4450,1417 +4603,1270 @@ class BSInterpreter(QObject):
     # --------------------------------------------------------------------------
     # Functions & Evaluation
     # --------------------------------------------------------------------------
+    @staticmethod
+    def __initFunctions():
+        """Return functions registry: a dictionary of <BSFunction>, according to function name
+
+        Handlers are not bound to an interpreter instance, so registry is initialised once
+        and <BSFunction> can be cached on AST
+        """
+        numeric=(int, float)
+        return {f.name(): f for f in [
+                # ----------------------------------------------------------------------
+                # math
+                # ----
+                BSFunction('math.random', BSInterpreter.__fctMathRandom, [('MIN', numeric, None), ('MAX', numeric, None)], argsCount=(0, 2)),
+                BSFunction('math.absolute', lambda self, currentAst, fctLabel, value: abs(value), [('VALUE', numeric)]),
+                BSFunction('math.even', lambda self, currentAst, fctLabel, value: (value%2)==0, [('VALUE', numeric)]),
+                BSFunction('math.odd', lambda self, currentAst, fctLabel, value: (value%2)==1, [('VALUE', numeric)]),
+                BSFunction('math.sign', BSInterpreter.__fctMathSign, [('VALUE', numeric)]),
+                BSFunction('math.exp', lambda self, currentAst, fctLabel, value: math.exp(value), [('VALUE', numeric)]),
+                BSFunction('math.power', lambda self, currentAst, fctLabel, value, power: math.pow(value, power), [('VALUE', numeric), ('POWER', numeric)]),
+                BSFunction('math.squareroot', BSInterpreter.__fctMathSquareRoot, [('VALUE', numeric)]),
+                BSFunction('math.logn', BSInterpreter.__fctMathLogN, [('VALUE', numeric)]),
+                BSFunction('math.log', BSInterpreter.__fctMathLog, [('VALUE', numeric), ('BASE', numeric, 10)]),
+                BSFunction('math.convert', BSInterpreter.__fctMathConvert, [('VALUE', numeric), ('F-UNIT', (str,)), ('T-UNIT', (str,)), ('PCT-REF', None, None)]),
+                BSFunction('math.minimum', lambda self, currentAst, fctLabel, values: min(values), [], variadic=('VALUE', numeric, True)),
+                BSFunction('math.maximum', lambda self, currentAst, fctLabel, values: max(values), [], variadic=('VALUE', numeric, True)),
+                BSFunction('math.sum', lambda self, currentAst, fctLabel, values: sum(values), [], variadic=('VALUE', numeric, True)),
+                BSFunction('math.average', BSInterpreter.__fctMathAverage, [], variadic=('VALUE', numeric, True)),
+                BSFunction('math.product', BSInterpreter.__fctMathProduct, [], variadic=('VALUE', numeric, True)),
+                BSFunction('math.ceil', lambda self, currentAst, fctLabel, value: math.ceil(value), [('VALUE', numeric)]),
+                BSFunction('math.floor', lambda self, currentAst, fctLabel, value: math.floor(value), [('VALUE', numeric)]),
+                BSFunction('math.round', BSInterpreter.__fctMathRound, [('VALUE', numeric), ('DECIMALS', numeric, 0)]),
+                BSFunction('math.cos', lambda self, currentAst, fctLabel, value: math.cos(self.__angleToRadian(value)), [('VALUE', numeric)]),
+                BSFunction('math.sin', lambda self, currentAst, fctLabel, value: math.sin(self.__angleToRadian(value)), [('VALUE', numeric)]),
+                BSFunction('math.tan', lambda self, currentAst, fctLabel, value: math.tan(self.__angleToRadian(value)), [('VALUE', numeric)]),
+                BSFunction('math.acos', BSInterpreter.__fctMathACos, [('VALUE', numeric)]),
+                BSFunction('math.asin', BSInterpreter.__fctMathASin, [('VALUE', numeric)]),
+                BSFunction('math.atan', lambda self, currentAst, fctLabel, value: math.atan(self.__angleToRadian(value)), [('VALUE', numeric)]),
+                BSFunction('math.cosh', lambda self, currentAst, fctLabel, value: math.cosh(self.__angleToRadian(value)), [('VALUE', numeric)]),
+                BSFunction('math.sinh', lambda self, currentAst, fctLabel, value: math.sinh(self.__angleToRadian(value)), [('VALUE', numeric)]),
+                BSFunction('math.tanh', lambda self, currentAst, fctLabel, value: math.tanh(self.__angleToRadian(value)), [('VALUE', numeric)]),
+                BSFunction('math.acosh', BSInterpreter.__fctMathACosH, [('VALUE', numeric)]),
+                BSFunction('math.asinh', lambda self, currentAst, fctLabel, value: math.asinh(self.__angleToRadian(value)), [('VALUE', numeric)]),
+                BSFunction('math.atanh', BSInterpreter.__fctMathATanH, [('VALUE', numeric)]),
+
+                # ----------------------------------------------------------------------
+                # string
+                # ------
+                BSFunction('string.length', lambda self, currentAst, fctLabel, value: len(value), [('TEXT', (str,))]),
+                BSFunction('string.upper', lambda self, currentAst, fctLabel, value: value.upper(), [('TEXT', (str,))]),
+                BSFunction('string.lower', lambda self, currentAst, fctLabel, value: value.lower(), [('TEXT', (str,))]),
+                # INDEX and COUNT types are checked by handler, only when needed
+                BSFunction('string.substring', BSInterpreter.__fctStringSubstring, [('TEXT', (str,)), ('INDEX', None), ('COUNT', None, None)]),
+                BSFunction('string.format', BSInterpreter.__fctStringFormat, [('FORMAT', (str,))], variadic=('VALUE', None, False)),
+                BSFunction('string.split', lambda self, currentAst, fctLabel, value, sepChar: value.split(sepChar), [('TEXT', (str,)), ('SEPARATOR', (str,), ',')]),
+
+                # ----------------------------------------------------------------------
+                # color
+                # -----
+                BSFunction('color.rgb', BSInterpreter.__fctColorRgb, [('R-VALUE', numeric), ('G-VALUE', numeric), ('B-VALUE', numeric)]),
+                BSFunction('color.rgba', BSInterpreter.__fctColorRgb, [('R-VALUE', numeric), ('G-VALUE', numeric), ('B-VALUE', numeric), ('O-VALUE', numeric)]),
+                BSFunction('color.hsl', BSInterpreter.__fctColorHsl, [('H-VALUE', numeric), ('S-VALUE', numeric), ('L-VALUE', numeric)]),
+                BSFunction('color.hsla', BSInterpreter.__fctColorHsl, [('H-VALUE', numeric), ('S-VALUE', numeric), ('L-VALUE', numeric), ('O-VALUE', numeric)]),
+                BSFunction('color.hsv', BSInterpreter.__fctColorHsv, [('H-VALUE', numeric), ('S-VALUE', numeric), ('V-VALUE', numeric)]),
+                BSFunction('color.hsva', BSInterpreter.__fctColorHsv, [('H-VALUE', numeric), ('S-VALUE', numeric), ('V-VALUE', numeric), ('O-VALUE', numeric)]),
+                BSFunction('color.cmyk', BSInterpreter.__fctColorCmyk, [('C-VALUE', numeric), ('M-VALUE', numeric), ('Y-VALUE', numeric), ('K-VALUE', numeric)]),
+                BSFunction('color.cmyka', BSInterpreter.__fctColorCmyk, [('C-VALUE', numeric), ('M-VALUE', numeric), ('Y-VALUE', numeric), ('K-VALUE', numeric), ('O-VALUE', numeric)]),
+                BSFunction('color.red', lambda self, currentAst, fctLabel, color: color.red(), [('COLOR', (QColor,))]),
+                BSFunction('color.green', lambda self, currentAst, fctLabel, color: color.green(), [('COLOR', (QColor,))]),
+                BSFunction('color.blue', lambda self, currentAst, fctLabel, color: color.blue(), [('COLOR', (QColor,))]),
+                BSFunction('color.cyan', lambda self, currentAst, fctLabel, color: color.cyan(), [('COLOR', (QColor,))]),
+                BSFunction('color.magenta', lambda self, currentAst, fctLabel, color: color.magenta(), [('COLOR', (QColor,))]),
+                BSFunction('color.yellow', lambda self, currentAst, fctLabel, color: color.yellow(), [('COLOR', (QColor,))]),
+                BSFunction('color.black', lambda self, currentAst, fctLabel, color: color.black(), [('COLOR', (QColor,))]),
+                BSFunction('color.hue', lambda self, currentAst, fctLabel, color: color.hue(), [('COLOR', (QColor,))]),
+                BSFunction('color.saturation', lambda self, currentAst, fctLabel, color: color.saturation(), [('COLOR', (QColor,))]),
+                BSFunction('color.lightness', lambda self, currentAst, fctLabel, color: color.lightness(), [('COLOR', (QColor,))]),
+                BSFunction('color.value', lambda self, currentAst, fctLabel, color: color.value(), [('COLOR', (QColor,))]),
+                BSFunction('color.opacity', lambda self, currentAst, fctLabel, color: color.alpha(), [('COLOR', (QColor,))]),
+
+                # ----------------------------------------------------------------------
+                # list
+                # ----
+                BSFunction('list.length', lambda self, currentAst, fctLabel, value: len(value), [('LIST', (list,))]),
+                BSFunction('list.join', BSInterpreter.__fctListJoin, [('LIST', (list,)), ('SEPARATOR', (str,), ',')]),
+                BSFunction('list.rotate', lambda self, currentAst, fctLabel, value, shiftValue: rotate(value, shiftValue), [('LIST', (list,)), ('VALUE', (int,), 1)]),
+                BSFunction('list.sort', lambda self, currentAst, fctLabel, value, ascending: sorted(value, key=BSInterpreter.__sortKey, reverse=not ascending), [('LIST', (list,)), ('ASCENDING', (bool,), True)]),
+                BSFunction('list.revert', lambda self, currentAst, fctLabel, value: value[::-1], [('LIST', (list,))]),
+                BSFunction('list.unique', lambda self, currentAst, fctLabel, value: unique(value), [('LIST', (list,))]),
+                BSFunction('list.shuffle', lambda self, currentAst, fctLabel, value: random.sample(value, len(value)), [('LIST', (list,))]),
+                BSFunction('list.index', BSInterpreter.__fctListIndex, [('LIST', (list,)), ('INDEX', (int,)), ('DEFAULT', None, 0)]),
+
+                # ----------------------------------------------------------------------
+                # boolean
+                # -------
+                BSFunction('boolean.isstring', lambda self, currentAst, fctLabel, value: isinstance(value, str), [('VALUE', None)]),
+                BSFunction('boolean.isnumber', lambda self, currentAst, fctLabel, value: isinstance(value, (int, float)), [('VALUE', None)]),
+                BSFunction('boolean.isinteger', lambda self, currentAst, fctLabel, value: isinstance(value, int), [('VALUE', None)]),
+                BSFunction('boolean.isdecimal', lambda self, currentAst, fctLabel, value: isinstance(value, float), [('VALUE', None)]),
+                BSFunction('boolean.isboolean', lambda self, currentAst, fctLabel, value: isinstance(value, bool), [('VALUE', None)]),
+                BSFunction('boolean.iscolor', lambda self, currentAst, fctLabel, value: isinstance(value, QColor), [('VALUE', None)]),
+                BSFunction('boolean.islist', lambda self, currentAst, fctLabel, value: isinstance(value, list), [('VALUE', None)])
+            ]}
+
+    @staticmethod
+    def __sortKey(x):
+        """Return key used to compare items in list, allowing to sort list with
+        mixed values (int, float, string, QColor, ...)
+        """
+        if isinstance(x, (int, float)):
+            return f"{x:050.25f}"
+        elif isinstance(x, QColor):
+            return x.name(QColor.HexArgb)
+        else:
+            try:
+                return f"{float(x):050.25f}"
+            except:
+                return str(x)
+
     def __executeFunction(self, currentAst):
-        """Execute a function"""
-        def sortKey(x):
-            # a function used to compare items in list, allowing to sort list with values
-            # mixed values (int, float, string, QColor, ...)
-            if isinstance(x, (int, float)):
-                return f"{x:050.25f}"
-            elif isinstance(x, QColor):
-                return x.name(QColor.HexArgb)
-            else:
-                try:
-                    return f"{float(x):050.25f}"
-                except:
-                    return str(x)
+        """Execute a function
 
+        Function is resolved from functions registry on first execution, and
+        then cached on AST
+        """
         # Defined by N+1 nodes:
         #   0: function (<Token>)
         #   N: value (<Token> or <ASTItem>)  -- arguments, 0 to N; will depend of function
+        execution=self.__functionExecution(currentAst)
 
-        # get function name
-        fctName=currentAst.node(0).value()
-        fctLabel=f'Function {fctName}()'
-
-        if fctName=='math.random':
-            self.__checkFctParamNumber(currentAst, fctLabel, 0, 2)
-
-            if currentAst.countNodes()==1:
-                # no parameters
-                return random.random()
-            elif currentAst.countNodes()==3:
-                minValue=self.__evaluate(currentAst.node(1))
-                maxValue=self.__evaluate(currentAst.node(2))
+        return self.__callFunction(currentAst, execution, list(map(self.__evaluate, execution[2])))
 
-                self.__checkParamType(currentAst, fctLabel, 'MIN', minValue, int, float)
-                self.__checkParamType(currentAst, fctLabel, 'MAX', maxValue, int, float)
+    def __functionExecution(self, currentAst):
+        """Return execution definition for function AST, resolved on first call and then cached on AST"""
+        execution=currentAst.cachedValue('bsFunction')
+        if execution is None:
+            execution=self.__resolveFunction(currentAst)
+            currentAst.setCachedValue('bsFunction', execution)
+        return execution
 
-                if minValue>maxValue:
-                    # switch values
-                    minValue, maxValue=maxValue, minValue
+    def __callFunction(self, currentAst, execution, values):
+        """Call function handler with given (already evaluated) arguments `values`
 
-                if isinstance(minValue, int) and isinstance(maxValue, int):
-                    # both bound value are integer, return integer
-                    return random.randrange(minValue, maxValue)
-                else:
-                    # at least one decimal value, return decimal value
-                    return random.uniform(minValue, maxValue)
+        Given `execution` is the function execution definition returned by __resolveFunction()
+        """
+        handler, fctLabel, argsNodes, argsTypes, argsDefaults, variadic=execution
 
-        elif fctName=='math.absolute':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+        # check types of provided arguments; default values are not checked
+        for index, name, types in argsTypes:
+            if not isinstance(values[index], types):
+                self.__checkParamType(currentAst, fctLabel, name, values[index], *types)
 
-            value=self.__evaluate(currentAst.node(1))
+        if argsDefaults:
+            values.extend(argsDefaults)
 
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
+        if not variadic is None:
+            # all values after arguments are provided to handler as a list
+            nbArguments, name, types, flattenValues=variadic
+            if nbArguments==0:
+                variadicValues=values
+                values=[]
+            else:
+                variadicValues=values[nbArguments:]
+                del values[nbArguments:]
 
-            return abs(value)
-        elif fctName=='math.even':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+            if flattenValues:
+                variadicValues=flatten(variadicValues)
 
-            value=self.__evaluate(currentAst.node(1))
+            if not types is None:
+                for index, value in enumerate(variadicValues):
+                    if not isinstance(value, types):
+                        self.__checkParamType(currentAst, fctLabel, f'{name}[{index}]', value, *types)
 
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
+            values.append(variadicValues)
 
-            return (value%2)==0
-        elif fctName=='math.odd':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+        return handler(self, currentAst, fctLabel, *values)
 
-            value=self.__evaluate(currentAst.node(1))
+    def __resolveFunction(self, currentAst):
+        """Return execution definition for function AST, as a tuple:
+            (handler, label, arguments nodes, arguments types, default values, variadic)
 
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
+        As AST nodes can't change, number of arguments is checked here, and only
+        types of provided arguments have to be checked on execution
+        """
+        # get function name
+        fctName=currentAst.node(0).value()
+        function=BSInterpreter.__functions.get(fctName)
+        if function is None:
+            # shouldn't occurs
+            raise EInterpreterInternalError(f"Function {fctName}() hasn't been implemented!?", currentAst)
 
-            return (value%2)==1
-        elif fctName=='math.sign':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+        fctLabel=function.label()
+        argsNodes=tuple(currentAst.nodes()[1:])
+        nbArgs=len(argsNodes)
 
-            value=self.__evaluate(currentAst.node(1))
+        if not nbArgs in function.argsCount():
+            raise EInterpreter(f"{fctLabel}: invalid number of provided arguments", currentAst)
 
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
+        arguments=function.arguments()
+        argsTypes=tuple((index, name, types) for index, (name, types, default) in enumerate(arguments[:nbArgs]) if not types is None)
+        argsDefaults=tuple(default for name, types, default in arguments[nbArgs:])
 
-            if isinstance(value, int):
-                if value==0:
-                    return 0
-                elif value>0:
-                    return 1
-                else:
-                    return -1
-            elif isinstance(value, float):
-                if value==0:
-                    return 0.0
-                elif value>0:
-                    return 1.0
-                else:
-                    return -1.0
-        elif fctName=='math.exp':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+        variadic=function.variadic()
+        if not variadic is None:
+            variadic=(len(arguments), *variadic)
 
-            value=self.__evaluate(currentAst.node(1))
+        return (function.handler(), fctLabel, argsNodes, argsTypes, argsDefaults, variadic)
 
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
+    def __angleToRadian(self, value):
+        """Return given angle `value`, expressed in current rotation unit, as radian"""
+        return BSConvertUnits.convertAngle(value, self.__scriptBlockStack.variable(':unit.rotation'), 'RADIAN')
 
-            return math.exp(value)
-        elif fctName=='math.power':
-            self.__checkFctParamNumber(currentAst, fctLabel, 2)
-            value=self.__evaluate(currentAst.node(1))
-            power=self.__evaluate(currentAst.node(2))
+    def __colorComponent(self, currentAst, fctLabel, name, value):
+        """Return given color component `value` as an integer 0-255
 
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'POWER', power, int, float)
+        If `value` is an integer, expected range is [0;255]
+        If `value` is a decimal, expected range is [0.0;1.0]
 
-            return math.pow(value, power)
-        elif fctName=='math.squareroot':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+        Out of range value is bounded (with a warning)
+        """
+        if isinstance(value, int):
+            if not self.__checkParamDomain(currentAst, fctLabel, name, value>=0 and value<=255, f"allowed value when provided as an integer number is range [0;255] (current={value})", False):
+                value=min(255, max(0, value))
+            return value
+        else:
+            if not self.__checkParamDomain(currentAst, fctLabel, name, value>=0.0 and value<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={value})", False):
+                value=min(1.0, max(0.0, value))
+            return round(value*255)
 
-            value=self.__evaluate(currentAst.node(1))
+    def __fctMathRandom(self, currentAst, fctLabel, minValue, maxValue):
+        """Function math.random()"""
+        if minValue is None:
+            # no parameters
+            return random.random()
 
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
-            self.__checkParamDomain(currentAst, fctLabel, 'VALUE', value>=0, f'must be a zero or positive numeric value (current={value})')
+        if minValue>maxValue:
+            # switch values
+            minValue, maxValue=maxValue, minValue
 
+        if isinstance(minValue, int) and isinstance(maxValue, int):
+            # both bound value are integer, return integer
+            return random.randrange(minValue, maxValue)
+        else:
+            # at least one decimal value, return decimal value
+            return random.uniform(minValue, maxValue)
 
-            return math.sqrt(value)
-        elif fctName=='math.logn':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+    def __fctMathSign(self, currentAst, fctLabel, value):
+        """Function math.sign()"""
+        if isinstance(value, int):
+            if value==0:
+                return 0
+            elif value>0:
+                return 1
+            else:
+                return -1
+        elif isinstance(value, float):
+            if value==0:
+                return 0.0
+            elif value>0:
+                return 1.0
+            else:
+                return -1.0
+
+    def __fctMathSquareRoot(self, currentAst, fctLabel, value):
+        """Function math.squareroot()"""
+        self.__checkParamDomain(currentAst, fctLabel, 'VALUE', value>=0, f'must be a zero or positive numeric value (current={value})')
+        return math.sqrt(value)
+
+    def __fctMathLogN(self, currentAst, fctLabel, value):
+        """Function math.logn()"""
+        self.__checkParamDomain(currentAst, fctLabel, 'VALUE', value>0, f'must be a positive numeric value (current={value})')
+        return math.log(value)
+
+    def __fctMathLog(self, currentAst, fctLabel, value, base):
+        """Function math.log()"""
+        self.__checkParamDomain(currentAst, fctLabel, 'VALUE', value>0, f'must be a positive numeric value (current={value})')
+        self.__checkParamDomain(currentAst, fctLabel, 'BASE', base>0 and base!=1, f'must be a positive numeric value not equal to 1  (current={base})')
+        return math.log(value, base)
+
+    def __fctMathConvert(self, currentAst, fctLabel, value, convertFrom, convertTo, refPct):
+        """Function math.convert()"""
+        # need to check consistency convertFrom->convertTo
+        if convertFrom in ['PX', 'PCT', 'MM', 'INCH']:
+            self.__checkParamDomain(currentAst, fctLabel, 'T-UNIT', convertTo in ['PX', 'PCT', 'MM', 'INCH'], 'conversion of a measure unit can only be converted to another measure unit (PC, PCT, MM, INCH)')
+
+            if not refPct is None:
+                self.__checkParamType(currentAst, fctLabel, 'PCT-REF', refPct, str)
+                self.__checkParamDomain(currentAst, fctLabel, 'PCT-REF', refPct in 'WH', 'percentage reference can only be: "W" or "H", use default WIDTH as reference', False)
+
+            return BSConvertUnits.convertMeasure(value, convertFrom, convertTo, refPct)
+        elif convertFrom in ['DEGREE','RADIAN']:
+            self.__checkParamDomain(currentAst, fctLabel, 'T-UNIT', convertTo in ['DEGREE','RADIAN'], 'conversion of an angle unit can only be converted to another angle unit (DEGREE, RADIAN)')
+            if not refPct is None:
+                self.warning(f"Percentage reference is ignored for ANGLE conversion", currentAst)
+            return BSConvertUnits.convertAngle(value, convertFrom, convertTo)
+        else:
+            self.__checkParamDomain(currentAst, fctLabel, 'F-UNIT', False, 'can only convert measures and angles units')
+
+    def __fctMathAverage(self, currentAst, fctLabel, values):
+        """Function math.average()"""
+        nbItems=len(values)
+        if nbItems>0:
+            return sum(values)/nbItems
+        return 0
+
+    def __fctMathProduct(self, currentAst, fctLabel, values):
+        """Function math.product()"""
+        if len(values)>0:
+            return math.prod(values)
+        return 0
+
+    def __fctMathRound(self, currentAst, fctLabel, value, roundValue):
+        """Function math.round()"""
+        self.__checkParamDomain(currentAst, fctLabel, 'DECIMALS', roundValue>=0 and isinstance(roundValue, int), f"must be a zero or positive integer value (current={roundValue})")
+
+        if roundValue==0:
+            # because math.floor(x, 0) return a float
+            # and here we want an integer if rounded to 0 decimal
+            return round(value)
+        else:
+            return round(value, roundValue)
+
+    def __fctMathACos(self, currentAst, fctLabel, value):
+        """Function math.acos()"""
+        self.__checkParamDomain(currentAst, fctLabel, 'VALUE', value>=-1 and value<=1 , f"must be a numeric value in range [-1.0;1.0] (current={value})")
+        return math.acos(self.__angleToRadian(value))
+
+    def __fctMathASin(self, currentAst, fctLabel, value):
+        """Function math.asin()"""
+        self.__checkParamDomain(currentAst, fctLabel, 'VALUE', value>=-1 and value<=1 , f"must be a numeric value in range [-1.0;1.0] (current={value})")
+        return math.asin(self.__angleToRadian(value))
+
+    def __fctMathACosH(self, currentAst, fctLabel, value):
+        """Function math.acosh()"""
+        self.__checkParamDomain(currentAst, fctLabel, 'VALUE', value>=1, f"must be a numeric value in range [1.0;infinite[ (current={value})")
+        return math.acosh(self.__angleToRadian(value))
+
+    def __fctMathATanH(self, currentAst, fctLabel, value):
+        """Function math.atanh()"""
+        self.__checkParamDomain(currentAst, fctLabel, 'VALUE', value>-1 and value<1 , f"must be a numeric value in range ]-1.0;1.0[ (current={value})")
+        return math.atanh(self.__angleToRadian(value))
+
+    def __fctStringSubstring(self, currentAst, fctLabel, value, fromIndex, countChar):
+        """Function string.substring()"""
+        nbChar=len(value)
+        if value=='':
+            # empty string, return result immediately
+            return ''
 
-            value=self.__evaluate(currentAst.node(1))
+        self.__checkParamType(currentAst, fctLabel, 'INDEX', fromIndex, int)
+        if fromIndex==0 or abs(fromIndex)>nbChar:
+            # invalid index, return empty string immediately
+            return ''
 
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
-            self.__checkParamDomain(currentAst, fctLabel, 'VALUE', value>0, f'must be a positive numeric value (current={value})')
+        if countChar:
+            self.__checkParamType(currentAst, fctLabel, 'COUNT', countChar, int)
 
-            return math.log(value)
-        elif fctName=='math.log':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1,2)
+        if fromIndex>0:
+            # positive value, start from beginning
+            if countChar:
+                # return a specific number of characters
+                return value[fromIndex-1:fromIndex+countChar-1]
+            else:
+                # return all characters
+                return value[fromIndex-1:]
+        else:
+            if countChar:
+                # return a specific number of characters
+                return value[fromIndex:fromIndex+countChar]
+            else:
+                # return all characters
+                return value[fromIndex:]
+
+    def __fctStringFormat(self, currentAst, fctLabel, formatStr, values):
+        """Function string.format()"""
+        return formatStr.format(*[str(self.__strValue(value)) for value in values])
+
+    def __fctColorRgb(self, currentAst, fctLabel, rValue, gValue, bValue, aValue=255):
+        """Functions color.rgb() and color.rgba()"""
+        return QColor.fromRgb(self.__colorComponent(currentAst, fctLabel, 'R-VALUE', rValue),
+                              self.__colorComponent(currentAst, fctLabel, 'G-VALUE', gValue),
+                              self.__colorComponent(currentAst, fctLabel, 'B-VALUE', bValue),
+                              self.__colorComponent(currentAst, fctLabel, 'O-VALUE', aValue))
+
+    def __fctColorHsl(self, currentAst, fctLabel, hValue, sValue, lValue, aValue=255):
+        """Functions color.hsl() and color.hsla()"""
+        if isinstance(hValue, float):
+            hValue=round(hValue*255)
+
+        return QColor.fromHsl(hValue%360,
+                              self.__colorComponent(currentAst, fctLabel, 'S-VALUE', sValue),
+                              self.__colorComponent(currentAst, fctLabel, 'L-VALUE', lValue),
+                              self.__colorComponent(currentAst, fctLabel, 'O-VALUE', aValue))
+
+    def __fctColorHsv(self, currentAst, fctLabel, hValue, sValue, vValue, aValue=255):
+        """Functions color.hsv() and color.hsva()"""
+        if isinstance(hValue, float):
+            hValue=round(hValue*255)
+
+        return QColor.fromHsv(hValue%360,
+                              self.__colorComponent(currentAst, fctLabel, 'S-VALUE', sValue),
+                              self.__colorComponent(currentAst, fctLabel, 'V-VALUE', vValue),
+                              self.__colorComponent(currentAst, fctLabel, 'O-VALUE', aValue))
+
+    def __fctColorCmyk(self, currentAst, fctLabel, cValue, mValue, yValue, kValue, aValue=255):
+        """Functions color.cmyk() and color.cmyka()"""
+        return QColor.fromCmyk(self.__colorComponent(currentAst, fctLabel, 'C-VALUE', cValue),
+                               self.__colorComponent(currentAst, fctLabel, 'M-VALUE', mValue),
+                               self.__colorComponent(currentAst, fctLabel, 'Y-VALUE', yValue),
+                               self.__colorComponent(currentAst, fctLabel, 'K-VALUE', kValue),
+                               self.__colorComponent(currentAst, fctLabel, 'O-VALUE', aValue))
+
+    def __fctListJoin(self, currentAst, fctLabel, value, sepChar):
+        """Function list.join()"""
+        # do join; force string conversion of items
+        return sepChar.join([item.name() if isinstance(item, QColor) and item.alpha()==255
+                             else item.name(QColor.HexArgb) if isinstance(item, QColor)
+                             else str(item)
+                             for item in value])
+
+    def __fctListIndex(self, currentAst, fctLabel, value, index, default):
+        """Function list.index()"""
+        if index>0 and index<=len(value):
+            return value[index-1]
+        elif index<0 and index > -len(value):
+            return value[index]
+        else:
+            return default
 
-            value=self.__evaluate(currentAst.node(1))
-            base=self.__evaluate(currentAst.node(2, 10))
+    def __executeEvaluationExpressionParenthesis(self, currentAst):
+        """return evaluation of expression in parenthesis"""
+        # defined by 1 Token nodes (<Token> or <ASTItem>)
+        return self.__evaluate(currentAst.node(0))
 
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'BASE', value, int, float)
+    def __executeStringValue(self, currentAst):
+        """return string value"""
+        # defined by N Token nodes (String)
 
-            self.__checkParamDomain(currentAst, fctLabel, 'VALUE', value>0, f'must be a positive numeric value (current={value})')
-            self.__checkParamDomain(currentAst, fctLabel, 'BASE', base>0 and base!=1, f'must be a positive numeric value not equal to 1  (current={base})')
+        returned=[]
+        for item in currentAst.nodes():
+            returned.append(item.value())
 
-            return math.log(value, base)
-        elif fctName=='math.convert':
-            self.__checkFctParamNumber(currentAst, fctLabel, 3,4)
+        return ''.join(returned)
 
-            value=self.__evaluate(currentAst.node(1))
-            convertFrom=self.__evaluate(currentAst.node(2))
-            convertTo=self.__evaluate(currentAst.node(3))
-            refPct=self.__evaluate(currentAst.node(4))
+    def __executeListValue(self, currentAst):
+        """return string value"""
+        # defined by N nodes (ASTItem)
+        returned=[]
+        for item in currentAst.nodes():
+            returned.append(self.__evaluate(item))
 
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'F-UNIT', convertFrom, str)
-            self.__checkParamType(currentAst, fctLabel, 'T-UNIT', convertTo, str)
+        return returned
 
-            # need to check consistency convertFrom->convertTo
-            if convertFrom in ['PX', 'PCT', 'MM', 'INCH']:
-                self.__checkParamDomain(currentAst, fctLabel, 'T-UNIT', convertTo in ['PX', 'PCT', 'MM', 'INCH'], 'conversion of a measure unit can only be converted to another measure unit (PC, PCT, MM, INCH)')
+    def __executeListIndexExpression(self, currentAst):
+        """return index value"""
+        return self.__evaluate(currentAst.node(0))
 
-                if not refPct is None:
-                    self.__checkParamType(currentAst, fctLabel, 'PCT-REF', refPct, str)
-                    self.__checkParamDomain(currentAst, refPct, 'PCT-REF', refPct in 'WH', 'percentage reference can only be: "W" or "H", use default WIDTH as reference', False)
+    # --------------------------------------------------------------------------
+    # Operators
+    # --------------------------------------------------------------------------
+    def __executeUnaryOperator(self, currentAst):
+        """return unary operation result"""
+        # Defined by 2 nodes:
+        #   0: operator (<Token>)
+        #   1: value (<Token> or <ASTItem>)
 
-                returned=BSConvertUnits.convertMeasure(value, convertFrom, convertTo, refPct)
-            elif convertFrom in ['DEGREE','RADIAN']:
-                self.__checkParamDomain(currentAst, fctLabel, 'T-UNIT', convertTo in ['DEGREE','RADIAN'], 'conversion of an angle unit can only be converted to another angle unit (DEGREE, RADIAN)')
-                if not refPct is None:
-                    self.warning(f"Percentage reference is ignored for ANGLE conversion", currentAst)
-                returned=BSConvertUnits.convertAngle(value, convertFrom, convertTo)
-            else:
-                self.__checkParamDomain(currentAst, fctLabel, 'F-UNIT', False, 'can only convert measures and angles units')
+        # get operator
+        operator=currentAst.node(0).value()
 
-            return returned
-        elif fctName=='math.minimum':
-            # no minimum  arguments
-            values=flatten(map(self.__evaluate, currentAst.nodes()[1:]))
-            for index, value in enumerate(values):
-                self.__checkParamType(currentAst, fctLabel, f'VALUE[{index}]', value, int, float)
-
-            return min(values)
-        elif fctName=='math.maximum':
-            # no minimum  arguments
-            values=flatten(map(self.__evaluate, currentAst.nodes()[1:]))
-            for index, value in enumerate(values):
-                self.__checkParamType(currentAst, fctLabel, f'VALUE[{index}]', value, int, float)
-
-            return max(values)
-        elif fctName=='math.sum':
-            # no minimum  arguments
-            values=flatten(map(self.__evaluate, currentAst.nodes()[1:]))
-            for index, value in enumerate(values):
-                self.__checkParamType(currentAst, fctLabel, f'VALUE[{index}]', value, int, float)
-
-            return sum(values)
-        elif fctName=='math.average':
-            # no minimum  arguments
-            values=flatten(map(self.__evaluate, currentAst.nodes()[1:]))
-            for index, value in enumerate(values):
-                self.__checkParamType(currentAst, fctLabel, f'VALUE[{index}]', value, int, float)
-
-            nbItems=len(values)
-            if nbItems>0:
-                return sum(values)/nbItems
-            return 0
-        elif fctName=='math.product':
-            # no minimum  arguments
-            values=flatten(map(self.__evaluate, currentAst.nodes()[1:]))
-            for index, value in enumerate(values):
-                self.__checkParamType(currentAst, fctLabel, f'VALUE[{index}]', value, int, float)
-
-            nbItems=len(values)
-            if nbItems>0:
-                return math.prod(values)
-            return 0
-        elif fctName=='math.ceil':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            value=self.__evaluate(currentAst.node(1))
-
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
-
-            return math.ceil(value)
-        elif fctName=='math.floor':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            value=self.__evaluate(currentAst.node(1))
-
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
-
-            return math.floor(value)
-        elif fctName=='math.round':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1,2)
-
-            value=self.__evaluate(currentAst.node(1))
-            roundValue=self.__evaluate(currentAst.node(2, 0))
-
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'DECIMALS', roundValue, int, float)
-            self.__checkParamDomain(currentAst, fctLabel, 'DECIMALS', roundValue>=0 and isinstance(roundValue, int), f"must be a zero or positive integer value (current={roundValue})")
-
-            if roundValue==0:
-                # because math.floor(x, 0) return a float
-                # and here we want an integer if rounded to 0 decimal
-                return round(value)
-            else:
-                return round(value, roundValue)
-        elif fctName=='math.cos':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+        # evaluate value
+        value=self.__evaluate(currentAst.node(1))
 
-            value=self.__evaluate(currentAst.node(1))
+        if operator=='not':
+            if isinstance(value, bool):
+                return not value
 
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
+            # not a boolean, raise an error
+            raise EInterpreter(f"Boolean operator 'NOT' can only be applied on a boolean value", currentAst)
+        elif operator=='-':
+            if isinstance(value, float) or isinstance(value, int):
+                return -value
 
-            return math.cos(BSConvertUnits.convertAngle(value, self.__scriptBlockStack.current().variable(':unit.rotation'), 'RADIAN'))
-        elif fctName=='math.sin':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+            # not a boolean, raise an error
+            raise EInterpreter(f"Negative operator '-' can only be applied on a numeric value", currentAst)
 
-            value=self.__evaluate(currentAst.node(1))
+        # should not occurs
+        raise EInterpreter(f"Unknown operator: {operator}", currentAst)
 
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
-
-            return math.sin(BSConvertUnits.convertAngle(value, self.__scriptBlockStack.current().variable(':unit.rotation'), 'RADIAN'))
-        elif fctName=='math.tan':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            value=self.__evaluate(currentAst.node(1))
-
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
-
-            return math.tan(BSConvertUnits.convertAngle(value, self.__scriptBlockStack.current().variable(':unit.rotation'), 'RADIAN'))
-        elif fctName=='math.acos':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            value=self.__evaluate(currentAst.node(1))
-
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
-            self.__checkParamDomain(currentAst, fctLabel, 'VALUE', value>=-1 and value<=1 , f"must be a numeric value in range [-1.0;1.0] (current={value})")
-
-            return math.acos(BSConvertUnits.convertAngle(value, self.__scriptBlockStack.current().variable(':unit.rotation'), 'RADIAN'))
-        elif fctName=='math.asin':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            value=self.__evaluate(currentAst.node(1))
-
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
-            self.__checkParamDomain(currentAst, fctLabel, 'VALUE', value>=-1 and value<=1 , f"must be a numeric value in range [-1.0;1.0] (current={value})")
-
-            return math.asin(BSConvertUnits.convertAngle(value, self.__scriptBlockStack.current().variable(':unit.rotation'), 'RADIAN'))
-        elif fctName=='math.atan':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            value=self.__evaluate(currentAst.node(1))
-
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
-
-            return math.atan(BSConvertUnits.convertAngle(value, self.__scriptBlockStack.current().variable(':unit.rotation'), 'RADIAN'))
-        elif fctName=='math.cosh':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            value=self.__evaluate(currentAst.node(1))
-
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
-
-            return math.cosh(BSConvertUnits.convertAngle(value, self.__scriptBlockStack.current().variable(':unit.rotation'), 'RADIAN'))
-        elif fctName=='math.sinh':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            value=self.__evaluate(currentAst.node(1))
-
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
-
-            return math.sinh(BSConvertUnits.convertAngle(value, self.__scriptBlockStack.current().variable(':unit.rotation'), 'RADIAN'))
-        elif fctName=='math.tanh':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            value=self.__evaluate(currentAst.node(1))
-
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
-
-            return math.tanh(BSConvertUnits.convertAngle(value, self.__scriptBlockStack.current().variable(':unit.rotation'), 'RADIAN'))
-        elif fctName=='math.acosh':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            value=self.__evaluate(currentAst.node(1))
-
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
-            self.__checkParamDomain(currentAst, fctLabel, 'VALUE', value>=1, f"must be a numeric value in range [1.0;infinite[ (current={value})")
+    def __executeBinaryOperator(self, currentAst):
+        """return binary operation result"""
+        # Defined by 3 nodes:
+        #   0: operator (<Token>)
+        #   1: left value (<Token> or <ASTItem>)
+        #   2: right value (<Token> or <ASTItem>)
 
-            return math.acosh(BSConvertUnits.convertAngle(value, self.__scriptBlockStack.current().variable(':unit.rotation'), 'RADIAN'))
-        elif fctName=='math.asinh':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+        # get opertor
+        operator=currentAst.node(0).value()
 
-            value=self.__evaluate(currentAst.node(1))
+        # evaluate values
+        leftValue=self.__evaluate(currentAst.node(1))
+        rightValue=self.__evaluate(currentAst.node(2))
 
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
+        binaryOperator=self.__binaryOperators.get(operator)
+        if binaryOperator is None:
+            # should not occurs
+            raise EInterpreter(f"Unknown operator: {operator}", currentAst)
 
-            return math.asinh(BSConvertUnits.convertAngle(value, self.__scriptBlockStack.current().variable(':unit.rotation'), 'RADIAN'))
-        elif fctName=='math.atanh':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+        applyOperator, operatorLabel, numericOperator=binaryOperator
+        try:
+            return applyOperator(leftValue, rightValue)
+        except Exception as e:
+            self.__raiseOperatorException(currentAst, e, operatorLabel)
+
+    def __initBinaryOperators(self):
+        """Initialise binary operators:
+        - function applying operator
+        - label used in error messages
+        - python operator that can be applied directly on numeric values (None if not applicable)
+        """
+        self.__binaryOperators={
+                '*':    (self.__applyMultiply, "multiply operator '*'", operator.mul),
+                '/':    (self.__applyDivide, "divide operator '/'", None),
+                '//':   (self.__applyFloorDivide, "floor division operator '//'", None),
+                '%':    (self.__applyModulus, "modulus operator '%'", None),
+                '+':    (self.__applyAddition, "addition operator '+'", operator.add),
+                '-':    (self.__applySubstraction, "substraction operator '-'", operator.sub),
+                '<':    (self.__applyCmpLT, "comparison operator '<'", operator.lt),
+                '<=':   (self.__applyCmpLE, "comparison operator '<='", operator.le),
+                '>':    (self.__applyCmpGT, "comparison operator '>'", operator.gt),
+                '>=':   (self.__applyCmpGE, "comparison operator '>='", operator.ge),
+                '=':    (self.__applyCmpEQ, "comparison operator '='", operator.eq),
+                '<>':   (self.__applyCmpNE, "comparison operator '<>'", operator.ne),
+                'in':   (self.__applyIn, "In list operator 'in'", None),
+                'and':  (self.__applyAnd, "logical operator 'AND'", None),
+                'or':   (self.__applyOr, "logical operator 'OR'", None),
+                'xor':  (self.__applyXOr, "logical operator 'XOR'", None)
+            }
 
-            value=self.__evaluate(currentAst.node(1))
+    def __raiseOperatorException(self, currentAst, e, operator):
+        """Reformat operator/operand exception for interpeter
+
+        Exceptions raised by __applyXXX() methods don't have AST, they're always
+        converted here to an <EInterpreter> for given `currentAst`
+        """
+        if isinstance(e, TypeError):
+            result=re.search("'([^']+)'\sand\s'([^']+)'", str(e))
+            if not result is None:
+                operator=re.sub(r"'([^']+)'", r"'***\1***'", operator)
+                raise EInterpreter(f"Unsupported operand types ***{self.__valueTypeFromName(result.groups()[0])}*** and ***{self.__valueTypeFromName(result.groups()[1])}*** for {operator}", currentAst)
+        raise EInterpreter(str(e), currentAst)
+
+    def __applyAnd(self, leftValue, rightValue):
+        """Return result of logical operator 'AND'"""
+        # Logical operator can be applied
+        # - between 2 boolean values
+        # - between 2 integer values
+        # - between boolean value and List
+        # - between integer value and List
+        if isinstance(leftValue, bool) and isinstance(rightValue, bool):
+            return leftValue and rightValue
+        elif isinstance(rightValue, list):
+            return [self.__applyAnd(leftValue, x) for x in rightValue]
+        elif isinstance(leftValue, list):
+            return [self.__applyAnd(x, rightValue) for x in leftValue]
+        else:
+            return leftValue & rightValue
+
+    def __applyOr(self, leftValue, rightValue):
+        """Return result of logical operator 'OR'"""
+        # Logical operator can be applied
+        # - between 2 boolean values
+        # - between 2 integer values
+        # - between boolean value and List
+        # - between integer value and List
+        if isinstance(leftValue, bool) and isinstance(rightValue, bool):
+            return leftValue or rightValue
+        elif isinstance(leftValue, (int, float)) and isinstance(rightValue, list):
+            return [self.__applyOr(leftValue, x) for x in rightValue]
+        elif isinstance(rightValue, (int, float)) and isinstance(leftValue, list):
+            return [self.__applyOr(x, rightValue) for x in leftValue]
+        else:
+            return leftValue | rightValue
+
+    def __applyXOr(self, leftValue, rightValue):
+        """Return result of logical operator 'XOR'"""
+        # Logical operator can be applied
+        # - between 2 boolean values
+        # - between 2 integer values
+        # - between boolean value and List
+        # - between integer value and List
+        if isinstance(leftValue, (int, float)) and isinstance(rightValue, list):
+            return [self.__applyXOr(leftValue, x) for x in rightValue]
+        elif isinstance(rightValue, (int, float)) and isinstance(leftValue, list):
+            return [self.__applyXOr(x, rightValue) for x in leftValue]
+        else:
+            return leftValue ^ rightValue
+
+    def __applyMultiply(self, leftValue, rightValue):
+        """Return result of multiply operator '*'"""
+        # product operator can be applied
+        # - between 2 numeric values
+        # - between 1 numeric value and 1 string
+        # - between 1 numeric value and 1 list of (int, float)
+        if isinstance(leftValue, (int, float)) and isinstance(rightValue, list):
+            return [self.__applyMultiply(x, leftValue) for x in rightValue]
+        elif isinstance(rightValue, (int, float)) and isinstance(leftValue, list):
+            return [self.__applyMultiply(x, rightValue) for x in leftValue]
+        else:
+            return leftValue * rightValue
+
+    def __applyDivide(self, leftValue, rightValue):
+        """Return result of divide operator '/'"""
+        # divide operator can be applied
+        # - between 2 numeric values
+        if isinstance(leftValue, (int, float)) and isinstance(rightValue, (int, float)):
+            if rightValue!=0:
+                return leftValue / rightValue
+            raise EInterpreter("Division by zero", None)
+        elif isinstance(leftValue, (int, float)) and isinstance(rightValue, list):
+            return [self.__applyDivide(leftValue, x) for x in rightValue ]
+        elif isinstance(rightValue, (int, float)) and isinstance(leftValue, list):
+            return [self.__applyDivide(x, rightValue) for x in leftValue]
+        else:
+            return leftValue / rightValue
+
+    def __applyFloorDivide(self, leftValue, rightValue):
+        """Return result of floor division operator '//'"""
+        # Floor division operator can be applied
+        # - between 2 numeric values
+        if isinstance(leftValue, (int, float)) and isinstance(rightValue, (int, float)):
+            if rightValue!=0:
+                return leftValue // rightValue
+            raise EInterpreter("Division by zero", None)
+        elif isinstance(leftValue, (int, float)) and isinstance(rightValue, list):
+            return [self.__applyFloorDivide(leftValue, x) for x in rightValue ]
+        elif isinstance(rightValue, (int, float)) and isinstance(leftValue, list):
+            return [self.__applyFloorDivide(x, rightValue) for x in leftValue]
+        else:
+            return leftValue // rightValue
+
+    def __applyModulus(self, leftValue, rightValue):
+        """Return result of modulus operator '%'"""
+        # Modulus operator can be applied
+        # - between 2 numeric values
+        if isinstance(leftValue, (int, float)) and isinstance(rightValue, (int, float)):
+            if rightValue!=0:
+                return leftValue % rightValue
+            raise EInterpreter("Division by zero", None)
+        elif isinstance(leftValue, (int, float)) and isinstance(rightValue, list):
+            return [self.__applyModulus(leftValue, x) for x in rightValue ]
+        elif isinstance(rightValue, (int, float)) and isinstance(leftValue, list):
+            return [self.__applyModulus(x, rightValue) for x in leftValue]
+        else:
+            return leftValue % rightValue
+
+    def __applyAddition(self, leftValue, rightValue):
+        """Return result of addition operator '+'"""
+        # addition operator can be applied
+        # - between 2 numeric values
+        # - between 2 string values
+        # - between a string and a numeric value
+        # - between a string and a color value
+        if (isinstance(leftValue, (int, float)) and isinstance(rightValue, (int, float)) or
+            isinstance(leftValue, str) and isinstance(rightValue, str)):
+            return leftValue + rightValue
+        elif isinstance(leftValue, (int, float)) and isinstance(rightValue, list):
+            return [self.__applyAddition(leftValue, x) for x in rightValue]
+        elif isinstance(rightValue, (int, float)) and isinstance(leftValue, list):
+            return [self.__applyAddition(x, rightValue) for x in leftValue]
+        elif isinstance(leftValue, str) and isinstance(rightValue, list):
+            return [self.__applyAddition(leftValue, x) for x in rightValue]
+        elif isinstance(rightValue, str) and isinstance(leftValue, list):
+            return [self.__applyAddition(x, rightValue) for x in leftValue]
+        elif (isinstance(leftValue, str) and isinstance(rightValue, (int, float)) or
+              isinstance(leftValue, (int, float)) and isinstance(rightValue, str)):
+            return f"{leftValue}{rightValue}"
+        elif isinstance(leftValue, str) and isinstance(rightValue, QColor):
+            return leftValue+self.__strValue(rightValue)
+        elif isinstance(leftValue, QColor) and isinstance(rightValue, str):
+            return self.__strValue(leftValue)+rightValue
+        else:
+            return leftValue+rightValue
+
+    def __applySubstraction(self, leftValue, rightValue):
+        """Return result of substraction operator '-'"""
+        # Subtraction operator can be applied
+        # - between 2 numeric values
+        if isinstance(leftValue, (int, float)) and isinstance(rightValue, list):
+            return [self.__applySubstraction(leftValue, x) for x in rightValue]
+        elif isinstance(rightValue, (int, float)) and isinstance(leftValue, list):
+            return [self.__applySubstraction(x, rightValue) for x in leftValue]
+        else:
+            return leftValue - rightValue
+
+    def __applyCmpGT(self, leftValue, rightValue):
+        """Return result of comparison operator '>'"""
+        # Comparison operator can be applied
+        # - between 2 numeric values
+        # - between 2 string values
+        # - between 2 boolean values
+        if isinstance(leftValue, (int, float, str, bool)) and isinstance(rightValue, list):
+            return [self.__applyCmpGT(leftValue, x) for x in rightValue]
+        elif isinstance(rightValue, (int, float, str, bool)) and isinstance(leftValue, list):
+            return [self.__applyCmpGT(x, rightValue) for x in leftValue]
+        else:
+            return leftValue > rightValue
+
+    def __applyCmpGE(self, leftValue, rightValue):
+        """Return result of comparison operator '>='"""
+        # Comparison operator can be applied
+        # - between 2 numeric values
+        # - between 2 string values
+        # - between 2 boolean values
+        if isinstance(leftValue, (int, float, str, bool)) and isinstance(rightValue, list):
+            return [self.__applyCmpGE(leftValue, x) for x in rightValue]
+        elif isinstance(rightValue, (int, float, str, bool)) and isinstance(leftValue, list):
+            return [self.__applyCmpGE(x, rightValue) for x in leftValue]
+        else:
+            return leftValue >= rightValue
+
+    def __applyCmpLT(self, leftValue, rightValue):
+        """Return result of comparison operator '<'"""
+        # Comparison operator can be applied
+        # - between 2 numeric values
+        # - between 2 string values
+        # - between 2 boolean values
+        if isinstance(leftValue, (int, float, str, bool)) and isinstance(rightValue, list):
+            return [self.__applyCmpLT(leftValue, x) for x in rightValue]
+        elif isinstance(rightValue, (int, float, str, bool)) and isinstance(leftValue, list):
+            return [self.__applyCmpLT(x, rightValue) for x in leftValue]
+        else:
+            return leftValue < rightValue
+
+    def __applyCmpLE(self, leftValue, rightValue):
+        """Return result of comparison operator '<='"""
+        # Comparison operator can be applied
+        # - between 2 numeric values
+        # - between 2 string values
+        # - between 2 boolean values
+        if isinstance(leftValue, (int, float, str, bool)) and isinstance(rightValue, list):
+            return [self.__applyCmpLE(leftValue, x) for x in rightValue]
+        elif isinstance(rightValue, (int, float, str, bool)) and isinstance(leftValue, list):
+            return [self.__applyCmpLE(x, rightValue) for x in leftValue]
+        else:
+            return leftValue <= rightValue
+
+    def __applyCmpEQ(self, leftValue, rightValue):
+        """Return result of comparison operator '='"""
+        # Comparison operator can be applied
+        # - between 2 numeric values
+        # - between 2 string values
+        # - between 2 boolean values
+        if isinstance(leftValue, (int, float, str, bool)) and isinstance(rightValue, list):
+            return [self.__applyCmpEQ(leftValue, x) for x in rightValue]
+        elif isinstance(rightValue, (int, float, str, bool)) and isinstance(leftValue, list):
+            return [self.__applyCmpEQ(x, rightValue) for x in leftValue]
+        else:
+            return leftValue==rightValue
+
+    def __applyCmpNE(self, leftValue, rightValue):
+        """Return result of comparison operator '<>'"""
+        # Comparison operator can be applied
+        # - between 2 numeric values
+        # - between 2 string values
+        # - between 2 boolean values
+        if isinstance(leftValue, (int, float, str, bool)) and isinstance(rightValue, list):
+            return [self.__applyCmpNE(leftValue, x) for x in rightValue]
+        elif isinstance(rightValue, (int, float, str, bool)) and isinstance(leftValue, list):
+            return [self.__applyCmpNE(x, rightValue) for x in leftValue]
+        else:
+            return leftValue!=rightValue
 
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', value, int, float)
-            self.__checkParamDomain(currentAst, fctLabel, 'VALUE', value>-1 and value<1 , f"must be a numeric value in range ]-1.0;1.0[ (current={value})")
+    def __applyIn(self, leftValue, rightValue):
+        """Return result of in list operator 'in'"""
+        # Comparison operator can be applied
+        # - between any value and a list
+        if isinstance(rightValue, list):
+            return leftValue in rightValue
 
-            return math.atanh(BSConvertUnits.convertAngle(value, self.__scriptBlockStack.current().variable(':unit.rotation'), 'RADIAN'))
-        elif fctName=='string.length':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+        # not a valid operation, raise an error
+        raise EInterpreter(f"In list operator 'in' can only be applied to a list", None)
 
-            value=self.__evaluate(currentAst.node(1))
+    def __unaryOperatorFunction(self, currentAst):
+        """Return a function applying unary operator from `currentAst` to an (already evaluated) value"""
+        operator=currentAst.node(0).value()
 
-            self.__checkParamType(currentAst, fctLabel, 'TEXT', value, str)
+        if operator=='not':
+            def applyNot(value):
+                if isinstance(value, bool):
+                    return not value
 
-            return len(value)
-        elif fctName=='string.upper':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+                # not a boolean, raise an error
+                raise EInterpreter(f"Boolean operator 'NOT' can only be applied on a boolean value", currentAst)
+            return applyNot
+        elif operator=='-':
+            def applyNegative(value):
+                if isinstance(value, (int, float)):
+                    return -value
 
-            value=self.__evaluate(currentAst.node(1))
+                # not a numeric, raise an error
+                raise EInterpreter(f"Negative operator '-' can only be applied on a numeric value", currentAst)
+            return applyNegative
 
-            self.__checkParamType(currentAst, fctLabel, 'TEXT', value, str)
+        def applyUnknown(value):
+            # should not occurs
+            raise EInterpreter(f"Unknown operator: {operator}", currentAst)
+        return applyUnknown
 
-            return value.upper()
-        elif fctName=='string.lower':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+    def __binaryOperatorFunction(self, currentAst):
+        """Return a function applying binary operator from `currentAst` to (already evaluated) left and right values
 
-            value=self.__evaluate(currentAst.node(1))
+        When both values are <int> or <float>, python operator is applied
+        directly for arithmetic and comparison operators
+        """
+        operator=currentAst.node(0).value()
+        binaryOperator=self.__binaryOperators.get(operator)
+        if binaryOperator is None:
+            def applyUnknown(leftValue, rightValue):
+                # should not occurs
+                raise EInterpreter(f"Unknown operator: {operator}", currentAst)
+            return applyUnknown
+
+        applyOperator, operatorLabel, numericOperator=binaryOperator
+        raiseOperatorException=self.__raiseOperatorException
+
+        if numericOperator is None:
+            def applyBinaryOperator(leftValue, rightValue):
+                try:
+                    return applyOperator(leftValue, rightValue)
+                except Exception as e:
+                    raiseOperatorException(currentAst, e, operatorLabel)
+            return applyBinaryOperator
 
-            self.__checkParamType(currentAst, fctLabel, 'TEXT', value, str)
+        numericTypes=(int, float)
 
-            return value.lower()
-        elif fctName=='string.substring':
-            self.__checkFctParamNumber(currentAst, fctLabel, 2,3)
+        def applyNumericBinaryOperator(leftValue, rightValue):
+            try:
+                if type(leftValue) in numericTypes and type(rightValue) in numericTypes:
+                    return numericOperator(leftValue, rightValue)
+                return applyOperator(leftValue, rightValue)
+            except Exception as e:
+                raiseOperatorException(currentAst, e, operatorLabel)
+        return applyNumericBinaryOperator
 
-            value=self.__evaluate(currentAst.node(1))
-            self.__checkParamType(currentAst, fctLabel, 'TEXT', value, str)
+    def __executeIndexOperator(self, currentAst):
+        """return unary operation result"""
+        fctLabel='list[index]'
+        # defined by 2 nodes (ASTItem)
+        # - 1st node= index value
+        # - 2nd node = list or string
 
-            nbChar=len(value)
-            if value=='':
-                # empty string, return result immediately
-                return ''
+        indexValue=self.__evaluate(currentAst.node(0))
+        listValue=self.__evaluate(currentAst.node(1))
 
+        return self.__indexValue(currentAst, indexValue, listValue)
 
-            fromIndex=self.__evaluate(currentAst.node(2))
-            self.__checkParamType(currentAst, fctLabel, 'INDEX', fromIndex, int)
-            if fromIndex==0 or abs(fromIndex)>nbChar:
-                # invalid index, return empty string immediately
-                return ''
+    def __indexValue(self, currentAst, indexValue, listValue):
+        """return item from (already evaluated) `listValue` for given `indexValue`"""
+        fctLabel='list[index]'
 
-            countChar=self.__evaluate(currentAst.node(3))
-            if countChar:
-                self.__checkParamType(currentAst, fctLabel, 'COUNT', countChar, int)
+        self.__checkParamType(currentAst, fctLabel, 'INDEX', indexValue, int)
+        self.__checkParamType(currentAst, fctLabel, 'LIST', listValue, list, str)
 
-            if fromIndex>0:
-                # positive value, start from beginning
-                if countChar:
-                    # return a specific number of characters
-                    return value[fromIndex-1:fromIndex+countChar-1]
-                else:
-                    # return all characters
-                    return value[fromIndex-1:]
-            else:
-                if countChar:
-                    # return a specific number of characters
-                    return value[fromIndex:fromIndex+countChar]
-                else:
-                    # return all characters
-                    return value[fromIndex:]
-        elif fctName=='string.format':
-            if len(currentAst.nodes())<1:
-                # at least need one parameter
-                self.__checkParamNumber(currentAst, fctLabel, 1)
+        if isinstance(listValue, str):
+            lenOf='string'
+        else:
+            lenOf='list'
 
-            formatStr=self.__evaluate(currentAst.node(1))
-            self.__checkParamType(currentAst, fctLabel, 'FORMAT', formatStr, str)
+        if not self.__checkParamDomain(currentAst, fctLabel, 'INDEX', abs(indexValue)>=1 and abs(indexValue)<=len(listValue), f"given index must be in range [1; length of {lenOf}] (current={indexValue})", False):
+            # if value<=0, exit
+            return None
 
-            values=[]
-            for index, node in enumerate(currentAst.nodes()):
-                if index>1:
-                    # 0 = function name
-                    # 1 = format str
-                    # 2+ = values
-                    values.append(str(self.__strValue(self.__evaluate(node))))
+        if indexValue>0:
+            returned=listValue[indexValue - 1]
+        else:
+            returned=listValue[indexValue]
 
-            returned=formatStr.format(*values)
+        return returned
 
-            return returned
-        elif fctName=='color.rgb':
-            self.__checkFctParamNumber(currentAst, fctLabel, 3)
+    # --------------------------------------------------------------------------
+    # Compilation
+    # --------------------------------------------------------------------------
+    def __initCompileAstHandlers(self):
+        """Initialise handlers used to compile AST, according to AST id
+
+        AST without compile handler are executed through __executeAst()
+        """
+        self.__compileAstHandlers={
+                ASTSpecialItemType.ROOT: self.__compileRoot,
+
+                'Flow_Set_Variable': self.__compileFlowSetVariable,
+                'Flow_Call_Macro': self.__compileFlowCallMacro,
+                'Flow_If': lambda currentAst: self.__compileFlowIfElseIf(currentAst, 'if'),
+                'Flow_ElseIf': lambda currentAst: self.__compileFlowIfElseIf(currentAst, 'else if'),
+                'Flow_Else': self.__compileFlowElse,
+                'Flow_Repeat': self.__compileFlowRepeat,
+                'Flow_ForEach': self.__compileFlowForEach,
+
+                'Function': self.__compileFunction,
+                'Evaluation_Expression_Parenthesis': self.__compileFirstNode,
+                'String_Value': self.__compileStringValue,
+                'List_Value': self.__compileListValue,
+                'List_Index_Expression': self.__compileFirstNode,
+
+                ASTSpecialItemType.UNARY_OPERATOR: self.__compileUnaryOperator,
+                ASTSpecialItemType.BINARY_OPERATOR: self.__compileBinaryOperator,
+                ASTSpecialItemType.INDEX_OPERATOR: self.__compileIndexOperator
+            }
 
-            rValue=self.__evaluate(currentAst.node(1))
-            gValue=self.__evaluate(currentAst.node(2))
-            bValue=self.__evaluate(currentAst.node(3))
+    def __compile(self, item):
+        """Return a function without argument, equivalent to __evaluate(item)
 
+        - Token: constant value is captured, variable value is read on call
+        - AST: compiled function is cached on AST
+        - Other: given value is returned
+        """
+        if isinstance(item, Token):
+            if item.type() in (BSLanguageDef.ITokenType.VARIABLE_USER, BSLanguageDef.ITokenType.VARIABLE_RESERVED):
+                # variable name is resolved once
+                variableSlot=BSScriptBlockStack.slot(item.value())
+                scriptBlockStackVariable=self.__scriptBlockStack.variableSlot
+                return lambda: scriptBlockStackVariable(variableSlot)
 
-            self.__checkParamType(currentAst, fctLabel, 'R-VALUE', rValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'G-VALUE', gValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'B-VALUE', bValue, int, float)
+            value=item.value()
+            return lambda: value
+        elif isinstance(item, ASTItem):
+            compiled=item.cachedValue('bsCompiled')
+            if compiled is None or not compiled[0] is self:
+                compileHandler=self.__compileAstHandlers.get(item.id())
+                function=None
+                if not compileHandler is None:
+                    function=compileHandler(item)
+
+                if function is None:
+                    # no compilation available: execute AST
+                    executeAst=self.__executeAst
+                    function=lambda: executeAst(item)
+
+                compiled=(self, function)
+                item.setCachedValue('bsCompiled', compiled)
+            return compiled[1]
+        else:
+            return lambda: item
 
-            if isinstance(rValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'R-VALUE', rValue>=0 and rValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={rValue})", False):
-                    rValue=min(255, max(0, rValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'R-VALUE', rValue>=0.0 and rValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={rValue})", False):
-                    rValue=min(1.0, max(0.0, rValue))
+    def __compileRaise(self, exception):
+        """Return a function that raise given `exception`
 
-            if isinstance(gValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'G-VALUE', gValue>=0 and gValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={gValue})", False):
-                    gValue=min(255, max(0, gValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'G-VALUE', gValue>=0.0 and gValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={gValue})", False):
-                    gValue=min(1.0, max(0.0, gValue))
+        Errors found on compilation are raised on execution only, as the
+        interpreter does
+        """
+        def raiseException():
+            raise exception
+        return raiseException
 
-            if isinstance(bValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'B-VALUE', bValue>=0 and bValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={bValue})", False):
-                    bValue=min(255, max(0, bValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'B-VALUE', bValue>=0.0 and bValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={bValue})", False):
-                    bValue=min(1.0, max(0.0, bValue))
-
-            # convert all values as integer 0-255
-            if isinstance(rValue, float):
-                rValue=round(rValue*255)
-            if isinstance(gValue, float):
-                gValue=round(gValue*255)
-            if isinstance(bValue, float):
-                bValue=round(bValue*255)
-
-            return QColor.fromRgb(rValue, gValue, bValue)
-        elif fctName=='color.rgba':
-            self.__checkFctParamNumber(currentAst, fctLabel, 4)
-
-            rValue=self.__evaluate(currentAst.node(1))
-            gValue=self.__evaluate(currentAst.node(2))
-            bValue=self.__evaluate(currentAst.node(3))
-            aValue=self.__evaluate(currentAst.node(4))
-
-
-            self.__checkParamType(currentAst, fctLabel, 'R-VALUE', rValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'G-VALUE', gValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'B-VALUE', bValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'O-VALUE', aValue, int, float)
-
-            if isinstance(rValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'R-VALUE', rValue>=0 and rValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={rValue})", False):
-                    rValue=min(255, max(0, rValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'R-VALUE', rValue>=0.0 and rValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={rValue})", False):
-                    rValue=min(1.0, max(0.0, rValue))
+    def __compileRoot(self, currentAst):
+        """Compile main block of instructions"""
+        executeScriptBlock=self.__compileScriptBlock(currentAst, True)
 
-            if isinstance(gValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'G-VALUE', gValue>=0 and gValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={gValue})", False):
-                    gValue=min(255, max(0, gValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'G-VALUE', gValue>=0.0 and gValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={gValue})", False):
-                    gValue=min(1.0, max(0.0, gValue))
+        def executeRoot():
+            # initialise reserved 'constant' variables
+            predefinedVariables={
+                    ':math.pi':                         math.pi,
+                    ':math.e':                          math.e,
+                    ':math.phi':                        1.618033988749895
+                }
+            return executeScriptBlock("Main script", predefinedVariables)
+        return executeRoot
 
-            if isinstance(bValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'B-VALUE', bValue>=0 and bValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={bValue})", False):
-                    bValue=min(255, max(0, bValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'B-VALUE', bValue>=0.0 and bValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={bValue})", False):
-                    bValue=min(1.0, max(0.0, bValue))
+    def __compileScriptBlock(self, currentAst, allowLocalVariable):
+        """Return a function equivalent to __iterateScriptBlock() for given script block
 
-            if isinstance(aValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'O-VALUE', aValue>=0 and aValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={aValue})", False):
-                    aValue=min(255, max(0, aValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'O-VALUE', aValue>=0.0 and aValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={aValue})", False):
-                    aValue=min(1.0, max(0.0, aValue))
-
-            # convert all values as integer 0-255
-            if isinstance(rValue, float):
-                rValue=round(rValue*255)
-            if isinstance(gValue, float):
-                gValue=round(gValue*255)
-            if isinstance(bValue, float):
-                bValue=round(bValue*255)
-            if isinstance(aValue, float):
-                aValue=round(aValue*255)
-
-            return QColor.fromRgb(rValue, gValue, bValue, aValue)
-        elif fctName=='color.hsl':
-            self.__checkFctParamNumber(currentAst, fctLabel, 3)
-
-            hValue=self.__evaluate(currentAst.node(1))
-            sValue=self.__evaluate(currentAst.node(2))
-            lValue=self.__evaluate(currentAst.node(3))
-
-            self.__checkParamType(currentAst, fctLabel, 'H-VALUE', hValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'S-VALUE', sValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'L-VALUE', lValue, int, float)
-
-            if isinstance(sValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'S-VALUE', sValue>=0 and sValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={sValue})", False):
-                    sValue=min(255, max(0, sValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'S-VALUE', sValue>=0.0 and sValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={sValue})", False):
-                    sValue=min(1.0, max(0.0, sValue))
+        Returned function is called with script block name, optional local
+        variables and if script block has to be pushed in stack
+        """
+        cacheKey=('bsCompiledScriptBlock', allowLocalVariable)
+        compiled=currentAst.cachedValue(cacheKey)
+        if not compiled is None and compiled[0] is self:
+            return compiled[1]
 
-            if isinstance(lValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'L-VALUE', lValue>=0 and lValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={lValue})", False):
-                    lValue=min(255, max(0, lValue))
+        functions=[]
+        for ast in currentAst.nodes():
+            if currentAst.id()==ASTSpecialItemType.ROOT and ast.id()=='ScriptBlock':
+                # we are in a special case, still in main script block
+                # returned values are ignored
+                functions.append(self.__compileInstructions([self.__compile(subAst) for subAst in ast.nodes()]))
             else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'L-VALUE', lValue>=0.0 and lValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={lValue})", False):
-                    lValue=min(1.0, max(0.0, lValue))
+                functions.append(self.__compile(ast))
 
+        scriptBlockStack=self.__scriptBlockStack
+        renderer=self.__renderer
 
-            # convert all values as integer 255
-            if isinstance(hValue, float):
-                hValue=round(hValue*255)
-            if isinstance(sValue, float):
-                sValue=round(sValue*255)
-            if isinstance(lValue, float):
-                lValue=round(lValue*255)
+        def executeScriptBlock(name, createLocalVariables=None, pushScriptBlock=True):
+            returned=None
 
-            return QColor.fromHsl(hValue%360, sValue, lValue)
-        elif fctName=='color.hsla':
-            self.__checkFctParamNumber(currentAst, fctLabel, 4)
+            if self.__optionVerboseMode:
+                self.verbose(f"Enter scriptblock: '{name}'", currentAst)
 
-            hValue=self.__evaluate(currentAst.node(1))
-            sValue=self.__evaluate(currentAst.node(2))
-            lValue=self.__evaluate(currentAst.node(3))
-            aValue=self.__evaluate(currentAst.node(4))
+            if pushScriptBlock:
+                scriptBlockStack.push(currentAst, allowLocalVariable, name)
 
+                if allowLocalVariable:
+                    # automatically save painter state
+                    renderer.pushState()
 
-            self.__checkParamType(currentAst, fctLabel, 'H-VALUE', hValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'S-VALUE', sValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'L-VALUE', lValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'O-VALUE', aValue, int, float)
+            if not createLocalVariables is None:
+                # create local variables if any provided before starting block execution
+                for variableName in createLocalVariables:
+                    scriptBlockStack.setVariable(variableName, createLocalVariables[variableName], BSVariableScope.LOCAL)
 
-            if isinstance(sValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'S-VALUE', sValue>=0 and sValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={sValue})", False):
-                    sValue=min(255, max(0, sValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'S-VALUE', sValue>=0.0 and sValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={sValue})", False):
-                    sValue=min(1.0, max(0.0, sValue))
+            for function in functions:
+                returned=function()
+                if not returned is None:
+                    # when a value is returned, that's a RETURN flow
+                    break
 
-            if isinstance(lValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'L-VALUE', lValue>=0 and lValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={lValue})", False):
-                    lValue=min(255, max(0, lValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'L-VALUE', lValue>=0.0 and lValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={lValue})", False):
-                    lValue=min(1.0, max(0.0, lValue))
+            if pushScriptBlock:
+                if allowLocalVariable:
+                    renderer.popState()
 
-            if isinstance(aValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'O-VALUE', aValue>=0 and aValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={aValue})", False):
-                    aValue=min(255, max(0, aValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'O-VALUE', aValue>=0.0 and aValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={aValue})", False):
-                    aValue=min(1.0, max(0.0, aValue))
-
-            # convert all values as integer 255
-            if isinstance(hValue, float):
-                hValue=round(hValue*255)
-            if isinstance(sValue, float):
-                sValue=round(sValue*255)
-            if isinstance(lValue, float):
-                lValue=round(lValue*255)
-            if isinstance(aValue, float):
-                aValue=round(aValue*255)
-
-            return QColor.fromHsl(hValue%360, sValue, lValue, aValue)
-        elif fctName=='color.hsv':
-            self.__checkFctParamNumber(currentAst, fctLabel, 3)
-
-            hValue=self.__evaluate(currentAst.node(1))
-            sValue=self.__evaluate(currentAst.node(2))
-            vValue=self.__evaluate(currentAst.node(3))
-
-            self.__checkParamType(currentAst, fctLabel, 'H-VALUE', hValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'S-VALUE', sValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'V-VALUE', vValue, int, float)
-
-            if isinstance(sValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'S-VALUE', sValue>=0 and sValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={sValue})", False):
-                    sValue=min(255, max(0, sValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'S-VALUE', sValue>=0.0 and sValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={sValue})", False):
-                    sValue=min(1.0, max(0.0, sValue))
+                scriptBlockStack.pop()
 
-            if isinstance(vValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'V-VALUE', vValue>=0 and vValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={vValue})", False):
-                    vValue=min(255, max(0, vValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'V-VALUE', vValue>=0.0 and vValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={vValue})", False):
-                    vValue=min(1.0, max(0.0, vValue))
-
-            # convert all values as integer 255
-            if isinstance(hValue, float):
-                hValue=round(hValue*255)
-            if isinstance(sValue, float):
-                sValue=round(sValue*255)
-            if isinstance(vValue, float):
-                vValue=round(vValue*255)
-
-            return QColor.fromHsv(hValue%360, sValue, vValue)
-        elif fctName=='color.hsva':
-            self.__checkFctParamNumber(currentAst, fctLabel, 4)
-
-            hValue=self.__evaluate(currentAst.node(1))
-            sValue=self.__evaluate(currentAst.node(2))
-            vValue=self.__evaluate(currentAst.node(3))
-            aValue=self.__evaluate(currentAst.node(4))
-
-            self.__checkParamType(currentAst, fctLabel, 'H-VALUE', hValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'S-VALUE', sValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'V-VALUE', vValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'O-VALUE', aValue, int, float)
-
-            if isinstance(sValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'S-VALUE', sValue>=0 and sValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={sValue})", False):
-                    sValue=min(255, max(0, sValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'S-VALUE', sValue>=0.0 and sValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={sValue})", False):
-                    sValue=min(1.0, max(0.0, sValue))
+            if self.__optionVerboseMode:
+                self.verbose(f"Exit scriptblock: '{name}'", currentAst)
 
-            if isinstance(vValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'V-VALUE', vValue>=0 and vValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={vValue})", False):
-                    vValue=min(255, max(0, vValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'V-VALUE', vValue>=0.0 and vValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={vValue})", False):
-                    vValue=min(1.0, max(0.0, vValue))
+            return returned
 
-            if isinstance(aValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'O-VALUE', aValue>=0 and aValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={aValue})", False):
-                    aValue=min(255, max(0, aValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'O-VALUE', aValue>=0.0 and aValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={aValue})", False):
-                    aValue=min(1.0, max(0.0, aValue))
-
-            # convert all values as integer 255
-            if isinstance(hValue, float):
-                hValue=round(hValue*255)
-            if isinstance(sValue, float):
-                sValue=round(sValue*255)
-            if isinstance(vValue, float):
-                vValue=round(vValue*255)
-            if isinstance(aValue, float):
-                aValue=round(aValue*255)
-
-            return QColor.fromHsv(hValue%360, sValue, vValue, aValue)
-        elif fctName=='color.cmyk':
-            self.__checkFctParamNumber(currentAst, fctLabel, 4)
-
-            cValue=self.__evaluate(currentAst.node(1))
-            mValue=self.__evaluate(currentAst.node(2))
-            yValue=self.__evaluate(currentAst.node(3))
-            kValue=self.__evaluate(currentAst.node(4))
-
-
-            self.__checkParamType(currentAst, fctLabel, 'C-VALUE', cValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'M-VALUE', mValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'Y-VALUE', yValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'K-VALUE', kValue, int, float)
-
-            if isinstance(cValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'C-VALUE', cValue>=0 and cValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={cValue})", False):
-                    cValue=min(255, max(0, cValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'C-VALUE', cValue>=0.0 and cValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={cValue})", False):
-                    cValue=min(1.0, max(0.0, cValue))
+        currentAst.setCachedValue(cacheKey, (self, executeScriptBlock))
+        return executeScriptBlock
 
-            if isinstance(mValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'M-VALUE', mValue>=0 and mValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={mValue})", False):
-                    mValue=min(255, max(0, mValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'M-VALUE', mValue>=0.0 and mValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={mValue})", False):
-                    mValue=min(1.0, max(0.0, mValue))
+    def __compileInstructions(self, functions):
+        """Return a function executing all given `functions`, ignoring returned values"""
+        def executeInstructions():
+            for function in functions:
+                function()
+            return None
+        return executeInstructions
 
-            if isinstance(yValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'Y-VALUE', yValue>=0 and yValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={yValue})", False):
-                    yValue=min(255, max(0, yValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'Y-VALUE', yValue>=0.0 and yValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={yValue})", False):
-                    yValue=min(1.0, max(0.0, yValue))
+    def __compileFlowSetVariable(self, currentAst):
+        """Compile set variable"""
+        if currentAst.node(0).value()=='set variable':
+            scope=BSVariableScope.CURRENT
+        else:
+            scope=BSVariableScope.GLOBAL
+        variableName=currentAst.node(1).value()
+        variableSlot=BSScriptBlockStack.slot(variableName)
+        valueFunction=self.__compile(currentAst.node(2))
+        flowSetVariable=self.__flowSetVariable
 
-            if isinstance(kValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'K-VALUE', kValue>=0 and kValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={kValue})", False):
-                    kValue=min(255, max(0, kValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'K-VALUE', kValue>=0.0 and kValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={kValue})", False):
-                    kValue=min(1.0, max(0.0, kValue))
-
-            # convert all values as integer 0-255
-            if isinstance(cValue, float):
-                cValue=round(cValue*255)
-            if isinstance(mValue, float):
-                mValue=round(mValue*255)
-            if isinstance(yValue, float):
-                yValue=round(yValue*255)
-            if isinstance(kValue, float):
-                kValue=round(kValue*255)
-
-            return QColor.fromCmyk(cValue, mValue, yValue, kValue)
-        elif fctName=='color.cmyka':
-            self.__checkFctParamNumber(currentAst, fctLabel, 5)
-
-            cValue=self.__evaluate(currentAst.node(1))
-            mValue=self.__evaluate(currentAst.node(2))
-            yValue=self.__evaluate(currentAst.node(3))
-            kValue=self.__evaluate(currentAst.node(4))
-            aValue=self.__evaluate(currentAst.node(5))
-
-
-            self.__checkParamType(currentAst, fctLabel, 'C-VALUE', cValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'M-VALUE', mValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'Y-VALUE', yValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'K-VALUE', kValue, int, float)
-            self.__checkParamType(currentAst, fctLabel, 'O-VALUE', aValue, int, float)
-
-            if isinstance(cValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'C-VALUE', cValue>=0 and cValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={cValue})", False):
-                    cValue=min(255, max(0, cValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'C-VALUE', cValue>=0.0 and cValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={cValue})", False):
-                    cValue=min(1.0, max(0.0, cValue))
+        return lambda: flowSetVariable(currentAst, variableName, valueFunction(), scope, variableSlot)
 
-            if isinstance(mValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'M-VALUE', mValue>=0 and mValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={mValue})", False):
-                    mValue=min(255, max(0, mValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'M-VALUE', mValue>=0.0 and mValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={mValue})", False):
-                    mValue=min(1.0, max(0.0, mValue))
+    def __compileFlowCallMacro(self, currentAst):
+        """Compile call macro
 
-            if isinstance(yValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'Y-VALUE', yValue>=0 and yValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={yValue})", False):
-                    yValue=min(255, max(0, yValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'Y-VALUE', yValue>=0.0 and yValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={yValue})", False):
-                    yValue=min(1.0, max(0.0, yValue))
+        Macro script block is compiled on first call, as macro is defined on
+        execution
+        """
+        fctLabel='Flow ***call macro***'
 
-            if isinstance(kValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'K-VALUE', kValue>=0 and kValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={kValue})", False):
-                    kValue=min(255, max(0, kValue))
-            else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'K-VALUE', kValue>=0.0 and kValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={kValue})", False):
-                    kValue=min(1.0, max(0.0, kValue))
+        if len(currentAst.nodes())<1:
+            try:
+                self.__checkParamNumber(currentAst, fctLabel, 1)
+            except EInterpreter as e:
+                return self.__compileRaise(e)
 
-            if isinstance(aValue, int):
-                if not self.__checkParamDomain(currentAst, fctLabel, 'O-VALUE', aValue>=0 and aValue<=255, f"allowed value when provided as an integer number is range [0;255] (current={aValue})", False):
-                    aValue=min(255, max(0, aValue))
+        macroNameFunction=None
+        parametersFunctions=[]
+        storeResultName=None
+        for index, node in enumerate(currentAst.nodes()):
+            if index==0:
+                macroNameFunction=self.__compile(node)
+            elif isinstance(node, ASTItem) and node.id()=='Flow_Call_Macro__storeResult':
+                storeResultName=node.nodes()[0].value()
             else:
-                if not self.__checkParamDomain(currentAst, fctLabel, 'O-VALUE', aValue>=0.0 and aValue<=1.0, f"allowed value when provided as a decimal number is range [0.0;1.0] (current={aValue})", False):
-                    aValue=min(1.0, max(0.0, aValue))
-
-            # convert all values as integer 0-255
-            if isinstance(cValue, float):
-                cValue=round(cValue*255)
-            if isinstance(mValue, float):
-                mValue=round(mValue*255)
-            if isinstance(yValue, float):
-                yValue=round(yValue*255)
-            if isinstance(kValue, float):
-                kValue=round(kValue*255)
-            if isinstance(aValue, float):
-                aValue=round(aValue*255)
-
-            return QColor.fromCmyk(cValue, mValue, yValue, kValue, aValue)
-        elif fctName=='color.red':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            color=self.__evaluate(currentAst.node(1))
-            self.__checkParamType(currentAst, fctLabel, 'COLOR', color, QColor)
-            return color.red()
-        elif fctName=='color.green':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            color=self.__evaluate(currentAst.node(1))
-            self.__checkParamType(currentAst, fctLabel, 'COLOR', color, QColor)
-            return color.green()
-        elif fctName=='color.blue':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            color=self.__evaluate(currentAst.node(1))
-            self.__checkParamType(currentAst, fctLabel, 'COLOR', color, QColor)
-            return color.blue()
-        elif fctName=='color.cyan':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            color=self.__evaluate(currentAst.node(1))
-            self.__checkParamType(currentAst, fctLabel, 'COLOR', color, QColor)
-            return color.cyan()
-        elif fctName=='color.magenta':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            color=self.__evaluate(currentAst.node(1))
-            self.__checkParamType(currentAst, fctLabel, 'COLOR', color, QColor)
-            return color.magenta()
-        elif fctName=='color.yellow':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            color=self.__evaluate(currentAst.node(1))
-            self.__checkParamType(currentAst, fctLabel, 'COLOR', color, QColor)
-            return color.yellow()
-        elif fctName=='color.black':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            color=self.__evaluate(currentAst.node(1))
-            self.__checkParamType(currentAst, fctLabel, 'COLOR', color, QColor)
-            return color.black()
-        elif fctName=='color.hue':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            color=self.__evaluate(currentAst.node(1))
-            self.__checkParamType(currentAst, fctLabel, 'COLOR', color, QColor)
-            return color.hue()
-        elif fctName=='color.saturation':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            color=self.__evaluate(currentAst.node(1))
-            self.__checkParamType(currentAst, fctLabel, 'COLOR', color, QColor)
-            return color.saturation()
-        elif fctName=='color.lightness':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            color=self.__evaluate(currentAst.node(1))
-            self.__checkParamType(currentAst, fctLabel, 'COLOR', color, QColor)
-            return color.lightness()
-        elif fctName=='color.value':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            color=self.__evaluate(currentAst.node(1))
-            self.__checkParamType(currentAst, fctLabel, 'COLOR', color, QColor)
-            return color.value()
-        elif fctName=='color.opacity':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            color=self.__evaluate(currentAst.node(1))
-            self.__checkParamType(currentAst, fctLabel, 'COLOR', color, QColor)
-            return color.alpha()
-        elif fctName=='list.length':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            value=self.__evaluate(currentAst.node(1))
-
-            self.__checkParamType(currentAst, fctLabel, 'LIST', value, list)
-
-            return len(value)
-        elif fctName=='list.join':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1,2)
-
-            value=self.__evaluate(currentAst.node(1))
-            sepChar=self.__evaluate(currentAst.node(2, ','))
-
-            self.__checkParamType(currentAst, fctLabel, 'LIST', value, list)
-            self.__checkParamType(currentAst, fctLabel, 'SEPARATOR', sepChar, str)
-
-            # do join; force string conversion of items
-            return sepChar.join([item.name() if isinstance(item, QColor) and item.alpha()==255
-                                 else item.name(QColor.HexArgb) if isinstance(item, QColor)
-                                 else str(item)
-                                 for item in value])
-        elif fctName=='string.split':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1,2)
-
-            value=self.__evaluate(currentAst.node(1))
-            sepChar=self.__evaluate(currentAst.node(2, ','))
-
-            self.__checkParamType(currentAst, fctLabel, 'TEXT', value, str)
-            self.__checkParamType(currentAst, fctLabel, 'SEPARATOR', sepChar, str)
-
-            return value.split(sepChar)
-        elif fctName=='list.rotate':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1,2)
-
-            value=self.__evaluate(currentAst.node(1))
-            shiftValue=self.__evaluate(currentAst.node(2, 1))
-
-            self.__checkParamType(currentAst, fctLabel, 'LIST', value, list)
-            self.__checkParamType(currentAst, fctLabel, 'VALUE', shiftValue, int)
-
-            return rotate(value, shiftValue)
-        elif fctName=='list.sort':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1,2)
+                parametersFunctions.append(self.__compile(node))
 
-            value=self.__evaluate(currentAst.node(1))
-            ascending=self.__evaluate(currentAst.node(2, True))
+        flowCallMacro=self.__flowCallMacro
+        executeMacro=lambda macroDefinition, name, localVariables: self.__compileScriptBlock(macroDefinition.ast(), True)(name, localVariables)
 
-            self.__checkParamType(currentAst, fctLabel, 'LIST', value, list)
-            self.__checkParamType(currentAst, fctLabel, 'ASCENDING', ascending, bool)
+        return lambda: flowCallMacro(currentAst, macroNameFunction(), [function() for function in parametersFunctions], storeResultName, executeMacro)
 
-            return sorted(value, key=sortKey, reverse=not ascending)
-        elif fctName=='list.revert':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            value=self.__evaluate(currentAst.node(1))
-
-            self.__checkParamType(currentAst, fctLabel, 'LIST', value, list)
-
-            return value[::-1]
-        elif fctName=='list.unique':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
-
-            value=self.__evaluate(currentAst.node(1))
-
-            self.__checkParamType(currentAst, fctLabel, 'LIST', value, list)
+    def __compileFlowIfElseIf(self, currentAst, mode):
+        """Compile if <condition> then"""
+        try:
+            self.__checkParamNumber(currentAst, 'Flow ***if ... then***', 2, 3)
+        except EInterpreter as e:
+            return self.__compileRaise(e)
 
-            return unique(value)
-        elif fctName=='list.shuffle':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+        conditionFunction=self.__compile(currentAst.node(0))
+        executeThen=self.__compileScriptBlock(currentAst.node(1), False)
+        if len(currentAst.nodes())==3:
+            # else or else if
+            executeElse=self.__compile(currentAst.node(2))
+        else:
+            executeElse=None
+        flowIfElseIf=self.__flowIfElseIf
 
-            value=self.__evaluate(currentAst.node(1))
+        return lambda: flowIfElseIf(currentAst, mode, conditionFunction(), executeThen, executeElse)
 
-            self.__checkParamType(currentAst, fctLabel, 'LIST', value, list)
+    def __compileFlowElse(self, currentAst):
+        """Compile ... else ..."""
+        try:
+            self.__checkParamNumber(currentAst, 'Flow ***else ...***', 1)
+        except EInterpreter as e:
+            return self.__compileRaise(e)
 
-            return random.sample(value, len(value))
-        elif fctName=='list.index':
-            self.__checkFctParamNumber(currentAst, fctLabel, 2,3)
+        executeScriptBlock=self.__compileScriptBlock(currentAst.node(0), False)
 
-            value=self.__evaluate(currentAst.node(1))
-            index=self.__evaluate(currentAst.node(2))
-            default=self.__evaluate(currentAst.node(3, 0))
+        def executeElse():
+            self.verbose('else ...', currentAst)
+            executeScriptBlock('else')
+            return None
+        return executeElse
 
-            self.__checkParamType(currentAst, fctLabel, 'LIST', value, list)
-            self.__checkParamType(currentAst, fctLabel, 'INDEX', index, int)
+    def __compileFlowRepeat(self, currentAst):
+        """Compile repeat <COUNT> times"""
+        try:
+            self.__checkParamNumber(currentAst, 'Flow ***repeat *<COUNT>* times***', 2)
+        except EInterpreter as e:
+            return self.__compileRaise(e)
 
-            if index>0 and index<=len(value):
-                return value[index-1]
-            elif index<0 and index > -len(value):
-                return value[index]
-            else:
-                return default
-        elif fctName=='boolean.isstring':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+        countFunction=self.__compile(currentAst.node(0))
+        executeScriptBlock=self.__compileScriptBlock(currentAst.node(1), False)
+        flowRepeat=self.__flowRepeat
 
-            value=self.__evaluate(currentAst.node(1))
+        def executeRepeat():
+            for scriptBlockName in flowRepeat(currentAst, countFunction()):
+                executeScriptBlock(scriptBlockName, None, False)
+            return None
+        return executeRepeat
 
-            return isinstance(value, str)
-        elif fctName=='boolean.isnumber':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+    def __compileFlowForEach(self, currentAst):
+        """Compile for each <variable> in <list>"""
+        try:
+            self.__checkParamNumber(currentAst, 'Flow ***for each ... in ...***', 3)
+        except EInterpreter as e:
+            return self.__compileRaise(e)
 
-            value=self.__evaluate(currentAst.node(1))
+        listFunction=self.__compile(currentAst.node(0))
+        forVarName=currentAst.node(1).value()
+        executeScriptBlock=self.__compileScriptBlock(currentAst.node(2), False)
+        flowForEach=self.__flowForEach
 
-            return isinstance(value, (int, float))
-        elif fctName=='boolean.isinteger':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+        def executeForEach():
+            for scriptBlockName in flowForEach(currentAst, listFunction(), forVarName):
+                executeScriptBlock(scriptBlockName, None, False)
+            return None
+        return executeForEach
 
-            value=self.__evaluate(currentAst.node(1))
+    def __compileFunction(self, currentAst):
+        """Compile function call
 
-            return isinstance(value, int)
-        elif fctName=='boolean.isdecimal':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+        Function and number of arguments are resolved once on compilation
+        """
+        try:
+            execution=self.__functionExecution(currentAst)
+        except EInterpreter as e:
+            return self.__compileRaise(e)
 
-            value=self.__evaluate(currentAst.node(1))
+        argsFunctions=[self.__compile(node) for node in execution[2]]
+        callFunction=self.__callFunction
 
-            return isinstance(value, float)
-        elif fctName=='boolean.isboolean':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+        if len(argsFunctions)==1:
+            argFunction=argsFunctions[0]
+            return lambda: callFunction(currentAst, execution, [argFunction()])
+        return lambda: callFunction(currentAst, execution, [function() for function in argsFunctions])
 
-            value=self.__evaluate(currentAst.node(1))
+    def __compileFirstNode(self, currentAst):
+        """Compile AST for which evaluation is evaluation of first node (parenthesis, list index)"""
+        return self.__compile(currentAst.node(0))
 
-            return isinstance(value, bool)
-        elif fctName=='boolean.iscolor':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+    def __compileStringValue(self, currentAst):
+        """Compile string value"""
+        # defined by N Token nodes (String), value can't change
+        value=''.join([item.value() for item in currentAst.nodes()])
+        return lambda: value
 
-            value=self.__evaluate(currentAst.node(1))
+    def __compileListValue(self, currentAst):
+        """Compile list value"""
+        # a new list is returned on each evaluation
+        itemsFunctions=[self.__compile(item) for item in currentAst.nodes()]
+        return lambda: [function() for function in itemsFunctions]
 
-            return isinstance(value, QColor)
-        elif fctName=='boolean.islist':
-            self.__checkFctParamNumber(currentAst, fctLabel, 1)
+    def __compileUnaryOperator(self, currentAst):
+        """Compile unary operator"""
+        valueFunction=self.__compile(currentAst.node(1))
+        applyUnaryOperator=self.__unaryOperatorFunction(currentAst)
 
-            value=self.__evaluate(currentAst.node(1))
+        return lambda: applyUnaryOperator(valueFunction())
 
-            return isinstance(value, list)
-        else:
-            # shouldn't occurs
-            print('fctName', fctName)
-            raise EInterpreterInternalError(f"Function {fctName}() hasn't been implemented!?", currentAst)
+    def __compileBinaryOperator(self, currentAst):
+        """Compile binary operator"""
+        leftFunction=self.__compile(currentAst.node(1))
+        rightFunction=self.__compile(currentAst.node(2))
+        applyBinaryOperator=self.__binaryOperatorFunction(currentAst)
 
-    def __executeEvaluationExpressionParenthesis(self, currentAst):
-        """return evaluation of expression in parenthesis"""
-        # defined by 1 Token nodes (<Token> or <ASTItem>)
-        return self.__evaluate(currentAst.node(0))
+        return lambda: applyBinaryOperator(leftFunction(), rightFunction())
 
-    def __executeStringValue(self, currentAst):
-        """return string value"""
-        # defined by N Token nodes (String)
+    def __compileIndexOperator(self, currentAst):
+        """Compile index operator"""
+        indexFunction=self.__compile(currentAst.node(0))
+        listFunction=self.__compile(currentAst.node(1))
+        indexValue=self.__indexValue
 
-        returned=[]
-        for item in currentAst.nodes():
-            returned.append(item.value())
-
-        return ''.join(returned)
-
-    def __executeListValue(self, currentAst):
-        """return string value"""
-        # defined by N nodes (ASTItem)
-        returned=[]
-        for item in currentAst.nodes():
-            returned.append(self.__evaluate(item))
-
-        return returned
-
-    def __executeListIndexExpression(self, currentAst):
-        """return index value"""
-        return self.__evaluate(currentAst.node(0))
+        return lambda: indexValue(currentAst, indexFunction(), listFunction())
 
     # --------------------------------------------------------------------------
-    # Operators
+    # Transpilation
     # --------------------------------------------------------------------------
-    def __executeUnaryOperator(self, currentAst):
-        """return unary operation result"""
-        # Defined by 2 nodes:
-        #   0: operator (<Token>)
-        #   1: value (<Token> or <ASTItem>)
-
-        # get operator
-        operator=currentAst.node(0).value()
-
-        # evaluate value
-        value=self.__evaluate(currentAst.node(1))
-
-        if operator=='not':
-            if isinstance(value, bool):
-                return not value
-
-            # not a boolean, raise an error
-            raise EInterpreter(f"Boolean operator 'NOT' can only be applied on a boolean value", currentAst)
-        elif operator=='-':
-            if isinstance(value, float) or isinstance(value, int):
-                return -value
-
-            # not a boolean, raise an error
-            raise EInterpreter(f"Negative operator '-' can only be applied on a numeric value", currentAst)
-
-        # should not occurs
-        raise EInterpreter(f"Unknown operator: {operator}", currentAst)
-
-    def __executeBinaryOperator(self, currentAst):
-        """return binary operation result"""
-
-        def raiseException(e, operator):
-            """Reformat operator/operand exception for interpeter"""
-            if isinstance(e, TypeError):
-                result=re.search("'([^']+)'\sand\s'([^']+)'", str(e))
-                if not result is None:
-                    operator=re.sub(r"'([^']+)'", r"'***\1***'", operator)
-                    raise EInterpreter(f"Unsupported operand types ***{self.__valueTypeFromName(result.groups()[0])}*** and ***{self.__valueTypeFromName(result.groups()[1])}*** for {operator}", currentAst)
-            raise EInterpreter(str(e), currentAst)
-
-        def applyAnd(leftValue, rightValue):
-            # Logical operator can be applied
-            # - between 2 boolean values
-            # - between 2 integer values
-            # - between boolean value and List
-            # - between integer value and List
-            if isinstance(leftValue, bool) and isinstance(rightValue, bool):
-                return leftValue and rightValue
-            elif isinstance(rightValue, list):
-                return [applyAnd(leftValue, x) for x in rightValue]
-            elif isinstance(leftValue, list):
-                return [applyAnd(x, rightValue) for x in leftValue]
-            else:
-                return leftValue & rightValue
-
-        def applyOr(leftValue, rightValue):
-            # Logical operator can be applied
-            # - between 2 boolean values
-            # - between 2 integer values
-            # - between boolean value and List
-            # - between integer value and List
-            if isinstance(leftValue, bool) and isinstance(rightValue, bool):
-                return leftValue or rightValue
-            elif isinstance(leftValue, (int, float)) and isinstance(rightValue, list):
-                return [applyOr(leftValue, x) for x in rightValue]
-            elif isinstance(rightValue, (int, float)) and isinstance(leftValue, list):
-                return [applyOr(x, rightValue) for x in leftValue]
-            else:
-                return leftValue | rightValue
-
-        def applyXOr(leftValue, rightValue):
-            # Logical operator can be applied
-            # - between 2 boolean values
-            # - between 2 integer values
-            # - between boolean value and List
-            # - between integer value and List
-            if isinstance(leftValue, (int, float)) and isinstance(rightValue, list):
-                return [applyXOr(leftValue, x) for x in rightValue]
-            elif isinstance(rightValue, (int, float)) and isinstance(leftValue, list):
-                return [applyXOr(x, rightValue) for x in leftValue]
-            else:
-                return leftValue ^ rightValue
-
-        def applyMultiply(leftValue, rightValue):
-            # product operator can be applied
-            # - between 2 numeric values
-            # - between 1 numeric value and 1 string
-            # - between 1 numeric value and 1 list of (int, float)
-            if isinstance(leftValue, (int, float)) and isinstance(rightValue, list):
-                return [applyMultiply(x, leftValue) for x in rightValue]
-            elif isinstance(rightValue, (int, float)) and isinstance(leftValue, list):
-                return [applyMultiply(x, rightValue) for x in leftValue]
-            else:
-                return leftValue * rightValue
-
-        def applyDivide(leftValue, rightValue):
-            # divide operator can be applied
-            # - between 2 numeric values
-            if isinstance(leftValue, (int, float)) and isinstance(rightValue, (int, float)):
-                if rightValue!=0:
-                    return leftValue / rightValue
-                raise EInterpreter(f"Division by zero", currentAst)
-            elif isinstance(leftValue, (int, float)) and isinstance(rightValue, list):
-                return [applyDivide(leftValue, x) for x in rightValue ]
-            elif isinstance(rightValue, (int, float)) and isinstance(leftValue, list):
-                return [applyDivide(x, rightValue) for x in leftValue]
-            else:
-                return leftValue / rightValue
-
-        def applyFloorDivide(leftValue, rightValue):
-            # Floor division operator can be applied
-            # - between 2 numeric values
-            if isinstance(leftValue, (int, float)) and isinstance(rightValue, (int, float)):
-                if rightValue!=0:
-                    return leftValue // rightValue
-                raise EInterpreter(f"Division by zero", currentAst)
-            elif isinstance(leftValue, (int, float)) and isinstance(rightValue, list):
-                return [applyFloorDivide(leftValue, x) for x in rightValue ]
-            elif isinstance(rightValue, (int, float)) and isinstance(leftValue, list):
-                return [applyFloorDivide(x, rightValue) for x in leftValue]
-            else:
-                return leftValue // rightValue
-
-        def applyModulus(leftValue, rightValue):
-            # Modulus operator can be applied
-            # - between 2 numeric values
-            if isinstance(leftValue, (int, float)) and isinstance(rightValue, (int, float)):
-                if rightValue!=0:
-                    return leftValue % rightValue
-                raise EInterpreter(f"Division by zero", currentAst)
-            elif isinstance(leftValue, (int, float)) and isinstance(rightValue, list):
-                return [applyModulus(leftValue, x) for x in rightValue ]
-            elif isinstance(rightValue, (int, float)) and isinstance(leftValue, list):
-                return [applyModulus(x, rightValue) for x in leftValue]
-            else:
-                return leftValue % rightValue
-
-        def applyAddition(leftValue, rightValue):
-            # addition operator can be applied
-            # - between 2 numeric values
-            # - between 2 string values
-            # - between a string and a numeric value
-            # - between a string and a color value
-            if (isinstance(leftValue, (int, float)) and isinstance(rightValue, (int, float)) or
-                isinstance(leftValue, str) and isinstance(rightValue, str)):
-                return leftValue + rightValue
-            elif isinstance(leftValue, (int, float)) and isinstance(rightValue, list):
-                return [applyAddition(leftValue, x) for x in rightValue]
-            elif isinstance(rightValue, (int, float)) and isinstance(leftValue, list):
-                return [applyAddition(x, rightValue) for x in leftValue]
-            elif isinstance(leftValue, str) and isinstance(rightValue, list):
-                return [applyAddition(leftValue, x) for x in rightValue]
-            elif isinstance(rightValue, str) and isinstance(leftValue, list):
-                return [applyAddition(x, rightValue) for x in leftValue]
-            elif (isinstance(leftValue, str) and isinstance(rightValue, (int, float)) or
-                  isinstance(leftValue, (int, float)) and isinstance(rightValue, str)):
-                return f"{leftValue}{rightValue}"
-            elif isinstance(leftValue, str) and isinstance(rightValue, QColor):
-                return leftValue+self.__strValue(rightValue)
-            elif isinstance(leftValue, QColor) and isinstance(rightValue, str):
-                return self.__strValue(leftValue)+rightValue
-            else:
-                return leftValue+rightValue
-
-        def applySubstraction(leftValue, rightValue):
-            # Subtraction operator can be applied
-            # - between 2 numeric values
-            if isinstance(leftValue, (int, float)) and isinstance(rightValue, list):
-                return [applySubstraction(leftValue, x) for x in rightValue]
-            elif isinstance(rightValue, (int, float)) and isinstance(leftValue, list):
-                return [applySubstraction(x, rightValue) for x in leftValue]
-            else:
-                return leftValue - rightValue
-
-        def applyCmpGT(leftValue, rightValue):
-            # Comparison operator can be applied
-            # - between 2 numeric values
-            # - between 2 string values
-            # - between 2 boolean values
-            if isinstance(leftValue, (int, float, str, bool)) and isinstance(rightValue, list):
-                return [applyCmpGT(leftValue, x) for x in rightValue]
-            elif isinstance(rightValue, (int, float, str, bool)) and isinstance(leftValue, list):
-                return [applyCmpGT(x, rightValue) for x in leftValue]
-            else:
-                return leftValue > rightValue
-
-        def applyCmpGE(leftValue, rightValue):
-            # Comparison operator can be applied
-            # - between 2 numeric values
-            # - between 2 string values
-            # - between 2 boolean values
-            if isinstance(leftValue, (int, float, str, bool)) and isinstance(rightValue, list):
-                return [applyCmpGE(leftValue, x) for x in rightValue]
-            elif isinstance(rightValue, (int, float, str, bool)) and isinstance(leftValue, list):
-                return [applyCmpGE(x, rightValue) for x in leftValue]
-            else:
-                return leftValue >= rightValue
-
-        def applyCmpLT(leftValue, rightValue):
-            # Comparison operator can be applied
-            # - between 2 numeric values
-            # - between 2 string values
-            # - between 2 boolean values
-            if isinstance(leftValue, (int, float, str, bool)) and isinstance(rightValue, list):
-                return [applyCmpLT(leftValue, x) for x in rightValue]
-            elif isinstance(rightValue, (int, float, str, bool)) and isinstance(leftValue, list):
-                return [applyCmpLT(x, rightValue) for x in leftValue]
-            else:
-                return leftValue < rightValue
-
-        def applyCmpLE(leftValue, rightValue):
-            # Comparison operator can be applied
-            # - between 2 numeric values
-            # - between 2 string values
-            # - between 2 boolean values
-            if isinstance(leftValue, (int, float, str, bool)) and isinstance(rightValue, list):
-                return [applyCmpLE(leftValue, x) for x in rightValue]
-            elif isinstance(rightValue, (int, float, str, bool)) and isinstance(leftValue, list):
-                return [applyCmpLE(x, rightValue) for x in leftValue]
-            else:
-                return leftValue <= rightValue
-
-        def applyCmpEQ(leftValue, rightValue):
-            # Comparison operator can be applied
-            # - between 2 numeric values
-            # - between 2 string values
-            # - between 2 boolean values
-            if isinstance(leftValue, (int, float, str, bool)) and isinstance(rightValue, list):
-                return [applyCmpEQ(leftValue, x) for x in rightValue]
-            elif isinstance(rightValue, (int, float, str, bool)) and isinstance(leftValue, list):
-                return [applyCmpEQ(x, rightValue) for x in leftValue]
-            else:
-                return leftValue==rightValue
-
-        def applyCmpNE(leftValue, rightValue):
-            # Comparison operator can be applied
-            # - between 2 numeric values
-            # - between 2 string values
-            # - between 2 boolean values
-            if isinstance(leftValue, (int, float, str, bool)) and isinstance(rightValue, list):
-                return [applyCmpNE(leftValue, x) for x in rightValue]
-            elif isinstance(rightValue, (int, float, str, bool)) and isinstance(leftValue, list):
-                return [applyCmpNE(x, rightValue) for x in leftValue]
-            else:
-                return leftValue!=rightValue
-
-        # Defined by 3 nodes:
-        #   0: operator (<Token>)
-        #   1: left value (<Token> or <ASTItem>)
-        #   2: right value (<Token> or <ASTItem>)
-
-        # get opertor
-        operator=currentAst.node(0).value()
-
-        # evaluate values
-        leftValue=self.__evaluate(currentAst.node(1))
-        rightValue=self.__evaluate(currentAst.node(2))
-
-        if operator=='*':
-            try:
-                return applyMultiply(leftValue, rightValue)
-            except Exception as e:
-                raiseException(e, "multiply operator '*'")
-        elif operator=='/':
-            try:
-                return applyDivide(leftValue, rightValue)
-            except Exception as e:
-                raiseException(e, "divide operator '/'")
-        elif operator=='//':
-            try:
-                return applyFloorDivide(leftValue, rightValue)
-            except Exception as e:
-                raiseException(e, "floor division operator '//'")
-        elif operator=='%':
-            try:
-                return applyModulus(leftValue, rightValue)
-            except Exception as e:
-                raiseException(e, "modulus operator '%'")
-        elif operator=='+':
-            try:
-                return applyAddition(leftValue, rightValue)
-            except Exception as e:
-                raiseException(e, "addition operator '+'")
-        elif operator=='-':
-            try:
-                return applySubstraction(leftValue, rightValue)
-            except Exception as e:
-                raiseException(e, "substraction operator '-'")
-        elif operator=='<':
-            try:
-                return applyCmpLT(leftValue, rightValue)
-            except Exception as e:
-                raiseException(e, "comparison operator '<'")
-        elif operator=='<=':
-            try:
-                return applyCmpLE(leftValue, rightValue)
-            except Exception as e:
-                raiseException(e, "comparison operator '<='")
-        elif operator=='>':
-            try:
-                return applyCmpGT(leftValue, rightValue)
-            except Exception as e:
-                raiseException(e, "comparison operator '>'")
-        elif operator=='>=':
-            try:
-                return applyCmpGE(leftValue, rightValue)
-            except Exception as e:
-                raiseException(e, "comparison operator '>='")
-        elif operator=='=':
-            try:
-                return applyCmpEQ(leftValue, rightValue)
-            except Exception as e:
-                raiseException(e, "comparison operator '='")
-        elif operator=='<>':
-            try:
-                return applyCmpNE(leftValue, rightValue)
-            except Exception as e:
-                raiseException(e, "comparison operator '<>'")
-        elif operator=='in':
-            # Comparison operator can be applied
-            # - between any value and a list
-            if isinstance(rightValue, list):
-                return leftValue in rightValue
-
-            # not a valid operation, raise an error
-            raise EInterpreter(f"In list operator 'in' can only be applied to a list", currentAst)
-        elif operator=='and':
-            try:
-                return applyAnd(leftValue, rightValue)
-            except Exception as e:
-                raiseException(e, "logical operator 'AND'")
-        elif operator=='or':
-            try:
-                return applyOr(leftValue, rightValue)
-            except Exception as e:
-                raiseException(e, "logical operator 'OR'")
-        elif operator=='xor':
-            try:
-                return applyXOr(leftValue, rightValue)
-            except Exception as e:
-                raiseException(e, "logical operator 'XOR'")
-
-        # should not occurs
-        raise EInterpreter(f"Unknown operator: {operator}", currentAst)
-
-    def __executeIndexOperator(self, currentAst):
-        """return unary operation result"""
-        fctLabel='list[index]'
-        # defined by 2 nodes (ASTItem)
-        # - 1st node= index value
-        # - 2nd node = list or string
-
-        indexValue=self.__evaluate(currentAst.node(0))
-        listValue=self.__evaluate(currentAst.node(1))
-
-        self.__checkParamType(currentAst, fctLabel, 'INDEX', indexValue, int)
-        self.__checkParamType(currentAst, fctLabel, 'LIST', listValue, list, str)
-
-        if isinstance(listValue, str):
-            lenOf='string'
-        else:
-            lenOf='list'
-
-        if not self.__checkParamDomain(currentAst, fctLabel, 'INDEX', abs(indexValue)>=1 and abs(indexValue)<=len(listValue), f"given index must be in range [1; length of {lenOf}] (current={indexValue})", False):
-            # if value<=0, exit
-            return None
-
-        if indexValue>0:
-            returned=listValue[indexValue - 1]
-        else:
-            returned=listValue[indexValue]
+    def __executeTranspiled(self, astRoot):
+        """Execute given `astRoot` through python code transpiled from AST
+
+        Transpiled code is cached according to script hash
+
+        Python exceptions raised from transpiled code are converted to
+        <EInterpreterInternalError> for AST from which code has been generated
+        (debug mode is always executed iteratively, not transpiled)
+        """
+        transpiled=BSTranspiler.transpile(astRoot, hashlib.sha1(self.__script.encode()).hexdigest())
+        astItems=BSTranspiler.astItems(astRoot)
+
+        def executeMacro(macroDefinition, name, localVariables):
+            macroFunction=namespace['_macros'].get(macroDefinition.ast())
+            if macroFunction is None:
+                # macro has been defined by another script (execution without reset)
+                macroFunction=self.__compileScriptBlock(macroDefinition.ast(), True)
+            return macroFunction(name, localVariables)
+
+        namespace={
+                '_ast': astItems,
+                '_stack': self.__scriptBlockStack,
+                '_renderer': self.__renderer,
+                '_LOCAL': BSVariableScope.LOCAL,
+                '_CURRENT': BSVariableScope.CURRENT,
+                '_GLOBAL': BSVariableScope.GLOBAL,
+                '_slot': BSScriptBlockStack.slot,
+                '_variable': self.__scriptBlockStack.variableSlot,
+                '_setVariableSlot': self.__scriptBlockStack.setVariableSlot,
+                '_setLocalVariables': self.__scriptBlockStack.setLocalVariables,
+                '_verbose': self.verbose,
+                '_verboseScriptBlock': self.__verboseScriptBlock,
+                '_compile': self.__compile,
+                '_condition': self.__conditionValue,
+                '_setVariable': self.__flowSetVariable,
+                '_flowReturn': self.__flowReturn,
+                '_flowCallMacro': self.__flowCallMacro,
+                '_executeMacro': executeMacro,
+                '_repeatCount': self.__flowRepeatCount,
+                '_forEachList': self.__flowForEachList,
+                '_unaryOperator': self.__unaryOperatorFunction,
+                '_binaryOperator': self.__binaryOperatorFunction,
+                '_indexValue': self.__indexValue,
+                '_functionExecution': self.__functionExecution,
+                '_callFunction': self.__callFunction
+            }
+        exec(transpiled.code(), namespace)
 
-        return returned
+        try:
+            return namespace['_main']()
+        except EInterpreter:
+            raise
+        except Exception as e:
+            index=transpiled.astIndex(transpiled.lineNumber(e.__traceback__))
+            if index is None:
+                raise
+            raise EInterpreterInternalError(f"{type(e).__name__}: {str(e)}", astItems[index]) from e
 
     # --------------------------------------------------------------------------
     # Internal -- can be called directly without AST definition
@@ -6007,10 +6013,11 @@ class BSInterpreter(QObject):
 
         :pen.color
         """
-        color=self.__scriptBlockStack.current().variable(':pen.color', QColor(0,0,0))
+        color=self.__scriptBlockStack.variable(':pen.color', QColor(0,0,0))
         value.setAlpha(color.alpha())
         self.__scriptBlockStack.setVariable(':pen.color', value, BSVariableScope.CURRENT)
         if self.__painter:
+            self.__renderer.prepareStateChange()
             pen=self.__painter.pen()
             pen.setColor(value)
             self.__painter.setPen(pen)
@@ -6022,6 +6029,7 @@ class BSInterpreter(QObject):
         """
         self.__scriptBlockStack.setVariable(':pen.size', value, BSVariableScope.CURRENT)
         if self.__painter:
+            self.__renderer.prepareStateChange()
             pen=self.__painter.pen()
             pen.setWidthF(BSConvertUnits.convertMeasure(value, self.__unitCanvas(unit), 'PX'))
             self.__painter.setPen(pen)
@@ -6033,6 +6041,7 @@ class BSInterpreter(QObject):
         """
         self.__scriptBlockStack.setVariable(':pen.style', value, BSVariableScope.CURRENT)
         if self.__painter:
+            self.__renderer.prepareStateChange()
             pen=self.__painter.pen()
             pen.setStyle(BSInterpreter.__CONV_PEN_STYLE[value])
             self.__painter.setPen(pen)
@@ -6044,6 +6053,7 @@ class BSInterpreter(QObject):
         """
         self.__scriptBlockStack.setVariable(':pen.cap', value, BSVariableScope.CURRENT)
         if self.__painter:
+            self.__renderer.prepareStateChange()
             pen=self.__painter.pen()
             pen.setCapStyle(BSInterpreter.__CONV_PEN_CAP[value])
             self.__painter.setPen(pen)
@@ -6055,6 +6065,7 @@ class BSInterpreter(QObject):
         """
         self.__scriptBlockStack.setVariable(':pen.join', value, BSVariableScope.CURRENT)
         if self.__painter:
+            self.__renderer.prepareStateChange()
             pen=self.__painter.pen()
             pen.setJoinStyle(BSInterpreter.__CONV_PEN_JOIN[value])
             self.__painter.setPen(pen)
@@ -6064,7 +6075,7 @@ class BSInterpreter(QObject):
 
         :pen.color
         """
-        color=self.__scriptBlockStack.current().variable(':pen.color', QColor(0,0,0))
+        color=self.__scriptBlockStack.variable(':pen.color', QColor(0,0,0))
         if isinstance(value, int):
             color.setAlpha(value)
         else:
@@ -6072,6 +6083,7 @@ class BSInterpreter(QObject):
 
         self.__scriptBlockStack.setVariable(':pen.color', color, BSVariableScope.CURRENT)
         if self.__painter:
+            self.__renderer.prepareStateChange()
             pen=self.__painter.pen()
             pen.setColor(color)
             self.__painter.setPen(pen)
@@ -6081,10 +6093,11 @@ class BSInterpreter(QObject):
 
         :fill.color
         """
-        color=self.__scriptBlockStack.current().variable(':fill.color', QColor(0,0,0))
+        color=self.__scriptBlockStack.variable(':fill.color', QColor(0,0,0))
         value.setAlpha(color.alpha())
         self.__scriptBlockStack.setVariable(':fill.color', value, BSVariableScope.CURRENT)
         if self.__painter:
+            self.__renderer.prepareStateChange()
             brush=self.__painter.brush()
             brush.setColor(value)
             self.__painter.setBrush(brush)
@@ -6102,13 +6115,14 @@ class BSInterpreter(QObject):
 
         :fill.color
         """
-        color=self.__scriptBlockStack.current().variable(':fill.color', QColor(0,0,0))
+        color=self.__scriptBlockStack.variable(':fill.color', QColor(0,0,0))
         if isinstance(value, int):
             color.setAlpha(value)
         else:
             color.setAlphaF(value)
         self.__scriptBlockStack.setVariable(':fill.color', color, BSVariableScope.CURRENT)
         if self.__painter:
+            self.__renderer.prepareStateChange()
             brush=self.__painter.brush()
             brush.setColor(color)
             self.__painter.setBrush(brush)
@@ -6118,7 +6132,7 @@ class BSInterpreter(QObject):
 
         :text.color
         """
-        color=self.__scriptBlockStack.current().variable(':text.color', QColor(0,0,0))
+        color=self.__scriptBlockStack.variable(':text.color', QColor(0,0,0))
         value.setAlpha(color.alpha())
         self.__scriptBlockStack.setVariable(':text.color', value, BSVariableScope.CURRENT)
 
@@ -6127,7 +6141,7 @@ class BSInterpreter(QObject):
 
         :text.color
         """
-        color=self.__scriptBlockStack.current().variable(':text.color', QColor(0,0,0))
+        color=self.__scriptBlockStack.variable(':text.color', QColor(0,0,0))
         if isinstance(value, int):
             color.setAlpha(value)
         else:
@@ -6141,6 +6155,7 @@ class BSInterpreter(QObject):
         """
         self.__scriptBlockStack.setVariable(':text.font', value, BSVariableScope.CURRENT)
         if self.__painter:
+            self.__renderer.prepareStateChange()
             font=self.__painter.font()
             font.setFamily(value)
             self.__painter.setFont(font)
@@ -6152,6 +6167,7 @@ class BSInterpreter(QObject):
         """
         self.__scriptBlockStack.setVariable(':text.size', value, BSVariableScope.CURRENT)
         if self.__painter:
+            self.__renderer.prepareStateChange()
             size=round(BSConvertUnits.convertMeasure(value, self.__unitCanvas(unit), 'PX'))
             if size<=0:
                 return
@@ -6166,6 +6182,7 @@ class BSInterpreter(QObject):
         """
         self.__scriptBlockStack.setVariable(':text.bold', value, BSVariableScope.CURRENT)
         if self.__painter:
+            self.__renderer.prepareStateChange()
             font=self.__painter.font()
             font.setBold(value)
             self.__painter.setFont(font)
@@ -6177,6 +6194,7 @@ class BSInterpreter(QObject):
         """
         self.__scriptBlockStack.setVariable(':text.italic', value, BSVariableScope.CURRENT)
         if self.__painter:
+            self.__renderer.prepareStateChange()
             font=self.__painter.font()
             font.setItalic(value)
             self.__painter.setFont(font)
@@ -6190,6 +6208,7 @@ class BSInterpreter(QObject):
         self.__scriptBlockStack.setVariable(':text.letterspacing.spacing', value, BSVariableScope.CURRENT)
         self.__scriptBlockStack.setVariable(':text.letterspacing.unit', unit, BSVariableScope.CURRENT)
         if self.__painter:
+            self.__renderer.prepareStateChange()
             font=self.__painter.font()
             if unit=='PCT':
                 font.setLetterSpacing(QFont.PercentageSpacing, value)
@@ -6204,6 +6223,7 @@ class BSInterpreter(QObject):
         """
         self.__scriptBlockStack.setVariable(':text.stretch', value, BSVariableScope.CURRENT)
         if self.__painter:
+            self.__renderer.prepareStateChange()
             font=self.__painter.font()
             font.setStretch(value)
             self.__painter.setFont(font)
@@ -6229,6 +6249,7 @@ class BSInterpreter(QObject):
         """
         self.__scriptBlockStack.setVariable(':draw.antialiasing', value, BSVariableScope.CURRENT)
         if self.__painter:
+            self.__renderer.prepareStateChange()
             if value:
                 self.__painter.setRenderHints(QPainter.Antialiasing|QPainter.SmoothPixmapTransform, True)
                 font=self.__painter.font()
@@ -6247,6 +6268,7 @@ class BSInterpreter(QObject):
         """
         self.__scriptBlockStack.setVariable(':draw.blendingmode', value, BSVariableScope.CURRENT)
         if self.__painter:
+            self.__renderer.prepareStateChange()
             self.__painter.setCompositionMode(BSInterpreter.__CONV_DRAW_BLENDING_MODE[value])
 
     def __setDrawFillStatus(self, value):
@@ -6256,6 +6278,7 @@ class BSInterpreter(QObject):
         """
         self.__scriptBlockStack.setVariable(':fill.status', value, BSVariableScope.CURRENT)
         if self.__painter:
+            self.__renderer.prepareStateChange()
             brush=self.__painter.brush()
             if value:
                 brush.setStyle(Qt.SolidPattern)
@@ -6270,6 +6293,7 @@ class BSInterpreter(QObject):
         """
         self.__scriptBlockStack.setVariable(':draw.opacity', value, BSVariableScope.CURRENT)
         if self.__painter:
+            self.__renderer.prepareStateChange()
             if isinstance(value, int):
                 self.__painter.setOpacity(value/255)
             else:
@@ -6324,7 +6348,7 @@ class BSInterpreter(QObject):
 
         :view.grid.color
         """
-        color=self.__scriptBlockStack.current().variable(':view.grid.color', QColor(0,0,0))
+        color=self.__scriptBlockStack.variable(':view.grid.color', QColor(0,0,0))
         if isinstance(value, int):
             color.setAlpha(value)
         else:
@@ -6381,7 +6405,7 @@ class BSInterpreter(QObject):
 
         :view.origin.color
         """
-        color=self.__scriptBlockStack.current().variable(':view.origin.color', QColor(60,60,128))
+        color=self.__scriptBlockStack.variable(':view.origin.color', QColor(60,60,128))
         if isinstance(value, int):
             color.setAlpha(value)
         else:
@@ -6411,7 +6435,7 @@ class BSInterpreter(QObject):
 
         :view.position.color
         """
-        color=self.__scriptBlockStack.current().variable(':view.position.color', QColor(60,60,128))
+        color=self.__scriptBlockStack.variable(':view.position.color', QColor(60,60,128))
         if isinstance(value, int):
             color.setAlpha(value)
         else:
@@ -6868,7 +6892,7 @@ class BSInterpreter(QObject):
             self.__painter.save()
             self.__painter.scale(1,-1)
 
-            color=self.__scriptBlockStack.current().variable(':text.color', QColor(0,0,0))
+            color=self.__scriptBlockStack.variable(':text.color', QColor(0,0,0))
             pen=self.__painter.pen()
             pen.setColor(color)
             self.__painter.setPen(pen)
@@ -7089,6 +7113,28 @@ class BSInterpreter(QObject):
     # --------------------------------------------------------------------------
     # Public
     # --------------------------------------------------------------------------
+    @staticmethod
+    def newParser(languageDef):
+        """Return a new parser for given language definition, initialised to parse scripts
+
+        A language definition can't be used by more than one parser at the same time
+        """
+        parser=Parser(languageDef.tokenizer(), languageDef.grammarRules())
+        # let parser ignore some tokens useless for execution
+        parser.setIgnoredTokens([BSLanguageDef.ITokenType.SPACE,
+                                 BSLanguageDef.ITokenType.NEWLINE,
+                                 BSLanguageDef.ITokenType.COMMENT])
+        # when script is modified, only modified statements are parsed again
+        parser.setIncremental(True)
+        return parser
+
+    @staticmethod
+    def scriptToParse(script):
+        """Return text given to parser for given `script`"""
+        # ensure parsed text is properly finished (ie: this ensure for example that
+        # we have DEDENT in case of INDENT)
+        return script+"\n\n#<EOT>"
+
     def script(self):
         """Return current script content"""
         return self.__script
@@ -7098,9 +7144,7 @@ class BSInterpreter(QObject):
 
         If text is different than current text, parse it
         """
-        # ensure parsed text is properly finished (ie: this ensure for example that
-        # we have DEDENT in case of INDENT)
-        script+="\n\n#<EOT>"
+        script=BSInterpreter.scriptToParse(script)
 
         totalTime=None
 
@@ -7151,35 +7195,114 @@ class BSInterpreter(QObject):
         self.__isRunning=True
         self.executionStarted.emit()
 
+        return self.__executeRun(lambda: self.__executeStart(reset))
+
+    def __executeRun(self, execution):
+        """Run given `execution` and return its returned value
+
+        Running status is kept if execution is paused
+        """
         try:
-            returned=self.__executeStart(reset)
+            returned=execution()
         except Exception as e:
-            self.executionFinished.emit()
             self.__isRunning=False
+            self.executionFinished.emit()
             raise e
 
-        self.executionFinished.emit()
-        self.__isRunning=False
+        if not self.__executionPaused:
+            self.__isRunning=False
+            self.executionFinished.emit()
         return returned
 
     def executeNext(self):
         """Execute next instruction
 
+        Execution stay paused after instruction has been executed
+        Return value returned by script if execution is finished, otherwise None
+
         Notes:
         - execution must be started
-        - debug mode must be active
+        - execution must be paused
         """
         if not self.__isRunning:
             # can't execute if execution not started
             raise EInterpreterInternalError("Interpreter is not running", None)
-        elif not self.__optionDebugMode:
-            # can't execute if not in debug mode
-            raise EInterpreterInternalError("Interpreter is not in Debug Mode", None)
+        elif not self.__executionPaused:
+            # can't execute if not paused
+            raise EInterpreterInternalError("Interpreter is not paused", None)
+
+        self.__executionPaused=False
+        self.__executionInterrupt=True
+        return self.__executeRun(lambda: self.__executeIterative(1))
+
+    def pause(self):
+        """Pause execution
+
+        Execution is paused before next instruction; if called while waiting
+        for delay, execution is paused when delay is finished
+        Paused execution is continued with executeNext() or resume()
+
+        Notes:
+        - execution must be iterative (debug mode, or compile and transpile
+          modes not active)
+        """
+        if not self.pausable():
+            raise EInterpreterInternalError("Interpreter execution can't be paused", None)
+
+        self.__executionInterrupt=True
+
+    def resume(self):
+        """Resume paused execution
+
+        Return value returned by script if execution is finished, otherwise None
+        """
+        if not self.__isRunning:
+            raise EInterpreterInternalError("Interpreter is not running", None)
+        elif not self.__executionPaused:
+            raise EInterpreterInternalError("Interpreter is not paused", None)
+
+        self.__executionPaused=False
+        self.__executionInterrupt=False
+        return self.__executeRun(self.__executeIterative)
+
+    def stop(self):
+        """Stop execution
+
+        If execution is paused, execution is stopped immediately, otherwise
+        iterative execution is stopped before next instruction; compiled and
+        transpiled executions are stopped only when current delay is finished
+
+        Iterative execution (default execution mode) processes user interface
+        events while running, then execution can be stopped at any time
+
+        When stopped, an <EInterpreter> exception with level ERROR_LEVEL_STOP
+        is raised by execution method
+        """
+        if not self.__isRunning:
+            raise EInterpreterInternalError("Interpreter is not running", None)
+
+        self.__executionStop=True
+        self.__executionInterrupt=True
+
+        if self.__executionPaused:
+            self.__executionPaused=False
+            self.__executeRun(self.__executeIterative)
 
     def parserErrors(self):
         """Return parser errors"""
         return self.__parser.errors()
 
+    def parserCache(self):
+        """Return persistent cache used by parser (None if not used)"""
+        return self.__parser.cache()
+
+    def setParserCache(self, cache):
+        """Set persistent cache used by parser
+
+        Given `cache` is a <ParserCache> or None (no persistent cache)
+        """
+        self.__parser.setCache(cache)
+
     def renderer(self):
         """Return renderer"""
         return self.__renderer
@@ -7188,6 +7311,17 @@ class BSInterpreter(QObject):
         """Return if interpreter is currently running a script"""
         return self.__isRunning
 
+    def paused(self):
+        """Return if interpreter execution is currently paused"""
+        return self.__executionPaused
+
+    def pausable(self):
+        """Return if interpreter execution can be paused
+
+        Only iterative execution can be paused
+        """
+        return self.__isRunning and not self.__executionStack is None
+
     # --------------------------------------------------------------------------
     # options
     def optionDebugMode(self):
@@ -7223,6 +7357,29 @@ class BSInterpreter(QObject):
             raise EInvalidValue("Given `value` must be in range [0 - 30000] (maximum delay is 30s)")
         self.__optionDelay=value
 
+    def optionCompileMode(self):
+        """Return if interpreter compile AST before execution or not"""
+        return self.__optionCompileMode
+
+    def setOptionCompileMode(self, value):
+        """Set if interpreter compile AST before execution or not"""
+        if not isinstance(value, bool):
+            raise EInvalidValue("Given `value` must be <bool>")
+        self.__optionCompileMode=value
+
+    def optionTranspileMode(self):
+        """Return if interpreter transpile AST to python code before execution or not"""
+        return self.__optionTranspileMode
+
+    def setOptionTranspileMode(self, value):
+        """Set if interpreter transpile AST to python code before execution or not
+
+        When transpile mode is active, compile mode is ignored
+        """
+        if not isinstance(value, bool):
+            raise EInvalidValue("Given `value` must be <bool>")
+        self.__optionTranspileMode=value
+
 
 
 class BSVariableScope(Enum):
@@ -7232,46 +7389,90 @@ class BSVariableScope(Enum):
 
 
 class BSScriptBlockProperties:
-    """Define current script block properties"""
+    """Define current script block properties
+
+    Script block instances are reused by stack, see reset()
+    """
 
-    def __init__(self, parent, ast, allowLocalVariable, id, rootStack):
+    def __init__(self, parent, ast, allowLocalVariable, id, stack):
         if not(parent is None or isinstance(parent, BSScriptBlockProperties)):
             raise EInvalidType("Given `parent` must be None or a <BSScriptBlockProperties>")
 
-        # keep a pointer to first stack block (root, used for global variables)
-        self.__rootStack=rootStack
+        # keep a pointer to stack, that store variables values
+        self.__stack=stack
 
+        # variables defined by script block hide variables with the same name
+        # defined by parents script blocks; for each hidden variable slot,
+        # maintain hidden [value, script block], restored when script block
+        # is removed from stack
+        self.__hiddenVariables={}
+
+        self.reset(parent, ast, allowLocalVariable, id)
+
+    def reset(self, parent, ast, allowLocalVariable, id):
+        """Initialise script block properties
+
+        Called by stack when script block is pushed
+        """
         # keep parent, used to access to parents variables
         self.__parent=parent
 
+        # position in stack, used to compare script blocks
+        if parent is None:
+            self.__depth=0
+        else:
+            self.__depth=parent.depth()+1
+
+        # script block in which variables with CURRENT scope are defined
+        if allowLocalVariable or parent is None:
+            # root scriptblock always allows user defined variable
+            self.__localScope=self
+        else:
+            self.__localScope=parent.localScope()
+
         # textual Id (informatiional, not used by scipt)
         self.__id=id
 
         # ast that contain script block
         self.__ast=ast
 
-        # unique Id for script execution
-        self.__uuid=str(uuid.uuid4())
+        # unique Id for script execution, generated on demand
+        self.__uuid=None
 
         # the allowLocalVariable is used here for information only
         # and no control is applied
         self.__allowLocalVariable=allowLocalVariable
 
-        # maintain a dictionary of local Variables
-        self.__variables={}
-
     def id(self):
         """Return informational ID, if any"""
         return self.__id
 
     def uuid(self):
         """Return Unique ID"""
+        if self.__uuid is None:
+            self.__uuid=str(uuid.uuid4())
         return self.__uuid
 
     def ast(self):
         """Return AST that contain script block"""
         return self.__ast
 
+    def parent(self):
+        """Return parent script block, None for root script block"""
+        return self.__parent
+
+    def depth(self):
+        """Return script block position in stack"""
+        return self.__depth
+
+    def localScope(self):
+        """Return script block in which variables with a CURRENT scope are defined"""
+        return self.__localScope
+
+    def hiddenVariables(self):
+        """Return dictionary of hidden variables, used by stack"""
+        return self.__hiddenVariables
+
     def allowLocalVariable(self):
         """Return if current script block allows or not creation of local variables
 
@@ -7297,14 +7498,11 @@ class BSScriptBlockProperties:
 
         If variable doesn't exist in current dictionnary, return variable from
         parent script block, if exist, otherwise return default value
+
+        Note: variables are read from stack, script block is expected to be the
+              current one
         """
-        name=name.lower()
-        if name in self.__variables:
-            return self.__variables[name]
-        elif not self.__parent is None:
-            return self.__parent.variable(name, default)
-        else:
-            return default
+        return self.__stack.variable(name, default)
 
     def setVariable(self, name, value, scope):
         """Set `value` for variable designed by given `name`
@@ -7316,24 +7514,7 @@ class BSScriptBlockProperties:
 
         If variable doesn't exist in script block, create it
         """
-        name=name.lower()
-        if scope==BSVariableScope.GLOBAL:
-            if self.__rootStack:
-                self.__rootStack.setVariable(name, value, BSVariableScope.GLOBAL)
-            else:
-                # occurs if current block is already root stack
-                self.__variables[name]=value
-        elif scope==BSVariableScope.LOCAL:
-            self.__variables[name]=value
-        else:
-            # current
-            if self.__allowLocalVariable:
-                self.__variables[name]=value
-            elif not self.__parent is None:
-                self.__parent.setVariable(name, value, scope)
-            else:
-                # should not occurs, root scriptblock always allows user defined variable
-                pass
+        self.__stack.setVariableSlot(BSScriptBlockStack.slot(name), value, scope, self)
 
     def variables(self, all=False):
         """Return dictionnary key/value of current variables
@@ -7341,41 +7522,113 @@ class BSScriptBlockProperties:
         If `all` is True, build a dictionnary with all variable accessible for current script block
         (ie: return parent variables)
         """
-        if all and not self.__parent is None:
-            # merge dictionaries
-            return {**self.__parent.variables(True), **self.__variables}
-        else:
-            return self.__variables
+        return self.__stack.variables(self, all)
 
 
 class BSScriptBlockStack:
-    """Stack of current executed scripts blocks"""
+    """Stack of current executed scripts blocks
+
+    Variables names are resolved once to a slot index, shared by all stacks
+    Stack maintains, for each slot, the visible value and the script block that
+    defined it; when a script block defines a variable already defined by a
+    parent, previous value is kept by script block and restored on pop.
+
+    Then accessing a variable doesn't depend on stack depth
+    """
+    # variable names (lower case) and their slot index
+    __slots={}
+    __slotNames=[]
+
+    # value of an undefined variable slot
+    UNDEFINED=object()
+
+    @staticmethod
+    def slot(name):
+        """Return slot index for variable `name`
+
+        Slot is created if not yet defined
+        """
+        name=name.lower()
+        slot=BSScriptBlockStack.__slots.get(name)
+        if slot is None:
+            slot=len(BSScriptBlockStack.__slotNames)
+            BSScriptBlockStack.__slots[name]=slot
+            BSScriptBlockStack.__slotNames.append(name)
+        return slot
 
     def __init__(self, maxStackSize=1000):
         self.__maxStackSize=maxStackSize
         self.__stack=[]
         self.__current=None
+
+        # popped script blocks, reused on push
+        self.__pool=[]
+
+        # for each slot, visible value and script block that defined it
+        self.__values=[]
+        self.__owners=[]
         self.clear()
 
-    def push(self, ast, allowLocalVariable, name=None):
-        if len(self.__stack)>0:
-            parent=self.__stack[-1]
-        else:
-            parent=None
+    def __bindSlot(self, scriptBlock, slot, value):
+        """Set variable `slot` for given `scriptBlock`, when visible variable
+        is not defined by `scriptBlock`
+        """
+        if len(self.__owners)<=slot:
+            # slots created since last update
+            nbSlots=len(BSScriptBlockStack.__slotNames)-len(self.__owners)
+            self.__values+=[BSScriptBlockStack.UNDEFINED]*nbSlots
+            self.__owners+=[None]*nbSlots
+
+        owner=self.__owners[slot]
+        if owner is None or owner.depth()<scriptBlock.depth():
+            # variable defined by a parent or not defined: hide it
+            scriptBlock.hiddenVariables()[slot]=[self.__values[slot], owner]
+            self.__values[slot]=value
+            self.__owners[slot]=scriptBlock
+            return
+
+        # visible variable is defined by a child of given script block
+        # search in hidden variables if script block already defines it
+        hidden=owner.hiddenVariables()[slot]
+        while not hidden[1] is None and hidden[1].depth()>scriptBlock.depth():
+            hidden=hidden[1].hiddenVariables()[slot]
+
+        if not hidden[1] is scriptBlock:
+            # not defined by script block, insert definition
+            scriptBlock.hiddenVariables()[slot]=[hidden[0], hidden[1]]
+            hidden[1]=scriptBlock
+        hidden[0]=value
 
+    def push(self, ast, allowLocalVariable, name=None):
         if len(self.__stack)<self.__maxStackSize:
-            self.__stack.append(BSScriptBlockProperties(parent, ast, allowLocalVariable, name, self.__stack[0] if len(self.__stack)>0 else None))
-            self.__current=self.__stack[-1]
+            if self.__pool:
+                scriptBlock=self.__pool.pop()
+                scriptBlock.reset(self.__current, ast, allowLocalVariable, name)
+            else:
+                scriptBlock=BSScriptBlockProperties(self.__current, ast, allowLocalVariable, name, self)
+            self.__stack.append(scriptBlock)
+            self.__current=scriptBlock
         else:
             raise EInvalidStatus(f"Current stack size limit ({self.__maxStackSize}) reached!")
 
     def pop(self):
-        """Pop current script block stack"""
+        """Pop current script block stack
+
+        Returned script block is reused by next push
+        """
         # do not control if there's something to pop
         # normally this method is called only if stack is not empty
         # if called on an empty stack, must raise an error because it must never occurs
         returned=self.__stack.pop()
 
+        # restore variables hidden by script block
+        hiddenVariables=returned.hiddenVariables()
+        if hiddenVariables:
+            for slot, hidden in hiddenVariables.items():
+                self.__values[slot], self.__owners[slot]=hidden
+            hiddenVariables.clear()
+        self.__pool.append(returned)
+
         if len(self.__stack)>0:
             self.__current=self.__stack[-1]
         else:
@@ -7390,6 +7643,18 @@ class BSScriptBlockStack:
         """
         return self.__current
 
+    def maxStackSize(self):
+        """Return maximum number of script blocks in stack"""
+        return self.__maxStackSize
+
+    def setMaxStackSize(self, value):
+        """Set maximum number of script blocks in stack"""
+        if not isinstance(value, int):
+            raise EInvalidType("Given `value` must be <int>")
+        elif value<1:
+            raise EInvalidValue("Given `value` must be greater than 0")
+        self.__maxStackSize=value
+
     def count(self):
         """Return number of script block in stack"""
         return len(self.__stack)
@@ -7397,19 +7662,99 @@ class BSScriptBlockStack:
     def clear(self):
         """Clear stack"""
         self.__stack.clear()
+        self.__current=None
+        self.__values.clear()
+        self.__owners.clear()
         self.push(ASTItem("<STACK.GLOBAL.VARIABLES>"), True, "<STACK.GLOBAL.VARIABLES>")
 
     def variable(self, name, default=None):
         """Shortcut to get variable from current block in stack"""
-        if self.__current:
-            return self.__current.variable(name, default)
-        else:
+        slot=BSScriptBlockStack.__slots.get(name.lower())
+        if slot is None:
             return default
+        return self.variableSlot(slot, default)
+
+    def variableSlot(self, slot, default=None):
+        """Return value for variable designed by given `slot`"""
+        try:
+            value=self.__values[slot]
+        except IndexError:
+            return default
+
+        if value is BSScriptBlockStack.UNDEFINED:
+            return default
+        return value
 
     def setVariable(self, name, value, scope):
         """Shortcut to set variable from current block in stack"""
         if self.__current:
-            self.__current.setVariable(name, value, scope)
+            self.setVariableSlot(BSScriptBlockStack.slot(name), value, scope)
+
+    def setLocalVariables(self, slots, values):
+        """Set local variables designed by given `slots` to given `values` in
+        current block in stack
+        """
+        scriptBlock=self.__current
+        for slot, value in zip(slots, values):
+            try:
+                if self.__owners[slot] is scriptBlock:
+                    self.__values[slot]=value
+                    continue
+            except IndexError:
+                pass
+            self.__bindSlot(scriptBlock, slot, value)
+
+    def setVariableSlot(self, slot, value, scope, scriptBlock=None):
+        """Set `value` for variable designed by given `slot`
+
+        If `scriptBlock` is not provided, scope is applied from current block
+        in stack
+        """
+        if scriptBlock is None:
+            scriptBlock=self.__current
+
+        if scope==BSVariableScope.LOCAL:
+            pass
+        elif scope==BSVariableScope.GLOBAL:
+            scriptBlock=self.__stack[0]
+        else:
+            scriptBlock=scriptBlock.localScope()
+
+        try:
+            if self.__owners[slot] is scriptBlock:
+                self.__values[slot]=value
+                return
+        except IndexError:
+            pass
+        self.__bindSlot(scriptBlock, slot, value)
+
+    def variables(self, scriptBlock=None, all=False):
+        """Return dictionnary key/value of variables for given `scriptBlock`
+
+        If `scriptBlock` is not provided, current block in stack is used
+        If `all` is True, return all variables accessible for script block
+        """
+        if scriptBlock is None:
+            scriptBlock=self.__current
+
+        returned={}
+        if all:
+            # visible variables
+            for slot, value in enumerate(self.__values):
+                if not value is BSScriptBlockStack.UNDEFINED:
+                    returned[BSScriptBlockStack.__slotNames[slot]]=value
+            return returned
+
+        for slot, owner in enumerate(self.__owners):
+            if owner is scriptBlock:
+                returned[BSScriptBlockStack.__slotNames[slot]]=self.__values[slot]
+
+        # variables hidden by children script blocks
+        for child in self.__stack[scriptBlock.depth()+1:]:
+            for slot, hidden in child.hiddenVariables().items():
+                if hidden[1] is scriptBlock:
+                    returned[BSScriptBlockStack.__slotNames[slot]]=hidden[0]
+        return returned
 
 
 class BSScriptBlockMacro:
@@ -7476,6 +7821,65 @@ class BSDefinedMacros:
         return None
 
 
+class BSFunction:
+    """A built-in function definition, as referenced by interpreter functions registry
+
+    Function is defined by:
+    - a `handler`, called with interpreter, AST, function label and arguments values
+    - a list of `arguments` definition, as tuple (name, types) or (name, types, default)
+        . an argument without default value is mandatory
+        . when types is None, argument type is not checked by interpreter
+    - `argsCount`, the allowed numbers of arguments, if it can't be determinated from
+      `arguments` definition
+    - `variadic` arguments definition, as a tuple (name, types, flatten); values
+      provided after `arguments` are given to handler as a list
+    """
+
+    def __init__(self, name, handler, arguments, argsCount=None, variadic=None):
+        self.__name=name
+        self.__label=f'Function {name}()'
+        self.__handler=handler
+        self.__arguments=tuple((argument[0], argument[1], argument[2] if len(argument)>2 else None) for argument in arguments)
+        self.__variadic=variadic
+
+        if not argsCount is None:
+            self.__argsCount=frozenset(argsCount)
+        else:
+            # from number of mandatory arguments, to number of arguments (no maximum if variadic)
+            minArgs=len([argument for argument in arguments if len(argument)==2])
+            if variadic is None:
+                self.__argsCount=range(minArgs, len(arguments)+1)
+            else:
+                self.__argsCount=range(minArgs, sys.maxsize)
+
+    def __repr__(self):
+        return f"<BSFunction('{self.__name}', {self.__argsCount})>"
+
+    def name(self):
+        """Return function name"""
+        return self.__name
+
+    def label(self):
+        """Return function label, used in error messages"""
+        return self.__label
+
+    def handler(self):
+        """Return function handler"""
+        return self.__handler
+
+    def arguments(self):
+        """Return arguments definition, as a tuple of (name, types, default)"""
+        return self.__arguments
+
+    def variadic(self):
+        """Return variadic arguments definition, as (name, types, flatten) or None"""
+        return self.__variadic
+
+    def argsCount(self):
+        """Return allowed numbers of arguments"""
+        return self.__argsCount
+
+
 class BSImagesLibrary:
     """Reference all imported images"""
     KEY_PIXMAP=0
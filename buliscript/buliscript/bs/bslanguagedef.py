@@ -35,6 +35,7 @@ from buliscript.pktk.modules.parser import (
         GROptional,
         GRNoneOrMore,
         GROneOrMore,
+        GRExpression,
         GRToken,
         GRRule,
         GROperatorPrecedence,
@@ -2520,7 +2521,7 @@ class BSLanguageDef(LanguageDef):
                                                                        ),
 
             TokenizerRule(BSLanguageDef.ITokenType.FLOW_UNCOMPLETE, r"^\x20*\b(?:"
-                                                                       r"|(?:stop|call|define|for(?:\s+(?:each(?:\s+(?:item))?))?)"
+                                                                       r"(?:stop|call|define|for(?:\s+(?:each(?:\s+(?:item))?))?)"
                                                                        r"|(?:import\s+buliscript)"
                                                                        r"|(?:import(?:\s+(?:document|canvas)(?:\s+into(?:\s+image)?)?))"
                                                                        r"|(?:import(?:\s+file(?:\s+into(?:\s+image(?:\s+library)?)?)?))"
@@ -6303,55 +6304,24 @@ class BSLanguageDef(LanguageDef):
             )
 
         GrammarRule('Evaluation_Expression',
-                GrammarRule.OPTION_OPERATOR_PRECEDENCE,
-                # --
-                GROne('Evaluation_Expression_Unary_Operator',
-                      'Evaluation_Expression_Parenthesis',
-                      'Any_Value'),
-                GROptional('Evaluation_Expression_Binary_Operator')
-            )
-
-        # When an evaluation expression start, only the first one need to manage operator precedence
-        # for this, grammar rules are built:
-        # - first evaluation expression manage OPTION_OPERATOR_PRECEDENCE
-        # - following evaluation expression do not manage OPTION_OPERATOR_PRECEDENCE
-        # for this, create a second Evaluation_Expression rule, without option, that is called for binary operators
-        GrammarRule('Evaluation_Expression__noop',
-                # --
-                GROne('Evaluation_Expression_Unary_Operator',
-                      'Evaluation_Expression_Parenthesis',
-                      'Any_Value'),
-                GROptional('Evaluation_Expression_Binary_Operator')
+                # operator tree is built according to operator precedence
+                GRExpression(GROne('Evaluation_Expression_Parenthesis',
+                                   'Any_Value'),
+                             GROne(GRToken(BSLanguageDef.ITokenType.UNARY_OPERATOR, 'not'),
+                                   GRToken(BSLanguageDef.ITokenType.DUAL_OPERATOR, '-')),
+                             GROne(GRToken(BSLanguageDef.ITokenType.BINARY_OPERATOR, '+', '*', '/', '//', '%', 'and', 'or', 'xor', '<=', '<>', '<', '>', '>=', '=', 'in'),
+                                   GRToken(BSLanguageDef.ITokenType.DUAL_OPERATOR, '-')))
             )
 
         GrammarRule('Evaluation_Expression_Parenthesis',
                 GrammarRule.OPTION_AST,
                 # --
                 GRToken(BSLanguageDef.ITokenType.PARENTHESIS_OPEN, False),
-                # use the evaluation expression with OPTION_OPERATOR_PRECEDENCE here as we're in an another level of evaluation
                 'Evaluation_Expression',
                 GRToken(BSLanguageDef.ITokenType.PARENTHESIS_CLOSE, False),
                 GROptional('List_Index_Expression')
             )
 
-        GrammarRule('Evaluation_Expression_Binary_Operator',
-                GROne(GRToken(BSLanguageDef.ITokenType.BINARY_OPERATOR, '+', '*', '/', '//', '%', 'and', 'or', 'xor', '<=', '<>', '<', '>', '>=', '=', 'in'),
-                      GRToken(BSLanguageDef.ITokenType.DUAL_OPERATOR, '-')),
-                'Evaluation_Expression__noop',
-                GROptional('Evaluation_Expression_Binary_Operator')
-            )
-
-        GrammarRule('Evaluation_Expression_Unary_Operator',
-                #GrammarRule.OPTION_AST, ==> no!
-                # --
-                GROne(GRToken(BSLanguageDef.ITokenType.UNARY_OPERATOR, 'not'),
-                      GRToken(BSLanguageDef.ITokenType.DUAL_OPERATOR, '-')),
-                GROne('Evaluation_Expression_Unary_Operator',
-                      'Evaluation_Expression_Parenthesis',
-                      'Any_Value'),
-                GROptional('Evaluation_Expression_Binary_Operator')
-            )
-
         GrammarRule('List_Value',
                 GrammarRule.OPTION_AST,
                 # --
@@ -6412,6 +6382,9 @@ class BSLanguageDef(LanguageDef):
                 #GROneOrMore(GRToken(BSLanguageDef.ITokenType.NEWLINE, False))
             )
 
+        # grammar is complete: check it once, it can't be modified anymore
+        self.__grammarRules.freeze()
+
     def __initTokenNumber(self, tokenType, value):
         """Convert value for NUMBER token from string to integer or decimal"""
         try:
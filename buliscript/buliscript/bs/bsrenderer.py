@@ -1209,12 +1209,16 @@ class BSRenderer(QObject):
         self.__transformPosition=QTransform()
         self.__transform=QTransform()
 
+        # pushed painter states; for each state, True when QPainter.save() has
+        # been applied
+        self.__states=[]
 
     def __initRenderer(self):
         """Initialiser renderer painter"""
         # if a painter is already initialised, need to be sure the painter is not active
         # before creating a new one
         self.__painter=self.finalize()
+        self.__states=[]
 
         if self.__renderMode==BSRenderer.OPTION_MODE_RASTER:
             # ensure no more vector data are kept in memory
@@ -1404,18 +1408,28 @@ class BSRenderer(QObject):
     def pushState(self):
         """Push current painter state
 
-        Do a QPainter.save()
+        QPainter.save() is deferred until painter state is modified, see
+        prepareStateChange()
         """
         if self.__painter:
+            self.__states.append(False)
+
+    def prepareStateChange(self):
+        """Must be called before painter state is modified
+
+        Do a QPainter.save() if current pushed state has not been saved yet
+        """
+        if self.__states and not self.__states[-1]:
             self.__painter.save()
+            self.__states[-1]=True
 
     def popState(self):
         """Pop painter state
 
-        Do a QPainter.restore()
+        Do a QPainter.restore() if state has been saved
         And reapply current transformation matrix
         """
-        if self.__painter:
+        if self.__painter and self.__states and self.__states.pop():
             self.__painter.restore()
             self.__painter.setTransform(self.__transform, False)
 
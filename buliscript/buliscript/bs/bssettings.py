@@ -78,6 +78,10 @@ class BSSettingsKey(SettingsKey):
 
     CONFIG_DOCKER_CONSOLE_BUFFERSIZE =                       'config.docker.console.bufferSize'
 
+    CONFIG_CACHE_AST_MAXSIZE =                               'config.cache.ast.maxSize'
+
+    CONFIG_EXECUTION_MODE =                                  'config.execution.mode'
+
     SESSION_MAINWINDOW_SPLITTER_MAIN_POSITION =              'session.mainwindow.splitter.main.position'
     SESSION_MAINWINDOW_WINDOW_GEOMETRY =                     'session.mainwindow.window.geometry'
     SESSION_MAINWINDOW_WINDOW_MAXIMIZED =                    'session.mainwindow.window.maximized'
@@ -156,6 +160,14 @@ class BSSettings(Settings):
 
             SettingsRule(BSSettingsKey.CONFIG_DOCKER_CONSOLE_BUFFERSIZE,                    1500,                     SettingsFmt(int, (250,25000))),
 
+            # maximum size of parsed scripts cache, in MB (0=no cache)
+            SettingsRule(BSSettingsKey.CONFIG_CACHE_AST_MAXSIZE,                            64,                       SettingsFmt(int, (0,1024))),
+
+            # 'interpreted': AST is executed by interpreter (execution can be paused/stopped)
+            # 'compiled': AST is compiled to closures before execution
+            # 'transpiled': AST is transpiled to python code before execution
+            SettingsRule(BSSettingsKey.CONFIG_EXECUTION_MODE,                               'interpreted',            SettingsFmt(str, ['interpreted', 'compiled', 'transpiled'])),
+
 
             SettingsRule(BSSettingsKey.SESSION_MAINWINDOW_SPLITTER_MAIN_POSITION,           [1000, 1000],             SettingsFmt(int), SettingsFmt(int)),
             SettingsRule(BSSettingsKey.SESSION_MAINWINDOW_WINDOW_GEOMETRY,                  [-1,-1,-1,-1],            SettingsFmt(int), SettingsFmt(int), SettingsFmt(int), SettingsFmt(int)),
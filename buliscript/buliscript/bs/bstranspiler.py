@@ -0,0 +1,578 @@
+#-----------------------------------------------------------------------------
+# Buli Script
+# Copyright (C) 2020 - Grum999
+# -----------------------------------------------------------------------------
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.
+# If not, see https://www.gnu.org/licenses/
+# -----------------------------------------------------------------------------
+# A Krita plugin designed to draw programmatically
+# -----------------------------------------------------------------------------
+
+import math
+
+from .bslanguagedef import BSLanguageDef
+
+from buliscript.pktk.modules.tokenizer import Token
+from buliscript.pktk.modules.parser import (
+        ASTItem,
+        ASTSpecialItemType
+    )
+from buliscript.pktk.pktk import (
+        EInvalidType
+    )
+
+
+class BSTranspiledScript:
+    """A BuliScript AST transpiled to python code
+
+    Provides compiled code object, and map python line numbers to AST items
+    from which lines have been generated
+    """
+
+    def __init__(self, source, lineMap):
+        # python source code
+        self.__source=source
+
+        # for each python line, a tuple (index of AST item in BSTranspiler.astItems(), BuliScript row)
+        self.__lineMap=lineMap
+
+        self.__code=compile(source, BSTranspiler.FILENAME, 'exec')
+
+    def source(self):
+        """Return python source code"""
+        return self.__source
+
+    def code(self):
+        """Return python code object"""
+        return self.__code
+
+    def astIndex(self, lineNumber):
+        """Return index of AST item from which python `lineNumber` has been generated
+
+        Index is relative to list returned by BSTranspiler.astItems()
+        Return None if line number is not valid
+        """
+        if isinstance(lineNumber, int) and lineNumber>=1 and lineNumber<=len(self.__lineMap):
+            return self.__lineMap[lineNumber-1][0]
+        return None
+
+    def row(self, lineNumber):
+        """Return BuliScript row from which python `lineNumber` has been generated
+
+        Return None if line number is not valid
+        """
+        if isinstance(lineNumber, int) and lineNumber>=1 and lineNumber<=len(self.__lineMap):
+            return self.__lineMap[lineNumber-1][1]
+        return None
+
+    def lineNumber(self, traceback):
+        """Return last python line number of transpiled code found in given `traceback`
+
+        Return None if traceback doesn't contain transpiled code
+        """
+        returned=None
+        while not traceback is None:
+            if traceback.tb_frame.f_code.co_filename==BSTranspiler.FILENAME:
+                returned=traceback.tb_lineno
+            traceback=traceback.tb_next
+        return returned
+
+
+class BSTranspiler:
+    """Transpile a BuliScript AST to python source code
+
+    Generated code defines a `_main()` function to execute script, and a
+    `_macros` dictionary {macro script block AST: function(name, localVariables)}
+
+    Flows (script blocks, if, repeat, for each, macros) and expressions are
+    transpiled; other AST (actions, ...) are executed through functions
+    returned by `_compile()`
+
+    Generated code has to be executed with following names defined:
+        _ast                                    list of AST items, as returned by astItems()
+        _stack                                  current <BSScriptBlockStack>
+        _renderer                               current <BSRenderer>
+        _LOCAL, _CURRENT, _GLOBAL               <BSVariableScope> values
+        _slot(name)                             return slot index for variable `name`
+        _variable(slot)                         return value for variable `slot`
+        _setVariableSlot(slot, value, scope)
+        _setLocalVariables(slots, values)
+        _verbose(text, ast)
+        _verboseScriptBlock(action, name, ast)
+        _compile(ast)                           return a function without argument evaluating `ast`
+        _condition(value)                       return `value` as a boolean condition
+        _setVariable(ast, name, value, scope, slot)
+        _flowReturn(ast, value)
+        _flowCallMacro(ast, name, values, storeResultName, _executeMacro)
+        _executeMacro(macroDefinition, name, localVariables)
+        _repeatCount(ast, value)                return checked number of iterations, or None
+        _forEachList(ast, value, variableName)  return tuple (list, script block name)
+        _unaryOperator(ast)                     return a function(value)
+        _binaryOperator(ast)                    return a function(leftValue, rightValue)
+        _indexValue(ast, index, value)
+        _functionExecution(ast)                 return function execution definition
+        _callFunction(ast, execution, values)
+    """
+    FILENAME='<buliscript>'
+
+    # maximum number of transpiled scripts kept in cache
+    CACHE_SIZE=16
+
+    # above these limits, AST are not transpiled (python compiler have
+    # limits for nested blocks and parenthesis)
+    MAX_INDENT=50
+    MAX_LOOP_DEPTH=16
+    MAX_EXPRESSION_DEPTH=50
+
+    __cache={}
+
+    @staticmethod
+    def astItems(astRoot):
+        """Return a list of all AST items from given `astRoot`
+
+        Order is always the same for a given AST structure: generated code
+        refers to AST items through their index in list
+        """
+        returned=[]
+        toProcess=[astRoot]
+        while len(toProcess)>0:
+            item=toProcess.pop()
+            returned.append(item)
+            toProcess.extend(reversed([node for node in item.nodes() if isinstance(node, ASTItem)]))
+        return returned
+
+    @staticmethod
+    def transpile(astRoot, scriptHash=None):
+        """Return a <BSTranspiledScript> for given `astRoot`
+
+        If `scriptHash` is provided, transpiled script is cached: a script
+        with the same hash is not transpiled again
+        """
+        if scriptHash is None:
+            return BSTranspiler(astRoot).transpiledScript()
+
+        # most recently used script is moved at the end of cache
+        transpiled=BSTranspiler.__cache.pop(scriptHash, None)
+        if transpiled is None:
+            transpiled=BSTranspiler(astRoot).transpiledScript()
+        BSTranspiler.__cache[scriptHash]=transpiled
+
+        while len(BSTranspiler.__cache)>BSTranspiler.CACHE_SIZE:
+            BSTranspiler.__cache.pop(next(iter(BSTranspiler.__cache)))
+
+        return transpiled
+
+    def __init__(self, astRoot):
+        if not isinstance(astRoot, ASTItem):
+            raise EInvalidType("Given `astRoot` must be <ASTItem>")
+
+        self.__astRoot=astRoot
+        self.__astItems=BSTranspiler.astItems(astRoot)
+        self.__astIndexes={id(item): index for index, item in enumerate(self.__astItems)}
+
+        # generated lines, as tuple (text, AST index)
+        self.__prologue=[]
+        self.__lines=[]
+        self.__definedNames=set()
+        self.__slotNames={}
+        self.__indent=0
+        self.__loopDepth=0
+        self.__expressionDepth=0
+
+    def __index(self, ast):
+        """Return index of given `ast` in AST items list"""
+        return self.__astIndexes[id(ast)]
+
+    def __emit(self, text, ast):
+        """Add a python line generated from given `ast`"""
+        self.__lines.append(('    '*self.__indent+text, self.__index(ast)))
+
+    def __define(self, name, text, ast):
+        """Define a global `name` initialised once with python expression `text`, and return name"""
+        if not name in self.__definedNames:
+            self.__definedNames.add(name)
+            self.__prologue.append((f'{name}={text}', self.__index(ast)))
+        return name
+
+    def __variableSlot(self, name, ast):
+        """Return python name of slot index for variable `name`"""
+        name=name.lower()
+        if not name in self.__slotNames:
+            self.__slotNames[name]=len(self.__slotNames)
+        return self.__define(f'_s{self.__slotNames[name]}', f'_slot({name!r})', ast)
+
+    def __fallback(self, ast):
+        """Return python expression executing given `ast` through compiled functions"""
+        index=self.__index(ast)
+        return self.__define(f'_c{index}', f'_compile(_ast[{index}])', ast)+'()'
+
+    def transpiledScript(self):
+        """Return a <BSTranspiledScript> for AST"""
+        self.__lines=[]
+
+        macros=[]
+        for ast in self.__astItems:
+            if ast.id()=='Flow_Define_Macro':
+                scriptBlock=None
+                for item in ast.nodes()[1:]:
+                    if not isinstance(item, Token):
+                        scriptBlock=item
+                if isinstance(scriptBlock, ASTItem):
+                    macros.append(scriptBlock)
+
+        for scriptBlock in macros:
+            self.__emit(f'def _macro{self.__index(scriptBlock)}(_name, _localVariables):', scriptBlock)
+            self.__indent+=1
+            self.__emit(f'return {self.__scriptBlock(scriptBlock, True, "_name", "_localVariables")}', scriptBlock)
+            self.__indent-=1
+
+        self.__emit('_macros={'+', '.join([f'_ast[{self.__index(scriptBlock)}]: _macro{self.__index(scriptBlock)}' for scriptBlock in macros])+'}', self.__astRoot)
+
+        self.__emit('def _main():', self.__astRoot)
+        self.__indent+=1
+        # initialise reserved 'constant' variables
+        predefinedVariables=[
+                (':math.pi', repr(math.pi)),
+                (':math.e', repr(math.e)),
+                (':math.phi', '1.618033988749895')
+            ]
+        self.__emit(f'return {self.__scriptBlock(self.__astRoot, True, repr("Main script"), predefinedVariables)}', self.__astRoot)
+        self.__indent-=1
+
+        lines=self.__prologue+self.__lines
+        source='\n'.join([text for text, index in lines])+'\n'
+        lineMap=[(index, self.__astItems[index].position()['from']['row']) for text, index in lines]
+        return BSTranspiledScript(source, lineMap)
+
+    def __scriptBlock(self, ast, allowLocalVariable, name, localVariables, pushScriptBlock=True):
+        """Emit code executing script block `ast`
+
+        Given `name` is a python expression
+        Given `localVariables` is a list of tuple (variable name, python expression)
+        or a python expression returning a dictionary
+
+        If `pushScriptBlock` is False, script block is already pushed in stack
+        (loops reuse the same script block for all iterations)
+
+        Return python expression for value returned by script block
+        """
+        index=self.__index(ast)
+
+        statements=[]
+        for item in ast.nodes():
+            if ast.id()==ASTSpecialItemType.ROOT and item.id()=='ScriptBlock':
+                # we are in a special case, still in main script block
+                # returned values are ignored
+                statements+=[(subItem, False) for subItem in item.nodes()]
+            else:
+                statements.append((item, True))
+
+        # when a statement can return a value, script block execution stops
+        # loop is used to be able to exit script block with a break
+        canReturn=any([checkReturn and not self.__isFlow(item) for item, checkReturn in statements])
+
+        self.__emit(f"_verboseScriptBlock('Enter', {name}, _ast[{index}])", ast)
+        if pushScriptBlock:
+            self.__emit(f'_stack.push(_ast[{index}], {allowLocalVariable}, {name})', ast)
+
+            if allowLocalVariable:
+                # automatically save painter state
+                self.__emit('_renderer.pushState()', ast)
+
+        # create local variables if any provided before starting block execution
+        if isinstance(localVariables, list):
+            if localVariables:
+                slots=self.__define(f'_ls{index}', f"({', '.join([self.__variableSlot(variableName, ast) for variableName, value in localVariables])},)", ast)
+                self.__emit(f"_setLocalVariables({slots}, ({', '.join([value for variableName, value in localVariables])},))", ast)
+        else:
+            self.__emit(f'for _variableName, _variableValue in {localVariables}.items():', ast)
+            self.__emit('    _stack.setVariable(_variableName, _variableValue, _LOCAL)', ast)
+
+        if canReturn:
+            returned=f'_r{index}'
+            self.__emit(f'{returned}=None', ast)
+            self.__emit('while True:', ast)
+            self.__indent+=1
+            self.__loopDepth+=1
+        else:
+            returned='None'
+
+        for item, checkReturn in statements:
+            if checkReturn and canReturn:
+                self.__statement(item, returned)
+                if not self.__isFlow(item):
+                    # when a value is returned, that's a RETURN flow
+                    self.__emit(f'if not {returned} is None:', item)
+                    self.__emit('    break', item)
+            else:
+                self.__statement(item, None)
+
+        if canReturn:
+            self.__emit('break', ast)
+            self.__indent-=1
+            self.__loopDepth-=1
+
+        if pushScriptBlock:
+            if allowLocalVariable:
+                self.__emit('_renderer.popState()', ast)
+
+            self.__emit('_stack.pop()', ast)
+
+        self.__emit(f"_verboseScriptBlock('Exit', {name}, _ast[{index}])", ast)
+
+        return returned
+
+    def __isFlow(self, ast):
+        """Return True if given `ast` is transpiled as a flow that never return value"""
+        if self.__indent>BSTranspiler.MAX_INDENT:
+            return False
+
+        astId=ast.id()
+        nbNodes=ast.countNodes()
+        if astId=='Flow_Set_Variable':
+            return nbNodes==3
+        elif astId=='Flow_If':
+            return nbNodes in (2, 3)
+        elif astId=='Flow_Repeat':
+            # native loop + loop used for return
+            return nbNodes==2 and self.__loopDepth+2<=BSTranspiler.MAX_LOOP_DEPTH
+        elif astId=='Flow_ForEach':
+            return nbNodes==3 and self.__loopDepth+2<=BSTranspiler.MAX_LOOP_DEPTH
+        elif astId=='Flow_Define_Macro':
+            return True
+        return False
+
+    def __statement(self, ast, returned):
+        """Emit code executing statement `ast`
+
+        If `returned` is provided, value returned by statement (if any) is
+        stored into python variable `returned`
+        """
+        index=self.__index(ast)
+        astId=ast.id()
+
+        if self.__isFlow(ast):
+            if astId=='Flow_Set_Variable':
+                if ast.node(0).value()=='set variable':
+                    scope='_CURRENT'
+                else:
+                    scope='_GLOBAL'
+                variableName=ast.node(1).value()
+                self.__emit(f'_setVariable(_ast[{index}], {variableName!r}, {self.__expression(ast, 2)}, {scope}, {self.__variableSlot(variableName, ast)})', ast)
+            elif astId=='Flow_If':
+                self.__flowIfElseIf(ast, 'if')
+            elif astId=='Flow_Repeat':
+                self.__flowRepeat(ast)
+            elif astId=='Flow_ForEach':
+                self.__flowForEach(ast)
+            else:
+                self.__emit(self.__fallback(ast), ast)
+            return
+
+        if astId=='Flow_Return' and ast.countNodes() in (0, 1) and self.__indent<=BSTranspiler.MAX_INDENT:
+            if ast.countNodes()==0:
+                value='False'
+            else:
+                value=self.__expression(ast, 0)
+            text=f'_flowReturn(_ast[{index}], {value})'
+        elif astId=='Flow_Call_Macro' and ast.countNodes()>=1 and self.__indent<=BSTranspiler.MAX_INDENT:
+            text=self.__flowCallMacro(ast)
+        else:
+            text=self.__fallback(ast)
+
+        if returned is None:
+            self.__emit(text, ast)
+        else:
+            self.__emit(f'{returned}={text}', ast)
+
+    def __flowIfElseIf(self, ast, mode):
+        """Emit code for if <condition> then"""
+        index=self.__index(ast)
+
+        self.__emit(f'if _condition({self.__expression(ast, 0)}):', ast)
+        self.__indent+=1
+        self.__emit(f'_verbose({mode+" (condition validated) then ..."!r}, _ast[{index}])', ast)
+        self.__scriptBlock(ast.node(1), False, repr(f'{mode} (ON) then (Execute statement)'), [])
+        self.__indent-=1
+
+        self.__emit('else:', ast)
+        self.__indent+=1
+        if ast.countNodes()==3:
+            # else or else if
+            astElse=ast.node(2)
+            if astElse.id()=='Flow_ElseIf':
+                self.__emit(f'_verbose({mode+" (condition not validated) then ... else if (...)"!r}, _ast[{index}])', ast)
+                if astElse.countNodes() in (2, 3) and self.__indent<=BSTranspiler.MAX_INDENT:
+                    self.__flowIfElseIf(astElse, 'else if')
+                else:
+                    self.__emit(self.__fallback(astElse), astElse)
+            else:
+                self.__emit(f'_verbose({mode+" (condition not validated) then ... else"!r}, _ast[{index}])', ast)
+                if astElse.id()=='Flow_Else' and astElse.countNodes()==1:
+                    self.__emit(f"_verbose('else ...', _ast[{self.__index(astElse)}])", astElse)
+                    self.__scriptBlock(astElse.node(0), False, repr('else'), [])
+                else:
+                    self.__emit(self.__fallback(astElse), astElse)
+        else:
+            self.__emit(f'_verbose({mode+" (condition not validated) then ..."!r}, _ast[{index}])', ast)
+        self.__indent-=1
+
+    def __flowRepeat(self, ast):
+        """Emit code for repeat <COUNT> times"""
+        index=self.__index(ast)
+        count=f'_n{index}'
+        current=f'_i{index}'
+        angle=f'_a{index}'
+        incAngle=f'_inc{index}'
+        name=f'_name{index}'
+
+        self.__emit(f'{count}=_repeatCount(_ast[{index}], {self.__expression(ast, 0)})', ast)
+        self.__emit(f'if not {count} is None:', ast)
+        self.__indent+=1
+        self.__emit(f"{name}=f'repeat {{{count}}} times'", ast)
+        self.__emit(f'if {count}>0:', ast)
+        self.__emit(f'    {incAngle}=360/{count}', ast)
+        self.__emit('else:', ast)
+        self.__emit(f'    {incAngle}=0', ast)
+        self.__emit(f'{angle}=0', ast)
+        # loop script block is pushed once and reused for all iterations
+        self.__emit(f'_stack.push(_ast[{self.__index(ast.node(1))}], False, {name})', ast)
+        self.__emit(f'for {current} in range({count}):', ast)
+        self.__indent+=1
+        self.__loopDepth+=1
+        # define loop variable
+        self.__scriptBlock(ast.node(1), False, name, [
+                (':repeat.totalIteration', count),
+                (':repeat.currentIteration', f'{current}+1'),
+                (':repeat.isFirstIteration', f'({current}==0)'),
+                (':repeat.isLastIteration', f'({current}=={count}-1)'),
+                (':repeat.incAngle', incAngle),
+                (':repeat.currentAngle', angle)
+            ], False)
+        self.__emit(f'{angle}+={incAngle}', ast)
+        self.__indent-=1
+        self.__loopDepth-=1
+        self.__emit('_stack.pop()', ast)
+        self.__indent-=1
+
+    def __flowForEach(self, ast):
+        """Emit code for for each <variable> in <list>"""
+        index=self.__index(ast)
+        values=f'_l{index}'
+        value=f'_v{index}'
+        count=f'_n{index}'
+        current=f'_i{index}'
+        angle=f'_a{index}'
+        incAngle=f'_inc{index}'
+        name=f'_name{index}'
+        forVarName=ast.node(1).value()
+
+        self.__emit(f'{values}, {name}=_forEachList(_ast[{index}], {self.__expression(ast, 0)}, {forVarName!r})', ast)
+        self.__emit(f'{count}=len({values})', ast)
+        self.__emit(f'if {count}>0:', ast)
+        self.__emit(f'    {incAngle}=360/{count}', ast)
+        self.__emit('else:', ast)
+        self.__emit(f'    {incAngle}=0', ast)
+        self.__emit(f'{angle}=0', ast)
+        # loop script block is pushed once and reused for all iterations
+        self.__emit(f'_stack.push(_ast[{self.__index(ast.node(2))}], False, {name})', ast)
+        self.__emit(f'for {current}, {value} in enumerate({values}):', ast)
+        self.__indent+=1
+        self.__loopDepth+=1
+        # define loop variable
+        self.__scriptBlock(ast.node(2), False, name, [
+                (':foreach.totalIteration', count),
+                (':foreach.currentIteration', f'{current}+1'),
+                (':foreach.isFirstIteration', f'({current}==0)'),
+                (':foreach.isLastIteration', f'({current}=={count}-1)'),
+                (':foreach.incAngle', incAngle),
+                (':foreach.currentAngle', angle),
+                (forVarName, value)
+            ], False)
+        self.__emit(f'{angle}+={incAngle}', ast)
+        self.__indent-=1
+        self.__loopDepth-=1
+        self.__emit('_stack.pop()', ast)
+
+    def __flowCallMacro(self, ast):
+        """Return python expression for call macro"""
+        index=self.__index(ast)
+        macroName=None
+        values=[]
+        storeResultName=None
+        for nodeIndex, node in enumerate(ast.nodes()):
+            if nodeIndex==0:
+                macroName=self.__expression(ast, 0)
+            elif isinstance(node, ASTItem) and node.id()=='Flow_Call_Macro__storeResult':
+                storeResultName=node.nodes()[0].value()
+            else:
+                values.append(self.__expression(ast, nodeIndex))
+
+        return f"_flowCallMacro(_ast[{index}], {macroName}, [{', '.join(values)}], {storeResultName!r}, _executeMacro)"
+
+    def __expression(self, parent, nodeIndex):
+        """Return python expression evaluating node `nodeIndex` of `parent` AST"""
+        item=parent.node(nodeIndex)
+
+        if isinstance(item, Token):
+            if item.type() in (BSLanguageDef.ITokenType.VARIABLE_USER, BSLanguageDef.ITokenType.VARIABLE_RESERVED):
+                # get variable value
+                return f'_variable({self.__variableSlot(item.value(), parent)})'
+            value=item.value()
+        elif isinstance(item, ASTItem):
+            if self.__expressionDepth>=BSTranspiler.MAX_EXPRESSION_DEPTH:
+                return self.__fallback(item)
+
+            self.__expressionDepth+=1
+            returned=self.__astExpression(item)
+            self.__expressionDepth-=1
+            return returned
+        else:
+            # a str, int, float, .... provided directly
+            value=item
+
+        if type(value) in (bool, int, str) or value is None or type(value) is float and math.isfinite(value):
+            return repr(value)
+
+        # other values (colors, ...) are read from AST once
+        parentIndex=self.__index(parent)
+        return self.__define(f'_k{parentIndex}_{nodeIndex}', f'_ast[{parentIndex}].node({nodeIndex}).value()', parent)
+
+    def __astExpression(self, ast):
+        """Return python expression evaluating given `ast`"""
+        index=self.__index(ast)
+        astId=ast.id()
+        nbNodes=ast.countNodes()
+
+        if astId=='String_Value':
+            # value can't change
+            return repr(''.join([item.value() for item in ast.nodes()]))
+        elif astId=='List_Value':
+            return '['+', '.join([self.__expression(ast, nodeIndex) for nodeIndex in range(nbNodes)])+']'
+        elif astId in ('Evaluation_Expression_Parenthesis', 'List_Index_Expression') and nbNodes>=1:
+            return f'({self.__expression(ast, 0)})'
+        elif astId=='Function' and nbNodes>=1:
+            # execution definition is resolved before arguments are evaluated
+            values=', '.join([self.__expression(ast, nodeIndex) for nodeIndex in range(1, nbNodes)])
+            return f'_callFunction(_ast[{index}], _functionExecution(_ast[{index}]), [{values}])'
+        elif astId==ASTSpecialItemType.UNARY_OPERATOR and nbNodes==2:
+            applyOperator=self.__define(f'_u{index}', f'_unaryOperator(_ast[{index}])', ast)
+            return f'{applyOperator}({self.__expression(ast, 1)})'
+        elif astId==ASTSpecialItemType.BINARY_OPERATOR and nbNodes==3:
+            applyOperator=self.__define(f'_o{index}', f'_binaryOperator(_ast[{index}])', ast)
+            return f'{applyOperator}({self.__expression(ast, 1)}, {self.__expression(ast, 2)})'
+        elif astId==ASTSpecialItemType.INDEX_OPERATOR and nbNodes==2:
+            return f'_indexValue(_ast[{index}], {self.__expression(ast, 0)}, {self.__expression(ast, 1)})'
+
+        return self.__fallback(ast)
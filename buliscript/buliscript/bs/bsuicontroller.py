@@ -64,6 +64,10 @@ from .bssettings import (
     )
 
 from buliscript.pktk.modules.tokenizer import TokenizerRule
+from buliscript.pktk.modules.parser import (
+        BackgroundParser,
+        ParserCache
+    )
 from buliscript.pktk.modules.uitheme import UITheme
 from buliscript.pktk.modules.utils import (
         checkKritaVersion,
@@ -134,7 +138,7 @@ class BSUIController(QObject):
         self.__bsCachePath = os.path.join(QStandardPaths.writableLocation(QStandardPaths.CacheLocation), "buliscript")
         try:
             os.makedirs(self.__bsCachePath, exist_ok=True)
-            for subDirectory in ['documents']:
+            for subDirectory in ['documents', 'ast']:
                 os.makedirs(self.cachePath(subDirectory), exist_ok=True)
         except Exception as e:
             Debug.print('[BSUIController.__init__] Unable to create directory {0}: {1}', self.cachePath(subDirectory), str(e))
@@ -159,6 +163,22 @@ class BSUIController(QObject):
         self.__renderedScene=BSWRendererScene()
 
         self.__interpreter=BSInterpreter(self.__languageDef, self.__renderedScene)
+        self.__interpreter.setOptionCompileMode(BSSettings.get(BSSettingsKey.CONFIG_EXECUTION_MODE)=='compiled')
+        self.__interpreter.setOptionTranspileMode(BSSettings.get(BSSettingsKey.CONFIG_EXECUTION_MODE)=='transpiled')
+        self.__interpreter.executionStarted.connect(self.updateMenu)
+        self.__interpreter.executionFinished.connect(self.updateMenu)
+
+        # parsed scripts are kept in cache, to avoid to parse them again
+        if BSSettings.get(BSSettingsKey.CONFIG_CACHE_AST_MAXSIZE)>0:
+            try:
+                self.__interpreter.setParserCache(ParserCache(self.cachePath('ast'), BSSettings.get(BSSettingsKey.CONFIG_CACHE_AST_MAXSIZE)*1048576))
+            except Exception as e:
+                Debug.print('[BSUIController.__init__] Unable to initialise parser cache {0}: {1}', self.cachePath('ast'), str(e))
+
+        # current document is parsed in background while edited, to display syntax errors in editor
+        # (grammar rules can't be shared between parsers: background parser use its own language definition)
+        self.__backgroundParser=BackgroundParser(BSInterpreter.newParser(BSLanguageDef()))
+        self.__backgroundParser.parsed.connect(self.__backgroundParsed)
 
         if kritaIsStarting and BSSettings.get(BSSettingsKey.CONFIG_OPEN_ATSTARTUP):
             self.start()
@@ -395,6 +415,41 @@ class BSUIController(QObject):
         self.__currentDocument=document
         self.updateMenu()
 
+        if document:
+            if document.codeEditor().property('__bsBackgroundParsed')!=True:
+                document.codeEditor().textChanged.connect(lambda: self.__documentModified(document))
+                document.codeEditor().setProperty('__bsBackgroundParsed', True)
+            self.__documentModified(document)
+
+    def __documentModified(self, document):
+        """Content of a document has been modified, parse it in background if it's current document"""
+        if document==self.__currentDocument:
+            self.__backgroundParser.parse(BSInterpreter.scriptToParse(document.codeEditor().toPlainText()))
+
+    def __backgroundParsed(self, text, ast, errors):
+        """Background parsing is finished, display errors in current document"""
+        if self.__currentDocument is None:
+            return
+
+        codeEditor=self.__currentDocument.codeEditor()
+        if BSInterpreter.scriptToParse(codeEditor.toPlainText())!=text:
+            # parsed text is not current document content
+            return
+
+        diagnostics=[]
+        nbRows=codeEditor.blockCount()
+        for error in errors:
+            token=error.errorToken()
+            if token is None:
+                continue
+
+            if token.row()>nbRows:
+                # error on text added at end of script: display it at end of last row
+                diagnostics.append((nbRows, len(codeEditor.document().lastBlock().text())+1, 0, error.errorMessage()))
+            else:
+                diagnostics.append((token.row(), token.column(), token.length(), error.errorMessage()))
+        codeEditor.setDiagnostics(diagnostics)
+
     def __checkKritaWindows(self):
         """Check if windows signal windowClosed() is already defined and, if not,
         define it
@@ -429,7 +484,7 @@ class BSUIController(QObject):
     def __updateMenuEditPaste(self):
         """Update menu Edit > Paste according to clipboard content"""
         if self.__currentDocument:
-            scriptIsRunning=False
+            scriptIsRunning=self.__interpreter.running()
             self.__window.actionEditPaste.setEnabled(self.__currentDocument.codeEditor().canPaste() and not (scriptIsRunning or self.__currentDocument.readOnly()))
 
     def updateMenu(self):
@@ -438,7 +493,7 @@ class BSUIController(QObject):
             # no active document? does nothing
             return
 
-        scriptIsRunning=False
+        scriptIsRunning=self.__interpreter.running()
         cursor=self.__currentDocument.codeEditor().cursorPosition()
 
         # Menu FILE
@@ -473,8 +528,8 @@ class BSUIController(QObject):
 
         # Menu SCRIPT
         # ----------------------------------------------------------------------
-        self.__window.actionScriptExecute.setEnabled(not scriptIsRunning)
-        self.__window.actionScriptBreakPause.setEnabled(scriptIsRunning)
+        self.__window.actionScriptExecute.setEnabled(not scriptIsRunning or self.__interpreter.paused())
+        self.__window.actionScriptBreakPause.setEnabled(not scriptIsRunning or self.__interpreter.pausable())
         self.__window.actionScriptStop.setEnabled(scriptIsRunning)
 
         # Menu VIEW
@@ -628,6 +683,8 @@ class BSUIController(QObject):
         if not self.__bsStarted:
             return
 
+        self.__backgroundParser.stop()
+
         for document in self.__window.documents().documents():
             document.saveCache()
 
@@ -894,8 +951,11 @@ class BSUIController(QObject):
             self.__currentDocument.codeEditor().selectAll()
 
 
-    def commandScriptExecute(self):
-        """Execute script"""
+    def __scriptStart(self, debugMode=False):
+        """Start execution of current script
+
+        In `debugMode`, execution is paused before first instruction
+        """
         def fmtAstLocation(ast):
             if ast:
                 position=ast.position()['from']['row']
@@ -912,7 +972,7 @@ class BSUIController(QObject):
                 self.__dwConsoleOutput.console().clear()
 
             try:
-                returned=self.__interpreter.setScript(self.__currentDocument.codeEditor().toPlainText())
+                self.__interpreter.setScript(self.__currentDocument.codeEditor().toPlainText())
             except EInterpreterInternalError as e:
                 self.__interpreter.error(f" *##lr#**INTERNAL ERROR**:# #r#*{str(e)}*#{fmtAstLocation(e.ast())}\n**Traceback:**\n{traceback.format_exc()}", e.ast())
                 return
@@ -928,31 +988,60 @@ class BSUIController(QObject):
                 self.__interpreter.error(f" *##lr#**PYTHON ERROR**:# #r#*{str(e)}\n *##lr#**Traceback:*\n{traceback.format_exc()}")
                 return
 
-            try:
-                returned=self.__interpreter.execute()
-            except EInterpreterInternalError as e:
-                self.__interpreter.error(f" *##lr#**INTERNAL ERROR**:# #r#*{str(e)}\n *##lr#**Traceback:**\n{traceback.format_exc()}", e.ast())
-                return
-            except EInterpreter as e:
-                if e.errorLevel()==EInterpreter.ERROR_LEVEL_STOP:
-                    self.__interpreter.valid(f" *##lg#**SCRIPT EXECUTION STOPPED**:# #g#*{str(e)}", e.ast())
-                    print(e.ast())
-                else:
-                    self.__interpreter.error(f" *##lr#**SCRIPT EXECUTION IN ERROR**:# #r#*{str(e)}", e.ast())
-                    print(e.ast())
-                return
-            except Exception as e:
-                self.__interpreter.error(f" *##lr#**PYTHON ERROR**:# #r#*{str(e)}\n *##lr#**Traceback:**\n{traceback.format_exc()}")
-                return
+            self.__interpreter.setOptionDebugMode(debugMode)
+            self.__scriptExecution(self.__interpreter.execute)
+
+    def __scriptExecution(self, execution):
+        """Call given interpreter `execution` method (execute, resume, ...)
+
+        Execution errors are printed in console
+        """
+        try:
+            execution()
+        except EInterpreterInternalError as e:
+            self.__interpreter.error(f" *##lr#**INTERNAL ERROR**:# #r#*{str(e)}\n *##lr#**Traceback:**\n{traceback.format_exc()}", e.ast())
+        except EInterpreter as e:
+            if e.errorLevel()==EInterpreter.ERROR_LEVEL_STOP:
+                self.__interpreter.valid(f" *##lg#**SCRIPT EXECUTION STOPPED**:# #g#*{str(e)}", e.ast())
+                print(e.ast())
+            else:
+                self.__interpreter.error(f" *##lr#**SCRIPT EXECUTION IN ERROR**:# #r#*{str(e)}", e.ast())
+                print(e.ast())
+        except Exception as e:
+            self.__interpreter.error(f" *##lr#**PYTHON ERROR**:# #r#*{str(e)}\n *##lr#**Traceback:**\n{traceback.format_exc()}")
 
+        # execution might be paused
+        self.updateMenu()
+
+    def commandScriptExecute(self):
+        """Execute script
+
+        If script execution is paused, execution is continued
+        """
+        if self.__interpreter.paused():
+            self.__scriptExecution(self.__interpreter.resume)
+        elif not self.__interpreter.running():
+            self.__scriptStart()
 
     def commandScriptBreakPause(self):
-        """Made Break/Pause in script execution"""
-        print("TODO: implement commandScriptBreakPause")
+        """Made Break/Pause in script execution
+
+        - If script is not running, execution is started step by step
+        - If script is running, execution is paused before next instruction
+        - If script is paused, next instruction is executed
+        """
+        if self.__interpreter.paused():
+            self.__scriptExecution(self.__interpreter.executeNext)
+        elif not self.__interpreter.running():
+            self.__scriptStart(True)
+        elif self.__interpreter.pausable():
+            # pause is applied when current instruction is finished
+            self.__interpreter.pause()
 
     def commandScriptStop(self):
         """Stop script execution"""
-        print("TODO: implement commandScriptStop")
+        if self.__interpreter.running():
+            self.__scriptExecution(self.__interpreter.stop)
 
     def commandScriptGoToLine(self, lineNumber, document=None):
         """Scroll to line number"""
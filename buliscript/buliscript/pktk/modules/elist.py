@@ -111,9 +111,7 @@ class EList(object):
             self.__index = 0
             return self.value()
         else:
-            if len(self.__list) > 0:
-                return self.__list[0]
-            return None
+            return self.value(0)
 
     def last(self, move=True):
         """Move to last item and return value
@@ -124,9 +122,7 @@ class EList(object):
             self.__index = len(self.__list) - 1
             return self.value()
         else:
-            if len(self.__list) > 0:
-                return self.__list[len(self.__list) - 1]
-            return None
+            return self.value(len(self.__list) - 1)
 
     def eol(self):
         """Return True if End Of list has been reached"""
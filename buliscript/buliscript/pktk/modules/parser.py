@@ -21,6 +21,13 @@
 #       Produce an AST (Abstract Syntax Tree) that have to be interpreted
 #       (there's no generic interpreter provided)
 #
+# - ParserCache
+#       Persistent (on disk) cache for parser results
+#
+# - BackgroundParser
+#       Parse text in a background thread, with debounce and cancellation
+#       (to check text while it's edited)
+#
 # - ASTItem
 #       Base for AST
 #       (root of AST is an ASTItem, childrens are ASTItem)
@@ -38,15 +45,37 @@
 # -----------------------------------------------------------------------------
 
 # import random#-- for debug only
+import base64
 import hashlib
+import json
+import os
+import threading
+import time
+from array import array
+from bisect import (
+        bisect_left,
+        bisect_right
+    )
 from enum import Enum
 
 from PyQt5.Qt import *
-from PyQt5.QtCore import qDebug
+from PyQt5.QtCore import (
+        pyqtSignal as Signal,
+        qDebug,
+        QRunnable,
+        QThreadPool,
+        QTimer
+    )
 
 from .elist import EList
+from .utils import Debug
+from .strtable import (
+        TextTable,
+        TextTableSettingsText
+    )
 from .tokenizer import (
         Token,
+        Tokens,
         Tokenizer,
         TokenizerRule,
         TokenType
@@ -55,9 +84,21 @@ from .tokenizer import (
 from ..pktk import *
 
 
+class EParserCancelled(Exception):
+    """Raised by grammar objects when parsing has been cancelled"""
+    pass
+
+
 class Parser:
     """Generic language parser"""
 
+    # default maximum number of results kept in packrat cache during parsing
+    PACKRAT_MAX_ENTRIES = 250000
+
+    # default minimum parsing duration (in seconds) for which results are stored in persistent cache
+    # (results from faster parsing are not worth to be stored)
+    CACHE_MIN_DURATION = 0.1
+
     def __init__(self, tokenizer, grammarRules):
         """Initialise parser
 
@@ -72,6 +113,8 @@ class Parser:
         self.__tokenizer = tokenizer
         # tokenized text
         self.__tokens = None
+        # significant tokens from tokenized text, walked by grammar rules
+        self.__parserTokens = None
 
         # list of token that are ignored during parsing (usually, spaces & comments)
         self.__ignoredTokens = []
@@ -90,20 +133,155 @@ class Parser:
         # store errors encountered during parsing (syntax not match grammar)
         self.__errors = []
 
+        # packrat cache: results of grammar rules checks, for a token index
+        # key=(grammar rule id, token index), value=(ASTItem, token index after check, errors, ...)
+        # (avoid to check again a grammar rule at the same token index when parser backtracks)
+        self.__packratEnabled = False
+        self.__packratMaxEntries = Parser.PACKRAT_MAX_ENTRIES
+        self.__packratCache = {}
+
+        # number of alternatives not checked during parsing, because current
+        # token can't be the first token of alternative (see GrammarRules.check())
+        self.__alternativesSkipped = 0
+
+        # persistent cache for parser results (None if not used)
+        self.__cache = None
+        self.__cacheMinDuration = Parser.CACHE_MIN_DURATION
+
+        # incremental parsing: items matched by loops (GROneOrMore, GRNoneOrMore) and starting
+        # a line are recorded during parsing, and are reused by next parsing if their tokens
+        # haven't been modified
+        self.__incremental = False
+        # records from last parsing (None if nothing recorded), a list of records (one record per loop check):
+        # (loop object, starts, ends, nodes before, nodes after, spans start, spans end, loop AST nodes, breaks)
+        # with, for each item, token indexes (start/end), number of loop AST nodes (before/after item)
+        # and first/last tokens; breaks are items that don't start where previous item ends
+        self.__loopRecords = None
+        # records that can be reused during current parsing
+        # key=loop object, value=list of (record, number of reusable items from start, first reusable item from end, token index offset)
+        self.__loopReuse = None
+        # number of items reused during last parsing
+        self.__reusedItems = 0
+
+        # profiling: statistics about grammar rules checked during parsing
+        self.__profiling = False
+        # key=grammar rule id, value=[attempts, cached, matches, no matches, partial matches, tokens, time, self time]
+        self.__profile = {}
+        # time spent in checked sub-rules, for each grammar rule being checked
+        self.__profileChildTime = []
+
+        # parsing can be cancelled from another thread
+        self.__mutex = QMutex()
+        self.__parsing = False
+        self.__cancelRequested = False
+
+    def __cacheKey(self, hashText):
+        """Return key in persistent cache for text for which SHA1 is given `hashText`
+
+        Key depends of text and of parser definition (tokenizer, grammar rules, ignored tokens)
+        """
+        key = hashlib.sha1()
+        key.update(f"{hashText}|{self.fingerprint()}".encode())
+        return key.hexdigest()
+
+    def __cacheLoad(self, text, hashText):
+        """Load tokens, AST and errors for given `text` from persistent cache
+
+        Return True if found in cache, otherwise False
+        """
+        data = self.__cache.get(self.__cacheKey(hashText))
+        if data is None:
+            return False
+
+        try:
+            tokensData, indent, indentPosition, unknownIndex, astData, errorsData = data
+
+            tokensData = tuple(tokensData)
+            if len(tokensData) != 6 or any(not isinstance(values, array) or len(values) != len(tokensData[0]) for values in tokensData):
+                return False
+
+            tokens = self.__tokenizer.tokensFromData(text, tokensData, indent, indentPosition, unknownIndex)
+            ast = ASTItem.importData(astData, tokens, self.__grammarRules)
+            errors = []
+            for errorMsg, tokenIndex, grammarRuleId, errorAstData in errorsData:
+                errors.append(ParserError(errorMsg,
+                                          None if tokenIndex is None else tokens.value(tokenIndex),
+                                          None if grammarRuleId is None else GRRule(grammarRuleId),
+                                          None if errorAstData is None else ASTItem.importData(errorAstData, tokens, self.__grammarRules)))
+        except Exception as e:
+            # invalid content
+            Debug.print('[Parser.__cacheLoad] Invalid cache content: {0}', f"{e}")
+            return False
+
+        self.__tokens = tokens
+        self.__parserTokens = ParserTokens(self.__tokens, self.__ignoredTokens)
+        self.__parserTokens.first()
+        self.__ast = ast
+        self.__errors = errors
+        self.__alternativesSkipped = 0
+        self.__loopRecords = None
+        self.__reusedItems = 0
+        return True
+
+    def __cacheSave(self, hashText):
+        """Save tokens, AST and errors from last parsing in persistent cache"""
+        try:
+            errorsData = []
+            for error in self.__errors:
+                grammarRule = error.errorGrammarRule()
+                errorsData.append((error.errorMessage(),
+                                   None if error.errorToken() is None else error.errorToken().index(),
+                                   grammarRule.id() if isinstance(grammarRule, (GRRule, GrammarRule)) else None,
+                                   None if error.errorAst() is None else error.errorAst().exportData()))
+
+            data = (self.__tokens.tokensData(),
+                    self.__tokens.indent(),
+                    self.__tokens.indentPosition(),
+                    self.__tokens.unknownIndex(),
+                    self.__ast.exportData(),
+                    errorsData)
+        except Exception as e:
+            # AST can't be exported (too deep, unexpected item...): not cached
+            Debug.print('[Parser.__cacheSave] Unable to export parsed text: {0}', f"{e}")
+            return
+        # stored from a background thread: files are written without blocking parser thread
+        self.__cache.setAsync(self.__cacheKey(hashText), data)
+
+    def __buildLoopReuse(self):
+        """Return records from previous parsing that can be reused for current parsing
+
+        An item can be reused if all tokens from item, and from next item (tokens after
+        item can have been read to check it), are in unmodified tokens
+        """
+        prefixLength, suffixIndex, suffixOffset = self.__parserTokens.reusedFrom()
+
+        returned = {}
+        for record in self.__loopRecords:
+            starts, ends = record[1:3]
+
+            # items before modified tokens
+            nbPrefixItems = max(0, bisect_right(ends, prefixLength) - 1)
+            # items after modified tokens
+            if suffixIndex is None:
+                suffixItem = len(starts)
+            else:
+                suffixItem = bisect_left(starts, suffixIndex)
+
+            if nbPrefixItems > 0 or suffixItem < len(starts):
+                returned.setdefault(record[0], []).append((record, nbPrefixItems, suffixItem, suffixOffset))
+        return returned
+
     def __parse(self):
         """Parse given tokens:
             - check grammar according defined GrammarRule rules
             - build AST (Abstract Syntax Tree)
         """
         def checkGrammarRule(id):
-            # retrieve current token
-            token = self.__tokens.value()
-
             # get current grammar rule for given `id`
             currentGrammarRule = self.__grammarRules.get(id)
 
             for grammarObject in currentGrammarRule.grammarList():
-                checked = grammarObject.check(self.__tokens, self.__ignoredTokens, grammarObject, self)
+                checked = grammarObject.check(self.__parserTokens, self.__ignoredTokens, grammarObject, self)
 
                 # print("checkGrammarRule", checked)
                 self.__ast.add(checked)
@@ -115,7 +293,7 @@ class Parser:
                     return
                 elif checked.status() != ASTStatus.MATCH:
                     self.__ast.setStatus(ASTStatus.INVALID)
-                    self.__errors.append(ParserError(i18n("Invalid syntax-NM"), self.__tokens.value(), grammarObject, checked))
+                    self.__errors.append(ParserError(i18n("Invalid syntax-NM"), self.__parserTokens.value(), grammarObject, checked))
                     return
 
                 # #if checked.countNodes() > 0:
@@ -123,28 +301,55 @@ class Parser:
                 # even if valid (example: optional can be valid, because nothing found)
                 # #self.__ast.add(checked)
 
-            if self.__tokens.value() is None:
+            if self.__parserTokens.value() is None:
                 # All tokens have been parsed!
                 self.__ast.setStatus(ASTStatus.MATCH)
             else:
                 # All tokens have not been parsed, that's not a normal case
                 self.__ast.setStatus(ASTStatus.INVALID)
-                self.__errors.append(ParserError(i18n("Unknown syntax"), self.__tokens.value()))
+                self.__errors.append(ParserError(i18n("Unknown syntax"), self.__parserTokens.value()))
 
         # result errors list
         self.__errors = []
 
+        # results from previous parsing can't be used
+        self.__packratCache = {}
+        self.__alternativesSkipped = 0
+
+        self.__profileChildTime = []
+
         # initialise empty AST
         self.__ast = ASTItem(ASTSpecialItemType.ROOT)
 
+        # ignored tokens (spaces, comments, ...) are filtered once
+        # on incremental parsing, significant tokens are reused from previous parsing when possible
+        if self.__incremental and self.__loopRecords is not None and self.__grammarRules.frozen():
+            self.__parserTokens = ParserTokens(self.__tokens, self.__ignoredTokens, self.__parserTokens)
+        else:
+            self.__parserTokens = ParserTokens(self.__tokens, self.__ignoredTokens)
+
+        if self.__parserTokens.reusedFrom() is not None:
+            self.__loopReuse = self.__buildLoopReuse()
+        else:
+            self.__loopReuse = None
+
+        if self.__incremental:
+            self.__loopRecords = []
+        else:
+            self.__loopRecords = None
+        self.__reusedItems = 0
+
         # rewind tokens list to first position
-        self.__tokens.first()
+        self.__parserTokens.first()
 
         # start to check grammar rules for tokens
         # print("------------------------------------------------")
         # print("-- Start                                      --")
         # print("------------------------------------------------")
         checkGrammarRule(self.__grammarRules.idFirst())
+
+        self.__packratCache = {}
+        self.__loopReuse = None
         # print("Tokens\n------\n", self.__tokens)
         # print("AST\n------\n", self.__ast)
         # print("Errors\n------\n", self.__errors)
@@ -152,6 +357,48 @@ class Parser:
         # print("-- End                                        --")
         # print("------------------------------------------------")
 
+    def __parseCancelled(self):
+        """Reset parser after a cancelled parsing
+
+        Partial AST and errors are lost; records from previous parsing that were
+        reusable are kept (remapped to current tokens) for next incremental parsing
+        """
+        self.__hashText = None
+        self.__ast = None
+        self.__errors = []
+        self.__packratCache = {}
+        self.__reusedItems = 0
+
+        if self.__loopReuse is None:
+            self.__loopRecords = None
+            return
+
+        self.__loopRecords = []
+        for reuse in self.__loopReuse.values():
+            for record, nbPrefixItems, suffixItem, offset in reuse:
+                grObject, starts, ends, nodesBefore, nodesAfter, spansStart, spansEnd, nodes, breaks = record
+
+                # items before modified tokens are unchanged, items after modified tokens are shifted
+                remapped = (grObject,
+                            starts[:nbPrefixItems] + [value + offset for value in starts[suffixItem:]],
+                            ends[:nbPrefixItems] + [value + offset for value in ends[suffixItem:]],
+                            nodesBefore[:nbPrefixItems] + nodesBefore[suffixItem:],
+                            nodesAfter[:nbPrefixItems] + nodesAfter[suffixItem:],
+                            spansStart[:nbPrefixItems] + spansStart[suffixItem:],
+                            spansEnd[:nbPrefixItems] + spansEnd[suffixItem:],
+                            nodes,
+                            [item for item in breaks if item < nbPrefixItems])
+
+                if nbPrefixItems > 0 and suffixItem < len(starts):
+                    # removed items: nodes between prefix and suffix items can't be reused
+                    remapped[8].append(nbPrefixItems)
+                remapped[8].extend([item - suffixItem + nbPrefixItems for item in breaks if item > suffixItem])
+
+                if len(remapped[1]) > 0:
+                    self.__loopRecords.append(remapped)
+
+        self.__loopReuse = None
+
     def grammarRules(self):
         """Return GrammarRules used by parser"""
         return self.__grammarRules
@@ -179,6 +426,7 @@ class Parser:
         """Parse given text and build AST (Abstract Syntax Tree)
 
         Once parsed, can be 'executed'
+        Return None if parsing has been cancelled (see cancel())
         """
         NL = '\n'
         if not isinstance(text, str):
@@ -186,14 +434,16 @@ class Parser:
         elif self.__grammarRules.count() == 0:
             raise EInvalidStatus("There's no rules defined for given Grammar rules!")
 
-        checkResult = self.__grammarRules.check()
-        if len(checkResult) > 0:
-            # grammar is not correct?
-            # #print(checkResult)
-            raise EInvalidStatus(f"Current grammar is not complete, some referenced grammar rule are missing:\n {NL.join(checkResult)}")
+        if not self.__grammarRules.frozen():
+            # a frozen grammar has already been checked
+            checkResult = self.__grammarRules.check()
+            if len(checkResult) > 0:
+                # grammar is not correct?
+                # #print(checkResult)
+                raise EInvalidStatus(f"Current grammar is not complete, some referenced grammar rule are missing:\n {NL.join(checkResult)}")
 
-        if self.__grammarRules.idFirst() is None:
-            raise EInvalidStatus(f"Current grammar is not valid: first grammar rule hasn't been defined")
+            if self.__grammarRules.idFirst() is None:
+                raise EInvalidStatus(f"Current grammar is not valid: first grammar rule hasn't been defined")
 
         textHash = hashlib.sha1()
         textHash.update(text.encode())
@@ -201,14 +451,53 @@ class Parser:
 
         if self.__hashText is None or hashText != self.__hashText:
             # if given text hasn't been already parsed
+            # - get it from persistent cache
+            # or
             # - tokenize
             # - parse
             self.__hashText = hashText
-            self.__tokens = self.__tokenizer.tokenize(text)
-            self.__parse()
+            if self.__cache is None or not self.__cacheLoad(text, hashText):
+                self.__mutex.lock()
+                self.__parsing = True
+                self.__cancelRequested = False
+                self.__mutex.unlock()
+                startTime = time.perf_counter()
+                try:
+                    if self.__tokens is None:
+                        self.__tokens = self.__tokenizer.tokenize(text)
+                    else:
+                        # only modified part of text need to be tokenized
+                        self.__tokens = self.__tokenizer.retokenize(self.__tokens, text)
+
+                    self.__parse()
+                except EParserCancelled:
+                    self.__parseCancelled()
+                    return None
+                finally:
+                    self.__mutex.lock()
+                    self.__parsing = False
+                    self.__cancelRequested = False
+                    self.__mutex.unlock()
+
+                if self.__cache is not None and time.perf_counter() - startTime >= self.__cacheMinDuration:
+                    self.__cacheSave(hashText)
 
         return self.__ast
 
+    def cancel(self):
+        """Cancel current parsing, if any
+
+        Can be called from another thread than the one in which text is parsed
+        """
+        self.__mutex.lock()
+        if self.__parsing:
+            self.__cancelRequested = True
+        self.__mutex.unlock()
+
+    def cancelRequested(self):
+        """Return True if cancellation of current parsing has been requested"""
+        return self.__cancelRequested
+
     def errors(self):
         """Return error found by parser"""
         return self.__errors
@@ -225,6 +514,901 @@ class Parser:
         """Returns tokens"""
         return self.__tokens
 
+    def parserTokens(self):
+        """Returns significant tokens (ignored tokens are not available) used for last parsing"""
+        return self.__parserTokens
+
+    def packratEnabled(self):
+        """Return if packrat cache is used during parsing"""
+        return self.__packratEnabled
+
+    def setPackratEnabled(self, value):
+        """Set if packrat cache is used during parsing"""
+        if not isinstance(value, bool):
+            raise EInvalidType("Given `value` must be a <bool>")
+        self.__packratEnabled = value
+        self.__packratCache = {}
+
+    def packratMaxEntries(self):
+        """Return maximum number of results kept in packrat cache during parsing"""
+        return self.__packratMaxEntries
+
+    def setPackratMaxEntries(self, value):
+        """Set maximum number of results kept in packrat cache during parsing
+
+        When maximum is reached, new results are not kept anymore
+        """
+        if not isinstance(value, int):
+            raise EInvalidType("Given `value` must be an <int>")
+        elif value < 0:
+            raise EInvalidValue("Given `value` must be a positive number")
+        self.__packratMaxEntries = value
+
+    def packratCache(self):
+        """Return packrat cache (a dictionary) used by grammar rules during parsing
+
+        Return None if packrat cache is not enabled
+        """
+        if self.__packratEnabled:
+            return self.__packratCache
+        return None
+
+    def alternativesSkipped(self):
+        """Return number of grammar alternatives that haven't been checked during last parsing
+
+        An alternative is not checked when current token can't be the first token of alternative
+        """
+        return self.__alternativesSkipped
+
+    def addAlternativesSkipped(self, value):
+        """Add given `value` to number of grammar alternatives that haven't been checked"""
+        self.__alternativesSkipped += value
+
+    def incremental(self):
+        """Return if incremental parsing is enabled"""
+        return self.__incremental
+
+    def setIncremental(self, value):
+        """Set if incremental parsing is enabled
+
+        When enabled, items matched by grammar loops (GROneOrMore, GRNoneOrMore) that start a
+        line (usually, top-level statements) are recorded during parsing; when a modified text
+        is parsed, items for which tokens haven't been modified are reused as they are, and only
+        modified items are parsed again
+
+        Reused AST items are shared between previous and new AST, and tokens are moved to new
+        tokens: AST from previous parsing can't be used anymore
+        Incremental parsing is only applied with frozen grammar rules
+        """
+        if not isinstance(value, bool):
+            raise EInvalidType("Given `value` must be a <bool>")
+        self.__incremental = value
+        self.__loopRecords = None
+
+    def reusedItems(self):
+        """Return number of items reused from previous parsing during last (incremental) parsing"""
+        return self.__reusedItems
+
+    def loopReuse(self, grObject):
+        """Return records from previous parsing that can be reused by loop `grObject` during current parsing
+
+        Return None if there's nothing to reuse
+        """
+        if self.__loopReuse is None:
+            return None
+        return self.__loopReuse.get(grObject)
+
+    def reuseLoopItems(self, grObject, ast, tokens, record=None):
+        """Reuse items from previous parsing for loop `grObject`, from current token
+
+        If items are reused, they're added to given loop `ast`, and tokens position is set after them
+        Given `record` is the record for loop (see recordLoopItem())
+
+        Return a tuple (record, number of reused items)
+        """
+        index = tokens.index()
+        for previousRecord, nbPrefixItems, suffixItem, offset in self.__loopReuse[grObject]:
+            starts = previousRecord[1]
+            item = bisect_left(starts, index, 0, nbPrefixItems)
+            if item < nbPrefixItems and starts[item] == index:
+                offset = 0
+                endItem = nbPrefixItems
+                break
+            item = bisect_left(starts, index - offset, suffixItem)
+            if item < len(starts) and starts[item] == index - offset:
+                endItem = len(starts)
+                break
+        else:
+            return (record, 0)
+
+        grObject, starts, ends, nodesBefore, nodesAfter, spansStart, spansEnd, nodes, breaks = previousRecord
+
+        # reused items can't go over a break
+        breakItem = bisect_right(breaks, item)
+        if breakItem < len(breaks) and breaks[breakItem] < endItem:
+            endItem = breaks[breakItem]
+
+        spanStart = None
+        spanEnd = None
+        for spanItem in range(item, endItem):
+            if spansStart[spanItem] is not None:
+                spanStart = spansStart[spanItem]
+                break
+        for spanItem in range(endItem - 1, item - 1, -1):
+            if spansEnd[spanItem] is not None:
+                spanEnd = spansEnd[spanItem]
+                break
+
+        nbNodes = ast.countNodes()
+        ast.addNodes(nodes[nodesBefore[item]:nodesAfter[endItem - 1]], spanStart, spanEnd)
+
+        index = ends[endItem - 1] + offset
+        if index < tokens.length():
+            tokens.setIndex(index)
+        else:
+            tokens.last()
+            tokens.next()
+
+        # reused items are recorded for next parsing
+        if record is None:
+            record = (grObject, [], [], [], [], [], [], ast.nodes(), [])
+            self.__loopRecords.append(record)
+        elif record[2][-1] != starts[item] + offset:
+            record[8].append(len(record[1]))
+
+        nodesOffset = nbNodes - nodesBefore[item]
+        if offset == 0:
+            record[1].extend(starts[item:endItem])
+            record[2].extend(ends[item:endItem])
+        else:
+            record[1].extend([value + offset for value in starts[item:endItem]])
+            record[2].extend([value + offset for value in ends[item:endItem]])
+        if nodesOffset == 0:
+            record[3].extend(nodesBefore[item:endItem])
+            record[4].extend(nodesAfter[item:endItem])
+        else:
+            record[3].extend([value + nodesOffset for value in nodesBefore[item:endItem]])
+            record[4].extend([value + nodesOffset for value in nodesAfter[item:endItem]])
+        record[5].extend(spansStart[item:endItem])
+        record[6].extend(spansEnd[item:endItem])
+
+        self.__reusedItems += endItem - item
+        return (record, endItem - item)
+
+    def recordLoopItem(self, record, grObject, ast, checked, index, nbNodes, nbTokens, nbErrors):
+        """Record an item matched by loop `grObject`, to be reused by next incremental parsing
+
+        Given `record` is the current record for loop (None if nothing has been recorded yet)
+        Given `ast` is the loop AST to which matched `checked` AST item has been added
+        Given `index` is the token index from which item has been checked
+        Given `nbNodes`, `nbTokens`, `nbErrors` are number of nodes and tokens in loop `ast`,
+        and number of parser errors, before item has been checked
+
+        Only items starting a line, without errors, are recorded
+
+        Return record for loop (None if nothing has been recorded yet)
+        """
+        if (self.__loopRecords is None or ast.countTokens() != nbTokens or len(self.__errors) != nbErrors or
+           self.__parserTokens.value(index).column() != 1):
+            return record
+
+        if record is None:
+            record = (grObject, [], [], [], [], [], [], ast.nodes(), [])
+            self.__loopRecords.append(record)
+        elif record[2][-1] != index:
+            record[8].append(len(record[1]))
+
+        spanTokens = checked.spanTokens()
+        record[1].append(index)
+        record[2].append(self.__parserTokens.index())
+        record[3].append(nbNodes)
+        record[4].append(ast.countNodes())
+        if spanTokens is None:
+            record[5].append(None)
+            record[6].append(None)
+        else:
+            record[5].append(spanTokens[0])
+            record[6].append(spanTokens[1])
+        return record
+
+    def profiling(self):
+        """Return if grammar rules are profiled during parsing"""
+        return self.__profiling
+
+    def setProfiling(self, value):
+        """Set if grammar rules are profiled during parsing
+
+        When enabled, for each grammar rule, number of checks and results, number of
+        consumed tokens and time spent to check rule are collected; statistics are
+        cumulated over parsings until resetProfile() is called
+        """
+        if not isinstance(value, bool):
+            raise EInvalidType("Given `value` must be a <bool>")
+        self.__profiling = value
+
+    def resetProfile(self):
+        """Reset grammar rules profiling statistics"""
+        self.__profile = {}
+
+    def profileEnter(self):
+        """Start profiling of a grammar rule check
+
+        Return start time, to provide to profileExit()
+        """
+        self.__profileChildTime.append(0)
+        return time.perf_counter()
+
+    def profileExit(self, id, status, tokens, startTime, cached=False):
+        """End profiling of a grammar rule check
+
+        Given `id` is grammar rule identifier, `status` the returned AST status and `tokens` number of consumed tokens
+        Given `startTime` is value returned by profileEnter()
+        Given `cached` is True if result has been returned from packrat cache
+        """
+        duration = time.perf_counter() - startTime
+        selfTime = duration - self.__profileChildTime.pop()
+        if len(self.__profileChildTime) > 0:
+            self.__profileChildTime[-1] += duration
+
+        if (stats := self.__profile.get(id)) is None:
+            stats = self.__profile[id] = [0, 0, 0, 0, 0, 0, 0, 0]
+        stats[0] += 1
+        if cached:
+            stats[1] += 1
+        if status == ASTStatus.MATCH:
+            stats[2] += 1
+            stats[5] += tokens
+        elif status == ASTStatus.NOMATCH:
+            stats[3] += 1
+        elif status == ASTStatus.PARTIAL_MATCH:
+            stats[4] += 1
+        stats[6] += duration
+        stats[7] += selfTime
+
+    def profile(self, sortKey='selfTime'):
+        """Return grammar rules profiling statistics
+
+        Returned value is a list of dictionaries, one per checked grammar rule, sorted by given
+        `sortKey` (descending order):
+            'id': grammar rule identifier
+            'attempts': number of times grammar rule has been checked
+            'cached': number of results returned from packrat cache
+            'matches': number of times grammar rule has matched
+            'noMatches': number of times grammar rule hasn't matched (parser go back to previous token)
+            'partialMatches': number of times grammar rule has partially matched
+            'tokens': number of tokens consumed by matches
+            'time': time (in seconds) spent to check grammar rule, including sub-rules
+            'selfTime': time (in seconds) spent to check grammar rule, excluding sub-rules
+        """
+        keys = ('attempts', 'cached', 'matches', 'noMatches', 'partialMatches', 'tokens', 'time', 'selfTime')
+        if sortKey not in keys and sortKey != 'id':
+            raise EInvalidValue(f"Given `sortKey` must be one of: id, {', '.join(keys)}")
+
+        returned = [dict(id=id, **dict(zip(keys, stats))) for id, stats in self.__profile.items()]
+        returned.sort(key=lambda stats: stats[sortKey], reverse=(sortKey != 'id'))
+        return returned
+
+    def profileAsText(self, sortKey='selfTime'):
+        """Return grammar rules profiling statistics as a text table
+
+        See profile() for given `sortKey`
+        """
+        table = TextTable()
+        table.setTitle('Grammar rules profile')
+        table.setHeader(['Rule', 'Attempts', 'Cached', 'Matches', 'No matches', 'Partial', 'Tokens', 'Time (ms)', 'Self (ms)'])
+        for stats in self.profile(sortKey):
+            table.addRow([stats['id'],
+                          f"{stats['attempts']}",
+                          f"{stats['cached']}",
+                          f"{stats['matches']}",
+                          f"{stats['noMatches']}",
+                          f"{stats['partialMatches']}",
+                          f"{stats['tokens']}",
+                          f"{stats['time'] * 1000:.2f}",
+                          f"{stats['selfTime'] * 1000:.2f}"])
+
+        settings = TextTableSettingsText()
+        settings.setMinWidthActive(False)
+        settings.setColumnsAlignment([0, 1, 1, 1, 1, 1, 1, 1, 1])
+        return table.asText(settings)
+
+    def profileAsJson(self, sortKey='selfTime'):
+        """Return grammar rules profiling statistics as a JSON string
+
+        See profile() for given `sortKey`
+        """
+        return json.dumps(self.profile(sortKey), indent=1)
+
+    def fingerprint(self):
+        """Return a fingerprint (SHA1 hexadecimal digest) of parser definition
+
+        Fingerprint is built from tokenizer rules, grammar rules and ignored tokens: results
+        from a parser with a different fingerprint can't be reused
+        """
+        fingerprint = hashlib.sha1()
+        fingerprint.update(f"{self.__tokenizer.fingerprint()}|{self.__grammarRules.fingerprint()}|{sorted(str(token) for token in self.__ignoredTokens)}".encode())
+        return fingerprint.hexdigest()
+
+    def cache(self):
+        """Return persistent cache used by parser (None if not used)"""
+        return self.__cache
+
+    def setCache(self, cache):
+        """Set persistent cache used by parser
+
+        Given `cache` must be a <ParserCache> or None (no persistent cache)
+        When a text is parsed, tokens, AST and errors are stored in cache (if parsing
+        duration is greater than cacheMinDuration()); if text has already been parsed,
+        they're directly loaded from cache
+        """
+        if not (cache is None or isinstance(cache, ParserCache)):
+            raise EInvalidType("Given `cache` must be None or a <ParserCache>")
+        self.__cache = cache
+
+    def cacheMinDuration(self):
+        """Return minimum parsing duration (in seconds) for which results are stored in persistent cache"""
+        return self.__cacheMinDuration
+
+    def setCacheMinDuration(self, value):
+        """Set minimum parsing duration (in seconds) for which results are stored in persistent cache"""
+        if not isinstance(value, (int, float)):
+            raise EInvalidType("Given `value` must be a <float>")
+        elif value < 0:
+            raise EInvalidValue("Given `value` must be a positive number")
+        self.__cacheMinDuration = value
+
+
+class ParserTokens(EList):
+    """Tokens walked by grammar rules during parsing
+
+    Only significant tokens from a Tokens object are available: ignored tokens (spaces, comments, ...)
+    are filtered once, when ParserTokens is initialised, and don't need to be skipped during parsing
+
+    For each significant token, a flag defines if token is preceded by a space in original tokens
+    """
+
+    def __init__(self, tokens, ignoredTokens=[], previousParserTokens=None):
+        """Initialise parser tokens
+
+        Given `tokens` is a <Tokens>
+        Given `ignoredTokens` is a list of token types to filter
+        Given `previousParserTokens`, if provided, is a <ParserTokens> built from tokens used by
+        Tokenizer.retokenize() to produce given `tokens`: significant tokens that have been reused
+        by tokenizer are taken from it instead of being filtered again (see reusedFrom())
+        (Token objects are moved to given `tokens`: previous parser tokens can't be used anymore)
+        """
+        if not isinstance(tokens, Tokens):
+            raise EInvalidType("Given `tokens` must be a <Tokens>")
+        elif not (previousParserTokens is None or isinstance(previousParserTokens, ParserTokens)):
+            raise EInvalidType("Given `previousParserTokens` must be None or a <ParserTokens>")
+
+        ruleIds = tokens.tokensData()[0]
+        rules = tokens.rules() or []
+
+        ignoredRuleIds = set(ruleId for ruleId, rule in enumerate(rules) if rule.type() in ignoredTokens)
+        spaceRuleIds = set(ruleId for ruleId, rule in enumerate(rules) if rule.type() in (TokenType.SPACE, TokenType.NEWLINE))
+
+        self.__tokens = tokens
+        self.__ignoredRuleIds = ignoredRuleIds
+        # significant tokens reused from previous parser tokens
+        self.__reusedFrom = None
+
+        reusedFrom = tokens.reusedFrom()
+        if (previousParserTokens is not None and reusedFrom is not None and reusedFrom[0] is previousParserTokens.tokens() and
+           previousParserTokens.__ignoredRuleIds == ignoredRuleIds and tokens.reuseTokens()):
+            prefixLength, suffixIndex, suffixOffset = reusedFrom[1:]
+            previousIndexes = previousParserTokens.__indexes
+            previousPrecededBySpace = previousParserTokens.__precededBySpace
+
+            prefixSig = bisect_left(previousIndexes, prefixLength)
+            if suffixIndex is None:
+                suffixSig = len(previousIndexes)
+                middleEnd = len(ruleIds)
+            else:
+                suffixSig = bisect_left(previousIndexes, suffixIndex)
+                middleEnd = suffixIndex + suffixOffset
+
+            # only tokens between reused prefix and suffix are filtered
+            middle = [index for index in range(prefixLength, middleEnd) if ruleIds[index] not in ignoredRuleIds]
+            suffix = previousIndexes[suffixSig:]
+            if suffixOffset != 0:
+                suffix = [index + suffixOffset for index in suffix]
+
+            indexes = previousIndexes[:prefixSig] + middle + suffix
+            self.__precededBySpace = (previousPrecededBySpace[:prefixSig] +
+                                      [index > 0 and ruleIds[index - 1] in spaceRuleIds for index in middle] +
+                                      previousPrecededBySpace[suffixSig:])
+            tokenObjects = previousParserTokens.list()[:prefixSig] + [tokens.value(index) for index in middle] + previousParserTokens.list()[suffixSig:]
+
+            newSuffixSig = prefixSig + len(middle)
+            if newSuffixSig < len(indexes):
+                # token that precedes first token of suffix can have been modified
+                index = indexes[newSuffixSig]
+                self.__precededBySpace[newSuffixSig] = index > 0 and ruleIds[index - 1] in spaceRuleIds
+                if self.__precededBySpace[newSuffixSig] != previousPrecededBySpace[suffixSig]:
+                    # first token of suffix is not the same
+                    suffixSig += 1
+                    newSuffixSig += 1
+
+            if suffixIndex is None or newSuffixSig >= len(indexes):
+                self.__reusedFrom = (prefixSig, None, 0)
+            else:
+                self.__reusedFrom = (prefixSig, suffixSig, newSuffixSig - suffixSig)
+        else:
+            # index of significant tokens in original tokens
+            indexes = [index for index, ruleId in enumerate(ruleIds) if ruleId not in ignoredRuleIds]
+            self.__precededBySpace = [index > 0 and ruleIds[index - 1] in spaceRuleIds for index in indexes]
+
+            # significant tokens are all walked during parsing: Token objects are created now
+            tokenObjects = [tokens.value(index) for index in indexes]
+
+        self.__indexes = indexes
+        self.__nbTokens = len(indexes)
+
+        super(ParserTokens, self).__init__(tokenObjects)
+
+    def precededBySpace(self):
+        """Return True if current token is preceded by a space or a new line in original tokens"""
+        index = self.index()
+        if 0 <= index < self.__nbTokens:
+            return self.__precededBySpace[index]
+        return False
+
+    def tokens(self):
+        """Return original tokens"""
+        return self.__tokens
+
+    def reusedFrom(self):
+        """Return, if significant tokens have been taken from previous parser tokens, a tuple
+        (prefix length, suffix index, suffix offset)
+
+        - significant tokens before `prefix length` are the same than in previous parser tokens
+        - significant tokens from `suffix index` in previous parser tokens are the same in current parser
+          tokens, with index shifted by `suffix offset` (`suffix index` is None if there's no suffix)
+
+        Return None if parser tokens have not been built from previous parser tokens
+        """
+        return self.__reusedFrom
+
+
+class ParserCache:
+    """A persistent cache for parser results
+
+    For a parsed text, tokens, AST and errors are stored in a file in cache directory,
+    allowing to get them without tokenizing and parsing text again, even after
+    application has been restarted
+
+    Data are stored as JSON: cache directory is writable by user, reading a cache
+    file must never execute code (as unpickling a file could do)
+
+    Cache size is limited: when maximum size is reached, least recently used files are removed
+    """
+    # version of cache file format; files with another version are ignored
+    # (must be incremented when format of stored data is modified)
+    VERSION = 2
+
+    # extension of cache files
+    FILE_EXTENSION = '.pcache'
+
+    # default maximum size (in bytes) of cache
+    DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+    def __init__(self, path, maxSize=None):
+        """Initialise cache
+
+        Given `path` is directory in which cache files are stored (created if doesn't exist)
+        Given `maxSize` is maximum size of cache (in bytes); if None, DEFAULT_MAX_SIZE is used
+        """
+        if not isinstance(path, str):
+            raise EInvalidType("Given `path` must be a <str>")
+
+        self.__path = path
+        self.__maxSize = ParserCache.DEFAULT_MAX_SIZE
+
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+        # cache can be updated from a background thread (see setAsync())
+        self.__mutex = QMutex()
+        self.__threadPool = QThreadPool()
+        self.__threadPool.setMaxThreadCount(1)
+
+        os.makedirs(self.__path, exist_ok=True)
+
+        # current size (in bytes) of cache, updated when files are stored or removed
+        # (cache directory is read again only when maximum size is reached)
+        self.__size = sum(file[1] for file in self.__files())
+
+        if maxSize is not None:
+            self.setMaxSize(maxSize)
+
+    @staticmethod
+    def __encodeValue(value):
+        """Return a JSON serializable value for given `value`, for types not supported by JSON"""
+        if isinstance(value, array):
+            return {'__array__': value.typecode, 'data': base64.b64encode(value.tobytes()).decode()}
+        raise EInvalidType(f"Given value can't be stored in cache: {type(value)}")
+
+    @staticmethod
+    def __decodeValue(value):
+        """Return value for given JSON object (see __encodeValue())"""
+        if '__array__' in value:
+            returned = array(value['__array__'])
+            returned.frombytes(base64.b64decode(value['data'], validate=True))
+            return returned
+        return value
+
+    def __fileName(self, key):
+        """Return file name for given `key`"""
+        return os.path.join(self.__path, f"{key}{ParserCache.FILE_EXTENSION}")
+
+    def __fileSize(self, fileName):
+        """Return size of given file (0 if file doesn't exist)"""
+        try:
+            return os.path.getsize(fileName)
+        except OSError:
+            return 0
+
+    def __files(self):
+        """Return list of cache files, as tuples (file name, size, last access time)"""
+        returned = []
+        try:
+            with os.scandir(self.__path) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith(ParserCache.FILE_EXTENSION):
+                        stat = entry.stat()
+                        returned.append((entry.path, stat.st_size, stat.st_mtime))
+        except Exception as e:
+            Debug.print('[ParserCache.__files] Unable to read directory {0}: {1}', self.__path, f"{e}")
+        return returned
+
+    def __removeFile(self, fileName):
+        """Remove given file
+
+        Return True if file has been removed, otherwise False
+        """
+        try:
+            os.remove(fileName)
+            return True
+        except FileNotFoundError:
+            # already removed
+            return False
+        except Exception as e:
+            Debug.print('[ParserCache.__removeFile] Unable to remove file {0}: {1}', fileName, f"{e}")
+            return False
+
+    def __updateSize(self, value):
+        """Add given `value` (in bytes) to current cache size"""
+        self.__mutex.lock()
+        self.__size += value
+        self.__mutex.unlock()
+
+    def __evict(self, keepFileName=None):
+        """Remove least recently used files until cache size is within limit
+
+        File `keepFileName` (most recently stored) is always kept
+        """
+        self.__mutex.lock()
+        try:
+            if self.__size <= self.__maxSize:
+                return
+
+            # limit reached: get files from cache directory, as another application instance
+            # can use the same directory
+            files = self.__files()
+            size = sum(file[1] for file in files)
+            for fileName, fileSize, fileTime in sorted(files, key=lambda file: file[2]):
+                if size <= self.__maxSize:
+                    break
+                elif fileName == keepFileName:
+                    continue
+
+                if self.__removeFile(fileName):
+                    size -= fileSize
+                    self.__evictions += 1
+            self.__size = size
+        finally:
+            self.__mutex.unlock()
+
+    def path(self):
+        """Return directory in which cache files are stored"""
+        return self.__path
+
+    def maxSize(self):
+        """Return maximum size (in bytes) of cache"""
+        return self.__maxSize
+
+    def setMaxSize(self, value):
+        """Set maximum size (in bytes) of cache
+
+        If current cache size is greater than given `value`, least recently used files are removed
+        """
+        if not isinstance(value, int):
+            raise EInvalidType("Given `value` must be an <int>")
+        elif value < 0:
+            raise EInvalidValue("Given `value` must be a positive number")
+        self.__maxSize = value
+        self.__evict()
+
+    def get(self, key):
+        """Return data stored for given `key`, or None if there's no data for key"""
+        fileName = self.__fileName(key)
+        try:
+            with open(fileName, 'r', encoding='utf-8') as file:
+                version, fileKey, data = json.load(file, object_hook=ParserCache.__decodeValue)
+        except FileNotFoundError:
+            self.__misses += 1
+            return None
+        except Exception as e:
+            Debug.print('[ParserCache.get] Unable to read file {0}: {1}', fileName, f"{e}")
+            self.remove(key)
+            self.__misses += 1
+            return None
+
+        if version != ParserCache.VERSION or fileKey != key:
+            # file from another version, can't be used
+            self.remove(key)
+            self.__misses += 1
+            return None
+
+        try:
+            # last access time is used to determinate least recently used files
+            os.utime(fileName)
+        except Exception as e:
+            Debug.print('[ParserCache.get] Unable to update access time for file {0}: {1}', fileName, f"{e}")
+
+        self.__hits += 1
+        return data
+
+    def set(self, key, data):
+        """Store given `data` for given `key`
+
+        Given `data` must be made of JSON serializable values (None, bool, int, float, str, list, tuple, dict with
+        str keys) or arrays; tuples are returned as lists by get()
+        Return True if data has been stored, otherwise False
+        """
+        fileName = self.__fileName(key)
+        tmpFileName = f"{fileName}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmpFileName, 'w', encoding='utf-8') as file:
+                json.dump((ParserCache.VERSION, key, data), file, default=ParserCache.__encodeValue, separators=(',', ':'))
+            sizeDelta = self.__fileSize(tmpFileName) - self.__fileSize(fileName)
+            # ensure a partially written file is never read
+            os.replace(tmpFileName, fileName)
+        except Exception as e:
+            Debug.print('[ParserCache.set] Unable to store file {0}: {1}', fileName, f"{e}")
+            self.__removeFile(tmpFileName)
+            return False
+
+        self.__updateSize(sizeDelta)
+        self.__evict(fileName)
+        return True
+
+    def setAsync(self, key, data):
+        """Store given `data` for given `key`, from a background thread
+
+        Method returns immediately, data are stored in the same order than setAsync() calls
+        Given `data` must not be modified after call
+        """
+        self.__threadPool.start(ParserCacheJob(self, key, data))
+
+    def waitForDone(self, timeout=-1):
+        """Wait at most `timeout` milliseconds (-1 for no limit) until data given to setAsync() are stored
+
+        Return True if all data are stored, otherwise False
+        """
+        return self.__threadPool.waitForDone(timeout)
+
+    def remove(self, key):
+        """Remove data stored for given `key`, if any"""
+        fileName = self.__fileName(key)
+        fileSize = self.__fileSize(fileName)
+        if self.__removeFile(fileName):
+            self.__updateSize(-fileSize)
+
+    def clear(self):
+        """Remove all data from cache"""
+        for fileName, fileSize, fileTime in self.__files():
+            if self.__removeFile(fileName):
+                self.__updateSize(-fileSize)
+
+    def stats(self):
+        """Return cache statistics as a dictionary
+
+            'entries':      number of files in cache
+            'size':         size (in bytes) of cache
+            'hits':         number of get() call for which data was found in cache
+            'misses':       number of get() call for which data was not found in cache
+            'evictions':    number of files removed from cache to respect size limit
+        """
+        files = self.__files()
+        return {
+                'entries': len(files),
+                'size': sum(file[1] for file in files),
+                'hits': self.__hits,
+                'misses': self.__misses,
+                'evictions': self.__evictions
+            }
+
+    def resetStats(self):
+        """Reset cache statistics counters (hits, misses, evictions)"""
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+
+class ParserCacheJob(QRunnable):
+    """Store data in a parser cache from a thread pool
+
+    Not aimed to be instancied directly, just use ParserCache.setAsync()
+    """
+
+    def __init__(self, cache, key, data):
+        super(ParserCacheJob, self).__init__()
+        self.__cache = cache
+        self.__key = key
+        self.__data = data
+
+    def run(self):
+        """Store data"""
+        self.__cache.set(self.__key, self.__data)
+
+
+class BackgroundParserSignals(QObject):
+    finished = Signal(str, object, object)      # parsing is finished: text, AST (None if cancelled), errors
+
+
+class BackgroundParserJob(QRunnable):
+    """Parse a text in a thread from a thread pool
+
+    Not aimed to be instancied directly, just use BackgroundParser
+    """
+
+    def __init__(self, parser, text):
+        super(BackgroundParserJob, self).__init__()
+        self.__parser = parser
+        self.__text = text
+        self.signals = BackgroundParserSignals()
+
+    def run(self):
+        """Parse text, and emit result"""
+        try:
+            ast = self.__parser.parse(self.__text)
+        except Exception as e:
+            # parser can't be used (invalid grammar...): nothing to publish
+            Debug.print('[BackgroundParserJob.run] Unable to parse text: {0}', f"{e}")
+            ast = None
+
+        if ast is None:
+            errors = []
+        else:
+            errors = list(self.__parser.errors())
+        self.signals.finished.emit(self.__text, ast, errors)
+
+
+class BackgroundParser(QObject):
+    """Parse text in a background thread, without blocking GUI thread
+
+    Parsing starts once text hasn't been modified since a delay; if text is
+    modified while parsing, current parsing is cancelled and new text is parsed
+
+    Given parser is used from background thread: it must not be used by something else
+    AST and errors provided by `parsed` signal are only valid until next parsing starts:
+    connected slots have to get what they need from them before returning
+    """
+    parsed = Signal(str, object, object)        # text has been parsed: text, AST, errors
+
+    # default delay (in milliseconds) after last modification before parsing starts
+    DEFAULT_DELAY = 500
+
+    def __init__(self, parser, delay=None, parent=None):
+        super(BackgroundParser, self).__init__(parent)
+
+        if not isinstance(parser, Parser):
+            raise EInvalidType("Given `parser` must be a <Parser>")
+
+        self.__parser = parser
+
+        # text waiting to be parsed (None if nothing to parse)
+        self.__pendingText = None
+        # running job (None if nothing is parsed)
+        self.__job = None
+        # result from running job is outdated (text modified or cancelled)
+        self.__jobOutdated = False
+
+        # only one text is parsed at a time
+        self.__threadPool = QThreadPool()
+        self.__threadPool.setMaxThreadCount(1)
+
+        self.__timer = QTimer()
+        self.__timer.setSingleShot(True)
+        self.__timer.timeout.connect(self.__startJob)
+        self.setDelay(BackgroundParser.DEFAULT_DELAY if delay is None else delay)
+
+    def __startJob(self):
+        """Start to parse pending text, if nothing is currently parsed"""
+        if self.__job is not None or self.__pendingText is None:
+            return
+
+        self.__job = BackgroundParserJob(self.__parser, self.__pendingText)
+        self.__job.signals.finished.connect(self.__jobFinished)
+        self.__jobOutdated = False
+        self.__pendingText = None
+        self.__threadPool.start(self.__job)
+
+    def __jobFinished(self, text, ast, errors):
+        """Parsing is finished, publish result if still relevant"""
+        if self.__job is None or self.sender() != self.__job.signals:
+            # job has been stopped
+            return
+
+        outdated = self.__jobOutdated
+        self.__job = None
+
+        if not outdated and ast is not None:
+            self.parsed.emit(text, ast, errors)
+
+        if not self.__timer.isActive():
+            # text has been modified during parsing, and delay is already over
+            self.__startJob()
+
+    def parser(self):
+        """Return parser used to parse text"""
+        return self.__parser
+
+    def delay(self):
+        """Return delay (in milliseconds) after last modification before parsing starts"""
+        return self.__timer.interval()
+
+    def setDelay(self, value):
+        """Set delay (in milliseconds) after last modification before parsing starts"""
+        if not isinstance(value, int):
+            raise EInvalidType("Given `value` must be an <int>")
+        elif value < 0:
+            raise EInvalidValue("Given `value` must be a positive number")
+        self.__timer.setInterval(value)
+
+    def isRunning(self):
+        """Return True if a text is currently parsed"""
+        return self.__job is not None
+
+    def parse(self, text):
+        """Parse given `text` once delay is over
+
+        If a text is currently parsed, parsing is cancelled
+        """
+        if not isinstance(text, str):
+            raise EInvalidType("Given `text` must be a <str>")
+
+        self.__pendingText = text
+        if self.__job is not None:
+            self.__jobOutdated = True
+            self.__parser.cancel()
+        self.__timer.start()
+
+    def cancel(self):
+        """Cancel current and pending parsing"""
+        self.__timer.stop()
+        self.__pendingText = None
+        if self.__job is not None:
+            self.__jobOutdated = True
+            self.__parser.cancel()
+
+    def stop(self, timeout=100):
+        """Cancel current and pending parsing
+
+        Wait at most `timeout` milliseconds (-1 for no limit) for background thread to be finished,
+        to avoid to freeze GUI thread; if not finished, cancelled parsing continues in background until
+        cancellation is taken in account, and its result is ignored
+
+        Return True if background thread is finished, otherwise False
+        """
+        self.cancel()
+        returned = self.__threadPool.waitForDone(timeout)
+        self.__job = None
+        return returned
+
 
 class ParserError:
     """Define an error"""
@@ -303,8 +1487,16 @@ class ASTItem:
     AST item status define if current node/sub-nodes are valid or not
 
     And AST item can have zero to N nodes
+
+    Position of AST item in source is stored as a span of tokens (first and
+    last token); row/column are only calculated when position() is called
+
+    AST item can also store values for AST consumers (an interpreter for
+    example) that are resolved once, see cachedValue(); these values are not
+    exported by exportData()
     """
-    # optionAst=True, optionOperatorPrecedence=False
+    __slots__ = ('__id', '__nodes', '__tokens', '__status', '__grammarRule', '__spanStart', '__spanEnd', '__cache')
+
     def __init__(self, id, grammarRule=None):
         """Initialise AST item
 
@@ -322,16 +1514,14 @@ class ASTItem:
         self.__status = ASTStatus.NOMATCH
         self.__grammarRule = grammarRule
 
-        self.__position = {
-                'from': {'column': 0,
-                         'row': 0
-                         },
-                'to': {'column': 0,
-                       'row': 0
-                       }
-                }
+        # span of AST item: first and last <Token>
+        # (None if AST item doesn't contains any token)
+        self.__spanStart = None
+        self.__spanEnd = None
 
-        self.__checkOperatorPrecedenceEnabled = True
+        # values cached by AST consumers
+        # (None until a value is cached)
+        self.__cache = None
 
     def __repr__(self):
         returned = [f'<ASTItem({self.__id}, {len(self.__nodes)}, {self.__status}, {self.position()})>']
@@ -343,6 +1533,17 @@ class ASTItem:
                     returned.append(f'. . {node}'.replace('\n', '\n. . '))
         return "\n".join(returned)
 
+    def __updateSpan(self, start, end):
+        """Extend span of AST item with given `start` and `end` tokens"""
+        if self.__spanStart is None:
+            self.__spanStart = start
+            self.__spanEnd = end
+        else:
+            if start.index() < self.__spanStart.index():
+                self.__spanStart = start
+            if end.index() > self.__spanEnd.index():
+                self.__spanEnd = end
+
     def id(self):
         """Return identifier of AST item"""
         return self.__id
@@ -369,9 +1570,6 @@ class ASTItem:
             # - it's another GRObject
             # - it's an AST item
             if isinstance(item, ASTItem):
-                # need to check if grammar rule is concerned by operator and need to be converted to a AST
-                item.checkOperatorPrecedence()
-
                 # we got an AST Item (ie, some already parsed tokens converted to a valid abstract syntax tree)
                 if (isinstance(item.id(), str) or isinstance(item.id(), ASTSpecialItemType)) and item.optionAst():
                     # AST item is refering to a grammar rule or a specital item type (probaly a binary operator)
@@ -388,65 +1586,50 @@ class ASTItem:
                     #
                     # To simplify AST sub-nodes, we don't add item directly as a node,
                     # but all nodes of item are directly added to current AST nodes
-                    for subItem in item.nodes():
-                        self.add(subItem)
-
-                    if item.countNodes() == 0:
+                    nodes = item.nodes()
+                    if len(nodes) == 0:
                         # no nodes???
                         # means we only have tokens, add them as nodes
                         for subItem in item.tokens():
                             self.add(subItem, False)
+                    elif all(isinstance(subItem, ASTItem) for subItem in nodes):
+                        # nodes of an AST item are already simplified: AST items can be
+                        # added as they are (span is updated from item span)
+                        self.__nodes.extend(nodes)
+                    else:
+                        for subItem in nodes:
+                            self.add(subItem)
             else:
                 # might be a grammar rule or GRObject
                 self.__nodes.append(item)
 
-        position = {'from':
-                    {'column': 0,
-                     'row': 0
-                     },
-                    'to':
-                    {'column': 0,
-                     'row': 0
-                     }
-                    }
         if isinstance(item, Token):
             # in all case, a token is added to token list
             self.__tokens.append(item)
 
-            if len(self.__tokens) > 0:
-                lastToken = self.__tokens[-1]
-                while lastToken.type() == TokenType.DEDENT:
-                    lastToken = lastToken.previous()
+            # span start from first token added, and end on added token
+            # (DEDENT tokens are ignored for span end)
+            lastToken = item
+            while lastToken.type() == TokenType.DEDENT:
+                lastToken = lastToken.previous()
 
-                position = {'from':
-                            {'column': self.__tokens[0].column(),
-                             'row': self.__tokens[0].row()
-                             },
-                            'to':
-                            {'column': lastToken.column() + lastToken.length(),
-                             'row': lastToken.row()
-                             }
-                            }
+            self.__updateSpan(self.__tokens[0], lastToken)
         elif isinstance(item, ASTItem):
-            position = item.position()
-
-        # print("ADD item: position", position)
-        # print("ADD item: __position", self.__position)
-
-        if position['from']['row'] > 0:
-            if position['from']['row'] < self.__position['from']['row'] or self.__position['from']['row'] == 0:
-                self.__position['from']['row'] = position['from']['row']
-                self.__position['from']['column'] = position['from']['column']
-            elif position['from']['row'] == self.__position['from']['row'] and position['from']['column'] < self.__position['from']['column']:
-                self.__position['from']['column'] = position['from']['column']
-        if position['to']['row'] > 0:
-            if position['to']['row'] > self.__position['to']['row']:
-                self.__position['to']['row'] = position['to']['row']
-                self.__position['to']['column'] = position['to']['column']
-            elif position['to']['row'] == self.__position['to']['row'] and position['to']['column'] > self.__position['to']['column']:
-                self.__position['to']['column'] = position['to']['column']
-
-        # print("ADD item: __position", self.__position)
+            if item.__spanStart is not None:
+                self.__updateSpan(item.__spanStart, item.__spanEnd)
+
+    def addNodes(self, nodes, spanStart=None, spanEnd=None):
+        """Add given AST items `nodes` as sub nodes
+
+        Given `spanStart` and `spanEnd` are the first and last tokens of given nodes (None if nodes
+        don't contain any token)
+
+        Faster than add() for each node, but nodes are not checked: they must be items from another
+        AST, previously added to it with add()
+        """
+        self.__nodes.extend(nodes)
+        if spanStart is not None:
+            self.__updateSpan(spanStart, spanEnd)
 
     def nodes(self):
         """Return nodes list"""
@@ -459,7 +1642,7 @@ class ASTItem:
         """
         try:
             return self.__nodes[index]
-        except Exception as e:
+        except Exception:
             return default
 
     def tokens(self):
@@ -492,6 +1675,21 @@ class ASTItem:
         """
         return self.__grammarRule
 
+    def cachedValue(self, key, default=None):
+        """Return value cached for given `key`
+
+        If no value has been cached for `key`, return `default` value
+        """
+        if self.__cache is None:
+            return default
+        return self.__cache.get(key, default)
+
+    def setCachedValue(self, key, value):
+        """Cache given `value` for given `key`"""
+        if self.__cache is None:
+            self.__cache = {}
+        self.__cache[key] = value
+
     def optionAst(self):
         """Return if current AST item can be added as a Node to another AST item
 
@@ -514,6 +1712,75 @@ class ASTItem:
         else:
             return self.__grammarRule.optionOperatorPrecedence()
 
+    def checkOperatorPrecedence(self):
+        """Check if current AST item is concerned by operator precedence rules
+
+        If yes, nodes (operands, unary/binary/index operators) are converted to an operator tree
+        (UNARY_OPERATOR, BINARY_OPERATOR, INDEX_OPERATOR AST items)
+
+        Deprecated: kept for grammar rules defined with GrammarRule.OPTION_OPERATOR_PRECEDENCE, use
+        GRExpression that build operator tree while parsing
+        """
+        def reduce():
+            # convert operator from top of stack to an AST item
+            operator, priority, operatorType = operators.pop()
+            if operatorType == GrammarRules.OPERATOR_BINARY:
+                right = operands.pop()
+                item = ASTItem(ASTSpecialItemType.BINARY_OPERATOR)
+                item.add(operator)
+                item.add(operands[-1])
+                item.add(right)
+            else:
+                item = ASTItem(ASTSpecialItemType.UNARY_OPERATOR)
+                item.add(operator)
+                item.add(operands[-1])
+            item.setStatus(ASTStatus.MATCH)
+            operands[-1] = item
+
+        def reduceOperators(priority):
+            # convert operators from top of stack with a priority higher or equal than given priority
+            while len(operators) > 0 and operators[-1][1] >= priority:
+                reduce()
+
+        if not self.optionOperatorPrecedence() or len(self.__nodes) == 0:
+            return
+
+        grammarRules = self.__grammarRule.grammarRules()
+
+        # operands and operators (token, priority, operator type) stack
+        operands = []
+        operators = []
+
+        expectOperand = True
+        for node in self.__nodes:
+            operatorType = grammarRules.operatorType(node)
+            if expectOperand:
+                if isinstance(node, Token) and GrammarRules.OPERATOR_UNARY in operatorType:
+                    operators.append((node, grammarRules.operatorPrecedence(node, GrammarRules.OPERATOR_UNARY), GrammarRules.OPERATOR_UNARY))
+                else:
+                    operands.append(node)
+                    expectOperand = False
+            elif GrammarRules.OPERATOR_INDEX in operatorType:
+                reduceOperators(grammarRules.operatorPrecedence(node, GrammarRules.OPERATOR_INDEX))
+                item = ASTItem(ASTSpecialItemType.INDEX_OPERATOR)
+                item.add(node)
+                item.add(operands[-1])
+                item.setStatus(ASTStatus.MATCH)
+                operands[-1] = item
+            else:
+                priority = grammarRules.operatorPrecedence(node, GrammarRules.OPERATOR_BINARY)
+                reduceOperators(priority)
+                operators.append((node, priority, GrammarRules.OPERATOR_BINARY))
+                expectOperand = True
+
+        if expectOperand:
+            # incomplete expression (no operand after an operator): nodes are kept as they are
+            return
+
+        while len(operators) > 0:
+            reduce()
+        self.__nodes = operands
+
     def optionNotPrecededBySpace(self):
         """Return if current AST allows to be preceded by a space value
 
@@ -525,174 +1792,99 @@ class ASTItem:
         else:
             return self.__grammarRule.optionNotPrecededBySpace()
 
-    def checkOperatorPrecedence(self):
-        """Check if current AST item is concerned by operator precedence rules
+    def span(self):
+        """Return tuple (start, end) of token indexes for current AST
 
-        If yes, do a conversion of current AST item to a BinaryOperator AST
+        Return None if there's no token in AST
         """
-        def getOperator(nodes, move=True):
-            """return current operator Token"""
-            returned = nodes.value()
-
-            if move:
-                # continue with next token
-                # if no more token, loop will be exited and last operator returned as head of AST
-                nodes.next()
-
-            return returned
-
-        def getOperand(nodes):
-            """From current index in nodes list, get operand
+        if self.__spanStart is None:
+            return None
+        return (self.__spanStart.index(), self.__spanEnd.index())
 
-            Returned value can be a Token (a number) or an ASTItem
+    def spanTokens(self):
+        """Return tuple (first token, last token) for current AST
 
-            when operand is returned, index in nodes list is moved on Operator
-            """
-            # get current node in list from current index
-            node = nodes.value()
-            # move to next one
-            nodes.next()
+        Return None if there's no token in AST
+        """
+        if self.__spanStart is None:
+            return None
+        return (self.__spanStart, self.__spanEnd)
 
-            if isinstance(node, Token) and GrammarRules.OPERATOR_UNARY in self.__grammarRule.grammarRules().operatorType(node):
-                # current node is an unary operator
-                # create ASTItem for operator
-                operator = ASTItem(ASTSpecialItemType.UNARY_OPERATOR)
-                operator.add(node)
-                # as it's an unary operator, there's only one branch child on which next operand is added
-                operator.add(getOperand(nodes))
-                operator.setStatus(ASTStatus.MATCH)
+    def exportData(self):
+        """Return current AST as a tuple of python built-in types, that can be serialized
 
-                returned = operator
+        Tokens are exported as token indexes; returned value can be imported with importData()
+        """
+        nodes = []
+        for node in self.__nodes:
+            if isinstance(node, Token):
+                nodes.append(node.index())
+            elif isinstance(node, ASTItem):
+                nodes.append(node.exportData())
             else:
-                # not a Token (an ASTItem) or a Token that is not an unary operator
-                # note: it shouldn't be a binary operator too, but normaly this case is already blocked when parser
-                #       is build AST from grammar rules
-                returned = node
-
-                nodeNext = nodes.value()
-                while nodeNext and GrammarRules.OPERATOR_INDEX in self.__grammarRule.grammarRules().operatorType(nodeNext):
-                    # next
-                    operator = ASTItem(ASTSpecialItemType.INDEX_OPERATOR)
-                    operator.add(nodeNext)
-                    operator.add(node)
-                    # as it's an unary operator, there's only one branch child on which next operand is added
-                    operator.setStatus(ASTStatus.MATCH)
-
-                    node = operator
-                    returned = node
-
-                    nodes.next()
-                    nodeNext = nodes.value()
-
-            return returned
-
-        def lookahead(nodes, notFirstLevel=True):
-            """Look ahead for next AST item"""
-            # normally, current index in nodes list is on an operand
-            # get it
-            left = getOperand(nodes)
-
-            # define return value, in case of we only have one operand in evaluated list
-            returned = left
-
-            # starting from here, current node should be an operator or None (if reached end of evaluation tokens list)
-            # if it's not an operator, it's not normal (parser in this case already stopped because it might not match grammar rule of a 'valid' evaluation expression)
-
-            # initialise the exitloop to false because we didn't entered in yet :-)
-            exitLoop = False
-            while node := getOperator(nodes):
-                # get priority of current operator
-                # note: it could only be a binary operator, unray operator are managed through getOperand()
-                priority = self.__grammarRule.grammarRules().operatorPrecedence(node, GrammarRules.OPERATOR_BINARY)
-
-                # get default right value for operator
-                right = getOperand(nodes)
-
-                # need to analyse lookahead, to get next operator and compare priority
-                nodeLA = getOperator(nodes, False)
-                if nodeLA:
-                    # got an operator
-
-                    # get operator's priority
-                    priorityLA = self.__grammarRule.grammarRules().operatorPrecedence(nodeLA, GrammarRules.OPERATOR_BINARY)
-
-                    # if priority == priorityLA:
-                    #       same priority, then we don't care
-                    #       example:
-                    #         a + b + c
-                    #           ^   ^
-                    #           |   +-- priorityLA=10     [node - look ahead]
-                    #           +------ priority=10       [node - current]
-                    #
-                    # else if priority > priorityLA:
-                    #       current operator priority is higher
-                    #       example:
-                    #         a * b + c
-                    #           ^   ^
-                    #           |   +-- priorityLA=10     [node - look ahead]
-                    #           +------ priority=20       [node - current]
-                    #
-                    #       in this case need to build
-                    #              +
-                    #           *     c
-                    #          a b
-                    #
-                    #
-                    #   ===> right value already defined with expected value
-
-                    if priorityLA > priority:
-                        # current operator priority is lower
-                        # example:
-                        #   a + b * c
-                        #     ^   ^
-                        #     |   +-- priorityLA=20     [node - look ahead]
-                        #     +------ priority=10       [node - current]
-                        #
-                        # in this case need to build
-                        #        +
-                        #     a    *
-                        #         b c
-                        #
-                        # get next look head as right value
-                        nodes.prev()
-                        right = lookahead(nodes)
-                    elif priorityLA < priority and notFirstLevel:
-                        # in this case we need to exit current look ahead and
-                        # continue on parent node.
-                        # except if there's no parent node :-)
-                        exitLoop = True
-
-                    # if priority is the same, "do nothing" continue, to look ahead in current node
-
-                operator = ASTItem(ASTSpecialItemType.BINARY_OPERATOR)
-                operator.add(node)
-                operator.add(left)
-                operator.add(right)
-                operator.setStatus(ASTStatus.MATCH)
-
-                if exitLoop:
-                    return operator
-
-                # left value for next operator will be current operator created
-                left = operator
-
-                # and return last operator from current lookahead (if next while condition exit loop)
-                returned = operator
+                raise EInvalidValue(f"AST item can't be exported: {node}")
+
+        # identifier is exported with its type: 0=<str>, 1=<ASTSpecialItemType>, 2=<GRObject> class
+        if isinstance(self.__id, ASTSpecialItemType):
+            id = (self.__id.name, 1)
+        elif isinstance(self.__id, type) and issubclass(self.__id, GRObject):
+            id = (self.__id.__name__, 2)
+        elif isinstance(self.__id, str):
+            id = (self.__id, 0)
+        else:
+            raise EInvalidValue(f"AST item identifier can't be exported: {self.__id}")
 
-            return returned
+        return (id,
+                self.__status.value,
+                None if self.__grammarRule is None else self.__grammarRule.id(),
+                nodes,
+                [token.index() for token in self.__tokens],
+                -1 if self.__spanStart is None else self.__spanStart.index(),
+                -1 if self.__spanEnd is None else self.__spanEnd.index())
 
-        if self.__checkOperatorPrecedenceEnabled and self.optionOperatorPrecedence():
-            # need to reorganise items
-            nodes = EList(self.__nodes)
-            nodes.first()
-            self.__nodes = [lookahead(nodes, False)]
+    @staticmethod
+    def importData(data, tokens, grammarRules):
+        """Return an ASTItem from given `data` (as returned by exportData())
 
-            # AST item has been processed, ensure that it won't be processed anymore
-            self.__checkOperatorPrecedenceEnabled = False
+        Given `tokens` is the <Tokens> from which exported AST has been built
+        Given `grammarRules` is the <GrammarRules> with which exported AST has been built
+        """
+        (id, idType), status, grammarRuleId, nodes, tokensIndexes, spanStart, spanEnd = data
+
+        if idType == 1:
+            id = ASTSpecialItemType[id]
+        elif idType == 2:
+            id = globals()[id]
+            if not (isinstance(id, type) and issubclass(id, GRObject)):
+                raise EInvalidValue(f"Invalid AST item identifier: {id}")
+
+        returned = ASTItem(id, None if grammarRuleId is None else grammarRules.get(grammarRuleId))
+        returned.__status = ASTStatus(status)
+        returned.__nodes = [tokens.value(node) if isinstance(node, int) else ASTItem.importData(node, tokens, grammarRules) for node in nodes]
+        returned.__tokens = [tokens.value(index) for index in tokensIndexes]
+        if spanStart >= 0:
+            returned.__spanStart = tokens.value(spanStart)
+            returned.__spanEnd = tokens.value(spanEnd)
+        return returned
 
     def position(self):
         """Return position column/rows of starting/ending tokens for current AST"""
-        return self.__position
+        if self.__spanStart is None:
+            return {'from': {'column': 0,
+                             'row': 0
+                             },
+                    'to': {'column': 0,
+                           'row': 0
+                           }
+                    }
+
+        return {'from': {'column': self.__spanStart.column(),
+                         'row': self.__spanStart.row()
+                         },
+                'to': {'column': self.__spanEnd.column() + self.__spanEnd.length(),
+                       'row': self.__spanEnd.row()
+                       }
+                }
 
 
 class GROperatorPrecedence:
@@ -769,6 +1961,13 @@ class GrammarRules:
         self.__rules = {}
         self.__firstRule = None
         self.__operatorPrecedence = []
+        # first tokens types for grammar rules
+        # key=rule id, value=tuple(set of token types, nullable)
+        self.__firstTokens = None
+        # when frozen, grammar rules can't be modified anymore
+        self.__frozen = False
+        # fingerprint of frozen grammar rules, calculated on demand
+        self.__fingerprint = None
 
     def get(self, id):
         """Return GrammarRule object referenced by given `id` if found, otherwise return None"""
@@ -780,16 +1979,134 @@ class GrammarRules:
         """Set grammar rule for given `id`"""
         if not isinstance(grammarRule, GrammarRule):
             raise EInvalidType("Given `grammarRule` must be <GrammarRule>")
+        elif self.__frozen:
+            raise EInvalidStatus("Grammar rules are frozen and can't be modified")
         self.__rules[id] = grammarRule
+        self.__firstTokens = None
 
     def remove(self, id):
         """Remove GrammarRule referenced by given `id` if found, otherwise do nothing"""
-        if id in self.__rules:
+        if self.__frozen:
+            raise EInvalidStatus("Grammar rules are frozen and can't be modified")
+        elif id in self.__rules:
             self.__rules.pop(id)
+            self.__firstTokens = None
 
     def clear(self):
         """Remove all GrammarRule"""
+        if self.__frozen:
+            raise EInvalidStatus("Grammar rules are frozen and can't be modified")
         self.__rules = {}
+        self.__firstTokens = None
+
+    def __ruleFirstTokens(self, id, inProgress):
+        """Return first tokens for grammar rule designed by given `id`
+
+        Returned value is a tuple(set of token types, nullable) (see __objectFirstTokens())
+        """
+        if id in self.__firstTokens:
+            return self.__firstTokens[id]
+        elif id in inProgress:
+            # recursive rule: can't be determinated
+            return (None, False)
+
+        inProgress.add(id)
+
+        grammarRule = self.__rules[id]
+        returned = (set(), True)
+        for index, grObject in enumerate(grammarRule.grammarList()):
+            if index > 0 and grammarRule.optionPartialMatch():
+                # rule can return a partial match without having consumed any token
+                returned = (None, False)
+                break
+
+            tokenTypes, nullable = self.__objectFirstTokens(grObject, inProgress)
+            if tokenTypes is None:
+                returned = (None, False)
+                break
+
+            returned[0].update(tokenTypes)
+            if not nullable:
+                returned = (returned[0], False)
+                break
+
+        inProgress.discard(id)
+        self.__firstTokens[id] = returned
+        return returned
+
+    def __objectFirstTokens(self, grObject, inProgress):
+        """Return first tokens for given `grObject`
+
+        Returned value is a tuple(set of token types, nullable):
+        - set of token types that can start given `grObject`, None if can't be determinated
+        - nullable is True if given `grObject` can match without consuming any token
+        """
+        if isinstance(grObject, GRToken):
+            return ({grObject.tokenType()}, False)
+        elif isinstance(grObject, GRRule):
+            return self.__ruleFirstTokens(grObject.id(), inProgress)
+        elif isinstance(grObject, GRExpression):
+            # an expression starts with an unary operator or an operand
+            tokenTypes = set()
+            for item in (grObject.unaryOperator(), grObject.operand()):
+                itemTokenTypes, itemNullable = self.__objectFirstTokens(item, inProgress)
+                if itemTokenTypes is None or itemNullable:
+                    return (None, False)
+                tokenTypes.update(itemTokenTypes)
+            return (tokenTypes, False)
+        elif isinstance(grObject, (GROne, GROptional, GRNoneOrMore, GROneOrMore)):
+            tokenTypes = set()
+            nullable = isinstance(grObject, (GROptional, GRNoneOrMore))
+            for item in grObject.grammarList():
+                itemTokenTypes, itemNullable = self.__objectFirstTokens(item, inProgress)
+                if itemTokenTypes is None:
+                    return (None, False)
+                tokenTypes.update(itemTokenTypes)
+                nullable |= itemNullable
+            return (tokenTypes, nullable)
+
+        # unknown object: can't be determinated
+        return (None, False)
+
+    def __buildAlternativesTables(self):
+        """Build, for all GROne and GROptional objects, table of alternatives that can
+        be checked according to current token type
+        """
+        def recursiveBuild(list):
+            for item in list:
+                if isinstance(item, GRRule):
+                    continue
+                elif isinstance(item, (GROne, GROptional)):
+                    alternatives = [self.__objectFirstTokens(alternative, set()) for alternative in item.grammarList()]
+
+                    # alternatives for which first tokens can't be determinated, or that can match without
+                    # consuming any token, are always checked
+                    default = tuple(grObject for grObject, (tokenTypes, nullable) in zip(item.grammarList(), alternatives) if tokenTypes is None or nullable)
+
+                    table = {}
+                    for tokenTypes, nullable in alternatives:
+                        if tokenTypes is not None:
+                            for tokenType in tokenTypes:
+                                if tokenType not in table:
+                                    table[tokenType] = tuple(grObject for grObject, (alternativeTokenTypes, alternativeNullable) in zip(item.grammarList(), alternatives)
+                                                             if alternativeTokenTypes is None or alternativeNullable or tokenType in alternativeTokenTypes)
+                    item.setAlternativesTable(table, default)
+
+                recursiveBuild(item.grammarList())
+
+        self.__firstTokens = {}
+        for rule in self.__rules:
+            recursiveBuild(self.__rules[rule].grammarList())
+
+    def firstTokens(self, id):
+        """Return set of token types that can start grammar rule designed by given `id`
+
+        Return None if grammar rule doesn't exist, or if first token types can't be determinated
+        (first tokens are determinated by check())
+        """
+        if self.__firstTokens is None or id not in self.__rules:
+            return None
+        return self.__firstTokens.get(id, (None, False))[0]
 
     def check(self):
         """Check all references to Grammar rules
@@ -819,8 +2136,76 @@ class GrammarRules:
         # remove duplicates
         missingDeclaration = list(set(missingDeclaration))
 
+        if len(missingDeclaration) == 0 and self.__firstTokens is None:
+            # grammar is complete, determinate first tokens for alternatives
+            self.__buildAlternativesTables()
+
         return missingDeclaration
 
+    def freeze(self):
+        """Check and freeze grammar rules
+
+        Grammar is checked once (all references to grammar rules are resolved) and can't be modified anymore:
+        parser doesn't need to check it again on each parsing
+
+        Raise an EInvalidStatus exception if grammar is not complete or first grammar rule is not defined
+        """
+        def recursiveFreeze(list):
+            for item in list:
+                if not isinstance(item, GRRule):
+                    recursiveFreeze(item.grammarList())
+                item.freeze()
+
+        if self.__frozen:
+            return
+
+        NL = '\n'
+        checkResult = self.check()
+        if len(checkResult) > 0:
+            raise EInvalidStatus(f"Current grammar is not complete, some referenced grammar rule are missing:\n {NL.join(checkResult)}")
+        elif self.__firstRule is None:
+            raise EInvalidStatus(f"Current grammar is not valid: first grammar rule hasn't been defined")
+
+        for rule in self.__rules:
+            recursiveFreeze(self.__rules[rule].grammarList())
+            self.__rules[rule].freeze()
+
+        self.__frozen = True
+
+    def frozen(self):
+        """Return True if grammar rules are frozen"""
+        return self.__frozen
+
+    def fingerprint(self):
+        """Return a fingerprint (SHA1 hexadecimal digest) of grammar rules definition
+
+        Fingerprint is modified if a grammar rule, first rule or operator precedence is modified
+        """
+        def grObjectDefinition(grObject):
+            if isinstance(grObject, GRToken):
+                return f"{grObject.__class__.__name__}({grObject.tokenType()}, {sorted(grObject.possibleValues())}, {grObject.optionAst()})"
+            elif isinstance(grObject, GRRule):
+                return f"{grObject.__class__.__name__}({grObject.id()})"
+            return f"{grObject.__class__.__name__}({', '.join([grObjectDefinition(item) for item in grObject.grammarList()])})"
+
+        if self.__fingerprint is not None:
+            # grammar rules are frozen, fingerprint can't change
+            return self.__fingerprint
+
+        fingerprint = hashlib.sha1()
+        fingerprint.update(f"{self.__firstRule}\n".encode())
+        for rule in self.__operatorPrecedence:
+            fingerprint.update(f"{rule.priority()}|{rule.type().__name__}|{rule.operatorType()}|{rule.values()}\n".encode())
+        for id in sorted(self.__rules):
+            grammarRule = self.__rules[id]
+            fingerprint.update(f"{id}|{grammarRule.optionAst()}|{grammarRule.optionPartialMatch()}|{grammarRule.optionOperatorPrecedence()}|{grammarRule.optionNotPrecededBySpace()}|"
+                               f"{', '.join([grObjectDefinition(item) for item in grammarRule.grammarList()])}\n".encode())
+
+        if self.__frozen:
+            self.__fingerprint = fingerprint.hexdigest()
+            return self.__fingerprint
+        return fingerprint.hexdigest()
+
     def count(self):
         """Return number of rules"""
         return len(self.__rules)
@@ -835,7 +2220,9 @@ class GrammarRules:
 
     def setIdFirst(self, id):
         """Set first rule identifiers"""
-        if self.get(id) is None:
+        if self.__frozen:
+            raise EInvalidStatus("Grammar rules are frozen and can't be modified")
+        elif self.get(id) is None:
             self.__firstRule = None
             raise EInvalidValue("Rule `id` designed to be first rule doesn't exists")
         self.__firstRule = id
@@ -843,13 +2230,11 @@ class GrammarRules:
     def setOperatorPrecedence(self, *rules):
         """Define precedence for operators
 
-        Note: currently, for technical reason there's an hardcoded priority:
-        - OPERATOR_INDEX have priority on OPERATOR_UNARY
+        Rules are used by GRExpression (and ASTItem.checkOperatorPrecedence()) to build operator tree:
+        - priority is given according to priority level
         - between OPERATOR_INDEX, priority is given from left to right
             x[0][1][2] => return index 0 from X, and then index 1 from returned list, and then index 2 from returned list
-        - OPERATOR_UNARY have priority on OPERATOR_BINARY
-        - between OPERATOR_UNARY, priority is given from left to right
-        - between OPERATOR_BINARY, priority is given according to priority level
+        - OPERATOR_UNARY is applied to following operand (and to following operators with a higher priority level)
         - between OPERATOR_BINARY with same priority level, priority is given from left to right
 
         Example:
@@ -942,6 +2327,7 @@ class GrammarRule:
     # one even if next tokens doesn't match rules: in this case raise an error without trying to check for an another rule
     OPTION_PARTIAL_MATCH =          0b00000100
     # If set, an operator precedence analysis is made for AST build (otherwise not)
+    # Deprecated: use GRExpression, that build operator tree while parsing
     OPTION_OPERATOR_PRECEDENCE =    0b00001000
     # If set, considerate grammar rule only if previous token is not a SPACE
     OPTION_NOT_PRECEDED_BY_SPACE =  0b00010000
@@ -1047,6 +2433,10 @@ class GrammarRule:
         """Return list of GRObjects that define grammar for current rule"""
         return self._grObjects
 
+    def freeze(self):
+        """Freeze grammar rule: list of GRObjects can't be modified anymore"""
+        self._grObjects = tuple(self._grObjects)
+
     def optionAst(self):
         """Return if grammar rule is returned in AST or not
 
@@ -1073,11 +2463,44 @@ class GRObject:
     def __init__(self):
         self._grObjects = []
         self._matchCount = 0
+        # key=token type, value=tuple of alternatives (GRObject) to check for token type
+        self._alternativesTable = None
+        # tuple of alternatives to check if token type is not in table
+        self._alternativesDefault = None
 
     def grammarList(self):
         """Return list of GRObjects that define grammar for current rule"""
         return self._grObjects
 
+    def freeze(self):
+        """Freeze object: list of GRObjects can't be modified anymore"""
+        self._grObjects = tuple(self._grObjects)
+
+    def setAlternativesTable(self, table=None, default=None):
+        """Set alternatives from grammar list to check according to current token type
+
+        Given `table` is a dictionary (key=token type, value=tuple of alternatives)
+        Given `default` is a tuple of alternatives to check when token type is not in `table`
+
+        If `table` is None, all alternatives are checked
+        """
+        self._alternativesTable = table
+        self._alternativesDefault = default
+
+    def _alternatives(self, tokens, ignoredTokens, parser):
+        """Return alternatives from grammar list that can match current token"""
+        if self._alternativesTable is None:
+            return self._grObjects
+
+        token = tokens.value()
+        if token is None:
+            return self._grObjects
+
+        returned = self._alternativesTable.get(token.type(), self._alternativesDefault)
+        if parser and len(returned) < len(self._grObjects):
+            parser.addAlternativesSkipped(len(self._grObjects) - len(returned))
+        return returned
+
     def check(self, tokens, ignoredTokens=[], grammarRule=None, parser=None):
         """Virtual method, must be overrided"""
         raise EInvalidStatus("Method can't be called from GRObject and must be overrided")
@@ -1120,7 +2543,7 @@ class GROne(GRObject):
 
         index = tokens.index()
 
-        for grObject in self._grObjects:
+        for grObject in self._alternatives(tokens, ignoredTokens, parser):
             # print('Check GROne', grObject)
             checked = grObject.check(tokens, ignoredTokens, grammarRule, parser)
             if checked.status() == ASTStatus.END:
@@ -1178,7 +2601,7 @@ class GROptional(GRObject):
 
         index = tokens.index()
 
-        for grObject in self._grObjects:
+        for grObject in self._alternatives(tokens, ignoredTokens, parser):
             checked = grObject.check(tokens, ignoredTokens, grammarRule, parser)
 
             if checked.status() == ASTStatus.END:
@@ -1236,9 +2659,26 @@ class GRNoneOrMore(GRObject):
         if tokens.eol():
             return ast.setStatus(ASTStatus.MATCH)
 
+        # incremental parsing: items can be reused from previous parsing, and matched items are recorded
+        loopReuse = parser.loopReuse(self) if parser else None
+        recording = parser is not None and parser.incremental()
+        record = None
+
         totalMatchCount = 0
         while True:
+            if parser is not None and parser.cancelRequested():
+                raise EParserCancelled()
+
+            if loopReuse is not None:
+                record, matchCount = parser.reuseLoopItems(self, ast, tokens, record)
+                if matchCount > 0:
+                    totalMatchCount += matchCount
+                    continue
+
             index = tokens.index()
+            if recording:
+                nbNodes, nbTokens, nbErrors = ast.countNodes(), ast.countTokens(), len(parser.errors())
+
             matchCount = 0
             for grObject in self._grObjects:
                 # print('Check GRNoneOrMore', grObject)
@@ -1250,6 +2690,8 @@ class GRNoneOrMore(GRObject):
                 elif checked.status() == ASTStatus.MATCH:
                     matchCount += 1
                     ast.add(checked)
+                    if recording:
+                        record = parser.recordLoopItem(record, self, ast, checked, index, nbNodes, nbTokens, nbErrors)
                     break
                 elif checked.status() == ASTStatus.PARTIAL_MATCH:
                     # print('Check GRNoneOrMore==>partial match', checked)
@@ -1300,9 +2742,26 @@ class GROneOrMore(GRObject):
         if tokens.eol():
             return ast.setStatus(ASTStatus.END)
 
+        # incremental parsing: items can be reused from previous parsing, and matched items are recorded
+        loopReuse = parser.loopReuse(self) if parser else None
+        recording = parser is not None and parser.incremental()
+        record = None
+
         totalMatchCount = 0
         while True:
+            if parser is not None and parser.cancelRequested():
+                raise EParserCancelled()
+
+            if loopReuse is not None:
+                record, matchCount = parser.reuseLoopItems(self, ast, tokens, record)
+                if matchCount > 0:
+                    totalMatchCount += matchCount
+                    continue
+
             index = tokens.index()
+            if recording:
+                nbNodes, nbTokens, nbErrors = ast.countNodes(), ast.countTokens(), len(parser.errors())
+
             matchCount = 0
             for grObject in self._grObjects:
                 checked = grObject.check(tokens, ignoredTokens, grammarRule, parser)
@@ -1318,6 +2777,8 @@ class GROneOrMore(GRObject):
                     # #print('Check GROneOrMore==>match!', checked)
                     matchCount += 1
                     ast.add(checked)
+                    if recording:
+                        record = parser.recordLoopItem(record, self, ast, checked, index, nbNodes, nbTokens, nbErrors)
                     break
                 elif checked.status() == ASTStatus.PARTIAL_MATCH:
                     # print('Check GROneOrMore==>partial match!', checked)
@@ -1339,6 +2800,205 @@ class GROneOrMore(GRObject):
                 return ast.setStatus(ASTStatus.NOMATCH)
 
 
+class GRExpression(GRObject):
+    """An expression: operands, unary operators and binary operators
+
+    Operator tree (UNARY_OPERATOR, BINARY_OPERATOR, INDEX_OPERATOR AST items) is built while
+    parsing expression, according to operator precedence rules defined in GrammarRules
+    (see GrammarRules.setOperatorPrecedence())
+
+    Example:
+        GRExpression('Operand',
+                     GROne(GRToken(TokenType.UNARY_OPERATOR, 'not'), GRToken(TokenType.DUAL_OPERATOR, '-')),
+                     GROne(GRToken(TokenType.BINARY_OPERATOR, '+', '*', '/'), GRToken(TokenType.DUAL_OPERATOR, '-')))
+
+        Nodes returned by operand that are defined as index operators (for example a list index
+        expression) are applied to operand
+    """
+
+    def __init__(self, operand, unaryOperator, binaryOperator):
+        """Initialise expression
+
+        Given `operand` define grammar for an operand
+        Given `unaryOperator` define grammar for an unary operator (a token)
+        Given `binaryOperator` define grammar for a binary operator (a token)
+
+        Each given value can be a <str> (refers to a GrammarRule identifier), a <GrammarRule> or a <GRObject>
+        """
+        super(GRExpression, self).__init__()
+
+        for grObject in (operand, unaryOperator, binaryOperator):
+            if isinstance(grObject, str) or isinstance(grObject, GrammarRule):
+                self._grObjects.append(GRRule(grObject))
+            elif isinstance(grObject, GRObject):
+                self._grObjects.append(grObject)
+            else:
+                raise EInvalidType(f'Arguments for GRExpression must be <str>, <GRObject>, <GrammarRule>: {grObject}')
+
+    def __repr__(self):
+        return f"<GRExpression({self._grObjects})>"
+
+    def operand(self):
+        """Return grammar for operand"""
+        return self._grObjects[0]
+
+    def unaryOperator(self):
+        """Return grammar for unary operators"""
+        return self._grObjects[1]
+
+    def binaryOperator(self):
+        """Return grammar for binary operators"""
+        return self._grObjects[2]
+
+    def check(self, tokens, ignoredTokens=[], grammarRule=None, parser=None):
+        """Check if current tokens match an expression
+
+        Operator tree is built in one pass (operator precedence parsing): operators are kept in a stack
+        and, when an operator with a lower or equal priority is found, operators with a higher or equal
+        priority are removed from stack and converted to an AST item with their operands
+        """
+        def operatorToken(checked):
+            # return token for an operator
+            if checked.countNodes() > 0:
+                return checked.node(0)
+            return checked.tokens()[0]
+
+        def reduce():
+            # convert operator from top of stack to an AST item
+            operator, priority, operatorType = operators.pop()
+            if operatorType == GrammarRules.OPERATOR_BINARY:
+                right = operands.pop()
+                item = ASTItem(ASTSpecialItemType.BINARY_OPERATOR)
+                item.add(operator)
+                item.add(operands[-1])
+                item.add(right)
+            else:
+                item = ASTItem(ASTSpecialItemType.UNARY_OPERATOR)
+                item.add(operator)
+                item.add(operands[-1])
+            item.setStatus(ASTStatus.MATCH)
+            operands[-1] = item
+
+        def reduceOperators(priority):
+            # convert operators from top of stack with a priority higher or equal than given priority
+            while len(operators) > 0 and operators[-1][1] >= priority:
+                reduce()
+
+        def restoreIndex(index):
+            # restore tokens index
+            # (nothing to do if end of tokens list was already reached)
+            if tokens.index() != index:
+                tokens.setIndex(index)
+
+        ast = ASTItem(self.__class__)
+
+        self._matchCount = 0
+        if tokens.eol():
+            return ast.setStatus(ASTStatus.END)
+
+        if isinstance(grammarRule, GrammarRule):
+            grammarRules = grammarRule.grammarRules()
+        else:
+            grammarRules = GrammarRule.grammarRules()
+
+        operand, unaryOperator, binaryOperator = self._grObjects
+
+        # operands and operators (token, priority, operator type) stack
+        operands = []
+        operators = []
+
+        # checked items (operands, operators), used to determinate position of expression
+        items = []
+
+        # index in tokens and number of items before last binary operator
+        binaryOperatorIndex = None
+        binaryOperatorItems = None
+
+        status = ASTStatus.MATCH
+        while True:
+            # unary operators
+            while True:
+                index = tokens.index()
+                checked = unaryOperator.check(tokens, ignoredTokens, grammarRule, parser)
+                if checked.status() != ASTStatus.MATCH:
+                    restoreIndex(index)
+                    break
+                items.append(checked)
+                token = operatorToken(checked)
+                operators.append((token, grammarRules.operatorPrecedence(token, GrammarRules.OPERATOR_UNARY), GrammarRules.OPERATOR_UNARY))
+
+            if checked.status() != ASTStatus.END:
+                # operand (if end of tokens is not reached)
+                checked = operand.check(tokens, ignoredTokens, grammarRule, parser)
+
+            if checked.status() == ASTStatus.NOMATCH:
+                if binaryOperatorIndex is None:
+                    return ast.setStatus(ASTStatus.NOMATCH)
+
+                # operand is not valid after a binary operator: expression stops before binary operator
+                restoreIndex(binaryOperatorIndex)
+                del items[binaryOperatorItems:]
+                while operators[-1][2] != GrammarRules.OPERATOR_BINARY:
+                    operators.pop()
+                operators.pop()
+                break
+            elif checked.status() != ASTStatus.MATCH:
+                # END or PARTIAL_MATCH
+                items.append(checked)
+                if checked.countNodes() > 0:
+                    operands.append(checked.node(0))
+                else:
+                    operands.append(None)
+
+                if checked.status() == ASTStatus.PARTIAL_MATCH or binaryOperatorIndex is None:
+                    status = checked.status()
+                break
+
+            items.append(checked)
+            nodes = checked.nodes()
+            operands.append(nodes[0] if len(nodes) > 0 else None)
+            for node in nodes[1:]:
+                # index operators
+                if GrammarRules.OPERATOR_INDEX in grammarRules.operatorType(node):
+                    reduceOperators(grammarRules.operatorPrecedence(node, GrammarRules.OPERATOR_INDEX))
+                    item = ASTItem(ASTSpecialItemType.INDEX_OPERATOR)
+                    item.add(node)
+                    item.add(operands[-1])
+                    item.setStatus(ASTStatus.MATCH)
+                    operands[-1] = item
+
+            # binary operator
+            index = tokens.index()
+            checked = binaryOperator.check(tokens, ignoredTokens, grammarRule, parser)
+            if checked.status() != ASTStatus.MATCH:
+                restoreIndex(index)
+                break
+
+            binaryOperatorIndex = index
+            binaryOperatorItems = len(items)
+            items.append(checked)
+            token = operatorToken(checked)
+            priority = grammarRules.operatorPrecedence(token, GrammarRules.OPERATOR_BINARY)
+            reduceOperators(priority)
+            operators.append((token, priority, GrammarRules.OPERATOR_BINARY))
+
+        if status == ASTStatus.MATCH:
+            self._matchCount = 1
+
+        while len(operators) > 0:
+            if operators[-1][2] == GrammarRules.OPERATOR_BINARY and len(operands) < 2:
+                # binary operator without right operand (end of tokens)
+                operands.append(None)
+            reduce()
+
+        for item in items:
+            ast.add(item, False)
+        if operands[0] is not None:
+            ast.add(operands[0])
+
+        return ast.setStatus(status)
+
+
 class GRToken(GRObject):
     """One token"""
 
@@ -1373,29 +3033,25 @@ class GRToken(GRObject):
         """Return possible values, if any"""
         return self.__possibleValues
 
+    def freeze(self):
+        """Freeze object: possible values are converted to a frozenset, faster to check"""
+        super(GRToken, self).freeze()
+        if isinstance(self.__possibleValues, list):
+            self.__possibleValues = frozenset(self.__possibleValues)
+
     def check(self, tokens, ignoredTokens=[], grammarRule=None, parser=None):
-        """Check if current token match expected token"""
-        def checkIfPreviousIsSpace():
-            prev = tokens.prev(False)
-            return prev and prev.type() in (TokenType.SPACE, TokenType.NEWLINE)
+        """Check if current token match expected token
 
+        Given `tokens` are ParserTokens: ignored tokens are already filtered
+        """
         ast = ASTItem(self.__class__)
 
         self._matchCount = 0
-        if tokens.eol():
-            return ast.setStatus(ASTStatus.END)
-
         token = tokens.value()
-
-        while (token is not None) and (token.type() in ignoredTokens):
-            # if there's token to ignore (like spaces, comments, ...)
-            # continue to next token
-            token = tokens.next()
-
         if token is None:
             return ast.setStatus(ASTStatus.END)
 
-        if grammarRule and grammarRule.optionNotPrecededBySpace() and checkIfPreviousIsSpace():
+        if grammarRule and grammarRule.optionNotPrecededBySpace() and tokens.precededBySpace():
             return ast.setStatus(ASTStatus.NOMATCH)
 
         if token.type() == self.__tokenType:
@@ -1411,18 +3067,7 @@ class GRToken(GRObject):
             self._matchCount = 1
 
             # move to next token, to continue parsing
-            token = tokens.next()
-
-            while (token is not None) and (token.type() in ignoredTokens):
-                # if there's token to ignore (like spaces, comments, ...)
-                # continue to next token
-                token = tokens.next()
-
-            # #print('GRToken.check(B)', token, grammarRule.optionNotPrecededBySpace(), checkIfPreviousIsSpace())
-            # #if grammarRule and grammarRule.optionNotPrecededBySpace() and checkIfPreviousIsSpace():
-            # #   return ast.setStatus(ASTStatus.NOMATCH)
-
-            # #print('GRToken: Next ', token)
+            tokens.next()
 
             return ast.setStatus(ASTStatus.MATCH)
         return ast.setStatus(ASTStatus.NOMATCH)
@@ -1442,19 +3087,20 @@ class GRRule(GRObject):
             raise EInvalidType(f'Given `id` must be <str> or <GrammarRule>: {id}')
 
         self.__grammarRule = id
+        if isinstance(id, str):
+            self.__id = id
+        else:
+            # is a GrammarRule
+            self.__id = id.id()
         self.__currentCheckedGrammar = None
         self.__currentCheckedGrammarIndex = None
 
     def __repr__(self):
-        return f"<GRRule({self.__grammarRule.id()})>"
+        return f"<GRRule({self.__id})>"
 
     def id(self):
         """Return identifier for GrammarRule"""
-        if isinstance(self.__grammarRule, str):
-            return self.__grammarRule
-        else:
-            # is a GrammarRule
-            return self.__grammarRule.id()
+        return self.__id
 
     def currentCheckedGrammar(self):
         """Return current grammar that is being checked
@@ -1488,20 +3134,50 @@ class GRRule(GRObject):
                 self.__grammarRule = object
 
     def check(self, tokens, ignoredTokens=[], grammarRule=None, parser=None):
-        """Check if One or More grammar rules match current token"""
+        """Check if One or More grammar rules match current token
+
+        Result only depends of grammar rule and token index: if parser provides a packrat cache, result is
+        returned from cache when grammar rule has already been checked at the same token index
+        """
         # loop over GRObjects list
         # if one is matching expected value, exit and return True
         # if none is matching expected value, exit return True
         # if more than one is matching expected value, exit and return True
         # #print('Check GRRule', self.id())
+        if tokens.eol():
+            self.__currentCheckedGrammar = None
+            self.__currentCheckedGrammarIndex = None
+            return ASTItem(self.id(), self.__grammarRule).setStatus(ASTStatus.END)
+
+        if profiling := (parser is not None and parser.profiling()):
+            startIndex = tokens.index()
+            startTime = parser.profileEnter()
+
+        if parser is None:
+            packratCache = None
+        elif (packratCache := parser.packratCache()) is not None:
+            packratKey = (self.id(), tokens.index())
+            if cached := packratCache.get(packratKey):
+                ast, index, errors, self.__currentCheckedGrammarIndex, self.__currentCheckedGrammar = cached
+                if index < tokens.length():
+                    tokens.setIndex(index)
+                else:
+                    # end of tokens list
+                    tokens.last()
+                    tokens.next()
+
+                for error in errors:
+                    parser.addError(error)
+                if profiling:
+                    parser.profileExit(self.__id, ast.status(), tokens.index() - startIndex, startTime, True)
+                return ast
+            nbErrors = len(parser.errors())
+
         self.__currentCheckedGrammar = None
         self.__currentCheckedGrammarIndex = None
 
         ast = ASTItem(self.id(), self.__grammarRule)
 
-        if tokens.eol():
-            return ast.setStatus(ASTStatus.END)
-
         # debugIdValue = random.randint(0, 999999)
         for currentCheckedGrammarIndex, currentCheckedGrammar in enumerate(self.__grammarRule.grammarList()):
             # print(". checked:", debugIdValue, '-->', currentCheckedGrammarIndex, currentCheckedGrammar)
@@ -1516,8 +3192,10 @@ class GRRule(GRObject):
                     self.__currentCheckedGrammar = currentCheckedGrammar
                     if parser:
                         parser.addError(ParserError(i18n("Incomplete syntax"), tokens.value(), self, ast))
-                    return ast.setStatus(ASTStatus.PARTIAL_MATCH)
-                return ast.setStatus(ASTStatus.END)
+                    ast.setStatus(ASTStatus.PARTIAL_MATCH)
+                else:
+                    ast.setStatus(ASTStatus.END)
+                break
             elif checked.status() in (ASTStatus.NOMATCH, ASTStatus.PARTIAL_MATCH):
                 self.__currentCheckedGrammarIndex = currentCheckedGrammarIndex
                 self.__currentCheckedGrammar = currentCheckedGrammar
@@ -1526,8 +3204,21 @@ class GRRule(GRObject):
                     ast.add(checked)
                     if parser:
                         parser.addError(ParserError(i18n("Invalid syntax"), tokens.value(), self, ast))
-                    return ast.setStatus(ASTStatus.PARTIAL_MATCH)
-                return ast.setStatus(ASTStatus.NOMATCH)
+                    ast.setStatus(ASTStatus.PARTIAL_MATCH)
+                else:
+                    ast.setStatus(ASTStatus.NOMATCH)
+                break
             ast.add(checked)
+        else:
+            ast.setStatus(ASTStatus.MATCH)
 
-        return ast.setStatus(ASTStatus.MATCH)
+        if self.__grammarRule.optionOperatorPrecedence():
+            ast.checkOperatorPrecedence()
+
+        if packratCache is not None and len(packratCache) < parser.packratMaxEntries():
+            packratCache[packratKey] = (ast, tokens.index(), parser.errors()[nbErrors:], self.__currentCheckedGrammarIndex, self.__currentCheckedGrammar)
+
+        if profiling:
+            parser.profileExit(self.__id, ast.status(), tokens.index() - startIndex, startTime)
+
+        return ast
@@ -286,3 +286,42 @@ def indent(text, firstIndent='', nextIndent='', strip=False):
 def boolYesNo(value):
     """Return yes or no according to value is True or False"""
     return i18n("Yes") if value else i18n("No")
+
+
+def strDiffRange(textFrom, textTo):
+    """Return modified range between given texts `textFrom` and `textTo`
+
+    Returned value is a tuple (position, charsRemoved, charsAdded)
+    """
+    length = min(len(textFrom), len(textTo))
+
+    # search common prefix length
+    lo = 0
+    hi = length
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if textFrom[:mid] == textTo[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    position = lo
+
+    # search common suffix length, without overlapping prefix
+    lo = 0
+    hi = length - position
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if textFrom[len(textFrom) - mid:] == textTo[len(textTo) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+
+    return (position, len(textFrom) - position - lo, len(textTo) - position - lo)
+
+
+def strIsBmp(value):
+    """Return True if given string `value` only contains characters from unicode Basic Multilingual Plane
+
+    In this case, positions in string are the same in python and in UTF-16 code units (QString)
+    """
+    return value.isascii() or max(value) <= '\uffff'
@@ -32,9 +32,21 @@
 import hashlib
 import re
 import time
+import weakref
+
+from array import array
+from bisect import (
+        bisect_left,
+        bisect_right
+    )
+from collections import OrderedDict
 
 from PyQt5.Qt import *
 from .elist import EList
+from .strutils import (
+        strDiffRange,
+        strIsBmp
+    )
 from .uitheme import UITheme
 from ..pktk import *
 
@@ -137,56 +149,43 @@ class Token(object):
     - a type
     - a value
     - position (column and row) from original text
-    """
-    __LINE_NUMBER = 0
-    __LINE_POSSTART = 0
 
-    @staticmethod
-    def resetTokenizer():
-        Token.__LINE_NUMBER = 1
-        Token.__LINE_POSSTART = 0
-
-    def __init__(self, text, rule, positionStart, positionEnd, length, simplifySpaces=False):
-        self.__text = text.lstrip()
-        self.__rule = rule
-        self.__positionStart = positionStart
-        self.__positionEnd = positionEnd
-        self.__length = length
-        self.__lineNumber = Token.__LINE_NUMBER
-        self.__linePositionStart = (positionStart - Token.__LINE_POSSTART)+1
-        self.__linePositionEnd = self.__linePositionStart + length
-        self.__next = None
-        self.__previous = None
-        self.__simplifySpaces = simplifySpaces
-
-        if self.type() == TokenType.NEWLINE:
-            self.__indent = 0
-            Token.__LINE_NUMBER += text.count('\n')
-            Token.__LINE_POSSTART = positionEnd
-        else:
-            self.__indent = len(text) - len(self.__text)
-
-        if simplifySpaces and self.type() != TokenType.COMMENT:
-            # do not simplify COMMENT token
-            self.__text = re.sub(r"\s+", " ", self.__text)
-
-        self.__caseInsensitive = self.__rule.caseInsensitive()
-        self.__iText = self.__text.lower()
-
-        self.__value = self.__rule.initValue(self.__text)
+    Token is a view on item `index` of a Tokens object: it's created by Tokens only when accessed,
+    and text, lower-case text and value are determinated on first access
+    """
+    __slots__ = ('__tokens', '__index', '__rule', '__positionStart', '__positionEnd', '__lineNumber', '__linePositionStart',
+                 '__indent', '__text', '__iText', '__value', '__valueDefined')
+
+    # type of tokens produced by tokenizer for indentation: no text
+    __INDENT_TYPES = (TokenType.INDENT, TokenType.DEDENT, TokenType.WRONG_INDENT, TokenType.WRONG_DEDENT)
+
+    def __init__(self, tokens, index):
+        ruleIds, positionsStart, positionsEnd, rows, columns, indents = tokens.tokensData()
+        self.__tokens = tokens
+        self.__index = index
+        self.__rule = tokens.rules()[ruleIds[index]]
+        self.__positionStart = positionsStart[index]
+        self.__positionEnd = positionsEnd[index]
+        self.__lineNumber = rows[index]
+        self.__linePositionStart = columns[index]
+        self.__indent = indents[index]
+        self.__text = None
+        self.__iText = None
+        self.__value = None
+        self.__valueDefined = False
 
     def __repr__(self):
         if self.type() == TokenType.NEWLINE:
             txt = ''
         else:
-            txt = self.__text
+            txt = self.text()
         return (f"<Token({self.__indent}, '{txt}', Type[{self.type()}]"
-                f"Length: {self.__length}, "
+                f"Length: {self.length()}, "
                 f"Global[Start: {self.__positionStart}, End: {self.__positionEnd}], "
-                f"Line[Start: {self.__linePositionStart}, End: {self.__linePositionEnd}, Number: {self.__lineNumber}])>")
+                f"Line[Start: {self.__linePositionStart}, End: {self.__linePositionStart + self.length()}, Number: {self.__lineNumber}])>")
 
     def __str__(self):
-        return f'| {self.__linePositionStart:>5} | {self.__lineNumber:>5} | {self.__indent:>2} | {self.type():<50} | {self.__length:>2} | `{self.__text}`'
+        return f'| {self.__linePositionStart:>5} | {self.__lineNumber:>5} | {self.__indent:>2} | {str(self.type()):<50} | {self.length():>2} | `{self.text()}`'
 
     def type(self):
         """return token type"""
@@ -202,7 +201,7 @@ class Token(object):
 
     def length(self):
         """Return text length"""
-        return self.__length
+        return self.__positionEnd - self.__positionStart
 
     def indent(self):
         """Return token indentation"""
@@ -210,6 +209,15 @@ class Token(object):
 
     def text(self):
         """Return token text"""
+        if self.__text is None:
+            if self.__rule.type() in Token.__INDENT_TYPES:
+                self.__text = ''
+            else:
+                self.__text = self.__tokens.textRange(self.__positionStart, self.__positionEnd).lstrip()
+
+                if self.__tokens.simplifySpaces() and self.__rule.type() != TokenType.COMMENT:
+                    # do not simplify COMMENT token
+                    self.__text = re.sub(r"\s+", " ", self.__text)
         return self.__text
 
     def value(self):
@@ -219,27 +227,52 @@ class Token(object):
         - text is raw text, provided as string value
         - value is a pre-processed text
         """
+        if not self.__valueDefined:
+            self.__value = self.__rule.initValue(self.text())
+            self.__valueDefined = True
         return self.__value
 
     def rule(self):
         """Return token rule"""
         return self.__rule
 
-    def setNext(self, token=None):
-        """Set next token"""
-        self.__next = token
+    def index(self):
+        """Return index of token in tokens list"""
+        return self.__index
 
-    def setPrevious(self, token=None):
-        """Set previous token"""
-        self.__previous = token
+    def tokens(self):
+        """Return tokens list from which token is issued"""
+        return self.__tokens
 
     def next(self):
         """Return next token, or None if current token is the last one"""
-        return self.__next
+        return self.__tokens.value(self.__index + 1)
+
+    @staticmethod
+    def relocate(tokenObjects, tokens, indexOffset=0, positionOffset=0, rowOffset=0):
+        """Move given Token objects to given `tokens`, with index, position and row shifted by given offsets
+        (None items from given `tokenObjects` list are ignored)
+
+        Used when tokens from a previous tokenization are reused: token rule, text and column must be the same
+        """
+        if indexOffset == 0 and positionOffset == 0 and rowOffset == 0:
+            for token in tokenObjects:
+                if token is not None:
+                    token.__tokens = tokens
+        else:
+            for token in tokenObjects:
+                if token is not None:
+                    token.__tokens = tokens
+                    token.__index += indexOffset
+                    token.__positionStart += positionOffset
+                    token.__positionEnd += positionOffset
+                    token.__lineNumber += rowOffset
 
     def previous(self):
-        """Return previous token, or None if current token is the last one"""
-        return self.__previous
+        """Return previous token, or None if current token is the first one"""
+        if self.__index > 0:
+            return self.__tokens.value(self.__index - 1)
+        return None
 
     def column(self):
         """Return column number for token"""
@@ -255,12 +288,12 @@ class Token(object):
 
     def simplifySpaces(self):
         """Return if spaces are simplified or not"""
-        return self.__simplifySpaces
+        return self.__tokens.simplifySpaces()
 
     def equal(self, value, doLower=False, caseInsensitive=None):
         """Check if given text `value` equals or not text value from token
 
-        If given `value` is a list, check if token text is in given list
+        If given `value` is a list (or tuple, set), check if token text is in given list
 
         If `doLower` is True, equal() will lowercase value before comparison (if case insensitive)
         If False, consider that when equal function is called, value are already provided as lowercase
@@ -271,10 +304,13 @@ class Token(object):
         Otherwise (None value) comparison will use the rule defined by tokenizerule
         """
         if caseInsensitive is None:
-            checkCaseInsensitive = self.__caseInsensitive
+            checkCaseInsensitive = self.__rule.caseInsensitive()
         else:
             checkCaseInsensitive = (caseInsensitive is True)
 
+        if checkCaseInsensitive and self.__iText is None:
+            self.__iText = self.text().lower()
+
         if isinstance(value, str):
             if checkCaseInsensitive:
                 if doLower:
@@ -282,38 +318,260 @@ class Token(object):
 
                 return (self.__iText == value)
             else:
-                return (self.__text == value)
-        elif isinstance(value, list) or isinstance(value, tuple):
+                return (self.text() == value)
+        elif isinstance(value, (list, tuple, set, frozenset)):
             if checkCaseInsensitive:
                 if doLower:
                     lValue = [v.lower() for v in value]
                     return (self.__iText in lValue)
                 return (self.__iText in value)
             else:
-                return (self.__text in value)
+                return (self.text() in value)
 
 
 class Tokens(EList):
-    """A tokenized text with facilities to access and parse tokens"""
+    """A tokenized text with facilities to access and parse tokens
 
-    def __init__(self, text, tokens):
-        super(Tokens, self).__init__(tokens)
+    Tokens are stored as parallel arrays (rule id, position start, position end, row, column, indent)
+    with original text; Token objects are created only when accessed
 
-        self.__text = None
+    Positions are defined in UTF-16 code units (as QString positions)
+    """
+
+    def __init__(self, text, tokensData=None, rules=None, simplifySpaces=False, indent=None, indentPosition=None, unknownIndex=None):
+        """Initialise tokens
+
+        Given `tokensData` is a tuple of arrays (rule id, position start, position end, row, column, indent)
+        Given `rules` is the list of rules referenced by rule id
+        Given `simplifySpaces` define if spaces are simplified in token texts
+        Given `indent` is indent value used by tokenizer to produce INDENT/DEDENT tokens
+        (-1 if indent value has not been determinated, None if unknown)
+        Given `indentPosition` is the position of token from which `indent` is applied
+        (-1 if `indent` is applied from start, None if `indent` is not determinated)
+        Given `unknownIndex` is the index of first unknown token, if any
+        """
+        if not isinstance(text, str):
+            raise EInvalidType('Given `text` must be a <str>')
+
+        if tokensData is None:
+            tokensData = tuple(array('i') for index in range(6))
 
-        if isinstance(text, str):
-            self.__text = text
+        self.__text = text
+        if strIsBmp(text):
+            # python string index and UTF-16 positions are the same
+            self.__textUtf16 = None
         else:
-            raise Exception('Given `text` must be a <str>')
+            self.__textUtf16 = text.encode('utf-16-le')
+        self.__tokensData = tokensData
+        self.__rules = rules
+        self.__simplifySpaces = simplifySpaces
+        self.__indent = indent
+        self.__indentPosition = indentPosition
+        self.__unknownIndex = unknownIndex
+        self.__nbTokens = len(tokensData[0])
+
+        # position of lines start in text, built on demand
+        self.__lineStarts = None
+
+        # Token objects, created on demand
+        self.__tokens = [None] * self.__nbTokens
+
+        # when tokens are produced by Tokenizer.retokenize(), define which tokens are reused from previous tokens
+        self.__reusedFrom = None
+
+        super(Tokens, self).__init__(self.__tokens)
 
     def __repr__(self):
         nl = '\n'
         return f"<Tokens({self.length()}, [{nl}{f'{nl}'.join([f'{token}' for token in self.list()])}{nl}])>"
 
+    def value(self, index=None):
+        """Return current token
+
+        If `index` is provided, return token for given index.
+        If given index is outside bounds, return 'None'
+        """
+        if index is None:
+            index = self.index()
+
+        if 0 <= index < self.__nbTokens:
+            token = self.__tokens[index]
+            if token is None:
+                token = Token(self, index)
+                self.__tokens[index] = token
+            return token
+        return None
+
+    def list(self):
+        """Return list of tokens
+
+        All Token objects are created
+        """
+        for index in range(self.__nbTokens):
+            if self.__tokens[index] is None:
+                self.__tokens[index] = Token(self, index)
+        return self.__tokens
+
+    def textRange(self, positionStart, positionEnd):
+        """Return original tokenized text between given positions"""
+        if self.__textUtf16 is None:
+            return self.__text[positionStart:positionEnd]
+        return self.__textUtf16[positionStart * 2:positionEnd * 2].decode('utf-16-le')
+
+    def textLength(self):
+        """Return length of original tokenized text, in UTF-16 code units (as tokens positions)"""
+        if self.__textUtf16 is None:
+            return len(self.__text)
+        return len(self.__textUtf16) // 2
+
+    def isBmp(self):
+        """Return True if original tokenized text only contains characters from unicode Basic Multilingual Plane"""
+        return self.__textUtf16 is None
+
+    def tokensData(self):
+        """Return tokens as a tuple of arrays (rule id, position start, position end, row, column, indent)"""
+        return self.__tokensData
+
+    def rules(self):
+        """Return list of rules referenced by rule id"""
+        return self.__rules
+
+    def simplifySpaces(self):
+        """Return if spaces are simplified or not in token texts"""
+        return self.__simplifySpaces
+
     def text(self):
         """Return original tokenized text"""
         return self.__text
 
+    def indent(self):
+        """Return indent value used to produce INDENT/DEDENT tokens"""
+        return self.__indent
+
+    def indentPosition(self):
+        """Return position of token from which indent() value is applied"""
+        return self.__indentPosition
+
+    def unknownIndex(self):
+        """Return index of first unknown token, or None if there's no unknown token"""
+        return self.__unknownIndex
+
+    def unknownToken(self):
+        """Return first unknown token, or None if there's no unknown token"""
+        if self.__unknownIndex is None:
+            return None
+        return self.value(self.__unknownIndex)
+
+    def reusedFrom(self):
+        """Return, if tokens have been produced by Tokenizer.retokenize(), a tuple
+        (previous tokens, prefix length, suffix index, suffix offset)
+
+        - tokens before `prefix length` are the same than in previous tokens
+        - tokens from `suffix index` in previous tokens are the same in current tokens, with index shifted by
+          `suffix offset` (`suffix index` is None if there's no suffix)
+
+        Return None if tokens have not been produced by Tokenizer.retokenize(), if previous tokens don't exist
+        anymore or if Token objects have already been taken from previous tokens (see reuseTokens())
+        """
+        if self.__reusedFrom is None:
+            return None
+
+        previousTokens = self.__reusedFrom[0]()
+        if previousTokens is None:
+            return None
+        return (previousTokens, *self.__reusedFrom[1:])
+
+    def setReusedFrom(self, tokens, prefixLength, suffixIndex=None, suffixOffset=0):
+        """Define tokens reused from given previous `tokens` (see reusedFrom())"""
+        if not isinstance(tokens, Tokens):
+            raise EInvalidType("Given `tokens` must be a <Tokens>")
+        self.__reusedFrom = (weakref.ref(tokens), prefixLength, suffixIndex, suffixOffset)
+
+    def reuseTokens(self):
+        """Take Token objects already created by previous tokens (see reusedFrom()) for reused tokens
+
+        Token objects are moved (not copied): they're not available anymore in previous tokens
+        Return True if Token objects have been taken, otherwise False
+        """
+        reusedFrom = self.reusedFrom()
+        self.__reusedFrom = None
+        if reusedFrom is None:
+            return False
+
+        previousTokens, prefixLength, suffixIndex, suffixOffset = reusedFrom
+        previousTokenObjects = previousTokens.__tokens
+
+        tokenObjects = previousTokenObjects[:prefixLength]
+        Token.relocate(tokenObjects, self)
+        self.__tokens[:prefixLength] = tokenObjects
+        previousTokenObjects[:prefixLength] = [None] * prefixLength
+
+        if suffixIndex is not None:
+            previousTokensData = previousTokens.tokensData()
+            index = suffixIndex + suffixOffset
+            positionOffset = self.__tokensData[1][index] - previousTokensData[1][suffixIndex]
+            rowOffset = self.__tokensData[3][index] - previousTokensData[3][suffixIndex]
+
+            tokenObjects = previousTokenObjects[suffixIndex:]
+            Token.relocate(tokenObjects, self, suffixOffset, positionOffset, rowOffset)
+            self.__tokens[index:] = tokenObjects
+            previousTokenObjects[suffixIndex:] = [None] * len(tokenObjects)
+        return True
+
+    def lineStarts(self):
+        """Return positions of lines start in text, as an array (first line is at index 0)
+
+        As tokens positions, positions are UTF-16 code units
+        """
+        if self.__lineStarts is None:
+            lineStarts = array('i', [0])
+            if self.__textUtf16 is None:
+                position = self.__text.find('\n')
+                while position >= 0:
+                    lineStarts.append(position + 1)
+                    position = self.__text.find('\n', position + 1)
+            else:
+                # only line feed found on a code unit boundary (even byte position) is a line feed
+                position = self.__textUtf16.find(b'\n\x00')
+                while position >= 0:
+                    if position % 2 == 0:
+                        lineStarts.append(position // 2 + 1)
+                    position = self.__textUtf16.find(b'\n\x00', position + 1)
+            self.__lineStarts = lineStarts
+        return self.__lineStarts
+
+    def lineCount(self):
+        """Return number of lines in text"""
+        return len(self.lineStarts())
+
+    def lineText(self, row):
+        """Return text for given `row` (start from 1), without line feed
+
+        Return None if row is outside text
+        """
+        lineStarts = self.lineStarts()
+        if row < 1 or row > len(lineStarts):
+            return None
+        elif row == len(lineStarts):
+            return self.textRange(lineStarts[row - 1], self.textLength())
+        return self.textRange(lineStarts[row - 1], lineStarts[row] - 1)
+
+    def positionToColRow(self, position):
+        """Return a tuple(column, row) (start from 1/1) for given `position` in text"""
+        lineStarts = self.lineStarts()
+        row = bisect_right(lineStarts, position)
+        return (position - lineStarts[row - 1] + 1, row)
+
+    def colRowToPosition(self, col, row):
+        """Return position in text for given `row`/`col` (start from 1/1)
+
+        Return None if row is outside text
+        """
+        lineStarts = self.lineStarts()
+        if row < 1 or row > len(lineStarts):
+            return None
+        return lineStarts[row - 1] + col - 1
+
     def inText(self, displayPosition=False, reference=None):
         """Return current token in text
 
@@ -360,26 +618,26 @@ class Tokens(EList):
             else:
                 raise Exception("Given `reference` must be a <tuple(<int>,<int>)>")
 
-            if len(reference) >= 3 and isinstance(reference[3], int):
-                length = max(1, reference[1])
+            if len(reference) >= 3 and isinstance(reference[2], int):
+                length = max(1, reference[2])
         else:
             raise Exception("When given, `reference` must be a <Token> or <tuple(<int>,<int>)>")
 
-        rows = self.__text.split('\n')
+        rowText = self.lineText(row + 1)
 
         returned = []
-        if row >= 0 and row < len(rows):
+        if rowText is not None:
             if displayPosition:
                 returned.append(f'At position ({col}, {row}):')
 
-            returned.append(rows[row])
+            returned.append(rowText)
 
-            if col >= 0 and col < len(rows[row]):
+            if col >= 0 and col < len(rowText):
                 returned.append(('.' * col) + ('^' * length))
             elif col < 0:
                 returned.append('<--')
             else:
-                returned.append(('-' * len(rows[row])) + outsideArrowRight)
+                returned.append(('-' * len(rowText)) + outsideArrowRight)
 
             return '\n'.join(returned)
         else:
@@ -390,17 +648,16 @@ class Tokens(EList):
 
         Return None if nothing to return
         """
-        token = self.first(False)
+        ruleIds, positionsStart, positionsEnd, rows, columns, indents = self.__tokensData
 
-        while token and token.row() < row:
-            # continue to next tokens
-            token = token.next()
+        # rows are sorted: tokens from row are found by bisection
+        index = bisect_left(rows, row)
+        indexEnd = bisect_right(rows, row, index)
 
-        # tokens from row
-        while token and token.row() == row and token.column() <= col:
-            if token.column() <= col and col < token.column() + token.length():
-                return token
-            token = token.next()
+        while index < indexEnd and columns[index] <= col:
+            if col < columns[index] + positionsEnd[index] - positionsStart[index]:
+                return self.value(index)
+            index += 1
 
         return None
 
@@ -686,6 +943,32 @@ class Tokenizer(object):
     __TOKEN_DEDENT_RULE = TokenizerRule(TokenType.DEDENT, '')
     __TOKEN_WRONGINDENT_RULE = TokenizerRule(TokenType.WRONG_INDENT, '')
     __TOKEN_WRONGDEDENT_RULE = TokenizerRule(TokenType.WRONG_DEDENT, '')
+    __TOKEN_INDENT_RULES = (__TOKEN_INDENT_RULE, __TOKEN_DEDENT_RULE, __TOKEN_WRONGINDENT_RULE, __TOKEN_WRONGDEDENT_RULE)
+
+    # default cache limits: number of entries, approximative size (in bytes)
+    CACHE_MAX_ENTRIES = 250
+    CACHE_MAX_SIZE = 32 * 1024 * 1024
+
+    # approximative memory footprint (in bytes) of a token (data + Token object, once accessed),
+    # used to estimate cache size
+    __CACHE_TOKEN_SIZE = 200
+
+    # text shorter than this value, without line feed, is used as cache key
+    # longer text use a SHA1 digest as key
+    __CACHE_KEY_TEXT_MAXLENGTH = 256
+
+    # regular expression engine used to lex text
+    # - AUTO: the faster engine for rules is selected on first tokenized text long enough to be a
+    #         significant sample (if both engines return the same tokens)
+    # - QT: QRegularExpression (PCRE2)
+    # - PYTHON: python `re` module (if rules can be compiled with it)
+    REGEX_BACKEND_AUTO = 'auto'
+    REGEX_BACKEND_QT = 'qt'
+    REGEX_BACKEND_PYTHON = 'python'
+
+    # min/max length of text used to select regular expression backend in auto mode
+    __REGEX_BACKEND_SAMPLE_MINLENGTH = 2000
+    __REGEX_BACKEND_SAMPLE_MAXLENGTH = 5000
 
     def __init__(self, rules=None):
         # internal storage for rules (list of TokenizerRule)
@@ -696,12 +979,44 @@ class Tokenizer(object):
         # a global regEx with all rules
         self.__regEx = None
 
+        # a list to retrieve rule from captured group index of global regEx
+        # (each rule is defined as a capturing group in global regEx, index 0 is not a rule)
+        self.__regExGroupRules = []
+
+        # rules referenced by rule id in produced Tokens: rules followed by indent rules
+        # and list to retrieve rule id from captured group index of global regEx
+        self.__tokenRules = Tokenizer.__TOKEN_INDENT_RULES
+        self.__regExGroupRuleIds = []
+
+        # the global regEx, compiled with python `re` module
+        # (None if rules can't be compiled with python `re` module)
+        self.__regExPython = None
+
+        # regular expression backend to use, and backend selected for rules
+        # (selected backend is None until auto selection has been made)
+        self.__regExBackend = Tokenizer.REGEX_BACKEND_AUTO
+        self.__regExBackendSelected = None
+
         # a flag to determinate if regular expression&cache need to be updated
         self.__needUpdate = True
 
-        # a cache to store tokenized code
-        self.__cache = {}
-        self.__cacheOrdered = []
+        # fingerprint of tokenizer definition, calculated on demand
+        self.__fingerprint = None
+
+        # tokenize() can be called from different threads: protect access to cache and
+        # built regular expression
+        self.__mutex = QMutex(QMutex.Recursive)
+
+        # a LRU cache to store tokenized code
+        # key=text hash, value=(Tokens, approximative size)
+        # least recently used items are first
+        self.__cache = OrderedDict()
+        self.__cacheSize = 0
+        self.__cacheMaxEntries = Tokenizer.CACHE_MAX_ENTRIES
+        self.__cacheMaxSize = Tokenizer.CACHE_MAX_SIZE
+        self.__cacheHits = 0
+        self.__cacheMisses = 0
+        self.__cacheEvictions = 0
 
         # when True, for token including spaces, reduce consecutive spaces to 1
         # example: 'set    value'
@@ -763,30 +1078,41 @@ class Tokenizer(object):
 
         return None
 
+    def __cacheKey(self, text):
+        """Return key for given text in cache
+
+        Short single line text (as provided by syntax highlighter) is used as its own key, as
+        python string hash is cheaper than a SHA1 digest; other text use a SHA1 digest
+        (a <bytes> value, that can't be equal to a <str> key)
+        """
+        if len(text) < Tokenizer.__CACHE_KEY_TEXT_MAXLENGTH and '\n' not in text:
+            return text
+        return hashlib.sha1(text.encode()).digest()
+
     def __setCache(self, hashValue, tokens=None):
         """Update cache content
 
-        If no tokens is provided, consider to update existing hashValue
+        If `tokens` is True, mark existing `hashValue` as most recently used
+        If `tokens` is False, remove existing `hashValue` from cache
+        Otherwise add given `tokens` as most recently used for `hashValue`
         """
+        self.__mutex.lock()
         if tokens is True:
-            # update cache timestamp
             # ==> assume that hashvalue exists in cache!!
-            index = self.__cacheOrdered.index(hashValue)
-            self.__cacheOrdered.pop(self.__cacheOrdered.index(hashValue))
-            self.__cache[hashValue][0] = time.time()
-            self.__cacheOrdered.append(hashValue)
-            self.__cache[hashValue][1].resetIndex()
+            self.__cache.move_to_end(hashValue)
+            self.__cache[hashValue][0].resetIndex()
         elif tokens is False:
-            # remove from cache
             # ==> assume that hashvalue exists in cache!!
-            index = self.__cacheOrdered.index(hashValue)
-            self.__cacheOrdered.pop(self.__cacheOrdered.index(hashValue))
-            self.__cache.pop(hashValue)
+            self.__cacheSize -= self.__cache.pop(hashValue)[1]
         else:
-            # add to cache
-            self.__cache[hashValue] = [time.time(), tokens, len(self.__cacheOrdered)]
-            self.__cacheOrdered.append(hashValue)
-            self.__cache[hashValue][1].resetIndex()
+            if hashValue in self.__cache:
+                self.__cacheSize -= self.__cache.pop(hashValue)[1]
+            size = len(tokens.text()) * 2 + tokens.length() * Tokenizer.__CACHE_TOKEN_SIZE
+            self.__cache[hashValue] = (tokens, size)
+            self.__cacheSize += size
+            tokens.resetIndex()
+            self.clearCache(False)
+        self.__mutex.unlock()
 
     def indent(self):
         """Return current indent value used to generate INDENT/DEDENT tokens"""
@@ -872,44 +1198,212 @@ class Tokenizer(object):
         return self.__invalidRules
 
     def regEx(self):
-        """Return current built regular expression used for lexer"""
+        """Return current built regular expression used for lexer
+
+        Each rule is defined as a capturing group in regular expression, allowing
+        to retrieve matching rule directly from match (see ruleFromGroup())
+        """
         def ruleInsensitive(rule):
             if rule.caseInsensitive():
-                return f"(?:(?i){rule.regEx().pattern()})"
+                return f"((?i){rule.regEx().pattern()})"
             else:
-                return rule.regEx().pattern()
+                return f"({rule.regEx().pattern()})"
 
+        def ruleInsensitivePython(rule):
+            # python `re` only allows global flags at start of expression: use scoped flags
+            if rule.caseInsensitive():
+                return f"((?i:{rule.regEx().pattern()}))"
+            else:
+                return f"({rule.regEx().pattern()})"
+
+        self.__mutex.lock()
         if self.__needUpdate:
             self.clearCache(True)
-            self.__needUpdate = False
             self.__regEx = QRegularExpression('|'.join([ruleInsensitive(rule) for rule in self.__rules]), QRegularExpression.MultilineOption)
 
-        return self.__regEx
+            # group 0 is the whole match and doesn't refer to any rule
+            # a rule can define its own capturing groups: all of them refer to rule
+            regExGroupRules = [None]
+            regExGroupRuleIds = [None]
+            for ruleId, rule in enumerate(self.__rules):
+                regExGroupRules += [rule] * (rule.regEx().captureCount() + 1)
+                regExGroupRuleIds += [ruleId] * (rule.regEx().captureCount() + 1)
+            self.__regExGroupRules = regExGroupRules
+            self.__regExGroupRuleIds = regExGroupRuleIds
+            self.__tokenRules = tuple(self.__rules) + Tokenizer.__TOKEN_INDENT_RULES
+            self.__fingerprint = None
+
+            # QRegularExpression doesn't use unicode properties by default: \w, \d, \s, \b only match ASCII characters
+            try:
+                self.__regExPython = re.compile('|'.join([ruleInsensitivePython(rule) for rule in self.__rules]), re.MULTILINE | re.ASCII)
+            except Exception:
+                self.__regExPython = None
+
+            if self.__regExPython is None or self.__regExBackend == Tokenizer.REGEX_BACKEND_QT:
+                self.__regExBackendSelected = Tokenizer.REGEX_BACKEND_QT
+            elif self.__regExBackend == Tokenizer.REGEX_BACKEND_PYTHON:
+                self.__regExBackendSelected = Tokenizer.REGEX_BACKEND_PYTHON
+            else:
+                self.__regExBackendSelected = None
+            self.__needUpdate = False
+        returned = self.__regEx
+        self.__mutex.unlock()
+
+        return returned
+
+    def ruleFromGroup(self, index):
+        """Return rule for given captured group `index` of regEx()
+
+        Usually `index` is the lastCapturedIndex() of a match
+        Return None if no rule is defined for given `index`
+        """
+        if index > 0 and index < len(self.__regExGroupRules):
+            return self.__regExGroupRules[index]
+        return None
+
+    def regExBackend(self):
+        """Return regular expression backend to use (Tokenizer.REGEX_BACKEND_AUTO, REGEX_BACKEND_QT or REGEX_BACKEND_PYTHON)"""
+        return self.__regExBackend
+
+    def setRegExBackend(self, value):
+        """Set regular expression backend to use
+
+        Given `value` can be:
+        - Tokenizer.REGEX_BACKEND_AUTO: the faster backend for rules is selected automatically
+        - Tokenizer.REGEX_BACKEND_QT: QRegularExpression is used
+        - Tokenizer.REGEX_BACKEND_PYTHON: python `re` module is used; if rules can't be compiled with python
+          `re` module, QRegularExpression is used
+        """
+        if value not in (Tokenizer.REGEX_BACKEND_AUTO, Tokenizer.REGEX_BACKEND_QT, Tokenizer.REGEX_BACKEND_PYTHON):
+            raise EInvalidValue("Given `value` must be a valid regular expression backend")
+
+        if value != self.__regExBackend:
+            self.__regExBackend = value
+            self.__needUpdate = True
+
+    def regExBackendSelected(self):
+        """Return regular expression backend used for rules
+
+        Return None if backend is not yet selected (auto mode)
+        """
+        self.regEx()
+        return self.__regExBackendSelected
+
+    def __matchesQt(self, regEx, text, position):
+        """Return iterator on matches (captured group index, position start, position end, text) from QRegularExpression"""
+        matchIterator = regEx.globalMatch(text, position)
+        while matchIterator.hasNext():
+            match = matchIterator.next()
+            yield (match.lastCapturedIndex(), match.capturedStart(0), match.capturedEnd(0), match.captured(0))
+
+    def __matchesPython(self, regEx, text, position):
+        """Return iterator on matches (captured group index, position start, position end, text) from python `re` module"""
+        return ((match.lastindex, match.start(), match.end(), match.group()) for match in regEx.finditer(text, position))
+
+    def __selectRegExBackend(self, text):
+        """Select faster regular expression backend, using given `text` as sample
+
+        Python backend is selected only if faster and if it returns the same tokens than QRegularExpression
+        """
+        regEx = self.regEx()
+        regExPython = self.__regExPython
+        sample = text[:Tokenizer.__REGEX_BACKEND_SAMPLE_MAXLENGTH]
+
+        durations = {}
+        results = {}
+        for backend, matches, backendRegEx in ((Tokenizer.REGEX_BACKEND_QT, self.__matchesQt, regEx),
+                                               (Tokenizer.REGEX_BACKEND_PYTHON, self.__matchesPython, regExPython)):
+            for run in range(2):
+                startTime = time.perf_counter()
+                results[backend] = [(self.__regExGroupRuleIds[groupIndex], positionStart, positionEnd)
+                                    for groupIndex, positionStart, positionEnd, tokenText in matches(backendRegEx, sample, 0)
+                                    if positionEnd > positionStart]
+                duration = time.perf_counter() - startTime
+                if run == 0 or duration < durations[backend]:
+                    durations[backend] = duration
+
+        self.__mutex.lock()
+        if self.__regEx is regEx:
+            if (results[Tokenizer.REGEX_BACKEND_PYTHON] == results[Tokenizer.REGEX_BACKEND_QT] and
+               durations[Tokenizer.REGEX_BACKEND_PYTHON] < durations[Tokenizer.REGEX_BACKEND_QT]):
+                self.__regExBackendSelected = Tokenizer.REGEX_BACKEND_PYTHON
+            else:
+                self.__regExBackendSelected = Tokenizer.REGEX_BACKEND_QT
+        self.__mutex.unlock()
 
     def clearCache(self, full=True):
         """Clear cache content
 
         If `full`, clear everything
 
-        Otherwise clear oldest values
-        - At least 5 items are kept in cache
-        - At most, 250 items are kept in cache
+        Otherwise remove least recently used items until cache is within limits
+        (number of entries and approximative size); most recently used item is
+        always kept
         """
+        self.__mutex.lock()
         if full:
-            self.__cache = {}
-            self.__cacheOrdered = []
+            self.__cache = OrderedDict()
+            self.__cacheSize = 0
         else:
-            currentTime = time.time()
-            # keep at least, five items
-            for key in self.__cacheOrdered[:-5]:
-                if (currentTime - self.__cache[key][0]) > 120:
-                    # older than than 2minutes, clear it
-                    self.__setCache(key, False)
-
-            if len(self.__cacheOrdered) > 250:
-                keys = self.__cacheOrdered[:-250]
-                for key in keys:
-                    self.__setCache(key, False)
+            while len(self.__cache) > 1 and (len(self.__cache) > self.__cacheMaxEntries or self.__cacheSize > self.__cacheMaxSize):
+                self.__cacheSize -= self.__cache.popitem(last=False)[1][1]
+                self.__cacheEvictions += 1
+        self.__mutex.unlock()
+
+    def cacheLimits(self):
+        """Return cache limits as a tuple (max number of entries, max approximative size in bytes)"""
+        return (self.__cacheMaxEntries, self.__cacheMaxSize)
+
+    def setCacheLimits(self, maxEntries=None, maxSize=None):
+        """Set cache limits
+
+        Given `maxEntries` is the maximum number of tokenized texts kept in cache
+        Given `maxSize` is the maximum approximative size (in bytes) of cache
+        When None, limit is not modified
+        """
+        if maxEntries is not None:
+            if not isinstance(maxEntries, int):
+                raise EInvalidType("Given `maxEntries` must be an <int>")
+            elif maxEntries < 1:
+                raise EInvalidValue("Given `maxEntries` must be greater than 0")
+            self.__cacheMaxEntries = maxEntries
+
+        if maxSize is not None:
+            if not isinstance(maxSize, int):
+                raise EInvalidType("Given `maxSize` must be an <int>")
+            elif maxSize < 0:
+                raise EInvalidValue("Given `maxSize` must be a positive number")
+            self.__cacheMaxSize = maxSize
+
+        self.clearCache(False)
+
+    def cacheStats(self):
+        """Return cache statistics as a dictionary
+
+            'entries':      number of items in cache
+            'size':         approximative size (in bytes) of cache
+            'hits':         number of tokenize() call for which result was found in cache
+            'misses':       number of tokenize() call for which result was not found in cache
+            'evictions':    number of items removed from cache to respect limits
+        """
+        self.__mutex.lock()
+        returned = {
+                'entries': len(self.__cache),
+                'size': self.__cacheSize,
+                'hits': self.__cacheHits,
+                'misses': self.__cacheMisses,
+                'evictions': self.__cacheEvictions
+            }
+        self.__mutex.unlock()
+        return returned
+
+    def resetCacheStats(self):
+        """Reset cache statistics counters (hits, misses, evictions)"""
+        self.__mutex.lock()
+        self.__cacheHits = 0
+        self.__cacheMisses = 0
+        self.__cacheEvictions = 0
+        self.__mutex.unlock()
 
     def simplifyTokenSpaces(self):
         """Return if option 'simplify token spaces' is active or not"""
@@ -924,6 +1418,190 @@ class Tokenizer(object):
             self.__simplifyTokenSpaces = value
             self.__needUpdate = True
 
+    def __searchTokenIndex(self, tokensData, position, indentRuleId):
+        """Return index of last token from `tokensData` starting before or at given `position`
+
+        INDENT/DEDENT tokens (rule id greater or equal than `indentRuleId`) are never returned: they're
+        produced by tokenizer in front of a token with positions that can be after the token itself,
+        then token they've been produced for is returned
+        Return -1 if there's no token
+        """
+        ruleIds, positionsStart = tokensData[0:2]
+        nbTokens = len(ruleIds)
+        lo = 0
+        hi = nbTokens
+        while lo < hi:
+            mid = (lo + hi) // 2
+            index = mid
+            while index < nbTokens - 1 and ruleIds[index] >= indentRuleId:
+                index += 1
+
+            if positionsStart[index] <= position:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        index = lo - 1
+        while 0 <= index < nbTokens - 1 and ruleIds[index] >= indentRuleId:
+            index += 1
+        return index
+
+    def __lex(self, text, position=0, lineNumber=1, linePositionStart=0, indent=None, indentPosition=None, previousIndent=0, checkSync=None):
+        """Lex given `text` starting from given `position`
+
+        See __lexChunks() for parameters and returned value
+        """
+        chunks = self.__lexChunks(text, position, lineNumber, linePositionStart, indent, indentPosition, previousIndent, checkSync)
+        try:
+            while True:
+                next(chunks)
+        except StopIteration as result:
+            return result.value
+
+    def __lexChunks(self, text, position=0, lineNumber=1, linePositionStart=0, indent=None, indentPosition=None, previousIndent=0, checkSync=None, chunkSize=0):
+        """Lex given `text` starting from given `position`, as a generator
+
+        Given `lineNumber` and `linePositionStart` define row and start position of line on which
+        given `position` is located
+
+        Given `indent`, `indentPosition` and `previousIndent` define tokenizer state at given `position`
+        (when not provided, state is defined for start of text)
+
+        All lexing state is local to method call, allowing tokenization from different threads
+
+        If provided, `checkSync` is a callable called for each token starting a line, once INDENT/DEDENT tokens
+        have been produced for it: checkSync(positionStart, ruleId, length, row, indent, indentDefined)
+        When returned value is not None, lexing is stopped (given token is not added to produced tokens)
+
+        Return a tuple (tokensData, indent, indentPosition, unknownIndex, sync)
+        - tokensData: produced tokens, as a tuple of arrays (rule id, position start, position end, row, column, indent)
+        - indent: indent value at the end of lexing
+        - indentPosition: position of token from which indent value has been defined
+        - unknownIndex: index of first unknown token from produced tokens
+        - sync: value returned by `checkSync` or None if end of text has been reached
+
+        If `chunkSize` is greater than 0, once a line is completed and at least `chunkSize` tokens have been
+        produced, tokens are yielded (as a tuple of arrays) and removed from returned tuple; otherwise
+        nothing is yielded
+        """
+        tokensData = tuple(array('i') for index in range(6))
+        ruleIds, positionsStart, positionsEnd, rows, columns, indents = tokensData
+        unknownIndex = None
+
+        if indent is None:
+            indent = self.__indent
+            if indent >= 0:
+                indentPosition = -1
+
+        regEx = self.regEx()
+        regExGroupRuleIds = self.__regExGroupRuleIds
+        tokenRules = self.__tokenRules
+
+        if self.__regExBackendSelected is None and len(text) >= Tokenizer.__REGEX_BACKEND_SAMPLE_MINLENGTH:
+            self.__selectRegExBackend(text)
+
+        if self.__regExBackendSelected == Tokenizer.REGEX_BACKEND_PYTHON and strIsBmp(text):
+            matches = self.__matchesPython(self.__regExPython, text, position)
+        else:
+            # positions are returned in UTF-16 code units by QRegularExpression, python backend can't be
+            # used if text contains characters outside unicode BMP
+            matches = self.__matchesQt(regEx, text, position)
+        indentRuleId = len(tokenRules) - len(Tokenizer.__TOKEN_INDENT_RULES)
+        indentRuleIds = {rule: indentRuleId + index for index, rule in enumerate(Tokenizer.__TOKEN_INDENT_RULES)}
+
+        # iterate all found tokens
+        for groupIndex, tokenPositionStart, tokenPositionEnd, tokenText in matches:
+            if tokenPositionEnd == tokenPositionStart or groupIndex is None:
+                # empty matches are ignored
+                continue
+
+            # matching rule is given by captured group
+            ruleId = regExGroupRuleIds[groupIndex]
+            if ruleId is None:
+                continue
+
+            rule = tokenRules[ruleId]
+            tokenRow = lineNumber
+            tokenColumn = tokenPositionStart - linePositionStart + 1
+
+            if rule.type() == TokenType.NEWLINE:
+                tokenIndent = 0
+                lineNumber += tokenText.count('\n')
+                linePositionStart = tokenPositionEnd
+            else:
+                tokenIndent = len(tokenText) - len(tokenText.lstrip())
+
+            indentDefined = False
+
+            # ---- manage indent/dedent ----
+            if not rule.ignoreIndent() and indent != 0 and tokenColumn == 1 and not tokenText.isspace():
+                # indent value is not zero => means that indent are managed
+                # token is not empty string (only spaces and/or newline)
+                if indent < 0 and tokenIndent > 0:
+                    # if indent is negative, define indent value with first indented token
+                    indent = tokenIndent
+                    indentPosition = tokenPositionStart
+                if indent > 0:
+                    indentTokens = []
+                    if previousIndent < tokenIndent:
+                        # token indent is greater than previous indent value
+                        # need to add INDENT token
+                        nbIndent, nbWrongIndent = divmod(tokenIndent - previousIndent, indent)
+                        indentRule = Tokenizer.__TOKEN_INDENT_RULE
+                        wrongIndentRule = Tokenizer.__TOKEN_WRONGINDENT_RULE
+                    elif previousIndent > tokenIndent:
+                        # token indent is lower than previous indent value
+                        # need to add DEDENT token
+                        nbIndent, nbWrongIndent = divmod(previousIndent - tokenIndent, indent)
+                        indentRule = Tokenizer.__TOKEN_DEDENT_RULE
+                        wrongIndentRule = Tokenizer.__TOKEN_WRONGDEDENT_RULE
+                    else:
+                        nbIndent = 0
+                        nbWrongIndent = 0
+
+                    for numIndent in range(nbIndent):
+                        pStart = tokenPositionStart + indent * numIndent
+                        indentTokens.append((indentRuleIds[indentRule], pStart, pStart + indent))
+
+                    if nbWrongIndent > 0:
+                        pStart = tokenPositionStart + indent * nbIndent
+                        indentTokens.append((indentRuleIds[wrongIndentRule], pStart, pStart + nbWrongIndent))
+
+                    for indentTokenRuleId, pStart, pEnd in indentTokens:
+                        ruleIds.append(indentTokenRuleId)
+                        positionsStart.append(pStart)
+                        positionsEnd.append(pEnd)
+                        rows.append(tokenRow)
+                        columns.append(pStart - linePositionStart + 1)
+                        indents.append(pEnd - pStart)
+
+                    previousIndent = tokenIndent
+                    indentDefined = True
+
+            if checkSync is not None and tokenColumn == 1:
+                sync = checkSync(tokenPositionStart, ruleId, tokenPositionEnd - tokenPositionStart, tokenRow, indent, indentDefined)
+                if sync is not None:
+                    return (tokensData, indent, indentPosition, unknownIndex, sync)
+
+            if unknownIndex is None and rule.type() == TokenType.UNKNOWN:
+                unknownIndex = len(ruleIds)
+
+            ruleIds.append(ruleId)
+            positionsStart.append(tokenPositionStart)
+            positionsEnd.append(tokenPositionEnd)
+            rows.append(tokenRow)
+            columns.append(tokenColumn)
+            indents.append(tokenIndent)
+
+            if chunkSize > 0 and tokenRow != lineNumber and len(ruleIds) >= chunkSize:
+                # a NEWLINE token has been produced (ie: a line is completed) and chunk is full
+                yield tokensData
+                tokensData = tuple(array('i') for index in range(6))
+                ruleIds, positionsStart, positionsEnd, rows, columns, indents = tokensData
+                unknownIndex = None
+
+        return (tokensData, indent, indentPosition, unknownIndex, None)
+
     def tokenize(self, text):
         """Tokenize given text
 
@@ -939,128 +1617,274 @@ class Tokenizer(object):
         if not isinstance(text, str):
             raise EInvalidType("Given `text` must be a <str>")
 
-        returned = []
-
         if self.__needUpdate:
             # rules has been modified, cleanup cache
             self.clearCache(True)
 
         if text == "" or len(self.__rules) == 0:
             # nothing to process (empty string and/or no rules?)
-            return Tokens(text, returned)
+            return Tokens(text)
 
-        textHash = hashlib.sha1()
-        textHash.update(text.encode())
-        hashValue = textHash.hexdigest()
+        hashValue = self.__cacheKey(text)
 
+        self.__mutex.lock()
         if hashValue in self.__cache:
             # udpate
+            self.__cacheHits += 1
             self.__setCache(hashValue, True)
-            # need to clear unused items in cache
-            self.clearCache(False)
-            return self.__cache[hashValue][1]
+            returnedTokens = self.__cache[hashValue][0]
+            self.__mutex.unlock()
+            return returnedTokens
+
+        self.__cacheMisses += 1
+        self.__mutex.unlock()
+
+        tokensData, indent, indentPosition, unknownIndex, sync = self.__lex(text)
+
+        # add
+        returnedTokens = Tokens(text, tokensData, self.__tokenRules, self.__simplifyTokenSpaces, indent, indentPosition, unknownIndex)
+        self.__setCache(hashValue, returnedTokens)
+
+        return returnedTokens
+
+    def tokensFromData(self, text, tokensData, indent=None, indentPosition=None, unknownIndex=None):
+        """Return a Tokens object for given `text` built from given `tokensData`
+
+        Allows to restore tokens (for example from a persistent cache) without tokenizing `text` again:
+        - Given `tokensData` is a tuple of arrays, as returned by Tokens.tokensData()
+        - Given `indent`, `indentPosition` and `unknownIndex` are values returned by Tokens methods
+
+        Given data must have been produced by a tokenizer with the same fingerprint()
+        Returned tokens are kept in cache, as tokens returned by tokenize()
+        """
+        if not isinstance(text, str):
+            raise EInvalidType("Given `text` must be a <str>")
+
+        # ensure rules are up to date
+        self.regEx()
+
+        returnedTokens = Tokens(text, tokensData, self.__tokenRules, self.__simplifyTokenSpaces, indent, indentPosition, unknownIndex)
+        if text != "":
+            self.__setCache(self.__cacheKey(text), returnedTokens)
+
+        return returnedTokens
+
+    def fingerprint(self):
+        """Return a fingerprint (SHA1 hexadecimal digest) of tokenizer definition
+
+        Fingerprint is modified if rules or options that modify produced tokens are modified
+        """
+        # ensure rules are up to date
+        self.regEx()
+
+        if self.__fingerprint is None:
+            fingerprint = hashlib.sha1()
+            fingerprint.update(f"{self.__indent}|{self.__simplifyTokenSpaces}\n".encode())
+            for rule in self.__rules:
+                fingerprint.update(f"{rule.type()}|{rule.regEx().pattern()}|{rule.caseInsensitive()}|{rule.ignoreIndent()}\n".encode())
+            self.__fingerprint = fingerprint.hexdigest()
+        return self.__fingerprint
+
+    def tokenizeIter(self, text, chunkSize=1000):
+        """Tokenize given text, as a generator
+
+        Tokens are yielded as soon as regular expression engine produce them, by chunks of complete
+        lines containing at least `chunkSize` tokens: lexing of text stops if generator is closed
+        (for example, when consumer stop on first fatal error)
+
+        Tokenized text is not put in cache, and yielded Token objects only see tokens of their chunk
+        (next() and previous() return None at chunk bounds)
 
-        matchIterator = self.regEx().globalMatch(text)
+        Yield Token objects
+        """
+        if not isinstance(text, str):
+            raise EInvalidType("Given `text` must be a <str>")
+        elif not isinstance(chunkSize, int) or chunkSize < 1:
+            raise EInvalidValue("Given `chunkSize` must be an <int> greater than 0")
+
+        if text == "" or len(self.__rules) == 0:
+            # nothing to process (empty string and/or no rules?)
+            return
 
-        Token.resetTokenizer()
+        # ensure rules are up to date
+        self.regEx()
+        tokenRules = self.__tokenRules
+
+        chunks = self.__lexChunks(text, chunkSize=chunkSize)
+        try:
+            while True:
+                yield from Tokens(text, next(chunks), tokenRules, self.__simplifyTokenSpaces).list()
+        except StopIteration as result:
+            yield from Tokens(text, result.value[0], tokenRules, self.__simplifyTokenSpaces).list()
+
+    def retokenize(self, tokens, text, position=None, charsRemoved=0, charsAdded=0):
+        """Tokenize given `text`, being a modified version of text from given `tokens`
+
+        Given `tokens` is a Tokens object returned by a previous call to tokenize() or retokenize()
+        Given `position`, `charsRemoved` and `charsAdded` define modified range, as provided by
+        QTextDocument.contentsChange() signal
+        If `position` is None, modified range is determinated from comparison of texts
+
+        Only tokens from the last line start before modification up to the first line start after
+        modification for which tokens are the same than before modification are tokenized again;
+        next tokens are reused, with position and row shifted
+
+        Return a Tokens object
+        """
+        if not isinstance(tokens, Tokens):
+            raise EInvalidType("Given `tokens` must be a <Tokens>")
+        elif not isinstance(text, str):
+            raise EInvalidType("Given `text` must be a <str>")
+
+        oldText = tokens.text()
+        oldTokensData = tokens.tokensData()
+        oldRuleIds, oldPositionsStart, oldPositionsEnd, oldRows, oldColumns, oldIndents = oldTokensData
+        nbOldTokens = len(oldRuleIds)
+
+        if position is None:
+            position, charsRemoved, charsAdded = strDiffRange(oldText, text)
+
+        delta = charsAdded - charsRemoved
+
+        if (self.__needUpdate or text == "" or nbOldTokens == 0 or len(self.__rules) == 0 or
+           tokens.indent() is None or tokens.rules() is not self.__tokenRules or len(text) != len(oldText) + delta or
+           not tokens.isBmp() or not strIsBmp(text)):
+            # rules has been modified, or nothing to reuse, or inconsistent range
+            # (or text with characters outside unicode BMP, for which python and token positions are not the same)
+            return self.tokenize(text)
+        elif charsRemoved == 0 and charsAdded == 0:
+            return tokens
+
+        tokenRules = self.__tokenRules
+        indentRuleId = len(tokenRules) - len(Tokenizer.__TOKEN_INDENT_RULES)
+
+        def indentValueAt(position, included):
+            # return indent value used by previous tokens, before (or at, if `included`) given position
+            if tokens.indentPosition() is not None and (tokens.indentPosition() < position or included and tokens.indentPosition() == position):
+                return tokens.indent()
+            return -1
+
+        # restart lexing from start of line that precedes modified line
+        restartPosition = oldText.rfind('\n', 0, position) + 1
+        if restartPosition > 0:
+            restartPosition = oldText.rfind('\n', 0, restartPosition - 1) + 1
+
+        unknownIndex = tokens.unknownIndex()
+        if unknownIndex is not None and oldPositionsStart[unknownIndex] < restartPosition:
+            # an unknown token can be the start of a token not yet completed (a string for which
+            # closing quote is missing for example) and modification can complete it
+            # => need to restart lexing from unknown token line
+            restartPosition = oldText.rfind('\n', 0, oldPositionsStart[unknownIndex]) + 1
+
+        restartIndex = max(0, self.__searchTokenIndex(oldTokensData, restartPosition, indentRuleId))
+        while restartIndex > 0 and (oldColumns[restartIndex] != 1 or oldRuleIds[restartIndex] >= indentRuleId):
+            restartIndex -= 1
+
+        # INDENT/DEDENT tokens produced for restart token will be produced again
+        syncIndex = restartIndex
+        while restartIndex > 0 and oldRuleIds[restartIndex - 1] >= indentRuleId:
+            restartIndex -= 1
+
+        if restartIndex > 0:
+            restartPosition = oldPositionsStart[syncIndex]
+            restartLineNumber = oldRows[syncIndex]
+        else:
+            # restart from start of text
+            restartPosition = 0
+            restartLineNumber = 1
+
+        # get indent values at restart position
+        if self.__indent >= 0:
+            indent = self.__indent
+        else:
+            indent = indentValueAt(restartPosition, False)
+
+        if indent < 0:
+            indentPosition = None
+        else:
+            indentPosition = tokens.indentPosition()
 
-        indent = self.__indent
         previousIndent = 0
-        previousToken = None
-        # iterate all found tokens
-        while matchIterator.hasNext():
-            match = matchIterator.next()
+        if indent > 0:
+            index = restartIndex - 1
+            while index >= 0:
+                rule = tokenRules[oldRuleIds[index]]
+                if (oldColumns[index] == 1 and oldRuleIds[index] < indentRuleId and not rule.ignoreIndent() and
+                   not oldText[oldPositionsStart[index]:oldPositionsEnd[index]].isspace()):
+                    previousIndent = oldIndents[index]
+                    break
+                index -= 1
 
-            for textIndex in range(len(match.capturedTexts())):
-                value = match.captured(textIndex)
+        editEnd = position + charsAdded
 
-                position = 0
-                for rule in self.__rules:
-                    if rule.caseInsensitive():
-                        options = QRegularExpression.CaseInsensitiveOption
-                    else:
-                        options = QRegularExpression.NoPatternOption
-
-                    if rule.regEx(True).match(value).hasMatch():
-                        tokenText = match.captured(textIndex)
-                        token = Token(tokenText, rule,
-                                      match.capturedStart(textIndex),
-                                      match.capturedEnd(textIndex),
-                                      match.capturedLength(textIndex),
-                                      self.__simplifyTokenSpaces)
-
-                        # ---- manage indent/dedent ----
-                        if not rule.ignoreIndent() and indent != 0 and (re.search(r'^\s*$', tokenText) is None) and token.column() == 1:
-                            # indent value is not zero => means that indent are managed
-                            # token is not empty string (only spaces and/or newline)
-                            if indent < 0 and token.indent() > 0:
-                                # if indent is negative, define indent value with first indented token
-                                indent = token.indent()
-
-                            if indent > 0:
-                                if previousIndent < token.indent():
-                                    # token indent is greater than previous indent value
-                                    # need to add INDENT token
-                                    nbIndent, nbWrongIndent = divmod(token.indent() - previousIndent, indent)
-
-                                    for numIndent in range(nbIndent):
-                                        pStart = token.positionStart() + indent * numIndent
-                                        pEnd = token.positionStart() + indent * (numIndent + 1)
-                                        length = pEnd-pStart
-
-                                        tokenIndent = Token(' ' * indent, Tokenizer.__TOKEN_INDENT_RULE, pStart, pEnd, length)
-                                        tokenIndent.setPrevious(previousToken)
-                                        returned.append(tokenIndent)
-                                        previousToken = tokenIndent
-
-                                    if nbWrongIndent > 0:
-                                        pStart = token.positionStart() + indent * (numIndent + 1)
-                                        pEnd = pStart+nbWrongIndent
-
-                                        tokenIndent = Token(' ' * nbWrongIndent, Tokenizer.__TOKEN_WRONGINDENT_RULE, pStart, pEnd, nbWrongIndent)
-                                        tokenIndent.setPrevious(previousToken)
-                                        returned.append(tokenIndent)
-                                        previousToken = tokenIndent
-
-                                elif previousIndent > token.indent():
-                                    # token indent is lower than previous indent value
-                                    # need to add DEDENT token
-                                    nbIndent, nbWrongIndent = divmod(previousIndent - token.indent(), indent)
-
-                                    for numIndent in range(nbIndent):
-                                        pStart = token.positionStart() + indent * numIndent
-                                        pEnd = token.positionStart() + indent * (numIndent + 1)
-                                        length = pEnd-pStart
-
-                                        tokenIndent = Token(' ' * indent, Tokenizer.__TOKEN_DEDENT_RULE, pStart, pEnd, length)
-                                        tokenIndent.setPrevious(previousToken)
-                                        returned.append(tokenIndent)
-                                        previousToken = tokenIndent
-
-                                    if nbWrongIndent > 0:
-                                        pStart = token.positionStart() + indent * (numIndent + 1)
-                                        pEnd = pStart+nbWrongIndent
-
-                                        tokenIndent = Token(' ' * nbWrongIndent, Tokenizer.__TOKEN_WRONGDEDENT_RULE, pStart, pEnd, nbWrongIndent)
-                                        tokenIndent.setPrevious(previousToken)
-                                        returned.append(tokenIndent)
-                                        previousToken = tokenIndent
-
-                                previousIndent = token.indent()
-
-                        token.setPrevious(previousToken)
-                        if previousToken is not None:
-                            previousToken.setNext(token)
-                        returned.append(token)
-                        previousToken = token
-
-                        # do not need to continue to check for another token type
-                        break
+        def checkSync(positionStart, ruleId, length, row, indent, indentDefined):
+            # check if produced token can be synchronized with a token from previous tokens
+            nonlocal syncIndex
 
-        # add
-        self.__setCache(hashValue, Tokens(text, returned))
+            if positionStart < editEnd:
+                return None
 
-        # need to clear unused items in cache
-        self.clearCache(False)
+            oldPosition = positionStart - delta
+            while syncIndex < nbOldTokens and (oldRuleIds[syncIndex] >= indentRuleId or oldPositionsStart[syncIndex] < oldPosition):
+                syncIndex += 1
+
+            if syncIndex >= nbOldTokens:
+                return None
+
+            if (oldPositionsStart[syncIndex] == oldPosition and oldColumns[syncIndex] == 1 and
+               oldRuleIds[syncIndex] == ruleId and oldPositionsEnd[syncIndex] - oldPosition == length and
+               (indentDefined or indent <= 0) and indent == indentValueAt(oldPosition, True)):
+                return (syncIndex, row - oldRows[syncIndex])
+            return None
+
+        tokensData, indent, indentPosition, lexUnknownIndex, sync = self.__lex(text, restartPosition, restartLineNumber, restartPosition, indent, indentPosition, previousIndent, checkSync)
+
+        if unknownIndex is not None and unknownIndex >= restartIndex:
+            # first unknown token from previous tokens is not kept
+            unknownIndex = None
+
+        if unknownIndex is None and lexUnknownIndex is not None:
+            unknownIndex = restartIndex + lexUnknownIndex
+
+        if sync is None:
+            returnedData = tuple(oldData[:restartIndex] + data for oldData, data in zip(oldTokensData, tokensData))
+        else:
+            syncIndex, rowOffset = sync
+
+            if unknownIndex is None and tokens.unknownIndex() is not None:
+                # first unknown token, if any, is in reused tokens
+                if tokens.unknownIndex() >= syncIndex:
+                    unknownIndex = tokens.unknownIndex()
+                else:
+                    for index in range(syncIndex, nbOldTokens):
+                        if tokenRules[oldRuleIds[index]].type() == TokenType.UNKNOWN:
+                            unknownIndex = index
+                            break
+
+                if unknownIndex is not None:
+                    unknownIndex += restartIndex + len(tokensData[0]) - syncIndex
+
+            # reused tokens are shifted
+            reusedData = [oldData[syncIndex:] for oldData in oldTokensData]
+            if delta != 0:
+                reusedData[1] = array('i', [value + delta for value in reusedData[1]])
+                reusedData[2] = array('i', [value + delta for value in reusedData[2]])
+            if rowOffset != 0:
+                reusedData[3] = array('i', [value + rowOffset for value in reusedData[3]])
+
+            if indentPosition is None and tokens.indentPosition() is not None:
+                # indent value defined after synchronization
+                indentPosition = tokens.indentPosition() + delta
+            indent = tokens.indent()
+
+            returnedData = tuple(oldData[:restartIndex] + data + reused for oldData, data, reused in zip(oldTokensData, tokensData, reusedData))
+
+        returnedTokens = Tokens(text, returnedData, tokenRules, self.__simplifyTokenSpaces, indent, indentPosition, unknownIndex)
+        if sync is None:
+            returnedTokens.setReusedFrom(tokens, restartIndex)
+        else:
+            returnedTokens.setReusedFrom(tokens, restartIndex, syncIndex, restartIndex + len(tokensData[0]) - syncIndex)
+
+        self.__setCache(self.__cacheKey(text), returnedTokens)
 
-        return self.__cache[hashValue][1]
+        return returnedTokens
@@ -14,6 +14,7 @@
 # - syntax highlighting
 # - autocompletion
 # - line number
+# - diagnostics (errors) display
 # - ...
 #
 # Main class from this module
@@ -102,6 +103,12 @@ class WCodeEditor(QPlainTextEdit):
 
         self.setContextMenuPolicy(Qt.CustomContextMenu)
 
+        # diagnostics (errors from a parser for example) displayed in editor
+        # list of (row, column, length, message)
+        self.__diagnostics = []
+        # key=row, value=list of diagnostics for row
+        self.__diagnosticsRows = {}
+
         # ---- options ----
         # > TODO: need to define setters/getters
 
@@ -135,6 +142,9 @@ class WCodeEditor(QPlainTextEdit):
         self.__optionShowSpaces = True
         self.__optionSpacesColor = QColor("#88666666")
 
+        # diagnostics properties
+        self.__optionDiagnosticsColor = QColor('#e06c75')
+
         # autocompletion is automatic (True) or manual (False)
         self.__optionAutoCompletion = True
 
@@ -405,6 +415,50 @@ class WCodeEditor(QPlainTextEdit):
         self.setExtraSelections(extraSelections)
         self.__updateCurrentPositionAndToken(False)
 
+    def __paintDiagnostics(self, event):
+        """Underline text for which a diagnostic is defined"""
+        rect = event.rect()
+        charWidth = QFontMetricsF(self.currentCharFormat().font()).averageCharWidth()
+        viewportRight = self.viewport().width()
+
+        painter = QPainter(self.viewport())
+        painter.setPen(QPen(self.__optionDiagnosticsColor, 1))
+
+        for row, column, length, message in self.__diagnostics:
+            block = self.document().findBlockByNumber(row - 1)
+            if not block.isValid() or not block.isVisible():
+                continue
+
+            cursor = QTextCursor(block)
+            cursor.setPosition(block.position() + min(max(0, column - 1), block.length() - 1))
+            startRect = self.cursorRect(cursor)
+            if startRect.top() > rect.bottom() or startRect.bottom() < rect.top():
+                continue
+
+            cursor.setPosition(block.position() + min(max(0, column - 1 + length), block.length() - 1))
+            endRect = self.cursorRect(cursor)
+
+            left = startRect.left()
+            if endRect.top() != startRect.top():
+                # wrapped line: underline until the end of row
+                right = viewportRight
+            else:
+                right = max(endRect.left(), left + charWidth)
+
+            # wave line
+            bottom = startRect.bottom()
+            points = []
+            x = left
+            up = True
+            while x < right:
+                points.append(QPointF(x, bottom - 2 if up else bottom))
+                x += 2
+                up = not up
+            points.append(QPointF(right, bottom - 2 if up else bottom))
+            painter.drawPolyline(QPolygonF(points))
+
+        painter.end()
+
     def __isEmptyBlock(self, blockNumber):
         """Check is line for current block is empty or not"""
         # get block text
@@ -473,7 +527,10 @@ class WCodeEditor(QPlainTextEdit):
             #   a block can, for example, be hidden by a window placed over the text edit
             if block.isVisible() and bottom >= event.rect().top():
                 number = f"{blockNumber + 1}"
-                painter.setPen(self.__optionGutterText.foreground().color())
+                if (blockNumber + 1) in self.__diagnosticsRows:
+                    painter.setPen(self.__optionDiagnosticsColor)
+                else:
+                    painter.setPen(self.__optionGutterText.foreground().color())
                 painter.drawText(QRectF(0, top, self.__lineNumberArea.width(), self.fontMetrics().height()), Qt.AlignRight, number)
 
             block = block.next()
@@ -481,6 +538,19 @@ class WCodeEditor(QPlainTextEdit):
             bottom = top + self.blockBoundingRect(block).height()
             blockNumber += 1
 
+    def viewportEvent(self, event):
+        """Display diagnostic message as tooltip when mouse is over an underlined text"""
+        if event.type() == QEvent.ToolTip and len(self.__diagnostics) > 0:
+            cursor = self.cursorForPosition(event.pos())
+            column = cursor.positionInBlock() + 1
+            messages = [message for diagnosticColumn, length, message in self.__diagnosticsRows.get(cursor.blockNumber() + 1, [])
+                        if diagnosticColumn <= column <= diagnosticColumn + max(1, length)]
+            if len(messages) > 0:
+                QToolTip.showText(event.globalPos(), '\n'.join(messages), self.viewport())
+                return True
+            # not over a diagnostic: let other tooltips (token help) be managed
+        return super(WCodeEditor, self).viewportEvent(event)
+
     def wheelEvent(self, event):
         """CTRL + wheel os used to zoom in/out font size"""
         if self.__optionWheelSetFontSize and event.modifiers() == Qt.ControlModifier:
@@ -541,6 +611,9 @@ class WCodeEditor(QPlainTextEdit):
         """Customize painting"""
         super(WCodeEditor, self).paintEvent(event)
 
+        if len(self.__diagnostics) > 0:
+            self.__paintDiagnostics(event)
+
         if not(self.__optionRightLimitVisible or self.__optionShowSpaces or self.__optionShowIndentLevel):
             return
 
@@ -1222,6 +1295,17 @@ class WCodeEditor(QPlainTextEdit):
             self.__optionSpacesColor = value
             self.update()
 
+    def optionDiagnosticsColor(self):
+        """Return diagnostics color"""
+        return self.__optionDiagnosticsColor
+
+    def setOptionDiagnosticsColor(self, value):
+        """Set diagnostics color"""
+        if isinstance(value, QColor) and value != self.__optionDiagnosticsColor:
+            self.__optionDiagnosticsColor = value
+            self.update()
+            self.__lineNumberArea.update()
+
     def optionAutoCompletion(self):
         """Return if autoCompletion is manual or automatic"""
         return self.__optionAutoCompletion
@@ -1262,6 +1346,36 @@ class WCodeEditor(QPlainTextEdit):
         if isinstance(value, bool) and value != self.__optionWheelSetFontSize:
             self.__optionWheelSetFontSize = value
 
+    def diagnostics(self):
+        """Return diagnostics displayed in editor, as a list of tuple (row, column, length, message)"""
+        return list(self.__diagnostics)
+
+    def setDiagnostics(self, diagnostics=None):
+        """Set diagnostics (errors found by a parser for example) displayed in editor
+
+        Given `diagnostics` is a list of tuple (row, column, length, message), with row and
+        column starting from 1; text is underlined, line number is highlighted and message is
+        displayed as tooltip
+
+        If None or empty list, diagnostics are cleared
+        """
+        if diagnostics is None:
+            diagnostics = []
+        elif not isinstance(diagnostics, (list, tuple)):
+            raise EInvalidType("Given `diagnostics` must be a <list>")
+
+        self.__diagnostics = []
+        self.__diagnosticsRows = {}
+        for diagnostic in diagnostics:
+            if not (isinstance(diagnostic, tuple) and len(diagnostic) == 4):
+                raise EInvalidValue("Given `diagnostics` items must be <tuple> (row, column, length, message)")
+            row, column, length, message = diagnostic
+            self.__diagnostics.append((row, column, length, message))
+            self.__diagnosticsRows.setdefault(row, []).append((column, length, message))
+
+        self.viewport().update()
+        self.__lineNumberArea.update()
+
     def setHeight(self, numberOfRows=None):
         """Set height according to given number of rows"""
 